@@ -1,12 +1,20 @@
 import logging
 
 from config import config, validate_startup_config
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 
 # Import routers so the lightweight app exposes the same API surface as server.py
 from routes import ads, ai, auth, platforms
+from services.indexes import ensure_indexes
+from services.mermaid_render import renderer_pool
+from services.metrics import (
+    PrometheusMiddleware,
+    instrument_motor_database,
+    loop_lag_monitor,
+    metrics_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,8 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
 )
+# Added last so it wraps every other middleware and times the whole request
+app.add_middleware(PrometheusMiddleware)
 
 # Include the same routers used by server.py so /api/auth and others are available
 app.include_router(ads.router)
@@ -43,9 +53,14 @@ async def startup():
 
     # Initialize MongoDB connection and attach to app.state so route dependencies work
     _client = AsyncIOMotorClient(config.get_mongo_url())
-    app.state.db = _client[config.get_db_name()]
+    # Collection calls are timed for /metrics
+    app.state.db = instrument_motor_database(_client[config.get_db_name()])
     logger.info(f"Connected to MongoDB database: {config.get_db_name()}")
 
+    await ensure_indexes(app.state.db)
+
+    loop_lag_monitor.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
@@ -55,6 +70,16 @@ async def shutdown_db_client():
         _client.close()
         logger.info("MongoDB connection closed")
 
+    await renderer_pool.close()
+    await loop_lag_monitor.stop()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = metrics_response()
+    return Response(content=body, media_type=content_type)
+
 
 @app.get("/health")
 async def health_check():
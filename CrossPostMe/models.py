@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -100,6 +100,23 @@ class AdAnalytics(BaseModel):
     date: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Platforms ads are posted to (config.AVAILABLE_PLATFORMS)
+AdPlatform = Literal["facebook", "craigslist", "offerup", "ebay"]
+
+# Largest increment one metric event may carry
+MAX_METRIC_INCREMENT = 1000
+
+
+class AdMetricEvent(BaseModel):
+    """Metric increments tracked for an ad on one platform."""
+
+    platform: AdPlatform
+    views: int = Field(0, ge=0, le=MAX_METRIC_INCREMENT)
+    clicks: int = Field(0, ge=0, le=MAX_METRIC_INCREMENT)
+    leads: int = Field(0, ge=0, le=MAX_METRIC_INCREMENT)
+    messages: int = Field(0, ge=0, le=MAX_METRIC_INCREMENT)
+
+
 class DashboardStats(BaseModel):
     total_ads: int
     active_ads: int
@@ -129,10 +146,13 @@ class AIAdResponse(BaseModel):
 class PaginationInfo(BaseModel):
     page: int
     per_page: int
-    total_items: int
-    total_pages: int
+    # Totals are only exact when requested (include_total); otherwise they are
+    # estimated from collection metadata or omitted for filtered listings
+    total_items: Optional[int] = None
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 
 class PaginatedAdsResponse(BaseModel):
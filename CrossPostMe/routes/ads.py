@@ -1,13 +1,13 @@
 import math
-import os
 import random
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from models import (
     Ad,
     AdAnalytics,
+    AdMetricEvent,
     AdCreate,
     AdUpdate,
     DashboardStats,
@@ -19,10 +19,63 @@ from models import (
 )
 from routes.dependencies import get_current_user, get_db, rate_limit_dependency
 from services.diagram import generate_ad_mermaid
+from services.mermaid_render import cache_key, render_svg
+from services.pagination import keyset_query, next_cursor, sort_spec
+from services.timeseries import query_series, record_samples, sample_doc
 
 router = APIRouter(prefix="/api/ads", tags=["ads"])
 
 
+async def _paginate(
+    collection,
+    query: dict,
+    sort_field: str,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    include_total: bool,
+):
+    """Fetch one page using keyset pagination on (sort_field, id).
+
+    When a cursor is given it takes precedence over ``page`` and the page is an
+    index range scan. ``page`` without a cursor falls back to skip for older
+    clients. Exact totals cost a full count, so they are only computed when
+    ``include_total`` is set; unfiltered listings get the metadata estimate.
+    """
+    find_query = keyset_query(query, sort_field, cursor)
+    skip = 0 if cursor else (page - 1) * per_page
+
+    items = (
+        await collection.find(find_query)
+        .sort(sort_spec(sort_field))
+        .skip(skip)
+        .limit(per_page + 1)
+        .to_list(per_page + 1)
+    )
+    cursor_out = next_cursor(items, sort_field, per_page)
+
+    if include_total:
+        total_items = await collection.count_documents(query)
+    elif not query:
+        total_items = await collection.estimated_document_count()
+    else:
+        total_items = None
+    total_pages = (
+        math.ceil(total_items / per_page) if total_items is not None else None
+    )
+
+    pagination = PaginationInfo(
+        page=page,
+        per_page=per_page,
+        total_items=total_items,
+        total_pages=total_pages,
+        has_next=cursor_out is not None,
+        has_prev=bool(cursor) or page > 1,
+        next_cursor=cursor_out,
+    )
+    return items, pagination
+
+
 # Create Ad
 @router.post("/", response_model=Ad)
 async def create_ad(
@@ -46,6 +99,8 @@ async def get_ads(
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     status: str = Query(None, description="Filter by status"),
     platform: str = Query(None, description="Filter by platform"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(False, description="Compute exact total count"),
     database=Depends(get_db),
 ):
     query = {}
@@ -54,28 +109,8 @@ async def get_ads(
     if platform:
         query["platforms"] = platform
 
-    # Calculate pagination
-    skip = (page - 1) * per_page
-    total_items = await database.ads.count_documents(query)
-    total_pages = math.ceil(total_items / per_page)
-
-    # Get paginated results
-    ads = (
-        await database.ads.find(query)
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(per_page)
-        .to_list(per_page)
-    )
-
-    # Create pagination info
-    pagination = PaginationInfo(
-        page=page,
-        per_page=per_page,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1,
+    ads, pagination = await _paginate(
+        database.ads, query, "created_at", page, per_page, cursor, include_total
     )
 
     return PaginatedAdsResponse(items=[Ad(**ad) for ad in ads], pagination=pagination)
@@ -220,9 +255,12 @@ async def get_user_diagrams(
     if not ads:
         return {}
 
-    # Batch fetch all posted_ads for these ads in a single query to avoid N+1
+    # Batch fetch all posted_ads for these ads in a single query to avoid N+1;
+    # only the fields the diagram depends on are needed
     ad_ids = [a.get("id") for a in ads if a.get("id")]
-    posted_cursor = database.posted_ads.find({"ad_id": {"$in": ad_ids}})
+    posted_cursor = database.posted_ads.find(
+        {"ad_id": {"$in": ad_ids}}, {"_id": 0, "ad_id": 1, "platform": 1}
+    )
     posted_list = await posted_cursor.to_list(length=2000)
 
     # Group posted ads by ad_id
@@ -232,85 +270,27 @@ async def get_user_diagrams(
     for pa in posted_list:
         posted_by_ad[pa.get("ad_id")].append(pa)
 
-    # Generate diagrams concurrently for responsiveness
-    import asyncio
-
-    async def make_diagram(ad):
-        pid = ad.get("id")
-        posted = posted_by_ad.get(pid, [])
-        # generate_ad_mermaid is CPU/lightweight; if it becomes heavy consider offloading
-        return pid, generate_ad_mermaid(ad, posted)
-
-    tasks = [make_diagram(a) for a in ads]
-    results = await asyncio.gather(*tasks)
-
-    diagrams = {pid: mer for pid, mer in results}
-    return diagrams
+    # generate_ad_mermaid is memoized per (ad, posted platforms), so unchanged
+    # ads are served from cache
+    return {
+        ad.get("id"): generate_ad_mermaid(ad, posted_by_ad.get(ad.get("id"), []))
+        for ad in ads
+    }
 
 
-# Render Mermaid to SVG (requires `mmdc` to be installed and available in PATH)
+# Render Mermaid to SVG. Results are cached by content hash; misses are served
+# by warm renderer processes, falling back to `mmdc` when Node is unavailable.
 @router.post("/render/svg")
 async def render_mermaid_svg(mermaid_text: str):
-    import asyncio
-    import shutil
-    import tempfile
-
-    mmdc = shutil.which("mmdc")
-    if not mmdc:
-        raise HTTPException(
-            status_code=501,
-            detail="Mermaid CLI (mmdc) not installed on server. Install it to use SVG rendering.",
-        )
-
-    # Enforce a mermaid_text size limit to avoid resource exhaustion
-    MAX_INPUT_SIZE = 32 * 1024  # 32 KB
-    if (
-        not isinstance(mermaid_text, str)
-        or len(mermaid_text.encode("utf-8")) > MAX_INPUT_SIZE
-    ):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Mermaid input too large (max {MAX_INPUT_SIZE} bytes)",
-        )
-
-    # Use asyncio subprocess to avoid blocking the event loop and apply a timeout
-    src = None
-    dst = None
-    try:
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".mmd", delete=False) as f:
-            f.write(mermaid_text)
-            src = f.name
-        dst = src + ".svg"
-
-        proc = await asyncio.create_subprocess_exec(mmdc, "-i", src, "-o", dst)
-
-        try:
-            await asyncio.wait_for(proc.wait(), timeout=10)
-        except asyncio.TimeoutError:
-            proc.kill()
-            raise HTTPException(status_code=504, detail="SVG rendering timed out")
-
-        if proc.returncode != 0:
-            raise HTTPException(
-                status_code=500, detail="Mermaid CLI failed to render SVG"
-            )
-
-        # Read resulting file safely
-        loop = asyncio.get_running_loop()
-        with open(dst, "rb") as svgf:
-            data = await loop.run_in_executor(None, svgf.read)
-
-        return Response(content=data, media_type="image/svg+xml")
-
-    finally:
-        # Best-effort cleanup
-        try:
-            if src and os.path.exists(src):
-                os.remove(src)
-            if dst and os.path.exists(dst):
-                os.remove(dst)
-        except Exception:
-            pass
+    data, cached = await render_svg(mermaid_text)
+    return Response(
+        content=data,
+        media_type="image/svg+xml",
+        headers={
+            "ETag": f'"{cache_key(mermaid_text)}"',
+            "X-Cache": "HIT" if cached else "MISS",
+        },
+    )
 
 
 # Get Posted Ads with Pagination
@@ -319,31 +299,13 @@ async def get_posted_ads(
     ad_id: str,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(False, description="Compute exact total count"),
     database=Depends(get_db),
 ):
-    # Calculate pagination
-    skip = (page - 1) * per_page
     query = {"ad_id": ad_id}
-    total_items = await database.posted_ads.count_documents(query)
-    total_pages = math.ceil(total_items / per_page)
-
-    # Get paginated results
-    posted_ads = (
-        await database.posted_ads.find(query)
-        .sort("posted_at", -1)
-        .skip(skip)
-        .limit(per_page)
-        .to_list(per_page)
-    )
-
-    # Create pagination info
-    pagination = PaginationInfo(
-        page=page,
-        per_page=per_page,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1,
+    posted_ads, pagination = await _paginate(
+        database.posted_ads, query, "posted_at", page, per_page, cursor, include_total
     )
 
     return PaginatedPostedAdsResponse(
@@ -357,34 +319,16 @@ async def get_all_posted_ads(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     platform: str = Query(None, description="Filter by platform"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(False, description="Compute exact total count"),
     database=Depends(get_db),
 ):
     query = {}
     if platform:
         query["platform"] = platform
 
-    # Calculate pagination
-    skip = (page - 1) * per_page
-    total_items = await database.posted_ads.count_documents(query)
-    total_pages = math.ceil(total_items / per_page)
-
-    # Get paginated results
-    posted_ads = (
-        await database.posted_ads.find(query)
-        .sort("posted_at", -1)
-        .skip(skip)
-        .limit(per_page)
-        .to_list(per_page)
-    )
-
-    # Create pagination info
-    pagination = PaginationInfo(
-        page=page,
-        per_page=per_page,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1,
+    posted_ads, pagination = await _paginate(
+        database.posted_ads, query, "posted_at", page, per_page, cursor, include_total
     )
 
     return PaginatedPostedAdsResponse(
@@ -418,49 +362,70 @@ async def get_dashboard_stats(database=Depends(get_db)):
     )
 
 
+# Track metric events (views, clicks, ...) for an ad
+@router.post("/{ad_id}/events", status_code=202)
+async def track_ad_event(
+    ad_id: str,
+    event: AdMetricEvent,
+    current_user: Optional[str] = Depends(get_current_user),
+    database=Depends(get_db),
+    _rl=Depends(rate_limit_dependency(capacity=120, per_seconds=60)),
+):
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    counts = event.dict(exclude={"platform"})
+    if not any(counts.values()):
+        raise HTTPException(status_code=400, detail="No metric increments given")
+    ad = await database.ads.find_one({"id": ad_id}, {"_id": 0, "owner_id": 1})
+    if not ad:
+        raise HTTPException(status_code=404, detail="Ad not found")
+    # Only the owner may add metrics; ads without an owner accept none
+    if current_user != ad.get("owner_id"):
+        raise HTTPException(status_code=403, detail="Not authorized to track this ad")
+    await record_samples(database, [sample_doc(ad_id, event.platform, **counts)])
+    return {"status": "recorded"}
+
+
 # Get Ad Analytics
 @router.get("/{ad_id}/analytics", response_model=List[AdAnalytics])
-async def get_ad_analytics(ad_id: str, days: int = 7, database=Depends(get_db)):
+async def get_ad_analytics(
+    ad_id: str,
+    days: int = Query(7, ge=1, le=3650),
+    resolution: Literal["day", "hour"] = "day",
+    database=Depends(get_db),
+):
     """
-    Get analytics for a specific ad over the specified time period.
+    Get analytics for a specific ad over the last ``days`` days.
 
-    **Note: Analytics data are simulated/generated for demonstration purposes.**
-    The following fields contain synthetic data and do not represent real metrics:
-    - views: Randomly generated between 50-500
-    - clicks: Randomly generated between 10-100
-    - leads: Randomly generated between 1-20
-    - messages: Randomly generated between 1-15
-    - conversion_rate: Randomly generated between 2.0-8.0%
-
-    Only the ad_id, platform, and date fields reflect actual posting data.
+    Returns one entry per platform and day (or hour) with activity, read from
+    the metric rollups in services.timeseries. Hourly resolution only reaches
+    back as far as hourly rollups are retained.
     """
     # First check if the ad exists
-    ad = await database.ads.find_one({"id": ad_id})
+    ad = await database.ads.find_one({"id": ad_id}, {"_id": 1})
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
 
-    start_date = datetime.utcnow() - timedelta(days=days)
-
-    posted_ads = await database.posted_ads.find(
-        {"ad_id": ad_id, "posted_at": {"$gte": start_date}}
-    ).to_list(1000)
-
-    analytics = []
-    for pa in posted_ads:
-        analytics.append(
-            AdAnalytics(
-                ad_id=ad_id,
-                platform=pa.get("platform"),
-                views=pa.get("views", random.randint(50, 500)),
-                clicks=pa.get("clicks", random.randint(10, 100)),
-                leads=pa.get("leads", random.randint(1, 20)),
-                messages=pa.get("messages", random.randint(1, 15)),
-                conversion_rate=round(random.uniform(2.0, 8.0), 2),
-                date=pa.get("posted_at"),
-            )
-        )
+    end = datetime.now(timezone.utc)
+    series = await query_series(
+        database, ad_id, end - timedelta(days=days), end, resolution=resolution
+    )
 
-    return analytics
+    return [
+        AdAnalytics(
+            ad_id=ad_id,
+            platform=point["platform"],
+            views=point["views"],
+            clicks=point["clicks"],
+            leads=point["leads"],
+            messages=point["messages"],
+            conversion_rate=(
+                round(point["leads"] / point["views"] * 100, 2) if point["views"] else 0.0
+            ),
+            date=point["bucket"],
+        )
+        for point in series
+    ]
 
 
 # Get Mermaid diagram for an ad
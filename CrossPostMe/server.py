@@ -4,7 +4,7 @@ from datetime import datetime
 
 # Import configuration and route modules
 from config import config, validate_startup_config
-from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Response
 from models import (
     PaginatedStatusChecksResponse,
     PaginationInfo,
@@ -13,6 +13,14 @@ from models import (
 )
 from motor.motor_asyncio import AsyncIOMotorClient
 from routes import ads, ai, auth, platforms
+from services.indexes import ensure_indexes
+from services.mermaid_render import renderer_pool
+from services.metrics import (
+    PrometheusMiddleware,
+    instrument_motor_database,
+    loop_lag_monitor,
+    metrics_response,
+)
 from starlette.middleware.cors import CORSMiddleware
 
 # Global client variable for shutdown; database is stored on app.state
@@ -116,6 +124,8 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
 )
+# Added last so it wraps every other middleware and times the whole request
+app.add_middleware(PrometheusMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -124,6 +134,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = metrics_response()
+    return Response(content=body, media_type=content_type)
+
+
 @app.on_event("startup")
 async def startup():
     """Initialize application components during startup."""
@@ -135,9 +152,14 @@ async def startup():
 
     # Initialize MongoDB connection after validation and attach to app.state
     client = AsyncIOMotorClient(config.get_mongo_url())
-    app.state.db = client[config.get_db_name()]
+    # Collection calls are timed for /metrics
+    app.state.db = instrument_motor_database(client[config.get_db_name()])
     logger.info(f"Connected to MongoDB database: {config.get_db_name()}")
 
+    await ensure_indexes(app.state.db)
+
+    loop_lag_monitor.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
@@ -145,3 +167,6 @@ async def shutdown_db_client():
     if client:
         client.close()
         logger.info("MongoDB connection closed")
+
+    await renderer_pool.close()
+    await loop_lag_monitor.stop()
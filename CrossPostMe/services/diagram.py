@@ -1,20 +1,17 @@
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 
 def generate_ad_mermaid(ad: Dict, posted: List[Dict]) -> str:
     """Generate a simple Mermaid flowchart string for an ad and its posted marketplaces.
 
     Implementation is intentionally small and deterministic for tests and UI demo.
+    The text is memoized on the inputs it depends on (ad title/owner and the
+    ordered set of posted platforms), so repeat gallery loads skip regeneration.
     """
     title = ad.get("title") or ad.get("id")
     owner = ad.get("owner_id", "unknown")
 
-    lines = ["flowchart TB"]
-    # High-level nodes
-    lines.append('    create["Create Ad"]')
-    lines.append(f'    ad["Ad: {title}"]')
-    lines.append("    create --> ad")
-
     # If there are posted marketplaces, add nodes
     platforms = []
     for p in posted:
@@ -22,6 +19,17 @@ def generate_ad_mermaid(ad: Dict, posted: List[Dict]) -> str:
         if plat and plat not in platforms:
             platforms.append(plat)
 
+    return _build_mermaid(str(title), str(owner), tuple(platforms))
+
+
+@lru_cache(maxsize=4096)
+def _build_mermaid(title: str, owner: str, platforms: Tuple[str, ...]) -> str:
+    lines = ["flowchart TB"]
+    # High-level nodes
+    lines.append('    create["Create Ad"]')
+    lines.append(f'    ad["Ad: {title}"]')
+    lines.append("    create --> ad")
+
     for i, plat in enumerate(platforms):
         node_id = f"m{i}"
         lines.append(f'    {node_id}["{plat}"]')
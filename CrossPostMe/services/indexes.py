@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Compound indexes per collection. Listing indexes end in (sort key, id) so the
+# keyset pagination in services.pagination is served by index range scans.
+INDEXES: Dict[str, List[Tuple[str, List[Tuple[str, int]]]]] = {
+    "ads": [
+        ("ads_created_id_idx", [("created_at", -1), ("id", -1)]),
+        ("ads_status_created_id_idx", [("status", 1), ("created_at", -1), ("id", -1)]),
+        (
+            "ads_platforms_created_id_idx",
+            [("platforms", 1), ("created_at", -1), ("id", -1)],
+        ),
+        ("ads_owner_created_id_idx", [("owner_id", 1), ("created_at", -1), ("id", -1)]),
+    ],
+    "posted_ads": [
+        ("posted_ads_posted_id_idx", [("posted_at", -1), ("id", -1)]),
+        (
+            "posted_ads_ad_posted_id_idx",
+            [("ad_id", 1), ("posted_at", -1), ("id", -1)],
+        ),
+        (
+            "posted_ads_platform_posted_id_idx",
+            [("platform", 1), ("posted_at", -1), ("id", -1)],
+        ),
+    ],
+    # Due-time claims and expired-lease reclaims in services.post_scheduler
+    "scheduled_posts": [
+        ("scheduled_posts_status_due_idx", [("status", 1), ("due_at", 1)]),
+        ("scheduled_posts_status_lease_idx", [("status", 1), ("lease_until", 1)]),
+        ("scheduled_posts_id_idx", [("id", 1)]),
+    ],
+    # Range reads and compaction in services.timeseries
+    "metric_samples": [
+        ("metric_samples_ad_ts_idx", [("ad_id", 1), ("ts", 1)]),
+        ("metric_samples_ts_idx", [("ts", 1)]),
+    ],
+    "metric_rollups_hourly": [
+        (
+            "metric_rollups_hourly_ad_bucket_idx",
+            [("ad_id", 1), ("bucket", 1), ("platform", 1)],
+        ),
+        ("metric_rollups_hourly_bucket_idx", [("bucket", 1)]),
+    ],
+    "metric_rollups_daily": [
+        (
+            "metric_rollups_daily_ad_bucket_idx",
+            [("ad_id", 1), ("bucket", 1), ("platform", 1)],
+        ),
+        ("metric_rollups_daily_bucket_idx", [("bucket", 1)]),
+    ],
+}
+
+
+async def ensure_indexes(db: Any) -> None:
+    """Create application indexes; failures are logged and never block startup."""
+    for collection, specs in INDEXES.items():
+        for name, keys in specs:
+            try:
+                await db[collection].create_index(keys, name=name, background=True)
+            except Exception as e:
+                logger.warning(f"Could not create index {name} on {collection}: {e}")
@@ -0,0 +1,375 @@
+"""Mermaid -> SVG rendering with a content-addressed cache and warm renderer pool.
+
+Rendered SVGs are keyed by the SHA-256 of the Mermaid source and kept in a
+bounded in-memory LRU backed by an on-disk cache directory, so a diagram is
+rendered at most once per deployment. Cache misses go to a small pool of
+long-lived Node processes (services/mermaid_renderer.mjs) that keep a headless
+browser open and take requests as JSON lines over stdin. If the pool cannot
+start (no node or @mermaid-js/mermaid-cli), rendering falls back to one-shot
+``mmdc`` invocations.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+MAX_INPUT_SIZE = 32 * 1024  # 32 KB
+RENDER_TIMEOUT = float(os.environ.get("MERMAID_RENDER_TIMEOUT", "10"))
+POOL_SIZE = int(os.environ.get("MERMAID_RENDERER_POOL_SIZE", "2"))
+CACHE_ENTRIES = int(os.environ.get("MERMAID_SVG_CACHE_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.environ.get("MERMAID_SVG_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_DIR = os.environ.get(
+    "MERMAID_SVG_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "crosspostme-svg-cache"),
+)
+
+# Bump when renderer options change so stale SVGs are not served
+RENDER_VERSION = "1"
+
+RENDERER_SCRIPT = Path(__file__).with_name("mermaid_renderer.mjs")
+
+# Rendered SVGs can be large; raise the StreamReader line limit accordingly
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+
+def cache_key(mermaid_text: str) -> str:
+    """Content hash identifying a rendered diagram."""
+    digest = hashlib.sha256(f"{RENDER_VERSION}\0{mermaid_text}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SvgCache:
+    """Memory LRU (bounded by entries and bytes) over an on-disk SVG cache."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = CACHE_DIR,
+        max_entries: int = CACHE_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.svg"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist rendered SVG {key}: {e}")
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    async def get(self, key: str) -> Optional[bytes]:
+        data = self.get_memory(key)
+        if data is not None or self.directory is None:
+            return data
+        data = await asyncio.to_thread(self._read_disk, key)
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        if self.directory is not None:
+            await asyncio.to_thread(self._write_disk, key, data)
+
+
+class RendererUnavailable(Exception):
+    """Raised when no warm renderer process can be started."""
+
+
+class _RendererProcess:
+    """One long-lived node renderer handling a single request at a time."""
+
+    def __init__(self, node: str, script: Path):
+        self.node = node
+        self.script = script
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self._next_id = 0
+
+    async def start(self, timeout: float) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            self.node,
+            str(self.script),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=_STREAM_LIMIT,
+        )
+        try:
+            line = await asyncio.wait_for(self.proc.stdout.readline(), timeout=timeout)
+            ready = bool(line) and json.loads(line).get("ready")
+        except (asyncio.TimeoutError, ValueError):
+            ready = False
+        if not ready:
+            await self.close()
+            raise RendererUnavailable("Mermaid renderer failed to start")
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def render(self, mermaid_text: str, timeout: float) -> bytes:
+        self._next_id += 1
+        request = {"id": self._next_id, "definition": mermaid_text}
+        self.proc.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.proc.stdin.drain()
+        line = await asyncio.wait_for(self.proc.stdout.readline(), timeout=timeout)
+        if not line:
+            raise RendererUnavailable("Mermaid renderer exited")
+        reply = json.loads(line)
+        if reply.get("id") != self._next_id:
+            raise RendererUnavailable("Mermaid renderer out of sync")
+        if "error" in reply:
+            raise HTTPException(
+                status_code=500, detail="Mermaid CLI failed to render SVG"
+            )
+        return reply["svg"].encode("utf-8")
+
+    async def close(self) -> None:
+        if not self.alive:
+            return
+        try:
+            self.proc.stdin.close()
+            await asyncio.wait_for(self.proc.wait(), timeout=5)
+        except (asyncio.TimeoutError, OSError):
+            self.proc.kill()
+            await self.proc.wait()
+
+
+class MermaidRendererPool:
+    """Fixed-size pool of warm renderer processes, started lazily."""
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        script: Path = RENDERER_SCRIPT,
+        node: Optional[str] = None,
+        startup_timeout: float = 30.0,
+    ):
+        self.size = size
+        self.script = script
+        self.node = node or shutil.which("node")
+        self.startup_timeout = startup_timeout
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_RendererProcess] = []
+        # Strong references to in-flight replacements so they are not collected
+        self._replacing: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.available: Optional[bool] = None
+
+    async def _spawn(self) -> _RendererProcess:
+        worker = _RendererProcess(self.node, self.script)
+        await worker.start(self.startup_timeout)
+        return worker
+
+    async def start(self) -> bool:
+        """Start the workers once; returns whether the pool is usable."""
+        async with self._lock:
+            if self.available is not None:
+                return self.available
+            if self.size < 1 or not self.node or not self.script.exists():
+                self.available = False
+                return False
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                try:
+                    worker = await self._spawn()
+                except (RendererUnavailable, asyncio.TimeoutError, OSError, ValueError) as e:
+                    logger.warning(f"Mermaid renderer pool unavailable, using mmdc: {e}")
+                    break
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+            self.available = bool(self._workers)
+            if self.available:
+                logger.info(f"Started {len(self._workers)} warm Mermaid renderers")
+            return self.available
+
+    async def _replace(self, worker: _RendererProcess) -> None:
+        await worker.close()
+        if worker not in self._workers:
+            # Pool was closed while this worker was busy
+            return
+        self._workers.remove(worker)
+        try:
+            worker = await self._spawn()
+        except (RendererUnavailable, asyncio.TimeoutError, OSError, ValueError) as e:
+            logger.error(f"Failed to restart Mermaid renderer: {e}")
+            if not self._workers:
+                self.available = False
+            return
+        self._workers.append(worker)
+        self._idle.put_nowait(worker)
+
+    def _schedule_replace(self, worker: _RendererProcess) -> None:
+        task = asyncio.create_task(self._replace(worker))
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def render(self, mermaid_text: str, timeout: float = RENDER_TIMEOUT) -> bytes:
+        if not await self.start():
+            raise RendererUnavailable("No warm Mermaid renderers")
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Every warm renderer stayed busy; let the caller fall back to mmdc
+            raise RendererUnavailable("All Mermaid renderers are busy")
+        try:
+            data = await worker.render(mermaid_text, timeout)
+        except asyncio.TimeoutError:
+            # The process is mid-render; replace it rather than reuse it
+            self._schedule_replace(worker)
+            raise HTTPException(status_code=504, detail="SVG rendering timed out")
+        except (RendererUnavailable, OSError, ValueError):
+            self._schedule_replace(worker)
+            raise RendererUnavailable("Mermaid renderer failed")
+        except BaseException:
+            self._release(worker)
+            raise
+        self._release(worker)
+        return data
+
+    def _release(self, worker: _RendererProcess) -> None:
+        if self._idle is not None and worker in self._workers:
+            self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*(w.close() for w in workers), return_exceptions=True)
+        self._idle = None
+        self.available = None
+
+
+async def render_with_mmdc(mermaid_text: str, timeout: float = RENDER_TIMEOUT) -> bytes:
+    """One-shot render through the mmdc CLI (fallback when the pool is down)."""
+    mmdc = shutil.which("mmdc")
+    if not mmdc:
+        raise HTTPException(
+            status_code=501,
+            detail="Mermaid CLI (mmdc) not installed on server. Install it to use SVG rendering.",
+        )
+
+    src = None
+    dst = None
+    try:
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".mmd", delete=False) as f:
+            f.write(mermaid_text)
+            src = f.name
+        dst = src + ".svg"
+
+        proc = await asyncio.create_subprocess_exec(mmdc, "-i", src, "-o", dst)
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            raise HTTPException(status_code=504, detail="SVG rendering timed out")
+
+        if proc.returncode != 0:
+            raise HTTPException(
+                status_code=500, detail="Mermaid CLI failed to render SVG"
+            )
+
+        return await asyncio.to_thread(Path(dst).read_bytes)
+    finally:
+        for path in (src, dst):
+            try:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+svg_cache = SvgCache()
+renderer_pool = MermaidRendererPool()
+
+# Concurrent requests for the same uncached diagram share one render
+_in_flight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+
+async def _render_uncached(mermaid_text: str) -> bytes:
+    try:
+        return await renderer_pool.render(mermaid_text)
+    except RendererUnavailable:
+        return await render_with_mmdc(mermaid_text)
+
+
+async def render_svg(mermaid_text: str) -> Tuple[bytes, bool]:
+    """Render Mermaid source to SVG, returning (svg, served_from_cache)."""
+    if (
+        not isinstance(mermaid_text, str)
+        or len(mermaid_text.encode("utf-8")) > MAX_INPUT_SIZE
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Mermaid input too large (max {MAX_INPUT_SIZE} bytes)",
+        )
+
+    key = cache_key(mermaid_text)
+    cached = await svg_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    pending = _in_flight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending), True
+
+    future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        data = await _render_uncached(mermaid_text)
+        await svg_cache.put(key, data)
+        future.set_result(data)
+        return data, False
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an unobserved failure is not logged at GC
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
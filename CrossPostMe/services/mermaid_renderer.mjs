@@ -0,0 +1,65 @@
+// Long-lived Mermaid renderer used by services/mermaid_render.py.
+//
+// Keeps one headless browser open and renders diagrams received as JSON lines
+// on stdin ({"id", "definition"}), answering with one JSON line per request on
+// stdout ({"id", "svg"} or {"id", "error"}). Uses @mermaid-js/mermaid-cli from
+// a local node_modules or the global npm install (see ENVIRONMENT_CONFIG.md).
+import { execFileSync } from "node:child_process";
+import { createRequire } from "node:module";
+import { join } from "node:path";
+import { createInterface } from "node:readline";
+import { pathToFileURL } from "node:url";
+
+const CLI_PACKAGE = "@mermaid-js/mermaid-cli";
+
+function locateMermaidCli() {
+  try {
+    return import.meta.resolve(CLI_PACKAGE);
+  } catch {
+    const globalRoot = execFileSync("npm", ["root", "-g"], { encoding: "utf8" }).trim();
+    return pathToFileURL(join(globalRoot, CLI_PACKAGE, "src", "index.js")).href;
+  }
+}
+
+const cliEntry = locateMermaidCli();
+const { renderMermaid } = await import(cliEntry);
+// puppeteer is a dependency of mermaid-cli; resolve it from there
+const require = createRequire(cliEntry);
+const { default: puppeteer } = await import(pathToFileURL(require.resolve("puppeteer")).href);
+
+const browser = await puppeteer.launch({
+  headless: true,
+  args: ["--no-sandbox", "--disable-dev-shm-usage"],
+});
+
+const shutdown = async () => {
+  await browser.close().catch(() => {});
+  process.exit(0);
+};
+process.on("SIGTERM", shutdown);
+process.stdin.on("end", shutdown);
+
+const reply = (message) => process.stdout.write(JSON.stringify(message) + "\n");
+
+// Signal readiness so the pool only routes work to warm workers
+reply({ ready: true });
+
+const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+for await (const line of lines) {
+  if (!line.trim()) continue;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (err) {
+    reply({ id: null, error: `invalid request: ${err.message}` });
+    continue;
+  }
+  try {
+    const { data } = await renderMermaid(browser, request.definition, "svg", {
+      backgroundColor: "white",
+    });
+    reply({ id: request.id, svg: Buffer.from(data).toString("utf8") });
+  } catch (err) {
+    reply({ id: request.id, error: String(err && err.message ? err.message : err) });
+  }
+}
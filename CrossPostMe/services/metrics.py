@@ -0,0 +1,255 @@
+"""Prometheus metrics exported on /metrics.
+
+``PrometheusMiddleware`` records per-route request latency (labelled with the
+route's path template, not the raw path), status codes and requests in flight.
+``instrument_motor_database`` wraps the Motor database on ``app.state.db`` so
+each collection call is timed by collection and operation. ``LoopLagMonitor``
+exports how late the event loop resumes a sleeping task.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+DB_CALL_DURATION = Histogram(
+    "db_call_duration_seconds",
+    "Database call latency by backend, collection and operation",
+    ["backend", "target", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds", "How late the event loop resumed the last lag probe"
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total", "Lag probes that resumed later than the stall threshold"
+)
+
+UNMATCHED_ROUTE = "unmatched"
+EXCLUDED_PATHS = {"/metrics"}
+
+# Collection methods that return a cursor; the round trip happens in to_list()
+CURSOR_METHODS = {"find", "aggregate", "list_indexes"}
+
+
+def metrics_response() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency, status and in-flight HTTP requests."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope while handling
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"], route=route, status=str(status_code)
+            ).observe(time.perf_counter() - started)
+
+
+def _observe(collection: str, operation: str, outcome: str, started: float) -> None:
+    DB_CALL_DURATION.labels(
+        backend="mongo", target=collection, operation=operation, outcome=outcome
+    ).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def _timed(collection: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        _observe(collection, operation, outcome, started)
+
+
+class _TimedCursor:
+    """Motor cursor proxy timing to_list()."""
+
+    def __init__(self, cursor: Any, collection: str, operation: str):
+        self._cursor = cursor
+        self._collection = collection
+        self._operation = operation
+
+    async def to_list(self, *args: Any, **kwargs: Any) -> List[Any]:
+        with _timed(self._collection, self._operation):
+            return await self._cursor.to_list(*args, **kwargs)
+
+    def __aiter__(self) -> Any:
+        return self._cursor.__aiter__()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            # sort()/skip()/limit() return the cursor itself
+            return self if result is self._cursor else result
+
+        return chained
+
+
+class _TimedCollection:
+    """Motor collection proxy timing each database operation."""
+
+    def __init__(self, collection: Any):
+        self._collection = collection
+        self._name = collection.name
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if _is_collection(attr):
+            return _TimedCollection(attr)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if name in CURSOR_METHODS:
+                return _TimedCursor(attr(*args, **kwargs), self._name, name)
+            started = time.perf_counter()
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self._await(name, result, started)
+            return result
+
+        return call
+
+    async def _await(self, operation: str, awaitable: Any, started: float) -> Any:
+        # Motor starts the operation when it is called, so time from there
+        outcome = "error"
+        try:
+            result = await awaitable
+            outcome = "ok"
+            return result
+        finally:
+            _observe(self._name, operation, outcome, started)
+
+    def __getitem__(self, name: str) -> "_TimedCollection":
+        return _TimedCollection(self._collection[name])
+
+
+class _TimedDatabase:
+    """Motor database proxy whose collections are timed."""
+
+    def __init__(self, database: Any):
+        self._database = database
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._database, name)
+        return _TimedCollection(attr) if _is_collection(attr) else attr
+
+    def __getitem__(self, name: str) -> _TimedCollection:
+        return _TimedCollection(self._database[name])
+
+    def get_collection(self, name: str, **kwargs: Any) -> _TimedCollection:
+        return _TimedCollection(self._database.get_collection(name, **kwargs))
+
+
+def _is_collection(value: Any) -> bool:
+    # Checked on the class: a Motor database answers any attribute with a
+    # collection of that name
+    return hasattr(type(value), "find_one") and hasattr(value, "name")
+
+
+def instrument_motor_database(database: Any) -> Any:
+    """Wrap a Motor database so every collection call is timed."""
+    if database is None or isinstance(database, _TimedDatabase):
+        return database
+    return _TimedDatabase(database)
+
+
+class LoopLagMonitor:
+    """Measures event loop lag by timing how late a periodic sleep resumes."""
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        stall_threshold_seconds: Optional[float] = None,
+    ):
+        self.interval_seconds = interval_seconds or float(
+            os.environ.get("LOOP_LAG_INTERVAL_SECONDS", "0.5")
+        )
+        self.stall_threshold_seconds = stall_threshold_seconds or float(
+            os.environ.get("LOOP_LAG_STALL_SECONDS", "0.1")
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        EVENT_LOOP_LAG.set(lag)
+        if lag >= self.stall_threshold_seconds:
+            EVENT_LOOP_STALLS.inc()
+            logger.warning("Event loop stalled for %.0f ms", lag * 1000)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.record(loop.time() - expected)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,51 @@
+"""Per-platform delivery policy for the posting subtasks in tasks.py.
+
+Each platform gets its own Celery task (``tasks.post_to_<platform>``) routed to
+its own queue, so a slow or throttled platform only backs up its own queue
+and its rate limit and retries never hold up the others.
+"""
+
+from typing import Dict, NamedTuple
+
+
+class PlatformPolicy(NamedTuple):
+    rate_limit: str  # Celery rate limit, per worker
+    max_retries: int
+    retry_backoff: int  # base seconds, doubled per retry
+    retry_backoff_max: int = 600
+
+
+DEFAULT_POLICY = PlatformPolicy(rate_limit="30/m", max_retries=3, retry_backoff=15)
+
+PLATFORM_POLICIES: Dict[str, PlatformPolicy] = {
+    "twitter": PlatformPolicy(rate_limit="50/m", max_retries=3, retry_backoff=30),
+    "linkedin": PlatformPolicy(rate_limit="20/m", max_retries=4, retry_backoff=30),
+    "facebook": PlatformPolicy(rate_limit="30/m", max_retries=4, retry_backoff=20),
+    "instagram": PlatformPolicy(rate_limit="20/m", max_retries=4, retry_backoff=30),
+}
+
+# Subtask for platforms without a dedicated policy
+GENERIC_PLATFORM = "other"
+
+
+def platform_key(platform: str) -> str:
+    key = (platform or "").strip().lower()
+    return key if key in PLATFORM_POLICIES else GENERIC_PLATFORM
+
+
+def policy_for(platform: str) -> PlatformPolicy:
+    return PLATFORM_POLICIES.get(platform_key(platform), DEFAULT_POLICY)
+
+
+def platform_task_name(platform: str) -> str:
+    return f"tasks.post_to_{platform_key(platform)}"
+
+
+def platform_queue(platform: str) -> str:
+    return f"platform_{platform_key(platform)}"
+
+
+def platform_task_routes() -> Dict[str, Dict[str, str]]:
+    """task_routes entries for every platform subtask."""
+    keys = list(PLATFORM_POLICIES) + [GENERIC_PLATFORM]
+    return {platform_task_name(k): {"queue": platform_queue(k)} for k in keys}
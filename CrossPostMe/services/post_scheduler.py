@@ -0,0 +1,359 @@
+"""Due-time dispatch of scheduled_posts.
+
+Scheduled posts store their due time as a datetime (``due_at``) indexed with
+``status``. Schedulers claim due posts one at a time with find-and-modify,
+moving them from ``scheduled`` to ``dispatching`` under a lease, enqueue
+``process_social_post`` and then mark them ``dispatched``. Any number of
+scheduler replicas can run: a post is only ever claimed by one of them, and a
+post whose scheduler died mid-dispatch is reclaimed once its lease expires.
+
+A reclaimed post may be enqueued twice, so the posting task itself takes the
+post from ``dispatching``/``dispatched`` to ``posting`` atomically
+(``begin_posting``) and skips if another copy already did.
+
+Enqueued tasks can still be lost (broker restart, purged queue, crashed
+worker). ``sweep_stale_posts`` returns posts left ``dispatched`` longer than
+the dispatch timeout to ``scheduled`` so they are enqueued again, and flags
+posts stuck in ``posting`` as ``needs_review``: their platforms may already
+have published them, so they are never re-posted automatically.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+STATUS_SCHEDULED = "scheduled"
+STATUS_DISPATCHING = "dispatching"
+STATUS_DISPATCHED = "dispatched"
+STATUS_POSTING = "posting"
+STATUS_POSTED = "posted"
+STATUS_PARTIAL = "partial"  # posted to some platforms, failed on others
+STATUS_FAILED = "failed"
+STATUS_NEEDS_REVIEW = "needs_review"  # stuck mid-posting; may be partly published
+
+# Dispatches after which a post that never started posting is flagged instead
+MAX_DISPATCH_ATTEMPTS = 5
+
+
+def parse_due_time(value: Union[str, datetime]) -> datetime:
+    """Normalize a scheduled time to an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def build_scheduled_post(post_data: Dict[str, Any], scheduled_time: Union[str, datetime]) -> Dict:
+    """Document stored in scheduled_posts for a post due at scheduled_time."""
+    due_at = parse_due_time(scheduled_time)
+    return {
+        "id": str(uuid.uuid4()),
+        "content": post_data.get("content"),
+        "platforms": post_data.get("platforms", []),
+        "media_urls": post_data.get("media_urls", []),
+        "scheduled_time": due_at.isoformat(),
+        "due_at": due_at,
+        "status": STATUS_SCHEDULED,
+        "dispatch_attempts": 0,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def post_payload(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments for process_social_post built from a scheduled post."""
+    return {
+        "scheduled_post_id": post["id"],
+        "content": post.get("content", ""),
+        "platforms": post.get("platforms", []),
+        "media_urls": post.get("media_urls", []),
+    }
+
+
+async def claim_due_post(
+    db: Any, now: datetime, owner: str, lease: timedelta
+) -> Optional[Dict]:
+    """Atomically lease the next due post (or one whose lease expired)."""
+    update = {
+        "$set": {
+            "status": STATUS_DISPATCHING,
+            "lease_owner": owner,
+            "lease_until": now + lease,
+        },
+        "$inc": {"dispatch_attempts": 1},
+    }
+    post = await db.scheduled_posts.find_one_and_update(
+        {"status": STATUS_SCHEDULED, "due_at": {"$lte": now}},
+        update,
+        sort=[("due_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if post is None:
+        post = await db.scheduled_posts.find_one_and_update(
+            {"status": STATUS_DISPATCHING, "lease_until": {"$lte": now}},
+            update,
+            sort=[("lease_until", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+    return post
+
+
+async def mark_dispatched(db: Any, post_id: str, owner: str, task_id: str) -> None:
+    await db.scheduled_posts.update_one(
+        {"id": post_id, "status": STATUS_DISPATCHING, "lease_owner": owner},
+        {
+            "$set": {
+                "status": STATUS_DISPATCHED,
+                "task_id": task_id,
+                "dispatched_at": datetime.now(timezone.utc),
+            },
+            "$unset": {"lease_until": ""},
+        },
+    )
+
+
+async def release_claim(db: Any, post_id: str, owner: str, error: str) -> None:
+    """Return a post whose enqueue failed to the scheduled state."""
+    await db.scheduled_posts.update_one(
+        {"id": post_id, "status": STATUS_DISPATCHING, "lease_owner": owner},
+        {
+            "$set": {"status": STATUS_SCHEDULED, "last_error": error},
+            "$unset": {"lease_until": "", "lease_owner": ""},
+        },
+    )
+
+
+async def begin_posting(db: Any, post_id: str) -> bool:
+    """Take a dispatched post for posting; False if another task already has it."""
+    post = await db.scheduled_posts.find_one_and_update(
+        {"id": post_id, "status": {"$in": [STATUS_DISPATCHING, STATUS_DISPATCHED]}},
+        {
+            "$set": {
+                "status": STATUS_POSTING,
+                "posting_started_at": datetime.now(timezone.utc),
+            },
+            "$unset": {"lease_until": ""},
+        },
+    )
+    return post is not None
+
+
+async def finish_posting(db: Any, post_id: str, result: Dict[str, Any]) -> None:
+    status = {"completed": STATUS_POSTED, "partial": STATUS_PARTIAL}.get(
+        result.get("status"), STATUS_FAILED
+    )
+    # A post flagged by the sweep that finishes after all resolves its review
+    await db.scheduled_posts.update_one(
+        {"id": post_id, "status": {"$in": [STATUS_POSTING, STATUS_NEEDS_REVIEW]}},
+        {
+            "$set": {
+                "status": status,
+                "result": result,
+                "completed_at": datetime.now(timezone.utc),
+            }
+        },
+    )
+
+
+async def sweep_stale_posts(
+    db: Any, now: datetime, dispatch_timeout: timedelta, posting_timeout: timedelta
+) -> Dict[str, int]:
+    """Re-schedule lost dispatches and flag posts stuck mid-posting for review.
+
+    Only a handful of posts are ever dispatched or posting at once, so the
+    (status, due_at) index prefix serves these updates.
+    """
+    stale_dispatch = {
+        "status": STATUS_DISPATCHED,
+        "dispatched_at": {"$lte": now - dispatch_timeout},
+    }
+    flagged = await db.scheduled_posts.update_many(
+        {**stale_dispatch, "dispatch_attempts": {"$gte": MAX_DISPATCH_ATTEMPTS}},
+        {
+            "$set": {
+                "status": STATUS_NEEDS_REVIEW,
+                "review_reason": "posting never started after "
+                f"{MAX_DISPATCH_ATTEMPTS} dispatches",
+            }
+        },
+    )
+    # Back to scheduled with its past due_at, so the next claim enqueues it again
+    requeued = await db.scheduled_posts.update_many(
+        stale_dispatch,
+        {
+            "$set": {
+                "status": STATUS_SCHEDULED,
+                "last_error": "dispatched task never started posting",
+            },
+            "$unset": {"lease_owner": ""},
+        },
+    )
+    stuck = await db.scheduled_posts.update_many(
+        {
+            "status": STATUS_POSTING,
+            "posting_started_at": {"$lte": now - posting_timeout},
+        },
+        {
+            "$set": {
+                "status": STATUS_NEEDS_REVIEW,
+                "review_reason": "posting did not finish",
+            }
+        },
+    )
+    return {
+        "requeued": requeued.modified_count,
+        "needs_review": flagged.modified_count + stuck.modified_count,
+    }
+
+
+async def backfill_due_times(db: Any) -> int:
+    """Give posts stored before due_at existed an indexed due time."""
+    updated = 0
+    cursor = db.scheduled_posts.find(
+        {"status": STATUS_SCHEDULED, "due_at": {"$exists": False}},
+        {"_id": 1, "id": 1, "scheduled_time": 1},
+    )
+    async for post in cursor:
+        try:
+            due_at = parse_due_time(post["scheduled_time"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Scheduled post {post.get('_id')} has no valid scheduled_time")
+            continue
+        await db.scheduled_posts.update_one(
+            {"_id": post["_id"]},
+            {"$set": {"due_at": due_at, "id": post.get("id") or str(uuid.uuid4())}},
+        )
+        updated += 1
+    return updated
+
+
+def enqueue_with_celery(post: Dict[str, Any]) -> str:
+    """Enqueue process_social_post for a claimed post; returns the task id."""
+    from tasks import process_social_post
+
+    task_id = f"scheduled-{post['id']}-{post.get('dispatch_attempts', 1)}"
+    process_social_post.apply_async(args=[post_payload(post)], task_id=task_id)
+    return task_id
+
+
+class PostScheduler:
+    """Claims due scheduled posts in batches and enqueues them."""
+
+    def __init__(
+        self,
+        db: Any,
+        enqueue: Callable[[Dict[str, Any]], Union[str, Awaitable[str]]] = enqueue_with_celery,
+        batch_size: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+        lease_seconds: int = 120,
+        owner: Optional[str] = None,
+        dispatch_timeout_seconds: Optional[float] = None,
+        posting_timeout_seconds: Optional[float] = None,
+        sweep_interval_seconds: float = 60,
+    ):
+        self.db = db
+        self.enqueue = enqueue
+        self.batch_size = batch_size or int(os.environ.get("SCHEDULER_BATCH_SIZE", "500"))
+        self.interval_seconds = interval_seconds or float(
+            os.environ.get("SCHEDULER_INTERVAL_SECONDS", "5")
+        )
+        self.lease = timedelta(seconds=lease_seconds)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.dispatch_timeout = timedelta(
+            seconds=dispatch_timeout_seconds
+            or float(os.environ.get("SCHEDULER_DISPATCH_TIMEOUT_SECONDS", "900"))
+        )
+        self.posting_timeout = timedelta(
+            seconds=posting_timeout_seconds
+            or float(os.environ.get("SCHEDULER_POSTING_TIMEOUT_SECONDS", "3600"))
+        )
+        self.sweep_interval = timedelta(seconds=sweep_interval_seconds)
+        self._last_sweep: Optional[datetime] = None
+
+    async def sweep(self, now: datetime) -> Dict[str, int]:
+        """Run ``sweep_stale_posts`` at most once per sweep interval."""
+        if self._last_sweep is not None and now - self._last_sweep < self.sweep_interval:
+            return {"requeued": 0, "needs_review": 0}
+        self._last_sweep = now
+        swept = await sweep_stale_posts(self.db, now, self.dispatch_timeout, self.posting_timeout)
+        if swept["requeued"] or swept["needs_review"]:
+            logger.warning(
+                f"Scheduler re-queued {swept['requeued']} lost dispatches, "
+                f"flagged {swept['needs_review']} posts for review"
+            )
+        return swept
+
+    async def _enqueue(self, post: Dict[str, Any]) -> str:
+        if asyncio.iscoroutinefunction(self.enqueue):
+            return await self.enqueue(post)
+        # Broker publishing is blocking; keep it off the event loop
+        return await asyncio.to_thread(self.enqueue, post)
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Dispatch up to one batch of due posts."""
+        now = now or datetime.now(timezone.utc)
+        await self.sweep(now)
+        stats = {"claimed": 0, "dispatched": 0, "failed": 0}
+        oldest_due = now
+        for _ in range(self.batch_size):
+            post = await claim_due_post(self.db, now, self.owner, self.lease)
+            if post is None:
+                break
+            stats["claimed"] += 1
+            oldest_due = min(oldest_due, parse_due_time(post["due_at"]))
+            try:
+                task_id = await self._enqueue(post)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning(f"Could not enqueue scheduled post {post['id']}: {e}")
+                await release_claim(self.db, post["id"], self.owner, str(e))
+                # The broker is most likely down; retry on the next tick
+                break
+            await mark_dispatched(self.db, post["id"], self.owner, task_id)
+            stats["dispatched"] += 1
+
+        if stats["claimed"]:
+            logger.info(
+                f"Scheduler dispatched {stats['dispatched']}/{stats['claimed']} posts "
+                f"(max skew {(now - oldest_due).total_seconds():.1f}s)"
+            )
+        return stats
+
+    async def _seconds_until_next_due(self) -> float:
+        nxt = await self.db.scheduled_posts.find_one(
+            {"status": STATUS_SCHEDULED, "due_at": {"$ne": None}},
+            {"due_at": 1},
+            sort=[("due_at", 1)],
+        )
+        if not nxt:
+            return self.interval_seconds
+        wait = (parse_due_time(nxt["due_at"]) - datetime.now(timezone.utc)).total_seconds()
+        return min(max(wait, 0.0), self.interval_seconds)
+
+    async def run_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                stats = await self.run_once()
+                # A full batch means a backlog; keep draining without sleeping
+                if stats["claimed"] >= self.batch_size:
+                    continue
+                if stats["failed"]:
+                    delay = self.interval_seconds
+                else:
+                    delay = await self._seconds_until_next_due()
+            except Exception as e:
+                logger.exception("Scheduler tick failed: %s", e)
+                delay = self.interval_seconds
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,327 @@
+"""Ad metric time series with hourly and daily rollups.
+
+Metric samples (views, clicks, leads, messages per ad and platform) are
+appended to ``metric_samples`` by the metrics poller and by view tracking, and
+never updated. ``RollupCompactor`` compacts closed hours of samples into
+``metric_rollups_hourly`` and closed days of hourly rollups into
+``metric_rollups_daily``. Each tier keeps a watermark in
+``metric_rollup_state``: everything before it has been rolled up, so a bucket is
+only ever computed from complete data and recomputing it is idempotent.
+
+``query_series`` answers a range from the coarsest tier that covers each part
+of it (daily rollups, then hourly rollups past the daily watermark, then the raw
+samples of the last open hour), so the cost of a chart grows with the number of
+buckets in the range rather than the number of samples. Retention is per tier;
+raw samples and hourly rollups are only deleted once the next tier has them.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+SAMPLES = "metric_samples"
+HOURLY = "metric_rollups_hourly"
+DAILY = "metric_rollups_daily"
+STATE = "metric_rollup_state"
+
+METRICS = ("views", "clicks", "leads", "messages")
+RESOLUTIONS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def _utc(value: datetime) -> datetime:
+    """Motor returns naive UTC datetimes; make them aware."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def floor_time(value: datetime, resolution: str) -> datetime:
+    """Start of the hour or day containing value."""
+    value = _utc(value).replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def sample_doc(
+    ad_id: str, platform: str, ts: Optional[datetime] = None, **counts: int
+) -> Dict[str, Any]:
+    """Raw sample holding metric increments observed at ts."""
+    unknown = set(counts) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unsupported metrics: {sorted(unknown)}")
+    ts = _utc(ts or datetime.now(timezone.utc))
+    return {
+        "ad_id": ad_id,
+        "platform": platform,
+        "ts": ts,
+        # Stored so rollups group on a field instead of computing buckets per sample
+        "hour": floor_time(ts, "hour"),
+        **{metric: counts.get(metric, 0) for metric in METRICS},
+    }
+
+
+async def record_samples(db: Any, samples: List[Dict[str, Any]]) -> None:
+    """Append samples built with sample_doc."""
+    if samples:
+        await db[SAMPLES].insert_many(samples, ordered=False)
+
+
+def _sum_fields() -> Dict[str, Any]:
+    return {metric: {"$sum": f"${metric}"} for metric in METRICS}
+
+
+def _add(
+    totals: Dict[Tuple[str, datetime], Dict[str, Any]],
+    platform: str,
+    bucket: datetime,
+    row: Dict[str, Any],
+) -> None:
+    entry = totals.setdefault(
+        (platform, bucket),
+        {"platform": platform, "bucket": bucket, **{metric: 0 for metric in METRICS}},
+    )
+    for metric in METRICS:
+        entry[metric] += row.get(metric, 0)
+
+
+async def get_watermarks(db: Any) -> Dict[str, Optional[datetime]]:
+    """Rollup watermarks: all data before them is in that tier."""
+    watermarks: Dict[str, Optional[datetime]] = {"hour": None, "day": None}
+    async for state in db[STATE].find({}):
+        if state.get("_id") in watermarks and state.get("watermark"):
+            watermarks[state["_id"]] = _utc(state["watermark"])
+    return watermarks
+
+
+async def query_series(
+    db: Any,
+    ad_id: str,
+    start: datetime,
+    end: datetime,
+    resolution: str = "day",
+) -> List[Dict[str, Any]]:
+    """Per platform and bucket metric totals for an ad in [start, end)."""
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution: {resolution}")
+    start, end = floor_time(start, resolution), _utc(end)
+    watermarks = await get_watermarks(db)
+    hourly_wm = watermarks["hour"] or start
+    daily_wm = watermarks["day"] or start
+    totals: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+
+    cursor = start
+    if resolution == "day" and daily_wm > cursor:
+        upto = min(daily_wm, end)
+        async for row in db[DAILY].find(
+            {"ad_id": ad_id, "bucket": {"$gte": cursor, "$lt": upto}}
+        ):
+            _add(totals, row["platform"], _utc(row["bucket"]), row)
+        cursor = upto
+
+    if hourly_wm > cursor and cursor < end:
+        upto = min(hourly_wm, end)
+        async for row in db[HOURLY].find(
+            {"ad_id": ad_id, "bucket": {"$gte": cursor, "$lt": upto}}
+        ):
+            _add(totals, row["platform"], floor_time(row["bucket"], resolution), row)
+        cursor = upto
+
+    # Samples not rolled up yet, grouped per hour on the server
+    if cursor < end:
+        pipeline = [
+            {"$match": {"ad_id": ad_id, "ts": {"$gte": cursor, "$lt": end}}},
+            {"$group": {"_id": {"platform": "$platform", "hour": "$hour"}, **_sum_fields()}},
+        ]
+        async for row in db[SAMPLES].aggregate(pipeline):
+            _add(
+                totals,
+                row["_id"]["platform"],
+                floor_time(row["_id"]["hour"], resolution),
+                row,
+            )
+
+    return sorted(totals.values(), key=lambda entry: (entry["bucket"], entry["platform"]))
+
+
+class RollupCompactor:
+    """Compacts samples into hourly and daily rollups and applies retention.
+
+    Run a single instance; every step is idempotent, so a compactor that dies
+    mid-tick redoes the same buckets on restart.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        interval_seconds: Optional[float] = None,
+        late_seconds: Optional[float] = None,
+        raw_retention_hours: Optional[float] = None,
+        hourly_retention_days: Optional[float] = None,
+        daily_retention_days: Optional[float] = None,
+        max_hours_per_tick: int = 24 * 7,
+    ):
+        self.db = db
+        self.interval_seconds = interval_seconds or float(
+            os.environ.get("TIMESERIES_COMPACT_INTERVAL_SECONDS", "300")
+        )
+        # Samples may arrive this late; an hour is only rolled up after it
+        self.late = timedelta(
+            seconds=late_seconds
+            if late_seconds is not None
+            else float(os.environ.get("TIMESERIES_LATE_SECONDS", "120"))
+        )
+        self.raw_retention = timedelta(
+            hours=raw_retention_hours
+            if raw_retention_hours is not None
+            else float(os.environ.get("TIMESERIES_RAW_RETENTION_HOURS", "48"))
+        )
+        self.hourly_retention = timedelta(
+            days=hourly_retention_days
+            if hourly_retention_days is not None
+            else float(os.environ.get("TIMESERIES_HOURLY_RETENTION_DAYS", "90"))
+        )
+        # 0 keeps daily rollups forever
+        daily_days = (
+            daily_retention_days
+            if daily_retention_days is not None
+            else float(os.environ.get("TIMESERIES_DAILY_RETENTION_DAYS", "0"))
+        )
+        self.daily_retention = timedelta(days=daily_days) if daily_days else None
+        self.max_hours_per_tick = max_hours_per_tick
+
+    async def _set_watermark(self, tier: str, value: datetime) -> None:
+        await self.db[STATE].update_one(
+            {"_id": tier}, {"$set": {"watermark": value}}, upsert=True
+        )
+
+    async def _initial_watermark(self, collection: str, field: str, fallback: datetime) -> datetime:
+        first = await self.db[collection].find_one({}, {field: 1}, sort=[(field, 1)])
+        if not first:
+            return fallback
+        return min(floor_time(first[field], "hour"), fallback)
+
+    async def _rollup(
+        self,
+        source: str,
+        target: str,
+        match_field: str,
+        bucket_field: str,
+        start: datetime,
+        end: datetime,
+    ) -> int:
+        """Replace target buckets in [start, end) with totals over source."""
+        pipeline = [
+            {"$match": {match_field: {"$gte": start, "$lt": end}}},
+            {
+                "$group": {
+                    "_id": {
+                        "ad_id": "$ad_id",
+                        "platform": "$platform",
+                        "bucket": f"${bucket_field}",
+                    },
+                    **_sum_fields(),
+                }
+            },
+        ]
+        writes = []
+        async for row in self.db[source].aggregate(pipeline, allowDiskUse=True):
+            key = row["_id"]
+            bucket = _utc(key["bucket"])
+            document = {metric: row[metric] for metric in METRICS}
+            if target == HOURLY:
+                document["day"] = floor_time(bucket, "day")
+            writes.append(
+                UpdateOne(
+                    {"ad_id": key["ad_id"], "platform": key["platform"], "bucket": bucket},
+                    {"$set": document},
+                    upsert=True,
+                )
+            )
+        if writes:
+            await self.db[target].bulk_write(writes, ordered=False)
+        return len(writes)
+
+    async def compact_hours(self, now: datetime) -> int:
+        """Roll closed hours of samples into hourly rollups."""
+        cutoff = floor_time(now - self.late, "hour")
+        watermarks = await get_watermarks(self.db)
+        start = watermarks["hour"] or await self._initial_watermark(SAMPLES, "ts", cutoff)
+        end = min(cutoff, start + timedelta(hours=self.max_hours_per_tick))
+        if end <= start:
+            return 0
+        written = await self._rollup(SAMPLES, HOURLY, "ts", "hour", start, end)
+        await self._set_watermark("hour", end)
+        return written
+
+    async def compact_days(self) -> int:
+        """Roll days whose hours are all rolled up into daily rollups."""
+        watermarks = await get_watermarks(self.db)
+        if watermarks["hour"] is None:
+            return 0
+        cutoff = floor_time(watermarks["hour"], "day")
+        start = watermarks["day"] or floor_time(
+            await self._initial_watermark(HOURLY, "bucket", cutoff), "day"
+        )
+        if cutoff <= start:
+            return 0
+        written = await self._rollup(HOURLY, DAILY, "bucket", "day", start, cutoff)
+        await self._set_watermark("day", cutoff)
+        return written
+
+    async def apply_retention(self, now: datetime) -> Dict[str, int]:
+        """Delete data past each tier's retention once the next tier has it."""
+        watermarks = await get_watermarks(self.db)
+        deleted = {"samples": 0, "hourly": 0, "daily": 0}
+        if watermarks["hour"] is not None:
+            before = min(now - self.raw_retention, watermarks["hour"])
+            result = await self.db[SAMPLES].delete_many({"ts": {"$lt": before}})
+            deleted["samples"] = result.deleted_count
+        if watermarks["day"] is not None:
+            before = min(now - self.hourly_retention, watermarks["day"])
+            result = await self.db[HOURLY].delete_many({"bucket": {"$lt": before}})
+            deleted["hourly"] = result.deleted_count
+        if self.daily_retention is not None:
+            result = await self.db[DAILY].delete_many(
+                {"bucket": {"$lt": now - self.daily_retention}}
+            )
+            deleted["daily"] = result.deleted_count
+        return deleted
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Compact what is due and apply retention."""
+        now = _utc(now or datetime.now(timezone.utc))
+        stats = {"hourly": await self.compact_hours(now), "daily": await self.compact_days()}
+        deleted = await self.apply_retention(now)
+        stats.update({f"deleted_{tier}": count for tier, count in deleted.items()})
+        if stats["hourly"] or stats["daily"]:
+            logger.info(
+                f"Rolled up {stats['hourly']} hourly and {stats['daily']} daily buckets"
+            )
+        return stats
+
+    async def run_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.run_once()
+                # Catching up on a backlog of hours; keep going without sleeping
+                if await self._behind():
+                    continue
+            except Exception as e:
+                logger.exception("Rollup compaction failed: %s", e)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _behind(self) -> bool:
+        watermarks = await get_watermarks(self.db)
+        cutoff = floor_time(datetime.now(timezone.utc) - self.late, "hour")
+        return watermarks["hour"] is not None and watermarks["hour"] < cutoff
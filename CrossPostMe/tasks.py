@@ -1,45 +1,111 @@
-import asyncio
-import os
+import random
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
+from celery import chord, group
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
 
-load_dotenv()
+import worker_runtime
+from services.platform_policies import (
+    GENERIC_PLATFORM,
+    PLATFORM_POLICIES,
+    platform_key,
+    platform_task_name,
+    policy_for,
+)
+from services.post_scheduler import begin_posting, build_scheduled_post, finish_posting
+from worker import celery_app
 
-# Database connection
-mongo_url = os.environ.get("MONGO_URL")
-db_name = os.environ.get("DB_NAME")
+load_dotenv()
 
 
-async def get_db():
-    client = AsyncIOMotorClient(mongo_url)
-    return client[db_name]
+def get_db():
+    """Database on the worker process's shared Motor client."""
+    return worker_runtime.get_db()
 
 
 # Social media posting tasks
+@celery_app.task(name="tasks.process_social_post")
 def process_social_post(post_data: Dict[str, Any]):
-    """Process and distribute a post to multiple social media platforms"""
+    """Fan a post out to one subtask per platform and aggregate in a chord callback.
+
+    Platforms post in parallel on their own queues, so total latency is that of
+    the slowest platform and a retry only repeats the platform that failed.
+    """
+    scheduled_post_id = post_data.get("scheduled_post_id")
+    if scheduled_post_id and not worker_runtime.run(begin_posting(get_db(), scheduled_post_id)):
+        # Another delivery of this scheduled post already started posting it
+        return {"status": "skipped", "scheduled_post_id": scheduled_post_id}
+
+    platforms = post_data.get("platforms", [])
+    content = post_data.get("content", "")
+    media_urls = post_data.get("media_urls", [])
+    if not platforms:
+        return aggregate_post_results([], scheduled_post_id)
+
+    header = group(
+        _platform_tasks[platform_key(p)].s(p, content, media_urls) for p in platforms
+    )
     try:
-        platforms = post_data.get("platforms", [])
-        content = post_data.get("content", "")
-        media_urls = post_data.get("media_urls", [])
+        result = chord(header)(aggregate_post_results.s(scheduled_post_id))
+    except Exception as e:
+        outcome = {"status": "failed", "error": str(e)}
+        if scheduled_post_id:
+            worker_runtime.run(finish_posting(get_db(), scheduled_post_id, outcome))
+        return outcome
+    return {"status": "dispatched", "platforms": platforms, "result_id": result.id}
+
+
+def _make_platform_task(key: str):
+    policy = policy_for(key)
+
+    @celery_app.task(
+        name=platform_task_name(key),
+        bind=True,
+        rate_limit=policy.rate_limit,
+        max_retries=policy.max_retries,
+        acks_late=True,
+    )
+    def post_to_platform_task(self, platform: str, content: str, media_urls: list):
+        try:
+            adapted_content = adapt_content_for_platform(content, platform)
+            return post_to_platform(platform, adapted_content, media_urls)
+        except Exception as e:
+            if self.request.retries < policy.max_retries:
+                # Exponential backoff with jitter, per platform policy
+                delay = min(policy.retry_backoff * 2**self.request.retries, policy.retry_backoff_max)
+                raise self.retry(exc=e, countdown=random.uniform(delay / 2, delay))
+            # Out of retries: report the failure so the chord callback still runs
+            return {
+                "platform": platform,
+                "status": "failed",
+                "error": str(e),
+                "attempts": self.request.retries + 1,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
 
-        results = {}
+    return post_to_platform_task
 
-        for platform in platforms:
-            # Adapt content for platform-specific requirements
-            adapted_content = adapt_content_for_platform(content, platform)
 
-            # Post to platform
-            result = post_to_platform(platform, adapted_content, media_urls)
-            results[platform] = result
+_platform_tasks = {key: _make_platform_task(key) for key in [*PLATFORM_POLICIES, GENERIC_PLATFORM]}
 
-        return {"status": "completed", "results": results}
 
-    except Exception as e:
-        return {"status": "failed", "error": str(e)}
+@celery_app.task(name="tasks.aggregate_post_results")
+def aggregate_post_results(results: List[Dict[str, Any]], scheduled_post_id: Optional[str] = None):
+    """Chord callback: combine per-platform results into the post outcome."""
+    by_platform = {r.get("platform"): r for r in results}
+    posted = sum(1 for r in results if r.get("status") == "posted")
+    if results and posted == len(results):
+        status = "completed"
+    elif posted:
+        status = "partial"
+    else:
+        status = "failed"
+    outcome = {"status": status, "results": by_platform}
+
+    if scheduled_post_id:
+        worker_runtime.run(finish_posting(get_db(), scheduled_post_id, outcome))
+    return outcome
 
 
 def adapt_content_for_platform(content: str, platform: str) -> str:
@@ -67,38 +133,31 @@ def post_to_platform(platform: str, content: str, media_urls: list) -> Dict[str,
     }
 
 
+@celery_app.task(name="tasks.schedule_post")
 def schedule_post(post_data: Dict[str, Any], scheduled_time: str):
     """Schedule a post for future publication"""
     try:
-        # Store scheduled post in database
-        asyncio.run(store_scheduled_post(post_data, scheduled_time))
-        return {"status": "scheduled", "scheduled_time": scheduled_time}
+        # Store scheduled post on the worker's long-lived loop and client
+        post_id = worker_runtime.run(store_scheduled_post(post_data, scheduled_time))
+        return {"status": "scheduled", "scheduled_time": scheduled_time, "id": post_id}
     except Exception as e:
         return {"status": "failed", "error": str(e)}
 
 
-async def store_scheduled_post(post_data: Dict[str, Any], scheduled_time: str, db=None):
-    """Store scheduled post in database. If `db` is not provided, create a temporary client."""
-    own_client = None
+async def store_scheduled_post(post_data: Dict[str, Any], scheduled_time: str, db=None) -> str:
+    """Store scheduled post in database. If `db` is not provided, use the worker's shared client.
+
+    The post is dispatched by the scheduler (worker/post_scheduler.py) once due.
+    """
     if db is None:
-        own_client = AsyncIOMotorClient(mongo_url)
-        db = own_client[db_name]
-
-    scheduled_post = {
-        "content": post_data.get("content"),
-        "platforms": post_data.get("platforms", []),
-        "media_urls": post_data.get("media_urls", []),
-        "scheduled_time": scheduled_time,
-        "status": "scheduled",
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    }
+        db = get_db()
 
+    scheduled_post = build_scheduled_post(post_data, scheduled_time)
     await db.scheduled_posts.insert_one(scheduled_post)
-
-    if own_client is not None:
-        own_client.close()
+    return scheduled_post["id"]
 
 
+@celery_app.task(name="tasks.validate_platforms")
 def validate_platforms(platforms: list) -> Dict[str, Any]:
     """Validate platform connections and credentials"""
     try:
@@ -0,0 +1,244 @@
+"""In-memory stand-in for the Motor collections the service tests touch.
+
+Covers the query, update and aggregation operators the services use, applying
+them the way MongoDB does (null/missing values never satisfy a range
+operator, sorts are stable, ``$setOnInsert`` only applies to upserts) so the
+tests exercise the real filters instead of echoing stored documents back.
+"""
+
+from types import SimpleNamespace
+
+_MISSING = object()
+
+
+def _compare(op, value, target):
+    if value is _MISSING or value is None or target is None:
+        return False
+    try:
+        return {
+            "$lt": value < target,
+            "$lte": value <= target,
+            "$gt": value > target,
+            "$gte": value >= target,
+        }[op]
+    except TypeError:
+        return False
+
+
+def _match_condition(value, cond):
+    if not (isinstance(cond, dict) and any(key.startswith("$") for key in cond)):
+        return value == cond or (cond is None and value is _MISSING)
+    for op, target in cond.items():
+        if op in ("$lt", "$lte", "$gt", "$gte"):
+            ok = _compare(op, value, target)
+        elif op == "$eq":
+            ok = _match_condition(value, target)
+        elif op == "$ne":
+            ok = not _match_condition(value, target)
+        elif op == "$in":
+            ok = any(_match_condition(value, option) for option in target)
+        elif op == "$nin":
+            ok = not any(_match_condition(value, option) for option in target)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(target)
+        else:
+            raise NotImplementedError(f"Unsupported query operator {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc, query):
+    """Whether doc satisfies a MongoDB query document."""
+    for key, cond in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif not _match_condition(doc.get(key, _MISSING), cond):
+            return False
+    return True
+
+
+def apply_update(doc, update, inserting=False):
+    for op, fields in update.items():
+        for field, value in fields.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                doc[field] = value
+            elif op == "$unset":
+                doc.pop(field, None)
+            elif op == "$inc":
+                doc[field] = doc.get(field, 0) + value
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"Unsupported update operator {op}")
+
+
+def _sorted(docs, spec):
+    # Stable multi-key sort, applied from the last key to the first
+    for field, direction in reversed(spec):
+        present = [d for d in docs if d.get(field) is not None]
+        absent = [d for d in docs if d.get(field) is None]
+        present.sort(key=lambda d: d[field], reverse=direction < 0)
+        # Missing/null sort before everything ascending, after everything descending
+        docs = absent + present if direction > 0 else present + absent
+    return docs
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    include = [key for key, flag in projection.items() if flag and key != "_id"]
+    if include:
+        projected = {key: doc[key] for key in include if key in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+
+class FakeCursor:
+    def __init__(self, docs, projection=None):
+        self.docs = docs
+        self.projection = projection
+
+    def sort(self, key_or_list, direction=1):
+        spec = key_or_list if isinstance(key_or_list, list) else [(key_or_list, direction)]
+        self.docs = _sorted(self.docs, spec)
+        return self
+
+    def limit(self, count):
+        if count:
+            self.docs = self.docs[:count]
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return [_project(doc, self.projection) for doc in self.docs[:length]]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in list(self.docs):
+            yield _project(doc, self.projection)
+
+
+def _group(docs, spec):
+    groups = {}
+    for doc in docs:
+        key = tuple((name, doc.get(path[1:])) for name, path in spec["_id"].items())
+        row = groups.setdefault(key, {"_id": dict(key)})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            if set(accumulator) != {"$sum"}:
+                raise NotImplementedError(f"Unsupported accumulator {accumulator}")
+            summand = accumulator["$sum"]
+            value = doc.get(summand[1:], 0) if isinstance(summand, str) else summand
+            row[field] = row.get(field, 0) + value
+    return list(groups.values())
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the services under test.
+
+    ``reads`` counts find/aggregate calls so tests can check which tier served a query.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.reads = 0
+
+    def _update(self, query, update, upsert=False, many=False):
+        targets = [d for d in self.docs if matches(d, query)]
+        if not many:
+            targets = targets[:1]
+        modified = 0
+        for doc in targets:
+            before = dict(doc)
+            apply_update(doc, update)
+            modified += doc != before
+        if targets or not upsert:
+            return SimpleNamespace(
+                matched_count=len(targets), modified_count=modified, upserted_id=None
+            )
+        doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+        apply_update(doc, update, inserting=True)
+        self.docs.append(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc.get("_id"))
+
+    def _cursor(self, query, projection, sort):
+        cursor = FakeCursor([d for d in self.docs if matches(d, query)], projection)
+        return cursor.sort(sort) if sort else cursor
+
+    def find(self, query=None, projection=None, sort=None):
+        self.reads += 1
+        return self._cursor(query, projection, sort)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        docs = await self._cursor(query, projection, sort).limit(1).to_list()
+        return docs[0] if docs else None
+
+    async def find_one_and_update(
+        self, query, update, sort=None, return_document=False, projection=None, upsert=False
+    ):
+        docs = _sorted([d for d in self.docs if matches(d, query)], sort or [])
+        if not docs:
+            return None
+        doc = docs[0]
+        before = dict(doc)
+        apply_update(doc, update)
+        # pymongo's ReturnDocument.AFTER is True
+        return _project(doc if return_document else before, projection)
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(dict(doc) for doc in docs)
+
+    async def update_one(self, query, update, upsert=False):
+        return self._update(query, update, upsert)
+
+    async def update_many(self, query, update, upsert=False):
+        return self._update(query, update, upsert, many=True)
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self._update(request._filter, request._doc, bool(request._upsert))
+
+    async def delete_many(self, query):
+        keep = [d for d in self.docs if not matches(d, query)]
+        deleted = len(self.docs) - len(keep)
+        self.docs = keep
+        return SimpleNamespace(deleted_count=deleted)
+
+    def aggregate(self, pipeline, **kwargs):
+        self.reads += 1
+        docs = list(self.docs)
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if matches(d, spec)]
+            elif op == "$group":
+                docs = _group(docs, spec)
+            else:
+                raise NotImplementedError(f"Unsupported pipeline stage {op}")
+        return FakeCursor(docs)
+
+
+class FakeDB(dict):
+    """Motor database stand-in; any attribute or key is a collection."""
+
+    def __init__(self, **collections):
+        super().__init__()
+        for name, docs in collections.items():
+            self[name].docs = docs
+
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
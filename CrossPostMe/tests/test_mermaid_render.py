@@ -0,0 +1,96 @@
+import asyncio
+
+from services import mermaid_render
+from services.diagram import _build_mermaid, generate_ad_mermaid
+from services.mermaid_render import (
+    MermaidRendererPool,
+    RendererUnavailable,
+    SvgCache,
+    cache_key,
+    render_svg,
+)
+
+
+def test_svg_cache_evicts_lru_and_reads_back_from_disk(tmp_path):
+    async def scenario():
+        cache = SvgCache(directory=str(tmp_path), max_entries=2)
+        await cache.put("a" * 64, b"<svg>a</svg>")
+        await cache.put("b" * 64, b"<svg>b</svg>")
+        await cache.put("c" * 64, b"<svg>c</svg>")
+        assert cache.get_memory("a" * 64) is None
+        # Evicted from memory but still on disk
+        assert await cache.get("a" * 64) == b"<svg>a</svg>"
+
+    asyncio.run(scenario())
+
+
+def test_render_svg_renders_each_diagram_once(tmp_path, monkeypatch):
+    calls = []
+
+    async def fake_render(text):
+        calls.append(text)
+        await asyncio.sleep(0)
+        return b"<svg/>"
+
+    monkeypatch.setattr(mermaid_render, "svg_cache", SvgCache(directory=str(tmp_path)))
+    monkeypatch.setattr(mermaid_render, "_render_uncached", fake_render)
+
+    async def scenario():
+        results = await asyncio.gather(*(render_svg("flowchart TB") for _ in range(3)))
+        assert [data for data, _ in results] == [b"<svg/>"] * 3
+        assert await render_svg("flowchart TB") == (b"<svg/>", True)
+
+    asyncio.run(scenario())
+    assert calls == ["flowchart TB"]
+    assert (tmp_path / cache_key("flowchart TB")[:2]).is_dir()
+
+
+def test_generate_ad_mermaid_is_memoized_per_platform_set():
+    _build_mermaid.cache_clear()
+    ad = {"id": "ad1", "title": "Bike", "owner_id": "u1"}
+    first = generate_ad_mermaid(ad, [{"platform": "eBay"}])
+    again = generate_ad_mermaid(ad, [{"platform": "eBay"}, {"platform": "eBay"}])
+    assert first is again
+    assert _build_mermaid.cache_info().hits == 1
+
+    changed = generate_ad_mermaid(ad, [{"platform": "eBay"}, {"platform": "OfferUp"}])
+    assert "OfferUp" in changed
+
+
+def test_pool_reports_busy_workers_as_unavailable():
+    async def scenario():
+        pool = MermaidRendererPool(size=1)
+        pool.available = True
+        pool._idle = asyncio.Queue()  # the only worker is checked out
+        try:
+            await pool.render("flowchart TB", timeout=0.01)
+        except RendererUnavailable:
+            return
+        raise AssertionError("expected RendererUnavailable")
+
+    asyncio.run(scenario())
+
+
+def test_pool_keeps_replacement_tasks_until_done():
+    class _BrokenWorker:
+        async def render(self, text, timeout):
+            raise RendererUnavailable("exited")
+
+        async def close(self):
+            await asyncio.sleep(0)
+
+    async def scenario():
+        pool = MermaidRendererPool(size=1)
+        pool.available = True
+        pool._idle = asyncio.Queue()
+        pool._idle.put_nowait(_BrokenWorker())
+        try:
+            await pool.render("flowchart TB")
+        except RendererUnavailable:
+            pass
+        assert len(pool._replacing) == 1
+        await asyncio.gather(*pool._replacing)
+        await asyncio.sleep(0)
+        assert not pool._replacing
+
+    asyncio.run(scenario())
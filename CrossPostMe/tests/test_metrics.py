@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from services.metrics import PrometheusMiddleware, instrument_motor_database
+
+
+def _count(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+
+    @app.get("/api/ads/{ad_id}")
+    async def get_ad(ad_id: str):
+        return {"id": ad_id}
+
+    app.add_middleware(PrometheusMiddleware)
+    labels = {"method": "GET", "route": "/api/ads/{ad_id}", "status": "200"}
+    before = _count("http_request_duration_seconds_count", **labels)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            await c.get("/api/ads/1")
+            await c.get("/api/ads/2")
+
+    asyncio.run(run())
+    assert _count("http_request_duration_seconds_count", **labels) == before + 2
+
+
+class _Cursor:
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return [{"id": "1"}]
+
+
+class _Collection:
+    name = "posted_ads"
+
+    async def find_one(self, query):
+        return None
+
+    async def count_documents(self, query):
+        return 3
+
+    def find(self, query):
+        return _Cursor()
+
+
+class _Database:
+    posted_ads = _Collection()
+
+
+def test_motor_calls_are_timed_per_collection():
+    def count(operation):
+        return _count(
+            "db_call_duration_seconds_count",
+            backend="mongo",
+            target="posted_ads",
+            operation=operation,
+            outcome="ok",
+        )
+
+    before = count("count_documents"), count("find")
+    db = instrument_motor_database(_Database())
+
+    async def run():
+        total = await db.posted_ads.count_documents({})
+        docs = await db.posted_ads.find({}).sort("posted_at", -1).to_list(10)
+        return total, docs
+
+    assert asyncio.run(run()) == (3, [{"id": "1"}])
+    assert count("count_documents") == before[0] + 1
+    assert count("find") == before[1] + 1
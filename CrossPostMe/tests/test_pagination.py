@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from services.pagination import decode_cursor, encode_cursor, keyset_query, next_cursor
+
+
+def test_cursor_roundtrip_preserves_datetime():
+    ts = datetime(2025, 3, 1, 12, 30)
+    value, item_id = decode_cursor(encode_cursor(ts, "ad-1"))
+    assert value == ts
+    assert item_id == "ad-1"
+
+
+def test_keyset_query_combines_filter_and_position():
+    cursor = encode_cursor("2025-03-01T12:30:00", "ad-1")
+    query = keyset_query({"status": "posted"}, "created_at", cursor)
+    after = query["$and"][1]["$or"]
+    assert query["$and"][0] == {"status": "posted"}
+    assert after[0] == {"created_at": {"$lt": "2025-03-01T12:30:00"}}
+    assert after[1] == {"created_at": "2025-03-01T12:30:00", "id": {"$lt": "ad-1"}}
+
+
+def test_next_cursor_trims_lookahead_row():
+    items = [{"id": str(i), "created_at": i} for i in range(3)]
+    cursor = next_cursor(items, "created_at", 2)
+    assert len(items) == 2
+    assert decode_cursor(cursor) == (1, "1")
+    assert next_cursor(items, "created_at", 2) is None
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_query_keeps_null_sort_keys_reachable():
+    descending = keyset_query({}, "created_at", encode_cursor("2025-03-01", "ad-1"))
+    assert descending["$or"][-1] == {"created_at": None}
+
+    ascending = keyset_query({}, "created_at", encode_cursor(None, "ad-1"), descending=False)
+    assert ascending["$or"] == [
+        {"created_at": None, "id": {"$gt": "ad-1"}},
+        {"created_at": {"$ne": None}},
+    ]
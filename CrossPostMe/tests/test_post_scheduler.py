@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fake_mongo import FakeDB
+from services.post_scheduler import (
+    MAX_DISPATCH_ATTEMPTS,
+    STATUS_DISPATCHED,
+    STATUS_NEEDS_REVIEW,
+    STATUS_POSTED,
+    STATUS_POSTING,
+    STATUS_SCHEDULED,
+    PostScheduler,
+    begin_posting,
+    build_scheduled_post,
+    finish_posting,
+)
+
+
+def test_dispatches_only_due_posts_once_and_reclaims_expired_leases():
+    now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    due = build_scheduled_post({"content": "hi", "platforms": ["x"]}, "2025-01-01T11:59:30Z")
+    later = build_scheduled_post({"content": "later"}, now + timedelta(hours=1))
+    db = FakeDB(scheduled_posts=[due, later])
+    enqueued = []
+
+    def enqueue(post):
+        enqueued.append(post["id"])
+        return f"task-{post['id']}"
+
+    scheduler = PostScheduler(db, enqueue=enqueue, batch_size=10, lease_seconds=60)
+
+    async def scenario():
+        assert await scheduler.run_once(now) == {"claimed": 1, "dispatched": 1, "failed": 0}
+        assert await scheduler.run_once(now) == {"claimed": 0, "dispatched": 0, "failed": 0}
+
+        # A scheduler that died after claiming leaves the post dispatching
+        later.update(status="dispatching", lease_until=now, due_at=now)
+        assert (await scheduler.run_once(now + timedelta(seconds=1)))["claimed"] == 1
+
+        # Duplicate deliveries of the same post only post once
+        assert await begin_posting(db, later["id"]) is True
+        assert await begin_posting(db, later["id"]) is False
+
+    asyncio.run(scenario())
+    assert enqueued == [due["id"], later["id"]]
+    assert due["status"] == STATUS_DISPATCHED
+    assert due["due_at"].tzinfo is not None
+
+
+def test_failed_enqueue_returns_post_to_schedule():
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    post = build_scheduled_post({"content": "hi"}, now)
+    db = FakeDB(scheduled_posts=[post])
+
+    def enqueue(_):
+        raise ConnectionError("broker down")
+
+    stats = asyncio.run(PostScheduler(db, enqueue=enqueue).run_once(now))
+    assert stats["failed"] == 1
+    assert post["status"] == STATUS_SCHEDULED
+    assert post["last_error"] == "broker down"
+
+
+def test_sweep_requeues_lost_dispatches_and_flags_stuck_posts():
+    now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
+    def post(status, **fields):
+        return dict(
+            build_scheduled_post({"content": status}, now - timedelta(hours=2)),
+            status=status,
+            **fields,
+        )
+
+    lost = post(STATUS_DISPATCHED, dispatched_at=now - timedelta(minutes=20), dispatch_attempts=1)
+    recent = post(STATUS_DISPATCHED, dispatched_at=now - timedelta(minutes=1), dispatch_attempts=1)
+    hopeless = post(
+        STATUS_DISPATCHED,
+        dispatched_at=now - timedelta(minutes=20),
+        dispatch_attempts=MAX_DISPATCH_ATTEMPTS,
+    )
+    stuck = post(STATUS_POSTING, posting_started_at=now - timedelta(hours=2))
+    running = post(STATUS_POSTING, posting_started_at=now - timedelta(minutes=5))
+    db = FakeDB(scheduled_posts=[lost, recent, hopeless, stuck, running])
+    enqueued = []
+
+    def enqueue(p):
+        enqueued.append(p["id"])
+        return f"task-{p['id']}"
+
+    scheduler = PostScheduler(
+        db, enqueue=enqueue, dispatch_timeout_seconds=600, posting_timeout_seconds=1800
+    )
+
+    async def scenario():
+        stats = await scheduler.run_once(now)
+        # Swept at most once per interval
+        assert await scheduler.sweep(now + timedelta(seconds=1)) == {
+            "requeued": 0,
+            "needs_review": 0,
+        }
+        # A flagged post that does finish resolves its review
+        await finish_posting(db, stuck["id"], {"status": "completed"})
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    # The lost dispatch is enqueued again in the same tick
+    assert stats["dispatched"] == 1 and enqueued == [lost["id"]]
+    assert lost["status"] == STATUS_DISPATCHED and lost["dispatch_attempts"] == 2
+    assert recent["status"] == STATUS_DISPATCHED and recent["dispatch_attempts"] == 1
+    assert hopeless["status"] == STATUS_NEEDS_REVIEW
+    assert stuck["status"] == STATUS_POSTED and stuck["review_reason"] == "posting did not finish"
+    assert running["status"] == STATUS_POSTING
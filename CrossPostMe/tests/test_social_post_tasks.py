@@ -0,0 +1,48 @@
+import pytest
+
+import tasks
+from worker import celery_app
+
+
+@pytest.fixture
+def eager_celery():
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
+
+
+def test_platform_subtasks_are_routed_and_rate_limited_per_platform():
+    routes = celery_app.conf.task_routes
+    assert routes["tasks.post_to_twitter"] == {"queue": "platform_twitter"}
+    assert routes["tasks.post_to_other"] == {"queue": "platform_other"}
+    assert celery_app.tasks["tasks.post_to_linkedin"].rate_limit == "20/m"
+
+
+def test_failed_platform_is_retried_alone_and_reported(eager_celery, monkeypatch):
+    calls = []
+    real_post = tasks.post_to_platform
+
+    def flaky_post(platform, content, media_urls):
+        calls.append(platform)
+        if platform == "facebook":
+            raise ConnectionError("facebook is down")
+        return real_post(platform, content, media_urls)
+
+    monkeypatch.setattr(tasks, "post_to_platform", flaky_post)
+
+    outcome = tasks.aggregate_post_results(
+        [
+            tasks._platform_tasks["twitter"].apply(args=("twitter", "hello", [])).get(),
+            tasks._platform_tasks["facebook"].apply(args=("facebook", "hello", [])).get(),
+        ]
+    )
+
+    assert outcome["status"] == "partial"
+    assert outcome["results"]["twitter"]["status"] == "posted"
+    assert outcome["results"]["facebook"]["status"] == "failed"
+    assert calls.count("twitter") == 1
+    assert calls.count("facebook") == 1 + tasks.policy_for("facebook").max_retries
+
+
+def test_aggregate_without_platforms_fails():
+    assert tasks.aggregate_post_results([])["status"] == "failed"
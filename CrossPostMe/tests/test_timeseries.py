@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from fake_mongo import FakeDB
+from models import AdMetricEvent
+from routes.ads import track_ad_event
+from services.timeseries import (
+    DAILY,
+    HOURLY,
+    SAMPLES,
+    RollupCompactor,
+    query_series,
+    record_samples,
+    sample_doc,
+)
+
+
+def test_rollups_serve_the_same_totals_as_raw_samples():
+    db = FakeDB()
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    samples = [
+        sample_doc("ad1", platform, start + timedelta(minutes=20 * i), views=3, clicks=1)
+        for i in range(3 * 24 * 3)  # three days, three samples an hour
+        for platform in ("ebay", "facebook")
+    ]
+    samples.append(sample_doc("ad2", "ebay", start, views=100))
+    now = start + timedelta(days=3, minutes=30)
+
+    async def scenario():
+        await record_samples(db, samples)
+        raw = await query_series(db, "ad1", start, now)
+
+        compactor = RollupCompactor(
+            db, late_seconds=0, raw_retention_hours=1, hourly_retention_days=1
+        )
+        stats = await compactor.run_once(now)
+        assert stats["hourly"] == 2 * 72 + 1 and stats["daily"] == 2 * 3 + 1
+        # Idempotent: nothing new to roll up on the next tick
+        assert (await compactor.run_once(now))["hourly"] == 0
+
+        rolled = await query_series(db, "ad1", start, now)
+        hourly = await query_series(db, "ad1", now - timedelta(hours=2), now, "hour")
+        return raw, rolled, hourly
+
+    raw, rolled, hourly = asyncio.run(scenario())
+
+    assert rolled == raw
+    assert [p["views"] for p in rolled if p["platform"] == "ebay"] == [216, 216, 216]
+    assert len(db[DAILY].docs) == 7
+    # Retention dropped raw samples and hourly rollups already in the next tier
+    assert all(doc["ts"] >= now - timedelta(hours=1) for doc in db[SAMPLES].docs)
+    assert all(doc["bucket"] >= start + timedelta(days=2) for doc in db[HOURLY].docs)
+    assert [p["views"] for p in hourly if p["platform"] == "facebook"] == [9, 9]
+
+
+def test_range_queries_read_rollups_not_samples():
+    db = FakeDB()
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    now = start + timedelta(days=30)
+    samples = [
+        sample_doc("ad1", "ebay", start + timedelta(minutes=5 * i), views=1)
+        for i in range(30 * 24 * 12)
+    ]
+
+    async def scenario():
+        await record_samples(db, samples)
+        await RollupCompactor(db, late_seconds=0, max_hours_per_tick=24 * 30).run_once(now)
+        db[SAMPLES].reads = db[DAILY].reads = 0
+        return await query_series(db, "ad1", start, now)
+
+    series = asyncio.run(scenario())
+
+    assert len(series) == 30 and all(p["views"] == 288 for p in series)
+    assert db[DAILY].reads == 1 and db[SAMPLES].reads == 0
+
+
+def test_metric_events_require_the_ad_owner():
+    db = FakeDB()
+    db.ads.docs.append({"id": "ad1", "owner_id": "u1"})
+    event = AdMetricEvent(platform="ebay", views=2)
+
+    def track(ad_id, user):
+        return asyncio.run(track_ad_event(ad_id, event, current_user=user, database=db))
+
+    for ad_id, user, status in (("ad1", None, 401), ("ad1", "u2", 403), ("nope", "u1", 404)):
+        with pytest.raises(HTTPException) as exc:
+            track(ad_id, user)
+        assert exc.value.status_code == status
+    assert db[SAMPLES].docs == []
+
+    assert track("ad1", "u1") == {"status": "recorded"}
+    assert [(d["platform"], d["views"]) for d in db[SAMPLES].docs] == [("ebay", 2)]
+
+    with pytest.raises(ValueError):
+        AdMetricEvent(platform="myspace", views=1)
+    with pytest.raises(ValueError):
+        AdMetricEvent(platform="ebay", views=10**6)
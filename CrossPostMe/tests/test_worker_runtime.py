@@ -0,0 +1,22 @@
+import asyncio
+
+import worker_runtime
+
+
+def test_tasks_share_one_loop_and_client(monkeypatch):
+    monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+    monkeypatch.setenv("DB_NAME", "crosspostme_test")
+    worker_runtime.init_worker_runtime()
+    try:
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = worker_runtime.run(current_loop())
+        second = worker_runtime.run(current_loop())
+        assert first is second
+        assert worker_runtime.get_client() is worker_runtime.get_client()
+        assert worker_runtime.get_db().name == "crosspostme_test"
+    finally:
+        worker_runtime.shutdown_worker_runtime()
+    assert worker_runtime._loop is None
@@ -1,8 +1,12 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from dotenv import load_dotenv
 
+from services.platform_policies import platform_task_routes
+from worker_runtime import init_worker_runtime, shutdown_worker_runtime
+
 load_dotenv()
 
 # Create Celery instance
@@ -25,8 +29,15 @@ celery_app.conf.update(
         "tasks.process_social_post": {"queue": "social_posts"},
         "tasks.schedule_post": {"queue": "scheduler"},
         "tasks.validate_platforms": {"queue": "validation"},
+        "tasks.aggregate_post_results": {"queue": "social_posts"},
+        # One queue per platform subtask (see services/platform_policies.py)
+        **platform_task_routes(),
     },
 )
 
+# One event loop and pooled Motor client per worker process, reused by all tasks
+worker_process_init.connect(init_worker_runtime, weak=False)
+worker_process_shutdown.connect(shutdown_worker_runtime, weak=False)
+
 if __name__ == "__main__":
     celery_app.start()
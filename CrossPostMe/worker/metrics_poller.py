@@ -1,11 +1,17 @@
 import asyncio
 import logging
 import os
+import sys
 from datetime import datetime, timezone
 from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorClient
 
+# Run from the repo root or worker/; make the app modules importable either way
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.timeseries import METRICS, record_samples, sample_doc  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 MONGO_URL = os.environ.get("MONGO_URL")
@@ -15,14 +21,33 @@ POLL_INTERVAL = int(os.environ.get("METRICS_POLL_INTERVAL", "300"))
 
 async def poll_metrics_once(db_client: Any):
     db = db_client[DB_NAME]
-    # Placeholder: scan posted_ads and update metrics by querying real platform adapters
+    # Placeholder: platform adapters refresh the counters on posted_ads; here
+    # the change since the last poll is recorded as a time-series sample
     posted = await db.posted_ads.find({}).to_list(1000)
     logger.info(f"Found {len(posted)} posted ads while polling metrics")
-    now = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)
+    samples = []
+    baselines = []
     for pa in posted:
-        # Simulate a metrics update
+        totals = {metric: int(pa.get(metric) or 0) for metric in METRICS}
+        sampled = pa.get("sampled_metrics") or {}
+        # Counters that went down were reset on the platform; count from zero
+        deltas = {
+            metric: value - sampled.get(metric, 0)
+            if value >= sampled.get(metric, 0)
+            else value
+            for metric, value in totals.items()
+        }
+        if any(deltas.values()):
+            samples.append(sample_doc(pa["ad_id"], pa["platform"], now, **deltas))
+        baselines.append((pa.get("id"), totals))
+    # Store the samples before advancing the baselines: if recording fails, the
+    # next poll computes the same deltas again instead of losing them
+    await record_samples(db, samples)
+    for posted_ad_id, totals in baselines:
         await db.posted_ads.update_one(
-            {"id": pa.get("id")}, {"$set": {"last_polled": now}}
+            {"id": posted_ad_id},
+            {"$set": {"last_polled": now.isoformat(), "sampled_metrics": totals}},
         )
 
 
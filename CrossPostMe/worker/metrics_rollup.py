@@ -0,0 +1,40 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Run from the repo root or worker/; make the app modules importable either way
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indexes import ensure_indexes  # noqa: E402
+from services.timeseries import RollupCompactor  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+MONGO_URL = os.environ.get("MONGO_URL")
+DB_NAME = os.environ.get("DB_NAME")
+
+
+async def main():
+    if not MONGO_URL or not DB_NAME:
+        logger.error("MONGO_URL or DB_NAME not set; metrics rollup exiting")
+        return
+    client = AsyncIOMotorClient(MONGO_URL)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        db = client[DB_NAME]
+        await ensure_indexes(db)
+        await RollupCompactor(db).run_forever(stop)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
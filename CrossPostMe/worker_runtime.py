@@ -0,0 +1,83 @@
+"""Worker-lifetime async runtime for Celery tasks.
+
+Each worker process owns one event loop (running in a daemon thread) and one
+pooled Motor client bound to it, created in the ``worker_process_init`` hook
+and closed on ``worker_process_shutdown``. Tasks submit coroutines with
+``run()`` instead of ``asyncio.run()``, so they reuse warm connections rather
+than paying for a new client, pool and loop per task. Processes that never
+receive the hook (solo/threads pools, scripts) initialize lazily on first use.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional, TypeVar
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def init_worker_runtime(**_: Any) -> None:
+    """Start the process event loop and Motor client (idempotent)."""
+    global _loop, _thread, _client
+    with _lock:
+        if _loop is not None and _loop.is_running():
+            return
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever, name="worker-event-loop", daemon=True
+        )
+        thread.start()
+
+        async def _make_client() -> AsyncIOMotorClient:
+            # Created on the loop so Motor binds its pool to it
+            return AsyncIOMotorClient(
+                os.environ.get("MONGO_URL"),
+                maxPoolSize=int(os.environ.get("WORKER_MONGO_MAX_POOL_SIZE", "20")),
+            )
+
+        _client = asyncio.run_coroutine_threadsafe(_make_client(), loop).result()
+        _loop, _thread = loop, thread
+        logger.info(f"Worker runtime started (pid {os.getpid()})")
+
+
+def shutdown_worker_runtime(**_: Any) -> None:
+    """Close the Motor client and stop the loop."""
+    global _loop, _thread, _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        if _loop is not None:
+            _loop.call_soon_threadsafe(_loop.stop)
+            if _thread is not None:
+                _thread.join(timeout=5)
+            if not _loop.is_running():
+                _loop.close()
+        _loop, _thread, _client = None, None, None
+
+
+def get_client() -> AsyncIOMotorClient:
+    if _client is None:
+        init_worker_runtime()
+    return _client
+
+
+def get_db():
+    """Database handle on the worker's shared client."""
+    return get_client()[os.environ.get("DB_NAME")]
+
+
+def run(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the worker loop and block for its result."""
+    if _loop is None:
+        init_worker_runtime()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result(timeout)
@@ -4,7 +4,10 @@ Provides common functionality for web scraping, session management, and error ha
 
 import asyncio
 import logging
+import os
 import random
+import time
+import uuid
 from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
@@ -15,6 +18,18 @@ from asyncio_throttle import Throttler
 from fake_useragent import UserAgent
 from playwright.async_api import Browser, BrowserContext, Page, async_playwright
 
+from .humanize import (
+    AFTER_CLEAR,
+    AFTER_CLICK,
+    AFTER_FILL,
+    BEFORE_CLICK,
+    BEFORE_FILL,
+    Pacer,
+    humanization_for,
+)
+from .network import RequestInterceptor, profile_for
+from .tracing import OUTCOME_ERROR, outcome_of, span, trace_post, traced
+
 
 class PageNotInitializedError(RuntimeError):
     """Raised when attempting to use page before browser initialization"""
@@ -41,6 +56,9 @@ class PostResult:
     message: str | None = None
     error_code: str | None = None
     retry_after: int | None = None  # seconds
+    spans: dict[str, Any] | None = None  # step timings, see automation.tracing
+    trace_path: str | None = None  # Playwright trace kept for a slow post
+    network: dict[str, Any] | None = None  # requests blocked, bytes saved
 
     def to_dict(self) -> dict[str, Any]:
         result = asdict(self)
@@ -101,17 +119,37 @@ class PlatformAutomationBase(ABC):
         # When rate-limited until, or None
         self.blocked_until: Optional[datetime] = None
 
+        # Posts slower than this keep a Playwright trace (0 disables tracing)
+        self.trace_slow_seconds = float(
+            os.environ.get("AUTOMATION_TRACE_SLOW_SECONDS", "0")
+        )
+        self.trace_dir = os.environ.get("AUTOMATION_TRACE_DIR", "automation-traces")
+        self._tracing = False
+
+        # Request interception for the current browser context
+        self.network: RequestInterceptor | None = None
+        # Installed on every new browser context after request interception;
+        # objects with ``async install(context)``, e.g. a test harness routing
+        # marketplace requests to a fake marketplace
+        self.context_hooks: list[Any] = []
+
+        # Pauses and typing behaviour, stretched while rate limited
+        self.humanization = humanization_for(self.platform_name)
+        self.pacer = Pacer()
+
     def _ensure_page(self) -> Page:
         """Ensure page is initialized and return it. Raises PageNotInitializedError if not."""
         if not self.page:
             raise PageNotInitializedError
         return self.page
 
+    @traced()
     async def goto(self, url: str, **kwargs) -> None:
         """Navigate to a URL"""
         page = self._ensure_page()
         await page.goto(url, **kwargs)
 
+    @traced()
     async def wait_for_selector(self, selector: str, **kwargs):
         """Wait for a selector"""
         page = self._ensure_page()
@@ -166,17 +204,20 @@ class PlatformAutomationBase(ABC):
         locator = self.locator(selector)
         return await locator.all()
 
+    @traced("initialize_browser")
     async def __aenter__(self):
         """Async context manager entry"""
         await self.initialize_browser()
         return self
 
+    @traced("cleanup")
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         await self.cleanup()
 
     async def initialize_browser(self) -> None:
         """Initialize Playwright browser and context"""
+        self.network = None
         try:
             self.playwright = await async_playwright().start()
 
@@ -209,6 +250,17 @@ class PlatformAutomationBase(ABC):
                 },
             )
 
+            # Skip resources the posting flow does not need
+            self.network = RequestInterceptor(
+                self.platform_name, profile_for(self.platform_name)
+            )
+            await self.network.install(self.context)
+
+            for hook in self.context_hooks:
+                await hook.install(self.context)
+
+            await self._start_tracing()
+
             # Create page
             self.page = await self.context.new_page()
 
@@ -235,6 +287,44 @@ class PlatformAutomationBase(ABC):
             self.logger.error(f"Failed to initialize browser: {e}")
             raise
 
+    def network_stats(self) -> dict[str, Any] | None:
+        """Requests blocked and bytes saved in the current browser context"""
+        return self.network.stats.to_dict() if self.network else None
+
+    async def _start_tracing(self) -> None:
+        """Record a Playwright trace when slow posts are to be kept"""
+        if self.trace_slow_seconds <= 0 or self.context is None:
+            return
+        try:
+            await self.context.tracing.start(screenshots=True, snapshots=True)
+            self._tracing = True
+        except Exception as e:
+            self.logger.warning(f"Could not start Playwright tracing: {e}")
+
+    async def save_trace_if_slow(self, elapsed: float) -> str | None:
+        """Stop the Playwright trace, saving it only if the post was slow"""
+        if not self._tracing or self.context is None:
+            return None
+        self._tracing = False
+        try:
+            if elapsed < self.trace_slow_seconds:
+                await self.context.tracing.stop()
+                return None
+            os.makedirs(self.trace_dir, exist_ok=True)
+            path = os.path.join(
+                self.trace_dir,
+                f"{self.platform_name}-{datetime.now():%Y%m%d-%H%M%S}-"
+                f"{uuid.uuid4().hex[:8]}.zip",
+            )
+            await self.context.tracing.stop(path=path)
+            self.logger.warning(
+                f"Slow post ({elapsed:.0f}s), Playwright trace saved to {path}"
+            )
+            return path
+        except Exception as e:
+            self.logger.warning(f"Could not save Playwright trace: {e}")
+            return None
+
     async def cleanup(self) -> None:
         """Clean up browser resources"""
         try:
@@ -252,47 +342,70 @@ class PlatformAutomationBase(ABC):
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
 
+    @traced()
     async def random_delay(
         self,
         min_seconds: float = 1.0,
         max_seconds: float = 3.0,
     ) -> None:
-        """Add random delay to mimic human behavior"""
-        delay = random.uniform(min_seconds, max_seconds)
-        await asyncio.sleep(delay)
+        """Add random delay to mimic human behavior
 
+        Scaled by the humanization profile and the current pace.
+        """
+        delay = random.uniform(min_seconds, max_seconds)
+        delay *= self.humanization.delay_scale * self.pacer.pace
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @traced()
+    async def pause(self, action: str) -> None:
+        """Pause around an action as the humanization profile prescribes"""
+        delay = self.humanization.pause(action) * self.pacer.pace
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @traced()
     async def safe_click(self, selector: str, timeout: int = 30000) -> bool:
         """Safely click an element with retries"""
         try:
             page = self._ensure_page()
             await page.wait_for_selector(selector, timeout=timeout)
-            await self.random_delay(0.5, 1.5)
+            await self.pause(BEFORE_CLICK)
             await page.click(selector)
-            await self.random_delay(1.0, 2.0)
+            await self.pause(AFTER_CLICK)
             return True
         except Exception as e:
             self.logger.error(f"Failed to click {selector}: {e}")
             return False
 
+    @traced()
     async def safe_fill(self, selector: str, text: str, timeout: int = 30000) -> bool:
-        """Safely fill an input field"""
+        """Safely fill an input field
+
+        Text is typed key by key only where the humanization profile asks for
+        it (typeahead fields, scored logins); otherwise it is filled at once.
+        """
         try:
             page = self._ensure_page()
             await page.wait_for_selector(selector, timeout=timeout)
-            await self.random_delay(0.5, 1.5)
-
-            # Clear existing text
-            await page.fill(selector, "")
-            await self.random_delay(0.3, 0.8)
-
-            # Type with human-like speed
-            await page.type(selector, text, delay=random.randint(50, 150))
-            await self.random_delay(0.5, 1.0)
+            await self.pause(BEFORE_FILL)
+
+            if self.humanization.should_type(selector, text):
+                # Clear existing text, then type with human-like speed
+                await page.fill(selector, "")
+                await self.pause(AFTER_CLEAR)
+                delay_ms = self.humanization.keystroke_delay_ms()
+                await page.type(selector, text, delay=delay_ms)
+            else:
+                # fill replaces any existing text in one input event
+                await page.fill(selector, text)
+            await self.pause(AFTER_FILL)
             return True
         except Exception as e:
             self.logger.error(f"Failed to fill {selector}: {e}")
             return False
 
+    @traced()
     async def wait_and_handle_captcha(self, timeout: int = 60000) -> bool:
         """Wait for and handle CAPTCHA if present"""
         try:
@@ -331,6 +444,7 @@ class PlatformAutomationBase(ABC):
         """Mark the automation as rate limited"""
         self.blocked_until = datetime.now() + timedelta(seconds=retry_after)
         self.consecutive_failures += 1
+        self.pacer.blocked()
         self.logger.warning(f"Rate limited for {retry_after} seconds")
 
     def mark_success(self) -> None:
@@ -338,6 +452,7 @@ class PlatformAutomationBase(ABC):
         self.consecutive_failures = 0
         self.last_success_time = datetime.now()
         self.blocked_until = None
+        self.pacer.succeeded()
 
     @abstractmethod
     async def login(self, credentials: "PlatformCredentials") -> bool:
@@ -359,6 +474,57 @@ class PlatformAutomationBase(ABC):
     def get_supported_categories(self) -> list[str]:
         """Get list of supported categories for this platform"""
 
+    async def end_listing(
+        self,
+        platform_ad_id: str,
+        credentials: "PlatformCredentials",
+    ) -> "PostResult | None":
+        """End a listing; None when the platform has no way to end listings"""
+        return None
+
+    async def post_ads(
+        self,
+        ads: list["AdData"],
+        credentials: "PlatformCredentials",
+    ) -> list["PostResult"]:
+        """Post many ads in order; API platforms override this to batch calls
+
+        Each ad goes through ``AutomationManager.post_to_platform``, which
+        opens the browser session ``post_ad`` needs, checks the credentials
+        and applies the platform's rate limiting.
+        """
+        manager = AutomationManager()
+        manager.platforms[self.platform_name] = self
+        return [
+            await manager.post_to_platform(self.platform_name, ad_data, credentials)
+            for ad_data in ads
+        ]
+
+    async def end_listings(
+        self,
+        platform_ad_ids: list[str],
+        credentials: "PlatformCredentials",
+    ) -> "dict[str, PostResult] | None":
+        """End many listings; None when the platform has no way to end listings"""
+        results = {}
+        for platform_ad_id in platform_ad_ids:
+            result = await self.end_listing(platform_ad_id, credentials)
+            if result is None:
+                return None
+            results[platform_ad_id] = result
+        return results
+
+    async def revise_listings(
+        self,
+        items: list[tuple[str, "AdData"]],
+        credentials: "PlatformCredentials",
+    ) -> "dict[str, PostResult] | None":
+        """Update live listings in place; None when the platform cannot revise"""
+        return None
+
+    async def close(self) -> None:
+        """Release resources kept open across posts (called at app shutdown)"""
+
 
 class AutomationManager:
     """Manages multiple platform automations"""
@@ -399,35 +565,97 @@ class AutomationManager:
                 ),
             )
 
-        try:
-            async with platform:
-                # Validate credentials
-                if not await platform.validate_credentials(credentials):
-                    return PostResult(
-                        status=PostStatus.LOGIN_REQUIRED,
-                        message="Invalid credentials",
-                    )
-
-                # Attempt to post
-                result = await platform.post_ad(ad_data, credentials)
+        started = time.perf_counter()
+        trace_path = None
+        network = None
+        with trace_post(platform_name) as root:
+            try:
+                async with platform:
+                    try:
+                        result = await self._validate_and_post(
+                            platform, ad_data, credentials
+                        )
+                    finally:
+                        trace_path = await platform.save_trace_if_slow(
+                            time.perf_counter() - started
+                        )
+                        network = platform.network_stats()
 
-                if result.status == PostStatus.SUCCESS:
-                    platform.mark_success()
-                elif result.status == PostStatus.RATE_LIMITED:
-                    platform.mark_rate_limited(result.retry_after or 300)
+            except Exception as e:
+                platform.consecutive_failures += 1
+                self.logger.error(f"Error posting to {platform_name}: {e}")
 
-                return result
+                result = PostResult(
+                    status=PostStatus.FAILED,
+                    message=str(e),
+                    error_code="AUTOMATION_ERROR",
+                )
+                root.error = str(e)
+                root.outcome = OUTCOME_ERROR
+            else:
+                root.outcome = outcome_of(result)
+
+        result.spans = root.to_dict()
+        result.trace_path = trace_path
+        result.network = network
+        return result
 
+    async def end_listing(
+        self,
+        platform_name: str,
+        platform_ad_id: str,
+        credentials: PlatformCredentials,
+    ) -> PostResult | None:
+        """End a listing on a platform; None when the platform cannot end listings"""
+        platform = self.platforms.get(platform_name)
+        if platform is None:
+            return None
+        try:
+            return await platform.end_listing(platform_ad_id, credentials)
         except Exception as e:
-            platform.consecutive_failures += 1
-            self.logger.error(f"Error posting to {platform_name}: {e}")
-
+            self.logger.error(f"Error ending {platform_name} listing: {e}")
             return PostResult(
                 status=PostStatus.FAILED,
                 message=str(e),
                 error_code="AUTOMATION_ERROR",
             )
 
+    async def close(self) -> None:
+        """Close every platform's long-lived resources"""
+        for platform in self.platforms.values():
+            try:
+                await platform.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing {platform.platform_name}: {e}")
+
+    async def _validate_and_post(
+        self,
+        platform: PlatformAutomationBase,
+        ad_data: AdData,
+        credentials: PlatformCredentials,
+    ) -> PostResult:
+        """Validate credentials, then post, updating the platform's health"""
+        name = platform.platform_name
+        with span(name, "validate_credentials") as step:
+            valid = await platform.validate_credentials(credentials)
+            step.outcome = outcome_of(valid)
+        if not valid:
+            return PostResult(
+                status=PostStatus.LOGIN_REQUIRED,
+                message="Invalid credentials",
+            )
+
+        with span(name, "post_ad") as step:
+            result = await platform.post_ad(ad_data, credentials)
+            step.outcome = outcome_of(result)
+
+        if result.status == PostStatus.SUCCESS:
+            platform.mark_success()
+        elif result.status == PostStatus.RATE_LIMITED:
+            platform.mark_rate_limited(result.retry_after or 300)
+
+        return result
+
     async def post_to_multiple_platforms(
         self,
         platforms: list[str],
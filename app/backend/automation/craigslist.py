@@ -17,6 +17,7 @@ from .base import (
     PostResult,
     PostStatus,
 )
+from .tracing import traced
 
 
 class CraigslistAutomation(PlatformAutomationBase):
@@ -70,6 +71,7 @@ class CraigslistAutomation(PlatformAutomationBase):
         # Default to Phoenix if no match found
         return "phoenix.craigslist.org"
 
+    @traced()
     async def login(self, credentials: PlatformCredentials) -> bool:
         """Login to Craigslist (if account exists)"""
         try:
@@ -154,6 +156,7 @@ class CraigslistAutomation(PlatformAutomationBase):
             self.logger.error(f"Error posting ad: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _navigate_posting_flow(self, ad_data: AdData) -> PostResult:
         """Navigate through Craigslist's multi-step posting flow"""
         try:
@@ -182,6 +185,7 @@ class CraigslistAutomation(PlatformAutomationBase):
             self.logger.error(f"Error navigating posting flow: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _fill_posting_form(self, ad_data: AdData) -> PostResult:
         """Fill the Craigslist posting form"""
         try:
@@ -243,6 +247,7 @@ class CraigslistAutomation(PlatformAutomationBase):
             self.logger.error(f"Error filling form: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _handle_location_selection(self, location: str) -> bool:
         """Handle Craigslist location/area selection"""
         try:
@@ -288,6 +293,7 @@ class CraigslistAutomation(PlatformAutomationBase):
             self.logger.error(f"Error handling location selection: {e}")
             return False
 
+    @traced()
     async def _fill_contact_info(self, contact_info: dict[str, str]) -> bool:
         """Fill contact information"""
         try:
@@ -313,6 +319,7 @@ class CraigslistAutomation(PlatformAutomationBase):
             self.logger.error(f"Error filling contact info: {e}")
             return False
 
+    @traced()
     async def _upload_images(self, image_urls: list[str]) -> bool:
         """Upload images to Craigslist listing"""
         if not image_urls:
@@ -494,6 +501,7 @@ class CraigslistAutomation(PlatformAutomationBase):
 
         return ".jpg"  # Default fallback
 
+    @traced()
     async def _handle_preview_and_submit(self) -> PostResult:
         """Handle the preview page and final submission"""
         try:
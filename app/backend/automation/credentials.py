@@ -9,9 +9,13 @@ from typing import Any
 import certifi
 from cryptography.fernet import Fernet
 from motor.motor_asyncio import AsyncIOMotorClient
+from services.metrics import instrument_motor_database
 
 from .base import PlatformCredentials
 
+# Platforms connected through OAuth; posting uses their stored access token
+OAUTH_PLATFORMS = ("facebook", "ebay")
+
 
 class CredentialManager:
     """Secure credential management for platform automations"""
@@ -37,7 +41,8 @@ class CredentialManager:
         client: Any = AsyncIOMotorClient(mongo_url, **client_opts)  # type: ignore[arg-type]
 
         # Motor database is dynamically typed; annotate as Any for typing passes
-        self.db: Any = client[db_name]
+        self.db: Any = instrument_motor_database(client[db_name])
+        self._oauth_service: Any = None
 
     def encrypt_data(self, data: str) -> str:
         """Encrypt sensitive data"""
@@ -88,31 +93,61 @@ class CredentialManager:
         user_id: str,
         platform: str,
     ) -> PlatformCredentials | None:
-        """Retrieve and decrypt platform credentials"""
+        """Retrieve and decrypt platform credentials
+
+        For OAuth platforms the current access token is added as
+        ``additional_data["oauth_access_token"]``.
+        """
         try:
             credential_doc = await self.db.secure_credentials.find_one(
                 {"user_id": user_id, "platform": platform},
                 {"_id": 0},
             )
+            access_token = await self.get_oauth_token(user_id, platform)
 
             if not credential_doc:
-                return None
+                if access_token is None:
+                    return None
+                # Connected through OAuth only
+                return PlatformCredentials(
+                    username="",
+                    password="",
+                    additional_data={"oauth_access_token": access_token},
+                )
 
             # Decrypt password
             decrypted_password = self.decrypt_data(credential_doc["encrypted_password"])
 
+            additional_data = dict(credential_doc.get("additional_data") or {})
+            if access_token is not None:
+                additional_data["oauth_access_token"] = access_token
+
             return PlatformCredentials(
                 username=credential_doc["username"],
                 password=decrypted_password,
                 email=credential_doc.get("email"),
                 phone=credential_doc.get("phone"),
-                additional_data=credential_doc.get("additional_data", {}),
+                additional_data=additional_data,
             )
 
         except Exception as e:
             print(f"Error retrieving credentials: {e}")
             return None
 
+    async def get_oauth_token(self, user_id: str, platform: str) -> str | None:
+        """Usable OAuth access token for a platform, refreshed inline if expired"""
+        if platform not in OAUTH_PLATFORMS:
+            return None
+        try:
+            if self._oauth_service is None:
+                from services.platform_oauth_service import PlatformOAuthService
+
+                self._oauth_service = PlatformOAuthService(self.db)
+            return await self._oauth_service.get_valid_token(user_id, platform)
+        except Exception as e:
+            print(f"Error retrieving {platform} OAuth token: {e}")
+            return None
+
     async def delete_credentials(self, user_id: str, platform: str) -> bool:
         """Delete stored credentials"""
         try:
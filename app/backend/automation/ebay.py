@@ -2,11 +2,10 @@
 Handles posting items to eBay through their official Trading API
 """
 
+import asyncio
 import xml.etree.ElementTree as ET
 from typing import Any
 
-import httpx
-
 from .base import (
     AdData,
     PlatformAutomationBase,
@@ -14,17 +13,26 @@ from .base import (
     PostResult,
     PostStatus,
 )
+from .ebay_api import (
+    AdaptiveTokenBucket,
+    EBayApiCredentials,
+    EBayResponse,
+    EBayTradingClient,
+    sub_element,
+)
+
+# Trading API batch limits
+ADD_ITEMS_BATCH_SIZE = 5
+END_ITEMS_BATCH_SIZE = 10
+# ReviseItem has no batch form; revisions are sent concurrently in chunks
+REVISE_CHUNK_SIZE = 20
 
 
 class EBayAutomation(PlatformAutomationBase):
     """eBay posting automation using Trading API"""
 
     def __init__(self, headless: bool = True):
-        super().__init__(
-            "ebay",
-            headless,
-            rate_limit=0.1,
-        )  # 0.1 requests per second for API
+        super().__init__("ebay", headless)
 
         # eBay API endpoints
         self.sandbox_url = "https://api.sandbox.ebay.com/ws/api/eBayAPI/xml"
@@ -39,6 +47,15 @@ class EBayAutomation(PlatformAutomationBase):
         # eBay site ID (0 = US, 3 = UK, etc.)
         self.site_id = "0"
 
+        # Pooled client shared by every call; the token bucket adapts its rate
+        # to eBay's throttling instead of a fixed requests-per-second limit
+        self.api_client = EBayTradingClient(
+            self.api_url,
+            api_version=self.api_version,
+            site_id=self.site_id,
+            rate_limiter=AdaptiveTokenBucket(),
+        )
+
         # Category mapping for eBay
         self.category_mapping = {
             "electronics": "293",  # Consumer Electronics
@@ -63,6 +80,10 @@ class EBayAutomation(PlatformAutomationBase):
         self.dev_id: str | None = None
         self.cert_id: str | None = None
         self.user_token: str | None = None
+        # OAuth access token from the connect flow, kept fresh by token refresh
+        self.oauth_token: str | None = None
+        # Token already confirmed by GeteBayOfficialTime, so repeat posts skip the check
+        self._validated_token: str | None = None
 
     def configure_api_credentials(
         self,
@@ -82,6 +103,23 @@ class EBayAutomation(PlatformAutomationBase):
             self.api_url = self.production_url
         else:
             self.api_url = self.sandbox_url
+        self.api_client.api_url = self.api_url
+
+    @property
+    def api_credentials(self) -> EBayApiCredentials:
+        return EBayApiCredentials(
+            self.app_id, self.dev_id, self.cert_id, self.user_token, self.oauth_token
+        )
+
+    async def initialize_browser(self) -> None:
+        """eBay is API-only; no browser is launched"""
+
+    async def cleanup(self) -> None:
+        """Keep the pooled API client open across posts"""
+
+    async def close(self) -> None:
+        """Close the pooled API client"""
+        await self.api_client.aclose()
 
     async def login(self, credentials: PlatformCredentials) -> bool:
         """Validate eBay API credentials (no traditional login needed)"""
@@ -92,9 +130,17 @@ class EBayAutomation(PlatformAutomationBase):
                 self.dev_id = credentials.additional_data.get("dev_id")
                 self.cert_id = credentials.additional_data.get("cert_id")
                 self.user_token = credentials.additional_data.get("user_token")
+                self.oauth_token = credentials.additional_data.get("oauth_access_token")
+
+            token = self.oauth_token or self.user_token
+            if token and token == self._validated_token:
+                return True
 
             # Validate credentials by making a test API call
-            return await self._validate_api_credentials()
+            if await self._validate_api_credentials():
+                self._validated_token = token
+                return True
+            return False
 
         except Exception as e:
             self.logger.error(f"eBay credential validation failed: {e}")
@@ -104,11 +150,9 @@ class EBayAutomation(PlatformAutomationBase):
         """Validate eBay API credentials with test call"""
         try:
             # Use GeteBayOfficialTime as a simple test call
-            xml_request = self._build_xml_request("GeteBayOfficialTime")
+            response = await self._call("GeteBayOfficialTime")
 
-            response = await self._make_api_call(xml_request)
-
-            if response and "eBayOfficialTime" in response:
+            if response and response.fields.get("Timestamp"):
                 self.logger.info("eBay API credentials validated")
                 return True
 
@@ -139,156 +183,166 @@ class EBayAutomation(PlatformAutomationBase):
             self.logger.error(f"Error posting to eBay: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
-    async def _create_ebay_listing(self, ad_data: AdData) -> PostResult:
-        """Create eBay listing using AddItem API call"""
+    async def post_ads(
+        self,
+        ads: list[AdData],
+        credentials: PlatformCredentials,
+    ) -> list[PostResult]:
+        """Post many items with batched AddItems calls
+
+        Results are returned in the order of ``ads``.
+        """
+        if not ads:
+            return []
+        if not await self.login(credentials):
+            return [
+                PostResult(
+                    status=PostStatus.LOGIN_REQUIRED,
+                    message="Invalid eBay API credentials",
+                )
+                for _ in ads
+            ]
+
+        indexed = list(enumerate(ads))
+        chunks = [
+            indexed[i : i + ADD_ITEMS_BATCH_SIZE]
+            for i in range(0, len(indexed), ADD_ITEMS_BATCH_SIZE)
+        ]
+        results: list[PostResult | None] = [None] * len(ads)
+        for chunk_results in await asyncio.gather(
+            *(self._add_items(chunk) for chunk in chunks)
+        ):
+            for index, result in chunk_results.items():
+                results[index] = result
+        return [
+            r or PostResult(status=PostStatus.FAILED, message="No response for item")
+            for r in results
+        ]
+
+    async def _add_items(
+        self, chunk: list[tuple[int, AdData]]
+    ) -> dict[int, PostResult]:
+        """One AddItems call; items are correlated by their index as MessageID"""
+        containers = []
+        for index, ad_data in chunk:
+            container = ET.Element("AddItemRequestContainer")
+            sub_element(container, "MessageID", index)
+            container.append(self._build_item(ad_data))
+            containers.append(container)
+
         try:
-            # Build the AddItem XML request
-            xml_request = self._build_add_item_request(ad_data)
+            response = await self._call("AddItems", containers)
+        except Exception as e:
+            self.logger.error(f"eBay AddItems failed: {e}")
+            return {
+                index: PostResult(status=PostStatus.FAILED, message=str(e))
+                for index, _ in chunk
+            }
 
-            # Make the API call
-            response = await self._make_api_call(xml_request)
+        if response.containers:
+            indexes = {str(index): index for index, _ in chunk}
+            return {
+                indexes[c["CorrelationID"]]: self._container_result(
+                    c, c.get("ItemID", "")
+                )
+                for c in response.containers
+                if c.get("CorrelationID") in indexes
+            }
+        # Call-level failure: every item in the batch gets its own copy, since
+        # callers attach per-post spans and network stats to each result
+        return {
+            index: self._call_failure(response, "eBay listing failed")
+            for index, _ in chunk
+        }
 
-            # Parse response
+    async def _create_ebay_listing(self, ad_data: AdData) -> PostResult:
+        """Create eBay listing using AddItem API call"""
+        try:
+            response = await self._call("AddItem", [self._build_item(ad_data)])
             return self._parse_add_item_response(response)
 
         except Exception as e:
             self.logger.error(f"Error creating eBay listing: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
-    def _build_xml_request(self, call_name: str, body_content: str = "") -> str:
-        """Build XML request with eBay API headers"""
-        xml = f"""<?xml version="1.0" encoding="utf-8"?>
-<{call_name}Request xmlns="urn:ebay:apis:eBLBaseComponents">
-  <RequesterCredentials>
-    <eBayAuthToken>{self.user_token}</eBayAuthToken>
-  </RequesterCredentials>
-  <Version>{self.api_version}</Version>
-  {body_content}
-</{call_name}Request>"""
-
-        return xml
-
-    def _build_add_item_request(self, ad_data: AdData) -> str:
-        """Build AddItem XML request for eBay listing"""
+    async def _call(
+        self, call_name: str, children: list[ET.Element] | None = None
+    ) -> EBayResponse:
+        """Make a Trading API call through the pooled client"""
+        return await self.api_client.call(call_name, self.api_credentials, children)
+
+    def _build_item(self, ad_data: AdData) -> ET.Element:
+        """Build the Item element for an AddItem(s) request"""
         # Get category ID
         category_id = self.category_mapping.get(ad_data.category.lower(), "99")
 
-        # Build item XML
-        item_xml = f"""
-        <Item>
-          <Title>{self._escape_xml(ad_data.title)}</Title>
-          <Description><![CDATA[{ad_data.description}]]></Description>
-          <PrimaryCategory>
-            <CategoryID>{category_id}</CategoryID>
-          </PrimaryCategory>
-          <StartPrice>{ad_data.price:.2f}</StartPrice>
-          <CategoryMappingAllowed>true</CategoryMappingAllowed>
-          <Country>US</Country>
-          <Currency>USD</Currency>
-          <DispatchTimeMax>3</DispatchTimeMax>
-          <ListingDuration>GTC</ListingDuration>
-          <ListingType>FixedPriceItem</ListingType>
-          <PaymentMethods>PayPal</PaymentMethods>
-          <PaymentMethods>VisaMC</PaymentMethods>
-          <PaymentMethods>AmEx</PaymentMethods>
-          <PostalCode>85001</PostalCode>
-          <Quantity>1</Quantity>
-          <ReturnPolicy>
-            <ReturnsAcceptedOption>ReturnsAccepted</ReturnsAcceptedOption>
-            <RefundOption>MoneyBack</RefundOption>
-            <ReturnsWithinOption>Days_30</ReturnsWithinOption>
-            <ShippingCostPaidByOption>Buyer</ShippingCostPaidByOption>
-          </ReturnPolicy>
-          <ShippingDetails>
-            <ShippingType>Flat</ShippingType>
-            <ShippingServiceOptions>
-              <ShippingServicePriority>1</ShippingServicePriority>
-              <ShippingService>USPSMedia</ShippingService>
-              <ShippingServiceCost>5.99</ShippingServiceCost>
-            </ShippingServiceOptions>
-          </ShippingDetails>
-          <Site>US</Site>
-        </Item>"""
-
-        return self._build_xml_request("AddItem", item_xml)
-
-    def _escape_xml(self, text: str) -> str:
-        """Escape XML special characters"""
-        if not text:
-            return ""
-
-        return (
-            text.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
+        item = ET.Element("Item")
+        sub_element(item, "Title", ad_data.title)
+        sub_element(item, "Description", ad_data.description)
+        sub_element(sub_element(item, "PrimaryCategory"), "CategoryID", category_id)
+        sub_element(item, "StartPrice", f"{ad_data.price:.2f}")
+        sub_element(item, "CategoryMappingAllowed", "true")
+        sub_element(item, "Country", "US")
+        sub_element(item, "Currency", "USD")
+        sub_element(item, "DispatchTimeMax", 3)
+        sub_element(item, "ListingDuration", "GTC")
+        sub_element(item, "ListingType", "FixedPriceItem")
+        for method in ("PayPal", "VisaMC", "AmEx"):
+            sub_element(item, "PaymentMethods", method)
+        sub_element(item, "PostalCode", "85001")
+        sub_element(item, "Quantity", 1)
+
+        returns = sub_element(item, "ReturnPolicy")
+        sub_element(returns, "ReturnsAcceptedOption", "ReturnsAccepted")
+        sub_element(returns, "RefundOption", "MoneyBack")
+        sub_element(returns, "ReturnsWithinOption", "Days_30")
+        sub_element(returns, "ShippingCostPaidByOption", "Buyer")
+
+        shipping = sub_element(item, "ShippingDetails")
+        sub_element(shipping, "ShippingType", "Flat")
+        service = sub_element(shipping, "ShippingServiceOptions")
+        sub_element(service, "ShippingServicePriority", 1)
+        sub_element(service, "ShippingService", "USPSMedia")
+        sub_element(service, "ShippingServiceCost", "5.99")
+        sub_element(item, "Site", "US")
+
+        return item
+
+    def _call_failure(self, response: EBayResponse, prefix: str) -> PostResult:
+        if response.throttled:
+            return PostResult(
+                status=PostStatus.RATE_LIMITED,
+                message=f"{prefix}: {response.error_message()}",
+                retry_after=60,
+            )
+        return PostResult(
+            status=PostStatus.FAILED,
+            message=f"{prefix}: {response.error_message() or 'Unknown eBay API error'}",
         )
 
-    async def _make_api_call(self, xml_request: str) -> dict[str, Any] | None:
-        """Make eBay API call"""
-        try:
-            # Ensure all header values are strings (httpx expects Mapping[str, str])
-            headers = {
-                "X-EBAY-API-COMPATIBILITY-LEVEL": str(self.api_version),
-                "X-EBAY-API-DEV-NAME": str(self.dev_id or ""),
-                "X-EBAY-API-APP-NAME": str(self.app_id or ""),
-                "X-EBAY-API-CERT-NAME": str(self.cert_id or ""),
-                "X-EBAY-API-SITEID": str(self.site_id),
-                "X-EBAY-API-CALL-NAME": str(self._extract_call_name(xml_request)),
-                "Content-Type": "text/xml",
-            }
-
-            # Make the async HTTP request using httpx
-            async with httpx.AsyncClient() as client:
-                # use `content=` to make the intent explicit for httpx and help stubs
-                response = await client.post(
-                    self.api_url,
-                    content=xml_request,
-                    headers=headers,
-                    timeout=30,
-                )
-
-            if response.status_code == 200:
-                return self._parse_xml_response(response.text)
-            self.logger.error(
-                f"eBay API error: {response.status_code} - {response.text}",
+    def _container_result(self, container: dict[str, Any], item_id: str) -> PostResult:
+        """Result for one item of a batch response"""
+        errors = [
+            e for e in container.get("Errors", []) if e.get("SeverityCode") != "Warning"
+        ]
+        if errors or (
+            not container.get("ItemID") and container.get("Ack") == "Failure"
+        ):
+            message = "; ".join(
+                e.get("LongMessage") or e.get("ShortMessage", "") for e in errors
             )
-            return None
-
-        except Exception as e:
-            self.logger.error(f"eBay API call failed: {e}")
-            return None
-
-    def _extract_call_name(self, xml_request: str) -> str:
-        """Extract API call name from XML request"""
-        try:
-            # Parse XML to get the root element name
-            root = ET.fromstring(xml_request)
-            call_name = root.tag.split("}")[-1]  # Remove namespace
-            return call_name.replace("Request", "")
-        except Exception:
-            return "AddItem"  # Default fallback
-
-    def _parse_xml_response(self, xml_text: str) -> dict[str, Any] | None:
-        """Parse eBay XML response to dictionary"""
-        try:
-            root = ET.fromstring(xml_text)
-
-            # Convert XML to dictionary (simplified)
-            result: dict[str, Any] = {}
-
-            for child in root:
-                tag = child.tag.split("}")[-1]  # Remove namespace
-                result[tag] = child.text or ""
-
-            return result
-
-        except Exception as e:
-            self.logger.error(f"Error parsing eBay XML response: {e}")
-            return None
+            return PostResult(
+                status=PostStatus.FAILED,
+                platform_ad_id=item_id or None,
+                message=f"eBay request failed: {message}",
+            )
+        return PostResult(
+            status=PostStatus.SUCCESS,
+            platform_ad_id=item_id,
+            post_url=f"https://www.ebay.com/itm/{item_id}" if item_id else None,
+        )
 
-    def _parse_add_item_response(self, response: dict[str, Any] | None) -> PostResult:
+    def _parse_add_item_response(self, response: EBayResponse | None) -> PostResult:
         """Parse AddItem API response"""
         try:
             if not response:
@@ -298,9 +352,8 @@ class EBayAutomation(PlatformAutomationBase):
                 )
 
             # Check for success
-            ack = response.get("Ack", "")
-            if ack in ["Success", "Warning"]:
-                item_id = response.get("ItemID", "")
+            if response.ok:
+                item_id = response.fields.get("ItemID", "")
                 listing_url = f"https://www.ebay.com/itm/{item_id}" if item_id else None
 
                 return PostResult(
@@ -310,18 +363,7 @@ class EBayAutomation(PlatformAutomationBase):
                     message=f"Successfully listed on eBay with ID: {item_id}",
                 )
 
-            # Handle errors
-            errors = response.get("Errors", "")
-            if errors:
-                return PostResult(
-                    status=PostStatus.FAILED,
-                    message=f"eBay listing failed: {errors}",
-                )
-
-            return PostResult(
-                status=PostStatus.FAILED,
-                message="Unknown eBay API error",
-            )
+            return self._call_failure(response, "eBay listing failed")
 
         except Exception as e:
             self.logger.error(f"Error parsing eBay response: {e}")
@@ -344,14 +386,11 @@ class EBayAutomation(PlatformAutomationBase):
     async def get_categories(self) -> list[dict[str, Any]] | None:
         """Get eBay categories using GetCategories API"""
         try:
-            xml_request = self._build_xml_request(
-                "GetCategories",
-                "<DetailLevel>ReturnAll</DetailLevel>",
-            )
+            detail = ET.Element("DetailLevel")
+            detail.text = "ReturnAll"
+            response = await self._call("GetCategories", [detail])
 
-            response = await self._make_api_call(xml_request)
-
-            if response:
+            if response and response.ok:
                 # Parse categories from response
                 # This is a simplified version - you'd need to parse the full XML
                 return [{"id": k, "name": v} for k, v in self.category_mapping.items()]
@@ -362,58 +401,156 @@ class EBayAutomation(PlatformAutomationBase):
             self.logger.error(f"Error getting eBay categories: {e}")
             return None
 
+    async def revise_listings(
+        self,
+        items: list[tuple[str, AdData]],
+        credentials: PlatformCredentials,
+    ) -> dict[str, PostResult]:
+        """Revise many listings through chunked ReviseItem calls"""
+        if not await self.login(credentials):
+            return {
+                item_id: PostResult(
+                    status=PostStatus.LOGIN_REQUIRED,
+                    message="Invalid eBay API credentials",
+                )
+                for item_id, _ in items
+            }
+        return await self.revise_items(items)
+
     async def revise_item(self, item_id: str, ad_data: AdData) -> PostResult:
         """Revise existing eBay item using ReviseItem API"""
+        results = await self.revise_items([(item_id, ad_data)])
+        return results[item_id]
+
+    async def revise_items(
+        self, items: list[tuple[str, AdData]]
+    ) -> dict[str, PostResult]:
+        """Revise many items, REVISE_CHUNK_SIZE concurrent ReviseItem calls at a time"""
+        results: dict[str, PostResult] = {}
+        for start in range(0, len(items), REVISE_CHUNK_SIZE):
+            chunk = items[start : start + REVISE_CHUNK_SIZE]
+            revised = await asyncio.gather(
+                *(self._revise(item_id, ad_data) for item_id, ad_data in chunk),
+            )
+            results.update(zip((item_id for item_id, _ in chunk), revised))
+        return results
+
+    async def _revise(self, item_id: str, ad_data: AdData) -> PostResult:
         try:
-            item_xml = f"""
-            <Item>
-              <ItemID>{item_id}</ItemID>
-              <Title>{self._escape_xml(ad_data.title)}</Title>
-              <Description><![CDATA[{ad_data.description}]]></Description>
-              <StartPrice>{ad_data.price:.2f}</StartPrice>
-            </Item>"""
-
-            xml_request = self._build_xml_request("ReviseItem", item_xml)
-            response = await self._make_api_call(xml_request)
-
-            if response and response.get("Ack") in ["Success", "Warning"]:
+            item = ET.Element("Item")
+            sub_element(item, "ItemID", item_id)
+            sub_element(item, "Title", ad_data.title)
+            sub_element(item, "Description", ad_data.description)
+            sub_element(item, "StartPrice", f"{ad_data.price:.2f}")
+
+            response = await self._call("ReviseItem", [item])
+
+            if response.ok:
                 return PostResult(
                     status=PostStatus.SUCCESS,
                     platform_ad_id=item_id,
                     message="Successfully revised eBay listing",
                 )
 
-            return PostResult(
-                status=PostStatus.FAILED,
-                message="Failed to revise eBay listing",
-            )
+            return self._call_failure(response, "Failed to revise eBay listing")
 
         except Exception as e:
             self.logger.error(f"Error revising eBay item: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
-    async def end_item(self, item_id: str, reason: str = "NotAvailable") -> PostResult:
-        """End eBay listing using EndItem API"""
-        try:
-            item_xml = f"""
-            <ItemID>{item_id}</ItemID>
-            <EndingReason>{reason}</EndingReason>"""
-
-            xml_request = self._build_xml_request("EndItem", item_xml)
-            response = await self._make_api_call(xml_request)
+    async def end_listing(
+        self,
+        platform_ad_id: str,
+        credentials: PlatformCredentials,
+    ) -> PostResult:
+        """End a listing (e.g. one replaced by a repost)"""
+        if not await self.login(credentials):
+            return PostResult(
+                status=PostStatus.LOGIN_REQUIRED,
+                message="Invalid eBay API credentials",
+            )
+        return await self.end_item(platform_ad_id)
 
-            if response and response.get("Ack") in ["Success", "Warning"]:
-                return PostResult(
-                    status=PostStatus.SUCCESS,
-                    platform_ad_id=item_id,
-                    message="Successfully ended eBay listing",
+    async def end_listings(
+        self,
+        platform_ad_ids: list[str],
+        credentials: PlatformCredentials,
+    ) -> dict[str, PostResult]:
+        """End many listings with batched EndItems calls"""
+        if not await self.login(credentials):
+            return {
+                item_id: PostResult(
+                    status=PostStatus.LOGIN_REQUIRED,
+                    message="Invalid eBay API credentials",
                 )
+                for item_id in platform_ad_ids
+            }
+        return await self.end_items(platform_ad_ids)
 
-            return PostResult(
-                status=PostStatus.FAILED,
-                message="Failed to end eBay listing",
-            )
+    async def end_item(self, item_id: str, reason: str = "NotAvailable") -> PostResult:
+        """End eBay listing using EndItem API"""
+        results = await self.end_items([item_id], reason)
+        return results[item_id]
 
+    async def end_items(
+        self,
+        item_ids: list[str],
+        reason: str = "NotAvailable",
+    ) -> dict[str, PostResult]:
+        """End many listings with batched EndItems calls"""
+        chunks = [
+            item_ids[i : i + END_ITEMS_BATCH_SIZE]
+            for i in range(0, len(item_ids), END_ITEMS_BATCH_SIZE)
+        ]
+        results: dict[str, PostResult] = {}
+        for chunk_results in await asyncio.gather(
+            *(self._end_items(c, reason) for c in chunks)
+        ):
+            results.update(chunk_results)
+        return results
+
+    async def _end_items(
+        self, item_ids: list[str], reason: str
+    ) -> dict[str, PostResult]:
+        containers = []
+        for item_id in item_ids:
+            container = ET.Element("EndItemRequestContainer")
+            sub_element(container, "MessageID", item_id)
+            sub_element(container, "ItemID", item_id)
+            sub_element(container, "EndingReason", reason)
+            containers.append(container)
+
+        try:
+            response = await self._call("EndItems", containers)
         except Exception as e:
-            self.logger.error(f"Error ending eBay item: {e}")
-            return PostResult(status=PostStatus.FAILED, message=str(e))
+            self.logger.error(f"Error ending eBay items: {e}")
+            return {
+                item_id: PostResult(status=PostStatus.FAILED, message=str(e))
+                for item_id in item_ids
+            }
+
+        if response.containers:
+            requested = set(item_ids)
+            results = {
+                c["CorrelationID"]: self._container_result(c, c["CorrelationID"])
+                for c in response.containers
+                if c.get("CorrelationID") in requested
+            }
+            for result in results.values():
+                if result.status == PostStatus.SUCCESS:
+                    result.message = "Successfully ended eBay listing"
+            # Items eBay did not answer for stay listed as far as we know
+            for item_id in item_ids:
+                results.setdefault(
+                    item_id,
+                    PostResult(
+                        status=PostStatus.FAILED,
+                        platform_ad_id=item_id,
+                        message="No response for item",
+                    ),
+                )
+            return results
+        return {
+            item_id: self._call_failure(response, "Failed to end eBay listing")
+            for item_id in item_ids
+        }
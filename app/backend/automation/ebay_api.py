@@ -0,0 +1,332 @@
+"""eBay Trading API client
+Pooled, rate-limited transport for the Trading API used by ``EBayAutomation``.
+
+One ``httpx.AsyncClient`` (keep-alive connection pool) is shared by every call
+instead of a client per request. Calls pass through an adaptive token bucket
+that speeds up while eBay accepts requests and backs off when it throttles.
+Responses are parsed incrementally as they stream in, keeping only the
+top-level fields, errors and per-item response containers.
+"""
+
+import asyncio
+import logging
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from services.metrics import track_call
+
+logger = logging.getLogger("automation.ebay.api")
+
+EBAY_NS = "urn:ebay:apis:eBLBaseComponents"
+
+# eBay error codes that mean the caller is being throttled
+THROTTLE_ERROR_CODES = {"518"}  # Call usage limit has been reached
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def sub_element(parent: ET.Element, tag: str, text: Any = None) -> ET.Element:
+    """Append a child element, setting its text when given"""
+    child = ET.SubElement(parent, tag)
+    if text is not None:
+        child.text = str(text)
+    return child
+
+
+@dataclass
+class EBayApiCredentials:
+    app_id: str | None
+    dev_id: str | None
+    cert_id: str | None
+    user_token: str | None
+    # OAuth user access token; sent instead of the Auth'n'Auth user_token
+    oauth_token: str | None = None
+
+
+@dataclass
+class EBayResponse:
+    """Parsed Trading API response
+
+    ``fields`` holds the text of each top-level element (empty for elements
+    with children), ``errors`` the top-level ``Errors`` and ``containers``
+    the per-item ``*ResponseContainer`` elements of batch calls.
+    """
+
+    ack: str = ""
+    fields: dict[str, str] = field(default_factory=dict)
+    errors: list[dict[str, str]] = field(default_factory=list)
+    containers: list[dict[str, Any]] = field(default_factory=list)
+    status_code: int = 200
+
+    @property
+    def ok(self) -> bool:
+        return self.ack in ("Success", "Warning")
+
+    @property
+    def throttled(self) -> bool:
+        if self.status_code in THROTTLE_STATUS_CODES:
+            return True
+        return any(e.get("ErrorCode") in THROTTLE_ERROR_CODES for e in self.errors)
+
+    def error_message(self) -> str:
+        return "; ".join(
+            e.get("LongMessage") or e.get("ShortMessage") or e.get("ErrorCode", "")
+            for e in self.errors
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Flat view of the top-level fields, with errors joined into ``Errors``"""
+        result = dict(self.fields)
+        if self.errors:
+            result["Errors"] = self.error_message()
+        return result
+
+
+def _flat(element: ET.Element) -> dict[str, str]:
+    return {_local(child.tag): (child.text or "").strip() for child in element}
+
+
+class ResponseParser:
+    """Incremental parser for Trading API responses
+
+    Feed body chunks as they arrive; each top-level element is converted and
+    discarded as soon as it closes, so large responses are never held as a
+    whole tree.
+    """
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._depth = 0
+        self._root: ET.Element | None = None
+        self.response = EBayResponse()
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> EBayResponse:
+        self._parser.close()
+        self._drain()
+        self.response.ack = self.response.fields.get("Ack", "")
+        return self.response
+
+    def _drain(self) -> None:
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._depth == 0:
+                    self._root = element
+                self._depth += 1
+                continue
+
+            self._depth -= 1
+            if self._depth != 1:
+                continue
+
+            tag = _local(element.tag)
+            if tag == "Errors":
+                self.response.errors.append(_flat(element))
+            elif tag.endswith("ResponseContainer"):
+                container: dict[str, Any] = {"Errors": []}
+                for child in element:
+                    if _local(child.tag) == "Errors":
+                        container["Errors"].append(_flat(child))
+                    else:
+                        container[_local(child.tag)] = (child.text or "").strip()
+                self.response.containers.append(container)
+            else:
+                self.response.fields[tag] = (element.text or "").strip()
+
+            # Drop the finished subtree
+            if self._root is not None:
+                self._root.remove(element)
+
+
+def parse_response(data: bytes, chunk_size: int = 65536) -> EBayResponse:
+    """Parse a complete response body"""
+    parser = ResponseParser()
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start : start + chunk_size])
+    return parser.close()
+
+
+class AdaptiveTokenBucket:
+    """Token bucket whose refill rate adapts to the server's feedback
+
+    The rate grows additively after each accepted call and is cut
+    multiplicatively when the API throttles (AIMD), so sustained throughput
+    settles just under eBay's limit instead of a fixed conservative rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 5,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a call may be made"""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0.0
+
+
+class EBayTradingClient:
+    """Persistent Trading API client shared by all eBay calls"""
+
+    def __init__(
+        self,
+        api_url: str,
+        api_version: str = "967",
+        site_id: str = "0",
+        rate_limiter: AdaptiveTokenBucket | None = None,
+        max_connections: int = 8,
+        timeout: float = 30,
+        max_retries: int = 3,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.api_url = api_url
+        self.api_version = api_version
+        self.site_id = site_id
+        self.rate_limiter = rate_limiter or AdaptiveTokenBucket()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        # Never more calls in flight than pooled connections
+        self._slots = asyncio.Semaphore(max_connections)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def build_request(
+        self,
+        call_name: str,
+        credentials: EBayApiCredentials,
+        children: list[ET.Element] | None = None,
+    ) -> bytes:
+        """Serialize a ``<call_name>Request`` document"""
+        root = ET.Element(f"{call_name}Request", xmlns=EBAY_NS)
+        if not credentials.oauth_token:
+            auth = sub_element(root, "RequesterCredentials")
+            sub_element(auth, "eBayAuthToken", credentials.user_token or "")
+        sub_element(root, "Version", self.api_version)
+        for child in children or []:
+            root.append(child)
+        return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+    def _headers(
+        self, call_name: str, credentials: EBayApiCredentials
+    ) -> dict[str, str]:
+        headers = {
+            "X-EBAY-API-COMPATIBILITY-LEVEL": str(self.api_version),
+            "X-EBAY-API-DEV-NAME": str(credentials.dev_id or ""),
+            "X-EBAY-API-APP-NAME": str(credentials.app_id or ""),
+            "X-EBAY-API-CERT-NAME": str(credentials.cert_id or ""),
+            "X-EBAY-API-SITEID": str(self.site_id),
+            "X-EBAY-API-CALL-NAME": call_name,
+            "Content-Type": "text/xml",
+        }
+        if credentials.oauth_token:
+            headers["X-EBAY-API-IAF-TOKEN"] = credentials.oauth_token
+        return headers
+
+    async def _send(
+        self, call_name: str, body: bytes, credentials: EBayApiCredentials
+    ) -> EBayResponse:
+        client = self._get_client()
+        async with self._slots:
+            async with client.stream(
+                "POST",
+                self.api_url,
+                content=body,
+                headers=self._headers(call_name, credentials),
+            ) as response:
+                if response.status_code != 200:
+                    text = (await response.aread()).decode("utf-8", "replace")
+                    return EBayResponse(
+                        ack="Failure",
+                        errors=[
+                            {
+                                "ShortMessage": f"HTTP {response.status_code}",
+                                "LongMessage": text[:500],
+                            }
+                        ],
+                        status_code=response.status_code,
+                    )
+                parser = ResponseParser()
+                async for chunk in response.aiter_bytes():
+                    parser.feed(chunk)
+                return parser.close()
+
+    async def call(
+        self,
+        call_name: str,
+        credentials: EBayApiCredentials,
+        children: list[ET.Element] | None = None,
+    ) -> EBayResponse:
+        """Make a Trading API call, retrying when eBay throttles it"""
+        body = self.build_request(call_name, credentials, children)
+        response = EBayResponse()
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            with track_call("ebay", call_name):
+                response = await self._send(call_name, body, credentials)
+            if not response.throttled:
+                self.rate_limiter.on_success()
+                return response
+            self.rate_limiter.on_throttle()
+            logger.warning(
+                f"eBay throttled {call_name} (attempt {attempt + 1}); "
+                f"rate now {self.rate_limiter.rate:.2f}/s",
+            )
+        return response
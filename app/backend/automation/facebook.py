@@ -17,6 +17,7 @@ from .base import (
     PostResult,
     PostStatus,
 )
+from .tracing import traced
 
 
 class FacebookMarketplaceAutomation(PlatformAutomationBase):
@@ -82,6 +83,7 @@ class FacebookMarketplaceAutomation(PlatformAutomationBase):
             f"Facebook automation timeouts: download={self.download_timeout}s, upload={self.upload_timeout}s",
         )
 
+    @traced()
     async def login(self, credentials: PlatformCredentials) -> bool:
         """Login to Facebook"""
         try:
@@ -143,6 +145,7 @@ class FacebookMarketplaceAutomation(PlatformAutomationBase):
             self.logger.error(f"Login failed: {e}")
             return False
 
+    @traced()
     async def _handle_2fa(self) -> bool:
         """Handle two-factor authentication"""
         try:
@@ -158,6 +161,7 @@ class FacebookMarketplaceAutomation(PlatformAutomationBase):
         except Exception:
             return True
 
+    @traced()
     async def _verify_marketplace_access(self) -> bool:
         """Verify we have access to Facebook Marketplace"""
         try:
@@ -215,6 +219,7 @@ class FacebookMarketplaceAutomation(PlatformAutomationBase):
             self.logger.error(f"Error posting ad: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _fill_listing_form(self, ad_data: AdData) -> PostResult:
         """Fill the Facebook Marketplace listing form"""
         try:
@@ -317,6 +322,7 @@ class FacebookMarketplaceAutomation(PlatformAutomationBase):
             self.logger.error(f"Error filling form: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _upload_images(self, image_urls: list[str]) -> bool:
         """Upload images to Facebook Marketplace"""
         if not image_urls:
@@ -0,0 +1,178 @@
+"""Humanization profiles for platform automations
+Controls how long an automation pauses around clicks and fills, and whether
+text is typed key by key or set in one ``fill``.
+
+Keystroke typing is slow (a 2,000-character description at 100 ms per key is
+over three minutes) and only matters where a page listens for key events:
+typeahead and location pickers, and the login forms of platforms that score
+how credentials are entered. Everything else is filled in one input event.
+
+Pauses are drawn from log-normal distributions clamped to a range, which
+resembles human reaction times better than a flat ``uniform`` and keeps the
+long tail bounded. Each platform has its own profile; when a platform starts
+rate limiting, ``Pacer`` stretches every pause and backs off again as posts
+succeed, so the delays follow the block rate actually observed.
+
+Set ``AUTOMATION_HUMANIZATION`` to a profile name (``legacy``, ``fast``, or a
+platform) to use that profile for every platform, e.g. to compare post
+durations with ``scripts/benchmark_humanization.py``.
+"""
+
+import math
+import os
+import random
+from dataclasses import dataclass, field
+
+# Actions a profile defines pauses for
+BEFORE_CLICK = "before_click"
+AFTER_CLICK = "after_click"
+BEFORE_FILL = "before_fill"
+AFTER_CLEAR = "after_clear"  # between clearing a field and typing into it
+AFTER_FILL = "after_fill"
+
+
+@dataclass(frozen=True)
+class Pause:
+    """A random delay in seconds
+
+    Uniform over ``[low, high]`` when no median is given, otherwise log-normal
+    around the median and clamped to the range.
+    """
+
+    low: float
+    high: float
+    median: float | None = None
+    sigma: float = 0.4
+
+    def sample(self, rng: random.Random | None = None) -> float:
+        source = rng if rng is not None else random
+        if self.median is None:
+            return source.uniform(self.low, self.high)
+        value = source.lognormvariate(math.log(self.median), self.sigma)
+        return min(max(value, self.low), self.high)
+
+
+NO_PAUSE = Pause(0.0, 0.0)
+
+
+@dataclass(frozen=True)
+class HumanizationProfile:
+    """Pauses and typing behaviour for one platform"""
+
+    name: str
+    pauses: dict[str, Pause] = field(default_factory=dict)
+    # Multiplier for the explicit ``random_delay`` waits in platform flows
+    delay_scale: float = 1.0
+    # Per-character delay (seconds) when text is typed
+    keystroke: Pause = Pause(0.04, 0.16, median=0.08, sigma=0.3)
+    # Selector fragments of fields that need real key events
+    keystroke_fields: tuple[str, ...] = ()
+    # Longer text is always filled; None types every field (legacy behaviour)
+    max_typed_chars: int | None = 64
+
+    def pause(self, action: str, rng: random.Random | None = None) -> float:
+        return self.pauses.get(action, NO_PAUSE).sample(rng)
+
+    def keystroke_delay_ms(self, rng: random.Random | None = None) -> int:
+        return round(self.keystroke.sample(rng) * 1000)
+
+    def should_type(self, selector: str, text: str) -> bool:
+        """Whether to type text key by key instead of filling it"""
+        if self.max_typed_chars is None:
+            return True
+        if len(text) > self.max_typed_chars:
+            return False
+        selector = selector.lower()
+        return any(fragment in selector for fragment in self.keystroke_fields)
+
+
+# Pauses shared by the platform profiles; shorter and tighter than the legacy
+# flat ranges, which spent 1.5-3.5 s on every click
+_DEFAULT_PAUSES = {
+    BEFORE_CLICK: Pause(0.15, 1.2, median=0.4),
+    AFTER_CLICK: Pause(0.2, 1.5, median=0.6),
+    BEFORE_FILL: Pause(0.1, 0.8, median=0.3),
+    AFTER_CLEAR: Pause(0.05, 0.4, median=0.15),
+    AFTER_FILL: Pause(0.1, 0.8, median=0.3),
+}
+
+# Typeahead inputs only resolve suggestions on key events
+_TYPEAHEAD_FIELDS = ("location", "zip", "postal")
+
+PROFILES: dict[str, HumanizationProfile] = {
+    # Plain HTML forms without behavioural scoring
+    "craigslist": HumanizationProfile(
+        name="craigslist",
+        pauses=_DEFAULT_PAUSES,
+        delay_scale=0.5,
+        keystroke_fields=_TYPEAHEAD_FIELDS,
+    ),
+    # Scores login keystrokes and is the quickest to checkpoint accounts
+    "facebook": HumanizationProfile(
+        name="facebook",
+        pauses={
+            **_DEFAULT_PAUSES,
+            BEFORE_CLICK: Pause(0.3, 1.8, median=0.7),
+            AFTER_CLICK: Pause(0.4, 2.0, median=0.9),
+        },
+        keystroke_fields=_TYPEAHEAD_FIELDS + ("#email", "#pass"),
+    ),
+    "offerup": HumanizationProfile(
+        name="offerup",
+        pauses=_DEFAULT_PAUSES,
+        delay_scale=0.75,
+        keystroke_fields=_TYPEAHEAD_FIELDS,
+    ),
+    # The fixed delays used before profiles existed, for comparison
+    "legacy": HumanizationProfile(
+        name="legacy",
+        pauses={
+            BEFORE_CLICK: Pause(0.5, 1.5),
+            AFTER_CLICK: Pause(1.0, 2.0),
+            BEFORE_FILL: Pause(0.5, 1.5),
+            AFTER_CLEAR: Pause(0.3, 0.8),
+            AFTER_FILL: Pause(0.5, 1.0),
+        },
+        keystroke=Pause(0.05, 0.15),
+        max_typed_chars=None,
+    ),
+    # No pauses and no typing; for local test harnesses only
+    "fast": HumanizationProfile(name="fast", delay_scale=0.0, max_typed_chars=0),
+}
+
+
+def humanization_for(platform: str) -> HumanizationProfile:
+    """Profile for a platform, or the one forced by AUTOMATION_HUMANIZATION"""
+    forced = os.environ.get("AUTOMATION_HUMANIZATION", "").strip().lower()
+    if forced in PROFILES:
+        return PROFILES[forced]
+    return PROFILES.get(
+        platform,
+        HumanizationProfile(
+            name=platform,
+            pauses=_DEFAULT_PAUSES,
+            keystroke_fields=_TYPEAHEAD_FIELDS,
+        ),
+    )
+
+
+class Pacer:
+    """Stretches pauses while a platform is rate limiting
+
+    Each rate limit multiplies the pace by ``backoff`` (up to ``max_pace``);
+    each success moves it back towards 1 by ``recovery``.
+    """
+
+    def __init__(
+        self, backoff: float = 1.5, recovery: float = 0.8, max_pace: float = 4.0
+    ):
+        self.backoff = backoff
+        self.recovery = recovery
+        self.max_pace = max_pace
+        self.pace = 1.0
+
+    def blocked(self) -> None:
+        self.pace = min(self.pace * self.backoff, self.max_pace)
+
+    def succeeded(self) -> None:
+        self.pace = max(1.0, self.pace * self.recovery)
@@ -0,0 +1,245 @@
+"""Request interception for automation browser contexts
+Marketplace pages pull in far more than the posting flow needs: analytics and
+ad scripts, tracking pixels, fonts, video and product imagery. Each platform
+has an ``InterceptionProfile`` that is installed on the browser context with
+``context.route``; requests it does not need are aborted (or, for scripts the
+page expects to load, answered with an empty stub) before they reach the
+network.
+
+Rules are applied in order:
+
+1. hosts on the profile's allow-list (CAPTCHA providers, upload endpoints)
+   always load;
+2. blocked resource types (image, media, font) are aborted;
+3. stubbed hosts get an empty 200 response;
+4. blocked hosts are aborted;
+5. everything else loads.
+
+Aborted requests never report a size, so bytes saved are estimated from
+typical sizes per resource type. Set ``AUTOMATION_BLOCK_RESOURCES=false`` to
+load pages unfiltered (for comparison or when a flow breaks).
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+from services.metrics import (
+    AUTOMATION_BYTES_LOADED,
+    AUTOMATION_BYTES_SAVED,
+    AUTOMATION_INTERCEPTED_REQUESTS,
+)
+
+ALLOW = "allow"
+BLOCK = "block"
+STUB = "stub"
+
+# Typical transfer size per blocked resource type, used to estimate savings
+TYPICAL_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 35_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "ping": 500,
+    "beacon": 500,
+    "other": 5_000,
+}
+
+# CAPTCHA challenges must always render, including their images
+CAPTCHA_HOSTS = (
+    "google.com/recaptcha",
+    "gstatic.com/recaptcha",
+    "recaptcha.net",
+    "hcaptcha.com",
+    "arkoselabs.com",
+    "funcaptcha.com",
+)
+
+# Analytics, ads and session-replay services no posting flow depends on
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "fullstory.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "branch.io",
+    "braze.com",
+    "bugsnag.com",
+    "sentry.io",
+    "newrelic.com",
+    "nr-data.net",
+    "optimizely.com",
+    "bat.bing.com",
+    "ads-twitter.com",
+    "analytics.tiktok.com",
+    "snapchat.com",
+)
+
+# Tag managers whose absence makes page scripts throw; answered with a stub
+TAG_MANAGER_HOSTS = (
+    "googletagmanager.com",
+    "connect.facebook.net/en_US/fbevents.js",
+    "static.ads-twitter.com",
+)
+
+
+@dataclass(frozen=True)
+class InterceptionProfile:
+    """Which requests a platform's posting flow can do without"""
+
+    platform: str
+    block_types: frozenset[str] = frozenset({"image", "media", "font"})
+    block_hosts: tuple[str, ...] = TRACKER_HOSTS
+    stub_hosts: tuple[str, ...] = TAG_MANAGER_HOSTS
+    allow_hosts: tuple[str, ...] = CAPTCHA_HOSTS
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """ALLOW, BLOCK or STUB for a request"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return ALLOW
+        host, path = parts.hostname or "", parts.path
+        if _matches(host, path, self.allow_hosts):
+            return ALLOW
+        if resource_type in self.block_types:
+            return BLOCK
+        if _matches(host, path, self.stub_hosts):
+            return STUB
+        if _matches(host, path, self.block_hosts):
+            return BLOCK
+        return ALLOW
+
+
+def _matches(host: str, path: str, patterns: tuple[str, ...]) -> bool:
+    """Whether a request is on (a subdomain of) a host, under an optional path"""
+    for pattern in patterns:
+        pattern_host, slash, pattern_path = pattern.partition("/")
+        if host != pattern_host and not host.endswith(f".{pattern_host}"):
+            continue
+        prefix = f"/{pattern_path}".rstrip("/")
+        if not slash or path == prefix or path.startswith(f"{prefix}/"):
+            return True
+    return False
+
+
+PROFILES: dict[str, InterceptionProfile] = {
+    "craigslist": InterceptionProfile(platform="craigslist"),
+    # Facebook's own pixel is the tracker there; its CDN serves the app itself
+    "facebook": InterceptionProfile(
+        platform="facebook",
+        block_hosts=TRACKER_HOSTS + ("facebook.com/tr",),
+    ),
+    "offerup": InterceptionProfile(platform="offerup"),
+}
+
+
+def profile_for(platform: str) -> InterceptionProfile | None:
+    """Interception profile for a platform, or None when blocking is disabled"""
+    enabled = os.environ.get("AUTOMATION_BLOCK_RESOURCES", "true").lower()
+    if enabled not in ("true", "1", "yes"):
+        return None
+    return PROFILES.get(platform, InterceptionProfile(platform=platform))
+
+
+@dataclass
+class NetworkStats:
+    """Request counts and transfer sizes seen by one browser context"""
+
+    requests: int = 0
+    blocked: int = 0
+    stubbed: int = 0
+    bytes_loaded: int = 0
+    bytes_saved_estimate: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "stubbed": self.stubbed,
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+
+class RequestInterceptor:
+    """Applies an interception profile to a Playwright browser context
+
+    Without a profile nothing is intercepted, but loaded bytes are still
+    counted so runs with and without blocking can be compared.
+    """
+
+    def __init__(self, platform: str, profile: InterceptionProfile | None):
+        self.platform = platform
+        self.profile = profile
+        self.stats = NetworkStats()
+
+    async def install(self, context: Any) -> None:
+        if self.profile is not None:
+            await context.route("**/*", self.handle)
+        context.on("response", self.on_response)
+
+    async def handle(self, route: Any) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        self.stats.requests += 1
+        action = (
+            self.profile.decide(request.url, resource_type) if self.profile else ALLOW
+        )
+        if action == ALLOW:
+            await route.continue_()
+            return
+
+        saved = TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES["other"])
+        self.stats.bytes_saved_estimate += saved
+        AUTOMATION_BYTES_SAVED.labels(platform=self.platform).inc(saved)
+        AUTOMATION_INTERCEPTED_REQUESTS.labels(
+            platform=self.platform,
+            resource_type=resource_type,
+            action=action,
+        ).inc()
+        if action == STUB:
+            self.stats.stubbed += 1
+            await route.fulfill(
+                status=200,
+                body="",
+                content_type=(
+                    "application/javascript" if resource_type == "script" else None
+                ),
+            )
+            return
+
+        self.stats.blocked += 1
+        self.stats.blocked_by_type[resource_type] = (
+            self.stats.blocked_by_type.get(resource_type, 0) + 1
+        )
+        await route.abort("blockedbyclient")
+
+    def on_response(self, response: Any) -> None:
+        # Content-Length only: chunked responses are not counted
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            return
+        self.stats.bytes_loaded += size
+        AUTOMATION_BYTES_LOADED.labels(platform=self.platform).inc(size)
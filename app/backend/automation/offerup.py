@@ -11,6 +11,7 @@ from .base import (
     PostResult,
     PostStatus,
 )
+from .tracing import traced
 
 
 class OfferUpAutomation(PlatformAutomationBase):
@@ -36,6 +37,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             "other": "everything-else",
         }
 
+    @traced()
     async def login(self, credentials: PlatformCredentials) -> bool:
         """Login to OfferUp"""
         try:
@@ -184,6 +186,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             self.logger.error(f"Error posting ad: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _fill_listing_form(self, ad_data: AdData) -> PostResult:
         """Fill the OfferUp listing form"""
         try:
@@ -275,6 +278,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             self.logger.error(f"Error filling form: {e}")
             return PostResult(status=PostStatus.FAILED, message=str(e))
 
+    @traced()
     async def _select_category(self, category: str) -> bool:
         """Select category for OfferUp listing"""
         try:
@@ -320,6 +324,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             self.logger.error(f"Error selecting category: {e}")
             return False
 
+    @traced()
     async def _set_location(self, location: str) -> bool:
         """Set location for OfferUp listing"""
         try:
@@ -358,6 +363,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             self.logger.error(f"Error setting location: {e}")
             return False
 
+    @traced()
     async def _upload_images(self, image_urls: list[str]) -> bool:
         """Upload images to OfferUp listing"""
         try:
@@ -384,6 +390,7 @@ class OfferUpAutomation(PlatformAutomationBase):
             self.logger.error(f"Image upload failed: {e}")
             return False
 
+    @traced()
     async def _submit_listing(self) -> PostResult:
         """Submit the OfferUp listing"""
         try:
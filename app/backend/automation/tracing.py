@@ -0,0 +1,164 @@
+"""Step-level tracing for platform automations
+Breaks a post down into nested, timed spans (browser start, login, form
+filling, each click, fill and delay) so a slow or failed post shows where its
+time went.
+
+``AutomationManager`` opens a root span per post with ``trace_post``; methods
+decorated with ``@traced`` open child spans under whatever span is current
+(tracked in a context variable, so concurrent posts never share a tree). The
+finished tree is attached to ``PostResult.spans``. Every span, traced post or
+not, is also observed in the per-platform, per-step histogram on /metrics.
+"""
+
+import functools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from services.metrics import AUTOMATION_STEP_DURATION
+
+# Spans kept per post; deeper loops keep feeding the histogram only
+MAX_SPANS = 500
+# Longest detail (URL or selector) recorded on a span
+MAX_DETAIL_LENGTH = 200
+
+OUTCOME_OK = "ok"
+OUTCOME_FAILED = "failed"  # the step returned False or a non-success result
+OUTCOME_ERROR = "error"  # the step raised
+
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    """One timed step of an automation flow"""
+
+    name: str
+    started: float  # time.perf_counter() at start
+    offset_ms: float  # start relative to the root span
+    detail: str | None = None
+    duration_ms: float | None = None
+    outcome: str = OUTCOME_OK
+    error: str | None = None
+    children: list["Span"] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "offset_ms": self.offset_ms,
+            "duration_ms": self.duration_ms,
+            "outcome": self.outcome,
+        }
+        if self.detail:
+            data["detail"] = self.detail
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+class _Trace:
+    """Span tree of one post"""
+
+    def __init__(self, root: Span):
+        self.root = root
+        self.span_count = 1
+
+
+_current_span: ContextVar[Span | None] = ContextVar("automation_span", default=None)
+_current_trace: ContextVar[_Trace | None] = ContextVar("automation_trace", default=None)
+
+
+def outcome_of(result: Any) -> str:
+    """Outcome of a step judged from its return value"""
+    if result is False:
+        return OUTCOME_FAILED
+    status = getattr(result, "status", None)
+    value = getattr(status, "value", None)
+    if isinstance(value, str) and value != "success":
+        return OUTCOME_FAILED
+    return OUTCOME_OK
+
+
+@contextmanager
+def span(platform: str, name: str, detail: str | None = None) -> Iterator[Span]:
+    """Time a step, nested under the current span when a post is traced"""
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    started = time.perf_counter()
+    current = Span(
+        name=name,
+        started=started,
+        offset_ms=(round((started - trace.root.started) * 1000, 1) if trace else 0.0),
+        detail=detail[:MAX_DETAIL_LENGTH] if detail else None,
+    )
+    if trace is not None and parent is not None and trace.span_count < MAX_SPANS:
+        parent.children.append(current)
+        trace.span_count += 1
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = OUTCOME_ERROR
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        elapsed = time.perf_counter() - started
+        current.duration_ms = round(elapsed * 1000, 1)
+        AUTOMATION_STEP_DURATION.labels(
+            platform=platform, step=name, outcome=current.outcome
+        ).observe(elapsed)
+
+
+@contextmanager
+def trace_post(platform: str) -> Iterator[Span]:
+    """Root span collecting the step tree of one post"""
+    started = time.perf_counter()
+    root = Span(name="post", started=started, offset_ms=0.0)
+    trace_token = _current_trace.set(_Trace(root))
+    span_token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.outcome = OUTCOME_ERROR
+        root.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        elapsed = time.perf_counter() - started
+        root.duration_ms = round(elapsed * 1000, 1)
+        AUTOMATION_STEP_DURATION.labels(
+            platform=platform, step="post", outcome=root.outcome
+        ).observe(elapsed)
+
+
+def traced(
+    step: str | None = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Trace an async ``PlatformAutomationBase`` method as a step
+
+    The step is named after the method (without leading underscores) unless
+    given. A string first argument (URL or selector) is recorded as the span
+    detail; False or a non-success ``PostResult`` marks the step failed.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        name = step or fn.__name__.lstrip("_")
+
+        @functools.wraps(fn)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+            detail = args[0] if args and isinstance(args[0], str) else None
+            with span(self.platform_name, name, detail) as current:
+                result = await fn(self, *args, **kwargs)
+                current.outcome = outcome_of(result)
+                return result
+
+        return wrapper
+
+    return decorator
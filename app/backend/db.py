@@ -14,3 +14,40 @@ def get_db() -> SupabaseDB:
 
 def get_typed_db() -> SupabaseDB:  # type: ignore[override]
     return get_db()
+
+
+# Background services (token refresh, outbox replication, ad renewal) work on
+# MongoDB collections, which the stub above does not provide
+_mongo_client = None
+
+
+def get_mongo_db():
+    """Motor database for MONGO_URL / DB_NAME, or None when MONGO_URL is not set"""
+    global _mongo_client
+    import os
+
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        return None
+    if _mongo_client is None:
+        import certifi
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client_opts = {}
+        if "mongodb+srv" in mongo_url:
+            client_opts.update({"tls": True, "tlsCAFile": certifi.where()})
+        _mongo_client = AsyncIOMotorClient(mongo_url, **client_opts)
+
+    from services.metrics import instrument_motor_database
+
+    return instrument_motor_database(
+        _mongo_client[os.environ.get("DB_NAME", "crosspostme")]
+    )
+
+
+def close_mongo_db() -> None:
+    """Close the client opened by get_mongo_db"""
+    global _mongo_client
+    if _mongo_client is not None:
+        _mongo_client.close()
+        _mongo_client = None
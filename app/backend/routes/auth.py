@@ -3,6 +3,7 @@ import logging
 import os
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import Literal
 
 import jwt
 import pymongo.errors
@@ -20,10 +21,19 @@ from auth import (
     get_password_hash,
     verify_password,
 )
-from db import get_typed_db
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from db import get_mongo_db, get_typed_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from jwt import PyJWTError as JWTError
-from models import EnhancedSignupRequest
+from models import Ad, EnhancedSignupRequest, IncomingMessage, Lead
+from services.export import (
+    FORMAT_NDJSON,
+    mongo_cursor_rows,
+    streaming_export,
+    supabase_keyset_rows,
+)
+from services.pagination import sort_spec
+from services.user_search import user_search_fields
 from supabase_db import db as supabase_db
 
 # Configure logger for authentication events
@@ -54,6 +64,31 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 db = get_typed_db()
 
+# Supabase listings columns included in an ads export
+LISTING_EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "price",
+    "category",
+    "condition",
+    "location",
+    "images",
+    "status",
+    "platforms",
+    "created_at",
+    "updated_at",
+    "published_at",
+    "sold_at",
+)
+
+# MongoDB collection, export fields and sort key per dataset
+MONGO_EXPORTS = {
+    "ads": ("ads", tuple(Ad.model_fields), "created_at"),
+    "messages": ("messages", tuple(IncomingMessage.model_fields), "received_at"),
+    "leads": ("leads", tuple(Lead.model_fields), "created_at"),
+}
+
 # Cookie configuration - can be overridden based on environment
 COOKIE_SECURE = True  # Set to False for local development without HTTPS
 
@@ -208,6 +243,7 @@ async def register(request: Request, user_data: UserCreate):
                         "created_at": datetime.now(timezone.utc).isoformat(),
                         "updated_at": datetime.now(timezone.utc).isoformat(),
                         "supabase_id": user_id,  # Track Supabase ID
+                        **user_search_fields(user_data.username, user_data.email),
                     }
                     await db.users.insert_one(mongo_doc)
                     logger.info(
@@ -266,6 +302,7 @@ async def register(request: Request, user_data: UserCreate):
             "is_active": True,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat(),
+            **user_search_fields(user_data.username, user_data.email),
         }
 
         try:
@@ -671,6 +708,45 @@ async def get_current_user_info(
     )
 
 
+@router.get("/me/export")
+async def export_my_data(
+    dataset: Literal["ads", "messages", "leads"] = Query(...),
+    format: Literal["ndjson", "csv"] = Query(FORMAT_NDJSON),
+    gzip: bool = Query(False, description="Compress the download with gzip"),
+    current_user=Depends(get_current_user_with_fallback),
+) -> StreamingResponse:
+    """Download all of the current user's ads, messages or leads.
+
+    Rows are read a page at a time and streamed as NDJSON or CSV instead of
+    being loaded into memory. Ads come from Supabase listings when enabled;
+    messages and leads only exist in MongoDB.
+    """
+    _, current_user_id = current_user
+
+    if dataset == "ads" and USE_SUPABASE:
+        # --- SUPABASE PATH (PRIMARY) ---
+        fields = LISTING_EXPORT_FIELDS
+        rows = supabase_keyset_rows(
+            supabase_db.require_client(),
+            "listings",
+            columns=",".join(fields),
+            filters=lambda query: query.eq("user_id", current_user_id),
+            order_column="created_at",
+        )
+    else:
+        # --- MONGODB PATH ---
+        collection, fields, sort_field = MONGO_EXPORTS[dataset]
+        mongo_db = get_mongo_db()
+        rows = mongo_cursor_rows(
+            (mongo_db if mongo_db is not None else db)[collection],
+            {"user_id": current_user_id},
+            sort=sort_spec(sort_field, descending=False),
+        )
+
+    logger.info(f"Streaming {dataset} export for user {current_user_id}")
+    return streaming_export(rows, dataset, fmt=format, fields=fields, gzip=gzip)
+
+
 @router.post("/demo-login")
 async def demo_login(request: Request, response: Response):
     """Create a demo user session for development/testing.
@@ -854,6 +930,7 @@ async def enhanced_signup(
                     "created_at": datetime.now(timezone.utc).isoformat(),
                     "updated_at": datetime.now(timezone.utc).isoformat(),
                     "supabase_id": user_id,
+                    **user_search_fields(username, signup_data.email),
                 }
                 await db.users.insert_one(mongo_user_doc)
 
@@ -894,6 +971,7 @@ async def enhanced_signup(
             "is_active": True,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat(),
+            **user_search_fields(username, signup_data.email),
         }
 
         try:
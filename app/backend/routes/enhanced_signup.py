@@ -4,13 +4,20 @@ This creates a valuable data asset for future monetization and market insights
 """
 
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional
 
-from auth import create_access_token, get_password_hash
+from auth import create_access_token, get_current_user_with_fallback, get_password_hash
 from db import get_typed_db
+from services.export import (
+    FORMAT_NDJSON,
+    mongo_cursor_rows,
+    streaming_export,
+    supabase_keyset_rows,
+)
 from supabase_db import db as supabase_db
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
 
 logger = logging.getLogger(__name__)
@@ -21,6 +28,22 @@ db = get_typed_db()  # MongoDB (keep for parallel operation)
 USE_SUPABASE = True  # Set to True to enable Supabase
 PARALLEL_WRITE = True  # Write to both MongoDB and Supabase during migration
 
+# Events included inline in a /data-export response; /data-export/stream has all
+EXPORT_SAMPLE_SIZE = 100
+
+EXPORT_FIELDS = ("event_type", "event_data", "timestamp", "created_at")
+
+
+async def require_admin(current_user=Depends(get_current_user_with_fallback)) -> str:
+    """Allow only admins through; returns the admin's user id"""
+    user_data, user_id = current_user
+    if not (user_data and user_data.is_admin):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user_id
+
 
 class EnhancedSignupRequest(BaseModel):
     """Enhanced signup model that collects valuable business data"""
@@ -323,14 +346,36 @@ async def enhanced_signup(request: EnhancedSignupRequest) -> Dict:
         )
 
 
+def _ranked(counts: Dict[str, int]) -> List[Dict]:
+    """Shape precomputed counts like the MongoDB $group results"""
+    return [{"_id": key, "count": count} for key, count in counts.items()]
+
+
 @router.get("/business-insights")
-async def get_business_insights() -> Dict:
+async def get_business_insights(_admin: str = Depends(require_admin)) -> Dict:
     """
-    Analytics endpoint to view aggregated business intelligence data.
+    Analytics endpoint to view aggregated business intelligence data (admin only).
     This data is GOLD for investors, partners, and product decisions.
+
+    With Supabase the breakdowns come from the analytics materialized views,
+    so a request reads precomputed rows; "views" reports how stale they are.
     """
 
     try:
+        if USE_SUPABASE:
+            return {
+                "total_users": supabase_db.count_users(),
+                "industries": [
+                    {"_id": row["industry"], "count": row["user_count"]}
+                    for row in supabase_db.get_industry_stats()
+                ],
+                "revenue_ranges": _ranked(supabase_db.get_revenue_breakdown()),
+                "marketplace_usage": _ranked(supabase_db.get_marketplace_usage()),
+                "top_challenges": _ranked(supabase_db.get_challenge_breakdown()),
+                "views": supabase_db.get_analytics_staleness(),
+                "generated_at": datetime.utcnow().isoformat(),
+            }
+
         # Aggregate data from all users
         total_users = db["users"].count_documents({})
 
@@ -392,27 +437,51 @@ async def get_business_insights() -> Dict:
 
 
 @router.get("/data-export")
-async def export_business_data() -> Dict:
+async def export_business_data(
+    days: int = Query(30, ge=1, le=366, description="Export events from the last N days"),
+    _admin: str = Depends(require_admin),
+) -> Dict:
     """
-    Export anonymized business intelligence data.
+    Export anonymized business intelligence data (admin only).
     This endpoint can be used to:
     1. Share market insights with partners
     2. Create investor presentations
     3. Sell anonymized data to market research firms
     4. Generate industry reports
+
+    Events are bounded by timestamp so only the monthly partitions in range
+    are read.
     """
+    until = datetime.utcnow()
+    since = until - timedelta(days=days)
+    window = {"$gte": since.isoformat(), "$lt": until.isoformat()}
 
     try:
-        # Export anonymized aggregate data
-        all_data = list(db["business_intelligence"].find(
-            {},
-            {"_id": 0, "user_id": 0}  # Remove identifying info
-        ))
+        # Export anonymized aggregate data; count server-side, only fetch a sample
+        if USE_SUPABASE:
+            data_points = supabase_db.count_events(since=since, until=until)
+            events = supabase_db.get_events(
+                since=since, until=until, limit=EXPORT_SAMPLE_SIZE
+            )
+            sample = [
+                {k: v for k, v in event.items() if k not in ("id", "user_id")}
+                for event in events
+            ]
+        else:
+            data_points = await db["business_intelligence"].count_documents(
+                {"timestamp": window}
+            )
+            sample = await db["business_intelligence"].find(
+                {"timestamp": window},
+                {"_id": 0, "user_id": 0}  # Remove identifying info
+            ).limit(EXPORT_SAMPLE_SIZE).to_list(EXPORT_SAMPLE_SIZE)
 
         return {
-            "data_points": len(all_data),
-            "data": all_data[:100],  # Limit to 100 for demo
-            "export_date": datetime.utcnow().isoformat(),
+            "data_points": data_points,
+            "data": sample,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "export_date": until.isoformat(),
             "note": "This is anonymized aggregate data safe for sharing"
         }
 
@@ -422,3 +491,53 @@ async def export_business_data() -> Dict:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Export failed"
         )
+
+
+@router.get("/data-export/stream")
+async def stream_business_data(
+    days: int = Query(30, ge=1, le=366, description="Export events from the last N days"),
+    format: Literal["ndjson", "csv"] = Query(FORMAT_NDJSON),
+    gzip: bool = Query(False, description="Compress the download with gzip"),
+    _admin: str = Depends(require_admin),
+) -> StreamingResponse:
+    """
+    Download every anonymized business intelligence event of the window (admin only).
+    Events are read a page at a time and streamed as NDJSON or CSV, so the
+    export size is not bounded by worker memory.
+
+    Pages follow the (id, timestamp) primary key inside the monthly
+    partitions of the window, so each page is an index range read.
+    """
+    until = datetime.utcnow()
+    since = until - timedelta(days=days)
+
+    if USE_SUPABASE:
+        rows = supabase_keyset_rows(
+            supabase_db.require_client(),
+            "business_intelligence",
+            columns="id," + ",".join(EXPORT_FIELDS),
+            filters=lambda query: query.gte("timestamp", since.isoformat()).lt(
+                "timestamp", until.isoformat()
+            ),
+            order_column="id",
+        )
+    else:
+        rows = mongo_cursor_rows(
+            db["business_intelligence"],
+            {"timestamp": {"$gte": since.isoformat(), "$lt": until.isoformat()}},
+            sort=[("timestamp", 1)],
+            projection={field: 1 for field in EXPORT_FIELDS},
+        )
+
+    async def anonymized():
+        # Remove identifying info
+        async for row in rows:
+            yield {field: row.get(field) for field in EXPORT_FIELDS}
+
+    return streaming_export(
+        anonymized(),
+        f"business-data-{days}d",
+        fmt=format,
+        fields=EXPORT_FIELDS,
+        gzip=gzip,
+    )
@@ -15,6 +15,7 @@ from auth import get_current_user
 from db import get_typed_db
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
+from services.metrics import track_call
 
 logger = logging.getLogger(__name__)
 
@@ -181,12 +182,13 @@ Requirements:
 Return ONLY the optimized title, nothing else."""
 
     try:
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100,
-            temperature=0.7,
-        )
+        with track_call("openai", "chat.completions"):
+            response = await openai.ChatCompletion.acreate(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=100,
+                temperature=0.7,
+            )
 
         generated_title = str(response.choices[0].message.content).strip()
         return str(generated_title[: platform_config.title_max_length])
@@ -235,12 +237,13 @@ Requirements:
 Return ONLY the description, nothing else."""
 
     try:
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.8,
-        )
+        with track_call("openai", "chat.completions"):
+            response = await openai.ChatCompletion.acreate(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=500,
+                temperature=0.8,
+            )
 
         generated_desc = str(response.choices[0].message.content).strip()
         return str(generated_desc[: platform_config.description_max_length])
@@ -277,12 +280,13 @@ Requirements:
 Return ONLY the tags, nothing else."""
 
     try:
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,
-            temperature=0.6,
-        )
+        with track_call("openai", "chat.completions"):
+            response = await openai.ChatCompletion.acreate(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=150,
+                temperature=0.6,
+            )
 
         tags_text = response.choices[0].message.content.strip()
         tags = [tag.strip() for tag in tags_text.split(",")]
@@ -499,12 +503,13 @@ Provide:
 Format as JSON."""
 
     try:
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.5,
-        )
+        with track_call("openai", "chat.completions"):
+            response = await openai.ChatCompletion.acreate(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=200,
+                temperature=0.5,
+            )
 
         # Parse AI response (simplified - would need better parsing)
         suggestion_text = response.choices[0].message.content
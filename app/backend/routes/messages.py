@@ -7,12 +7,12 @@ import logging
 import os
 import re
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from auth import get_current_user
-from db import get_typed_db
+from db import get_mongo_db, get_typed_db
 from models import (
     IncomingMessage,
     IncomingMessageCreate,
@@ -27,6 +27,17 @@ from models import (
     ResponseTemplateCreate,
 )
 from services import LeadService
+from services.message_stats import (
+    get_message_stats as get_message_stats_cached,
+)
+from services.message_stats import invalidate_message_stats
+from services.replication import OP_UPSERT, outbox_op, write_with_outbox
+from services.pagination import (
+    NEXT_CURSOR_HEADER,
+    keyset_query,
+    next_cursor,
+    sort_spec,
+)
 
 # Feature flags
 USE_SUPABASE = os.getenv("USE_SUPABASE", "true").lower() in ("true", "1", "yes")
@@ -35,6 +46,16 @@ PARALLEL_WRITE = os.getenv("PARALLEL_WRITE", "true").lower() in ("true", "1", "y
 router = APIRouter(prefix="/api/messages", tags=["messages"])
 logger = logging.getLogger(__name__)
 
+
+def get_messages_db():
+    """MongoDB database holding messages and leads
+
+    Falls back to the typed stub when MONGO_URL is not set; the stats endpoint
+    then reads its message counters from Supabase.
+    """
+    mongo_db = get_mongo_db()
+    return mongo_db if mongo_db is not None else get_typed_db()
+
 # Platform validation
 ALLOWED_PLATFORMS = {
     "email",
@@ -137,19 +158,25 @@ def _generate_content_hash(platform: str, sender_email: str, message_text: str)
 # Incoming Messages Endpoints
 @router.get("/", response_model=list[IncomingMessage])
 async def get_messages(
+    response: Response,
     platform: str | None = Query(None),
     is_read: bool | None = Query(None),
     is_responded: bool | None = Query(None),
     priority: str | None = Query(None),
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    user=Depends(get_current_user),
+    cursor: str | None = Query(None),
+    user_id: str = Depends(get_current_user),
 ):
-    """Get incoming messages with filtering options"""
-    db = get_typed_db()
+    """Get incoming messages with filtering options
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the
+    next page; ``offset`` is kept for older clients and ignored with a cursor.
+    """
+    db = get_messages_db()
 
     # Build query
-    query = {"user_id": user["user_id"]}
+    query = {"user_id": user_id}
     if platform:
         query["platform"] = platform
     if is_read is not None:
@@ -164,9 +191,15 @@ async def get_messages(
         # NOTE: Messages are stored in MongoDB only for now
         # TODO: Add dedicated messages table to Supabase schema for full migration
         messages_cursor = (
-            db.messages.find(query).sort("received_at", -1).skip(offset).limit(limit)
+            db.messages.find(keyset_query(query, "received_at", cursor))
+            .sort(sort_spec("received_at"))
+            .skip(0 if cursor else offset)
+            .limit(limit + 1)
         )
-        messages = await messages_cursor.to_list(limit)
+        messages = await messages_cursor.to_list(limit + 1)
+        cursor_out = next_cursor(messages, "received_at", limit)
+        if cursor_out:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_out
 
         # Convert to Pydantic models
         result = []
@@ -181,6 +214,8 @@ async def get_messages(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching messages: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch messages")
@@ -189,10 +224,10 @@ async def get_messages(
 @router.post("/", response_model=IncomingMessage)
 async def create_message(
     message: IncomingMessageCreate,
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Create a new incoming message (typically used by monitoring services)"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Validate platform
@@ -202,7 +237,7 @@ async def create_message(
 
         # Create message document
         message_data = message.dict()
-        message_data["user_id"] = user["user_id"]
+        message_data["user_id"] = user_id
         message_data["platform"] = platform  # Use normalized platform
         message_data["id"] = f"msg_{uuid.uuid4().hex}_{platform}"
         message_data["received_at"] = datetime.now().isoformat()
@@ -217,7 +252,7 @@ async def create_message(
 
         # Insert into database
         # Apply stricter filters before creating leads
-        blocked_senders = await _get_blocked_senders(db, user["user_id"])
+        blocked_senders = await _get_blocked_senders(db, user_id)
         is_spam = _is_spam_message(message.message_text)
 
         if USE_SUPABASE:
@@ -228,7 +263,7 @@ async def create_message(
                 if client:
                     # Log message to business_intelligence table
                     bi_data = {
-                        "user_id": user["user_id"],
+                        "user_id": user_id,
                         "event_type": "message_received",
                         "event_data": {
                             "message_id": message_data["id"],
@@ -241,59 +276,52 @@ async def create_message(
                             "is_spam": is_spam
                         }
                     }
-                    client.table("business_intelligence").insert(bi_data).execute()
+                    # Mongo replica is written by the outbox replicator, not inline
+                    outbox = [outbox_op("messages", OP_UPSERT, message_data)] if PARALLEL_WRITE else []
+                    write_with_outbox(client, "business_intelligence", bi_data, outbox)
                     logger.info(f"Message logged to Supabase BI: {message_data['id']}")
-
-                    # PARALLEL WRITE: Also save to MongoDB
-                    if PARALLEL_WRITE:
-                        try:
-                            result = await db.messages.insert_one(message_data)
-                            logger.info(f"✅ Parallel write to MongoDB successful for message: {message_data['id']}")
-                        except Exception as e:
-                            logger.warning(f"⚠️  Parallel MongoDB write failed for message {message_data['id']}: {e}")
             except Exception as e:
                 logger.error(f"Failed to log message to Supabase: {e}")
                 # Continue with MongoDB fallback
-                result = await db.messages.insert_one(message_data)
+                await db.messages.insert_one(message_data)
         else:
             # --- MONGODB PATH (FALLBACK) ---
-            result = await db.messages.insert_one(message_data)
-
-        # Apply stricter filters before creating leads
-        blocked_senders = await _get_blocked_senders(db, user["user_id"])
-        is_spam = _is_spam_message(message.message_text)
-
-        should_create_lead = (
-            message.message_type == "inquiry"
-            and message.sender_email
-            and message.sender_email.lower() not in blocked_senders
-            and len(message.message_text or "") >= MIN_MESSAGE_LENGTH
-            and bool(message_data.get("ad_id"))
-            and not is_spam
-        )
+            await db.messages.insert_one(message_data)
+
+        try:
+            # Apply stricter filters before creating leads
+            blocked_senders = await _get_blocked_senders(db, user_id)
+            is_spam = _is_spam_message(message.message_text)
+
+            should_create_lead = (
+                message.message_type == "inquiry"
+                and message.sender_email
+                and message.sender_email.lower() not in blocked_senders
+                and len(message.message_text or "") >= MIN_MESSAGE_LENGTH
+                and bool(message_data.get("ad_id"))
+                and not is_spam
+            )
 
-        if should_create_lead:
-            # Use LeadService for intelligent lead matching and creation
-            lead_service = LeadService(db)
-            lead_id = await lead_service.find_or_create_lead(message_data)
-            if lead_id:
-                logger.info(
-                    f"Lead processed: {lead_id} for message: {message_data['id']}",
-                )
-            else:
-                logger.warning(
-                    f"Failed to create/find lead for message: {message_data['id']}",
-                )
-
-        # Return created message
-        created_message = await db.messages.find_one({"_id": result.inserted_id})
-        if created_message:
-            return IncomingMessage(**created_message)
+            if should_create_lead:
+                # Use LeadService for intelligent lead matching and creation
+                lead_service = LeadService(db)
+                lead_id = await lead_service.find_or_create_lead(message_data)
+                if lead_id:
+                    logger.info(
+                        f"Lead processed: {lead_id} for message: {message_data['id']}",
+                    )
+                else:
+                    logger.warning(
+                        f"Failed to create/find lead for message: {message_data['id']}",
+                    )
+        finally:
+            # Invalidate after the lead write so a concurrent read cannot
+            # cache counters that include the message but not its lead
+            invalidate_message_stats(user_id)
 
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to retrieve created message",
-        )
+        # Return created message (the Mongo replica may still be in the outbox,
+        # so build the response from what was written)
+        return IncomingMessage(**message_data)
 
     except Exception as e:
         logger.error(f"Error creating message: {e}")
@@ -301,19 +329,20 @@ async def create_message(
 
 
 @router.patch("/{message_id}/read")
-async def mark_message_read(message_id: str, user=Depends(get_current_user)):
+async def mark_message_read(message_id: str, user_id: str = Depends(get_current_user)):
     """Mark a message as read"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         result = await db.messages.update_one(
-            {"id": message_id, "user_id": user["user_id"]},
+            {"id": message_id, "user_id": user_id},
             {"$set": {"is_read": True}},
         )
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Message not found")
 
+        invalidate_message_stats(user_id)
         return {"success": True, "message": "Message marked as read"}
 
     except HTTPException:
@@ -326,18 +355,20 @@ async def mark_message_read(message_id: str, user=Depends(get_current_user)):
 # Lead Management Endpoints
 @router.get("/leads/", response_model=list[Lead])
 async def get_leads(
+    response: Response,
     status: str | None = Query(None),
     platform: str | None = Query(None),
     interest_level: str | None = Query(None),
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    user=Depends(get_current_user),
+    cursor: str | None = Query(None),
+    user_id: str = Depends(get_current_user),
 ):
-    """Get leads with filtering options"""
-    db = get_typed_db()
+    """Get leads with filtering options (cursor pagination as in get_messages)"""
+    db = get_messages_db()
 
     # Build query
-    query = {"user_id": user["user_id"]}
+    query = {"user_id": user_id}
     if status:
         query["status"] = status
     if platform:
@@ -348,9 +379,15 @@ async def get_leads(
     try:
         # Get leads sorted by created_at (newest first)
         leads_cursor = (
-            db.leads.find(query).sort("created_at", -1).skip(offset).limit(limit)
+            db.leads.find(keyset_query(query, "created_at", cursor))
+            .sort(sort_spec("created_at"))
+            .skip(0 if cursor else offset)
+            .limit(limit + 1)
         )
-        leads = await leads_cursor.to_list(limit)
+        leads = await leads_cursor.to_list(limit + 1)
+        cursor_out = next_cursor(leads, "created_at", limit)
+        if cursor_out:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_out
 
         # Convert to Pydantic models
         result = []
@@ -369,26 +406,29 @@ async def get_leads(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching leads: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch leads")
 
 
 @router.post("/leads/", response_model=Lead)
-async def create_lead(lead: LeadCreate, user=Depends(get_current_user)):
+async def create_lead(lead: LeadCreate, user_id: str = Depends(get_current_user)):
     """Create a new lead"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Create lead document
         lead_data = lead.dict()
-        lead_data["user_id"] = user["user_id"]
+        lead_data["user_id"] = user_id
         lead_data["id"] = f"lead_{uuid.uuid4().hex}_{lead.platform}"
         lead_data["created_at"] = datetime.now().isoformat()
         lead_data["status"] = "new"
 
         # Insert into database
         result = await db.leads.insert_one(lead_data)
+        invalidate_message_stats(user_id)
 
         # Return created lead
         created_lead = await db.leads.find_one({"_id": result.inserted_id})
@@ -406,10 +446,10 @@ async def create_lead(lead: LeadCreate, user=Depends(get_current_user)):
 async def update_lead(
     lead_id: str,
     lead_update: LeadUpdate,
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Update a lead"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Build update document (exclude None values)
@@ -420,16 +460,18 @@ async def update_lead(
             update_data["last_contact_at"] = update_data["last_contact_at"].isoformat()
 
         result = await db.leads.update_one(
-            {"id": lead_id, "user_id": user["user_id"]},
+            {"id": lead_id, "user_id": user_id},
             {"$set": update_data},
         )
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Lead not found")
 
+        invalidate_message_stats(user_id)
+
         # Return updated lead
         updated_lead = await db.leads.find_one(
-            {"id": lead_id, "user_id": user["user_id"]},
+            {"id": lead_id, "user_id": user_id},
         )
         if updated_lead:
             return Lead(**updated_lead)
@@ -448,13 +490,13 @@ async def update_lead(
 async def get_response_templates(
     template_type: str | None = Query(None),
     platform: str | None = Query(None),
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Get response templates"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     # Build query
-    query = {"user_id": user["user_id"], "is_active": True}
+    query = {"user_id": user_id, "is_active": True}
     if template_type:
         query["template_type"] = template_type
     if platform:
@@ -486,15 +528,15 @@ async def get_response_templates(
 @router.post("/templates/", response_model=ResponseTemplate)
 async def create_response_template(
     template: ResponseTemplateCreate,
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Create a new response template"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Create template document
         template_data = template.dict()
-        template_data["user_id"] = user["user_id"]
+        template_data["user_id"] = user_id
         template_data["id"] = f"template_{uuid.uuid4().hex}_{template.template_type}"
         template_data["created_at"] = datetime.now().isoformat()
         template_data["is_active"] = True
@@ -526,15 +568,15 @@ async def create_response_template(
 @router.post("/respond/", response_model=OutgoingResponse)
 async def send_response(
     response: OutgoingResponseCreate,
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Send a response to an incoming message"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Verify message exists
         message = await db.messages.find_one(
-            {"id": response.message_id, "user_id": user["user_id"]},
+            {"id": response.message_id, "user_id": user_id},
         )
 
         if not message:
@@ -542,7 +584,7 @@ async def send_response(
 
         # Create response document
         response_data = response.dict()
-        response_data["user_id"] = user["user_id"]
+        response_data["user_id"] = user_id
         response_data["id"] = (
             f"resp_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{response.platform}"
         )
@@ -553,9 +595,10 @@ async def send_response(
 
         # Mark original message as responded
         await db.messages.update_one(
-            {"id": response.message_id, "user_id": user["user_id"]},
+            {"id": response.message_id, "user_id": user_id},
             {"$set": {"is_responded": True}},
         )
+        invalidate_message_stats(user_id)
 
         # TODO: Actually send the response via the appropriate platform
         # This would involve calling platform-specific APIs or automation
@@ -581,12 +624,12 @@ async def send_response(
 
 # Platform Monitoring Configuration
 @router.get("/monitoring/", response_model=list[PlatformMonitoringConfig])
-async def get_monitoring_configs(user=Depends(get_current_user)):
+async def get_monitoring_configs(user_id: str = Depends(get_current_user)):
     """Get platform monitoring configurations"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
-        configs_cursor = db.monitoring_configs.find({"user_id": user["user_id"]})
+        configs_cursor = db.monitoring_configs.find({"user_id": user_id})
         configs = await configs_cursor.to_list(100)
 
         result = []
@@ -615,25 +658,25 @@ async def get_monitoring_configs(user=Depends(get_current_user)):
 @router.post("/monitoring/", response_model=PlatformMonitoringConfig)
 async def create_monitoring_config(
     config: PlatformMonitoringConfigCreate,
-    user=Depends(get_current_user),
+    user_id: str = Depends(get_current_user),
 ):
     """Create or update platform monitoring configuration"""
-    db = get_typed_db()
+    db = get_messages_db()
 
     try:
         # Check if config already exists for this platform
         existing = await db.monitoring_configs.find_one(
-            {"user_id": user["user_id"], "platform": config.platform},
+            {"user_id": user_id, "platform": config.platform},
         )
 
         config_data = config.dict()
-        config_data["user_id"] = user["user_id"]
+        config_data["user_id"] = user_id
         config_data["created_at"] = datetime.now().isoformat()
 
         if existing:
             # Update existing config
             await db.monitoring_configs.update_one(
-                {"user_id": user["user_id"], "platform": config.platform},
+                {"user_id": user_id, "platform": config.platform},
                 {"$set": config_data},
             )
             config_data["id"] = existing["id"]
@@ -656,49 +699,26 @@ async def create_monitoring_config(
 
 # Statistics and Analytics
 @router.get("/stats/")
-async def get_message_stats(user=Depends(get_current_user)):
-    """Get message and lead statistics"""
-    db = get_typed_db()
+async def get_message_stats(user_id: str = Depends(get_current_user)):
+    """Get message and lead statistics
 
-    try:
-        # Get basic counts
-        total_messages = await db.messages.count_documents({"user_id": user["user_id"]})
-        unread_messages = await db.messages.count_documents(
-            {"user_id": user["user_id"], "is_read": False},
-        )
-        total_leads = await db.leads.count_documents({"user_id": user["user_id"]})
-        active_leads = await db.leads.count_documents(
-            {
-                "user_id": user["user_id"],
-                "status": {"$in": ["new", "contacted", "qualified", "negotiating"]},
-            },
-        )
+    All counters come from one aggregation and are cached per user for a few
+    seconds; message and lead writes invalidate the cached entry.
+    """
+    db = get_messages_db()
 
-        # Get recent activity (last 24 hours)
-        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-        recent_messages = await db.messages.count_documents(
-            {"user_id": user["user_id"], "received_at": {"$gte": yesterday}},
-        )
+    supabase_client = None
+    if USE_SUPABASE:
+        from supabase_db import get_supabase
+
+        supabase_client = get_supabase()
 
-        # Get platform breakdown
-        pipeline = [
-            {"$match": {"user_id": user["user_id"]}},
-            {"$group": {"_id": "$platform", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-        ]
-        platform_stats = await db.messages.aggregate(pipeline).to_list(10)
-
-        return {
-            "total_messages": total_messages,
-            "unread_messages": unread_messages,
-            "total_leads": total_leads,
-            "active_leads": active_leads,
-            "recent_messages_24h": recent_messages,
-            "platform_breakdown": [
-                {"platform": stat["_id"], "count": stat["count"]}
-                for stat in platform_stats
-            ],
-        }
+    try:
+        return await get_message_stats_cached(
+            db,
+            user_id,
+            supabase_client=supabase_client,
+        )
 
     except Exception as e:
         logger.error(f"Error fetching message stats: {e}")
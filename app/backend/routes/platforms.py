@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from auth import get_optional_current_user
 from db import get_typed_db
 from models import PlatformAccount, PlatformAccountCreate
+from services.replication import OP_UPSERT, outbox_op, write_with_outbox
 
 # Import datetime helpers from ads module
 from .ads import deserialize_datetime_fields, serialize_datetime_fields
@@ -75,16 +76,10 @@ async def create_platform_account(
                         "last_used": doc.get("last_used")
                     }
                 }
-                result = client.table("platform_connections").insert(connection_data).execute()
+                # Mongo replica is written by the outbox replicator, not inline
+                outbox = [outbox_op("platform_accounts", OP_UPSERT, doc)] if PARALLEL_WRITE else []
+                write_with_outbox(client, "platform_connections", connection_data, outbox)
                 logger.info(f"Platform connection created in Supabase: {account.platform} for user {user_id}")
-
-                # PARALLEL WRITE: Also write to MongoDB
-                if PARALLEL_WRITE:
-                    try:
-                        await db["platform_accounts"].insert_one(doc)
-                        logger.info(f"✅ Parallel write to MongoDB successful for platform account: {account.platform}")
-                    except Exception as e:
-                        logger.warning(f"⚠️  Parallel MongoDB write failed for platform account {account.platform}: {e}")
         except Exception as e:
             logger.error(f"Platform account creation failed (Supabase): {e}")
             raise HTTPException(status_code=500, detail="Failed to create platform account")
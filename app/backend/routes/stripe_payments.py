@@ -14,6 +14,7 @@ from auth import get_current_user
 from db import get_typed_db
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
+from services.metrics import track_call
 
 # Feature flags
 USE_SUPABASE = os.getenv("USE_SUPABASE", "true").lower() in ("true", "1", "yes")
@@ -126,24 +127,25 @@ async def create_payment_intent(
             }
 
         # Create payment intent with Stripe
-        payment_intent = stripe.PaymentIntent.create(
-            amount=request.amount,
-            currency=request.currency,
-            description=request.description,
-            metadata={
-                "user_id": current_user.get("id"),
-                "user_email": current_user.get("email"),
-                **(request.metadata or {}),
-            },
-            # Enable automatic payment methods (cards, digital wallets, Link, etc.)
-            automatic_payment_methods={"enabled": True},
-            # Include payment method options if any
-            **(
-                {"payment_method_options": payment_method_options}
-                if payment_method_options
-                else {}
-            ),
-        )
+        with track_call("stripe", "PaymentIntent.create"):
+            payment_intent = stripe.PaymentIntent.create(
+                amount=request.amount,
+                currency=request.currency,
+                description=request.description,
+                metadata={
+                    "user_id": current_user.get("id"),
+                    "user_email": current_user.get("email"),
+                    **(request.metadata or {}),
+                },
+                # Enable automatic payment methods (cards, digital wallets, Link, etc.)
+                automatic_payment_methods={"enabled": True},
+                # Include payment method options if any
+                **(
+                    {"payment_method_options": payment_method_options}
+                    if payment_method_options
+                    else {}
+                ),
+            )
 
         logger.info(
             f"Created payment intent {payment_intent.id} for user {current_user.get('id')}"
@@ -187,7 +189,8 @@ async def get_payment_intent(
         )
 
     try:
-        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        with track_call("stripe", "PaymentIntent.retrieve"):
+            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
 
         # Verify the payment intent belongs to the current user
         if payment_intent.metadata.get("user_id") != current_user.get("id"):
@@ -243,22 +246,25 @@ async def create_setup_intent(
     try:
         # Get or create Stripe customer
         user_email = current_user.get("email")
-        customers = stripe.Customer.list(email=user_email, limit=1)
+        with track_call("stripe", "Customer.list"):
+            customers = stripe.Customer.list(email=user_email, limit=1)
 
         if customers.data:
             customer = customers.data[0]
         else:
-            customer = stripe.Customer.create(
-                email=user_email,
-                metadata={"user_id": current_user.get("id")},
-            )
+            with track_call("stripe", "Customer.create"):
+                customer = stripe.Customer.create(
+                    email=user_email,
+                    metadata={"user_id": current_user.get("id")},
+                )
 
         # Create setup intent
-        setup_intent = stripe.SetupIntent.create(
-            customer=customer.id,
-            payment_method_types=["card"],
-            usage="off_session",  # Allow charging later
-        )
+        with track_call("stripe", "SetupIntent.create"):
+            setup_intent = stripe.SetupIntent.create(
+                customer=customer.id,
+                payment_method_types=["card"],
+                usage="off_session",  # Allow charging later
+            )
 
         logger.info(
             f"Created setup intent {setup_intent.id} for user {current_user.get('id')}"
@@ -306,36 +312,41 @@ async def create_subscription(
     try:
         # Get or create Stripe customer
         user_email = current_user.get("email")
-        customers = stripe.Customer.list(email=user_email, limit=1)
+        with track_call("stripe", "Customer.list"):
+            customers = stripe.Customer.list(email=user_email, limit=1)
 
         if customers.data:
             customer = customers.data[0]
         else:
-            customer = stripe.Customer.create(
-                email=user_email,
-                metadata={"user_id": current_user.get("id")},
-            )
+            with track_call("stripe", "Customer.create"):
+                customer = stripe.Customer.create(
+                    email=user_email,
+                    metadata={"user_id": current_user.get("id")},
+                )
 
         # Attach payment method to customer
-        stripe.PaymentMethod.attach(
-            request.payment_method_id,
-            customer=customer.id,
-        )
+        with track_call("stripe", "PaymentMethod.attach"):
+            stripe.PaymentMethod.attach(
+                request.payment_method_id,
+                customer=customer.id,
+            )
 
         # Set as default payment method
-        stripe.Customer.modify(
-            customer.id,
-            invoice_settings={"default_payment_method": request.payment_method_id},
-        )
+        with track_call("stripe", "Customer.modify"):
+            stripe.Customer.modify(
+                customer.id,
+                invoice_settings={"default_payment_method": request.payment_method_id},
+            )
 
         # Create subscription
-        subscription = stripe.Subscription.create(
-            customer=customer.id,
-            items=[{"price": request.price_id}],
-            payment_behavior="default_incomplete",
-            payment_settings={"save_default_payment_method": "on_subscription"},
-            expand=["latest_invoice.payment_intent"],
-        )
+        with track_call("stripe", "Subscription.create"):
+            subscription = stripe.Subscription.create(
+                customer=customer.id,
+                items=[{"price": request.price_id}],
+                payment_behavior="default_incomplete",
+                payment_settings={"save_default_payment_method": "on_subscription"},
+                expand=["latest_invoice.payment_intent"],
+            )
 
         logger.info(
             f"Created subscription {subscription.id} for user {current_user.get('id')}"
@@ -565,7 +576,8 @@ async def handle_subscription_created(subscription: Dict[str, Any]) -> None:
     logger.info(f"Subscription created: {subscription_id} for customer {customer_id}")
 
     # Get user from customer ID
-    customer = stripe.Customer.retrieve(customer_id)
+    with track_call("stripe", "Customer.retrieve"):
+        customer = stripe.Customer.retrieve(customer_id)
     user_id = customer.metadata.get("user_id")
 
     subscription_data = {
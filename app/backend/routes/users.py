@@ -9,11 +9,17 @@ import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, EmailStr
 
 from auth import User, get_current_user_with_fallback, get_password_hash
 from db import get_typed_db
+from services.replication import OP_SET, outbox_op, write_with_outbox
+from services.user_search import (
+    email_search_fields,
+    search_users_mongo,
+    search_users_supabase,
+)
 from supabase_db import db as supabase_db
 
 logger = logging.getLogger(__name__)
@@ -68,11 +74,15 @@ def _get_user_from_supabase(user_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def _update_user_in_supabase(user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Update user in Supabase."""
+def _update_user_in_supabase(
+    user_id: str,
+    update_data: Dict[str, Any],
+    outbox: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Update user in Supabase, enqueuing any MongoDB replicas in the same transaction."""
     try:
-        updated = supabase_db.update_user(user_id, update_data)
-        return updated
+        client = supabase_db.require_client()
+        return write_with_outbox(client, "users", update_data, outbox, match_id=user_id)
     except Exception as e:
         logger.error(f"Supabase user update failed: {e}")
         raise
@@ -85,8 +95,8 @@ def _delete_user_from_supabase(user_id: str) -> bool:
             "is_active": False,
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
-        supabase_db.update_user(user_id, update_data)
-        return True
+        outbox = [outbox_op("users", OP_SET, update_data, {"id": user_id})] if PARALLEL_WRITE else []
+        return _update_user_in_supabase(user_id, update_data, outbox) is not None
     except Exception as e:
         logger.error(f"Supabase user deletion failed: {e}")
         return False
@@ -179,17 +189,25 @@ async def update_user(
         update_data["phone"] = user_update.phone
     if user_update.password is not None:
         update_data["password_hash"] = get_password_hash(user_update.password)
-        update_data["hashed_password"] = update_data["password_hash"]  # MongoDB compatibility
     if user_update.is_active is not None and is_admin:
         # Only admins can change active status
         update_data["is_active"] = user_update.is_active
 
+    # MongoDB keeps derived search fields in sync with the email
+    mongo_update_data = dict(update_data)
+    if "password_hash" in update_data:
+        mongo_update_data["hashed_password"] = update_data["password_hash"]  # MongoDB compatibility
+    if user_update.email is not None:
+        mongo_update_data.update(email_search_fields(user_update.email))
+
     updated_user = None
 
     if USE_SUPABASE:
         # --- SUPABASE PATH (PRIMARY) ---
         try:
-            updated_user = _update_user_in_supabase(user_id, update_data)
+            # Mongo replica is written by the outbox replicator, not inline
+            outbox = [outbox_op("users", OP_SET, mongo_update_data, {"id": user_id})] if PARALLEL_WRITE else []
+            updated_user = _update_user_in_supabase(user_id, update_data, outbox)
 
             if not updated_user:
                 raise HTTPException(
@@ -199,17 +217,6 @@ async def update_user(
 
             logger.info(f"User updated in Supabase: {user_id}")
 
-            # PARALLEL WRITE: Also update in MongoDB
-            if PARALLEL_WRITE:
-                try:
-                    await db.users.update_one(
-                        {"id": user_id},
-                        {"$set": update_data}
-                    )
-                    logger.info(f"✅ Parallel write to MongoDB successful for user: {user_id}")
-                except Exception as e:
-                    logger.warning(f"⚠️  Parallel MongoDB write failed for user {user_id}: {e}")
-
         except HTTPException:
             raise
         except Exception as e:
@@ -223,7 +230,7 @@ async def update_user(
         try:
             result = await db.users.update_one(
                 {"id": user_id},
-                {"$set": update_data}
+                {"$set": mongo_update_data}
             )
 
             if result.matched_count == 0:
@@ -286,20 +293,6 @@ async def delete_user(
 
             logger.info(f"User soft-deleted in Supabase: {user_id}")
 
-            # PARALLEL WRITE: Also delete in MongoDB
-            if PARALLEL_WRITE:
-                try:
-                    await db.users.update_one(
-                        {"id": user_id},
-                        {"$set": {
-                            "is_active": False,
-                            "updated_at": datetime.now(timezone.utc).isoformat()
-                        }}
-                    )
-                    logger.info(f"✅ Parallel write to MongoDB successful for user deletion: {user_id}")
-                except Exception as e:
-                    logger.warning(f"⚠️  Parallel MongoDB write failed for user deletion {user_id}: {e}")
-
         except HTTPException:
             raise
         except Exception as e:
@@ -345,11 +338,12 @@ async def delete_user(
 @router.get("/search/query", response_model=List[UserResponse])
 async def search_users(
     q: Optional[str] = None,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
     current_user=Depends(get_current_user_with_fallback)
 ):
     """Search users by username or email (admin only).
 
+    Substring matches are served by trigram indexes and ranked by similarity.
     Supports both Supabase (primary) and MongoDB (fallback).
     """
     user_data, current_user_id = current_user
@@ -370,14 +364,7 @@ async def search_users(
             from supabase_db import get_supabase
             client = get_supabase()
             if client:
-                query = client.table("users").select("*").limit(limit)
-
-                if q:
-                    # Search in username or email
-                    query = query.or_(f"username.ilike.%{q}%,email.ilike.%{q}%")
-
-                result = query.execute()
-                users = result.data if result.data else []
+                users = search_users_supabase(client, q, limit)
 
             logger.info(f"User search in Supabase: {len(users)} results for query: {q}")
 
@@ -390,17 +377,7 @@ async def search_users(
     else:
         # --- MONGODB PATH (FALLBACK) ---
         try:
-            query_filter = {}
-            if q:
-                query_filter = {
-                    "$or": [
-                        {"username": {"$regex": q, "$options": "i"}},
-                        {"email": {"$regex": q, "$options": "i"}}
-                    ]
-                }
-
-            cursor = db.users.find(query_filter).limit(limit)
-            users = await cursor.to_list(length=limit)
+            users = await search_users_mongo(db, q, limit)
 
             logger.info(f"User search in MongoDB: {len(users)} results for query: {q}")
 
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""API Benchmark
+Load-tests server.py (backend) and CrossPostMe/main.py against the in-memory
+database stand-ins in scripts/memory_db.py and compares the results with a
+stored baseline, so performance regressions fail the run.
+
+Each target boots in its own process (both apps define top-level routes,
+services and models packages), is seeded with synthetic users, ads and
+posts, and is driven in process through httpx.ASGITransport with a weighted
+request mix at fixed concurrency. Per-endpoint p50/p95/p99 latency,
+requests/sec and error counts are reported.
+
+The backend's analytics router is mounted for the run when server.py does
+not include it yet. Every stand-in call costs --db-latency-ms, which makes
+round-trip-bound code (N+1 queries) show up as it would against a real
+database. Seeded passwords are hashed at the minimum bcrypt cost so that a
+handful of logins does not stall the event loop for the whole mix; pass
+--bcrypt-rounds 12 to measure logins at production cost.
+
+Usage:
+  python scripts/benchmark_api.py
+  python scripts/benchmark_api.py --target crosspostme --concurrency 32
+  python scripts/benchmark_api.py --requests 5000 --json results.json
+  python scripts/benchmark_api.py --update-baseline
+
+Baselines are machine-specific; refresh them (--update-baseline) on the
+machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+SCRIPTS = Path(__file__).resolve().parent
+ROOT = SCRIPTS.parent
+REPO = ROOT.parents[1]
+
+TARGETS = {
+    "backend": ROOT,
+    "crosspostme": REPO / "CrossPostMe",
+}
+
+BASELINE_PATH = SCRIPTS / "benchmark_api_baseline.json"
+
+PASSWORD = "Benchmark-passw0rd"
+
+logger = logging.getLogger(__name__)
+
+# A step issues one request for a virtual user and returns its response
+Step = Callable[
+    [httpx.AsyncClient, "Context", random.Random], Awaitable[httpx.Response]
+]
+
+
+@dataclass
+class Context:
+    """Seeded data the request mix draws from"""
+
+    users: list[dict[str, Any]]
+    ad_ids: list[str]
+    next_cursor: str | None = None
+
+    def user(self, rng: random.Random) -> dict[str, Any]:
+        return rng.choice(self.users)
+
+    def auth(self, rng: random.Random) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.user(rng)['token']}"}
+
+
+def hash_password(pwd_context: Any, rounds: int) -> str:
+    # Logins verify against the stored hash's own cost factor
+    return pwd_context.handler("bcrypt").using(rounds=rounds).hash(PASSWORD)
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    seconds: float
+
+
+# ==================== BACKEND (server.py) ====================
+
+
+def boot_backend(args: argparse.Namespace) -> tuple[Any, Context]:
+    from memory_db import MemorySupabase
+
+    import supabase_db
+    from services.metrics import InstrumentedSupabaseClient
+
+    memory = MemorySupabase()
+    supabase_db.SUPABASE_URL = "http://supabase.memory"
+    supabase_db.SUPABASE_SERVICE_KEY = "memory"
+    supabase_db._supabase_client = memory
+    supabase_db.db.client = InstrumentedSupabaseClient(memory)
+
+    import server
+    from auth import create_access_token, pwd_context
+    from routes import analytics
+
+    if not any(
+        getattr(route, "path", "").startswith(analytics.router.prefix)
+        for route in server.app.routes
+    ):
+        server.app.include_router(analytics.router)
+
+    rng = random.Random(args.seed)
+    password_hash = hash_password(pwd_context, args.bcrypt_rounds)
+    users, ad_ids = [], []
+    for index in range(args.users):
+        user = memory.write(
+            "users",
+            {
+                "username": f"seller{index}",
+                "email": f"seller{index}@example.com",
+                "password_hash": password_hash,
+                "full_name": f"Seller {index}",
+                "is_active": True,
+            },
+        )
+        user["token"] = create_access_token(
+            data={
+                "user_id": user["id"],
+                "username": user["username"],
+                "email": user["email"],
+                "is_active": True,
+                "is_admin": False,
+            }
+        )
+        users.append(user)
+        for platform in ("facebook", "craigslist", "offerup"):
+            memory.write(
+                "platform_connections",
+                {
+                    "user_id": user["id"],
+                    "platform": platform,
+                    "platform_user_id": f"{platform}-{index}",
+                    "is_active": True,
+                    "metadata": {"account_email": user["email"]},
+                },
+            )
+        for ad in range(args.ads_per_user):
+            listing = memory.write(
+                "listings",
+                {
+                    "user_id": user["id"],
+                    "title": f"Listing {index}-{ad}",
+                    "price": rng.randint(10, 500),
+                    "status": "active",
+                },
+            )
+            ad_ids.append(listing["id"])
+            for platform in rng.sample(["facebook", "craigslist", "offerup"], 2):
+                memory.write(
+                    "posted_ads",
+                    {
+                        "ad_id": listing["id"],
+                        "platform": platform,
+                        "views": rng.randint(0, 500),
+                        "clicks": rng.randint(0, 50),
+                        "leads": rng.randint(0, 5),
+                    },
+                )
+    memory.latency_ms = args.db_latency_ms
+    return server.app, Context(users=users, ad_ids=ad_ids)
+
+
+async def backend_login(client: httpx.AsyncClient, ctx: Context, rng: random.Random):
+    user = ctx.user(rng)
+    return await client.post(
+        "/api/auth/login", json={"username": user["username"], "password": PASSWORD}
+    )
+
+
+async def backend_me(client: httpx.AsyncClient, ctx: Context, rng: random.Random):
+    return await client.get("/api/auth/me", headers=ctx.auth(rng))
+
+
+async def backend_platform_accounts(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get("/api/platforms/accounts", headers=ctx.auth(rng))
+
+
+async def backend_connect_platform(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    user = ctx.user(rng)
+    return await client.post(
+        "/api/platforms/accounts",
+        headers={"Authorization": f"Bearer {user['token']}"},
+        json={
+            "platform": rng.choice(["nextdoor", "mercari", "poshmark"]),
+            "account_name": user["username"],
+            "account_email": user["email"],
+        },
+    )
+
+
+async def backend_listing_analytics(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get("/api/analytics/listings", headers=ctx.auth(rng))
+
+
+async def backend_platform_analytics(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get("/api/analytics/platforms", headers=ctx.auth(rng))
+
+
+# ==================== CROSSPOSTME (main.py) ====================
+
+
+def boot_crosspostme(args: argparse.Namespace) -> tuple[Any, Context]:
+    from memory_db import MemoryMotorClient
+
+    os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+
+    import main
+    from config import config
+    from routes.auth import pwd_context
+    from services.auth import create_token
+
+    client = MemoryMotorClient()
+    main.AsyncIOMotorClient = lambda *args, **kwargs: client
+    db = client[config.get_db_name()]
+
+    rng = random.Random(args.seed)
+    password_hash = hash_password(pwd_context, args.bcrypt_rounds)
+    users, ad_ids = [], []
+    now = datetime.utcnow()
+    for index in range(args.users):
+        user = {
+            "id": f"user-{index}",
+            "email": f"seller{index}@example.com",
+            "hashed_password": password_hash,
+        }
+        db.users.docs.append(dict(user))
+        users.append({**user, "token": create_token(user["id"])})
+        db.platform_accounts.docs.append(
+            {
+                "id": f"account-{index}",
+                "platform": rng.choice(["facebook", "craigslist", "offerup"]),
+                "account_name": f"seller{index}",
+                "account_email": user["email"],
+                "status": "active",
+            }
+        )
+        for ad in range(args.ads_per_user):
+            ad_id = f"ad-{index}-{ad}"
+            created_at = now - timedelta(seconds=rng.randint(0, 30 * 86400))
+            db.ads.docs.append(
+                {
+                    "id": ad_id,
+                    "title": f"Listing {index}-{ad}",
+                    "description": "Solid oak writing desk with three drawers.",
+                    "price": float(rng.randint(10, 500)),
+                    "category": "furniture",
+                    "location": "Phoenix",
+                    "images": [],
+                    "platforms": ["facebook", "craigslist"],
+                    "owner_id": user["id"],
+                    "status": rng.choice(["draft", "posted", "posted"]),
+                    "created_at": created_at,
+                    "auto_renew": False,
+                }
+            )
+            ad_ids.append(ad_id)
+            for platform in rng.sample(["facebook", "craigslist", "offerup"], 2):
+                db.posted_ads.docs.append(
+                    {
+                        "id": f"post-{ad_id}-{platform}",
+                        "ad_id": ad_id,
+                        "platform": platform,
+                        "posted_at": now
+                        - timedelta(seconds=rng.randint(0, 14 * 86400)),
+                        "status": "active",
+                        "views": rng.randint(0, 500),
+                        "clicks": rng.randint(0, 50),
+                        "leads": rng.randint(0, 5),
+                        "metrics": {},
+                    }
+                )
+    db.latency_ms = args.db_latency_ms
+    return main.app, Context(users=users, ad_ids=ad_ids)
+
+
+async def crosspostme_login(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    user = ctx.user(rng)
+    return await client.post(
+        "/api/auth/login", json={"email": user["email"], "password": PASSWORD}
+    )
+
+
+async def crosspostme_list_ads(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    params = {"per_page": 20}
+    if rng.random() < 0.3:
+        params["status"] = "posted"
+    return await client.get("/api/ads/", params=params)
+
+
+async def crosspostme_list_ads_next_page(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get(
+        "/api/ads/", params={"per_page": 20, "cursor": ctx.next_cursor}
+    )
+
+
+async def crosspostme_dashboard_stats(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get("/api/ads/dashboard/stats")
+
+
+async def crosspostme_ad_analytics(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    ad_id = rng.choice(ctx.ad_ids)
+    return await client.get(f"/api/ads/{ad_id}/analytics", params={"days": 30})
+
+
+async def crosspostme_create_ad(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.post(
+        "/api/ads/",
+        headers=ctx.auth(rng),
+        json={
+            "title": "Mid-century armchair",
+            "description": "Walnut frame, new upholstery.",
+            "price": float(rng.randint(50, 400)),
+            "category": "furniture",
+            "location": "Phoenix",
+            "platforms": ["facebook", "offerup"],
+        },
+    )
+
+
+async def crosspostme_platform_accounts(
+    client: httpx.AsyncClient, ctx: Context, rng: random.Random
+):
+    return await client.get("/api/platforms/accounts")
+
+
+# Weighted request mix per target: endpoint name -> (weight, step)
+MIXES: dict[str, dict[str, tuple[int, Step]]] = {
+    "backend": {
+        "login": (2, backend_login),
+        "me": (25, backend_me),
+        "platform_accounts": (25, backend_platform_accounts),
+        "connect_platform": (5, backend_connect_platform),
+        "listing_analytics": (30, backend_listing_analytics),
+        "platform_analytics": (13, backend_platform_analytics),
+    },
+    "crosspostme": {
+        "login": (2, crosspostme_login),
+        "list_ads": (30, crosspostme_list_ads),
+        "list_ads_next_page": (10, crosspostme_list_ads_next_page),
+        "dashboard_stats": (15, crosspostme_dashboard_stats),
+        "ad_analytics": (20, crosspostme_ad_analytics),
+        "create_ad": (8, crosspostme_create_ad),
+        "platform_accounts": (15, crosspostme_platform_accounts),
+    },
+}
+
+BOOT = {"backend": boot_backend, "crosspostme": boot_crosspostme}
+
+
+# ==================== LOAD GENERATION ====================
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    mix: dict[str, tuple[int, Step]],
+    ctx: Context,
+    concurrency: int,
+    requests: int,
+    seed: int,
+) -> list[Sample]:
+    """Issue requests from the mix across concurrency workers"""
+    names = list(mix)
+    weights = [mix[name][0] for name in names]
+    remaining = iter(range(requests))
+    samples: list[Sample] = []
+
+    async def worker(rng: random.Random) -> None:
+        for _ in remaining:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await mix[name][1](client, ctx, rng)
+                status = response.status_code
+            except Exception as e:
+                logger.error(f"{name} raised {e!r}")
+                status = 599
+            samples.append(Sample(name, status, time.perf_counter() - started))
+
+    await asyncio.gather(
+        *(worker(random.Random(seed + index)) for index in range(concurrency))
+    )
+    return samples
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    by_endpoint: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    def stats(group: list[Sample]) -> dict[str, Any]:
+        seconds = [sample.seconds for sample in group]
+        return {
+            "requests": len(group),
+            "errors": sum(sample.status >= 400 for sample in group),
+            "p50_ms": round(percentile(seconds, 50) * 1000, 2),
+            "p95_ms": round(percentile(seconds, 95) * 1000, 2),
+            "p99_ms": round(percentile(seconds, 99) * 1000, 2),
+        }
+
+    return {
+        **stats(samples),
+        "elapsed_seconds": round(elapsed, 2),
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "endpoints": {
+            name: stats(group) for name, group in sorted(by_endpoint.items())
+        },
+    }
+
+
+async def run_target(name: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Boot one app on in-memory databases and drive its mix"""
+    sys.path.insert(0, str(TARGETS[name]))
+    sys.path.insert(0, str(SCRIPTS))
+    app, ctx = BOOT[name](args)
+    # The apps log every login and query failure; only errors are of interest
+    logging.disable(logging.WARNING)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            if name == "crosspostme":
+                first = await client.get("/api/ads/", params={"per_page": 20})
+                ctx.next_cursor = first.json()["pagination"]["next_cursor"]
+            mix = MIXES[name]
+            await drive(client, mix, ctx, args.concurrency, args.warmup, args.seed)
+            started = time.perf_counter()
+            samples = await drive(
+                client, mix, ctx, args.concurrency, args.requests, args.seed + 1000
+            )
+            elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": args.concurrency,
+        "db_latency_ms": args.db_latency_ms,
+        **summarize(samples, elapsed),
+    }
+
+
+# ==================== BASELINE ====================
+
+
+def compare_to_baseline(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    slack_ms: float = 2.0,
+) -> list[str]:
+    """Describe every metric that regressed beyond tolerance
+
+    Throughput regresses when it drops by more than ``tolerance``; an
+    endpoint's p95 when it grows by more than ``tolerance`` plus ``slack_ms``
+    (so sub-millisecond jitter does not fail fast endpoints). New errors are
+    always regressions, and so is a baseline taken at other settings.
+    """
+    regressions = []
+    for target, result in results.items():
+        reference = baseline.get(target)
+        if not reference:
+            continue
+        settings = ("concurrency", "db_latency_ms")
+        if any(result.get(key) != reference.get(key) for key in settings):
+            regressions.append(
+                f"{target}: baseline was recorded with different "
+                f"{' / '.join(settings)}; rerun with those or update it"
+            )
+            continue
+        floor = reference["requests_per_second"] * (1 - tolerance)
+        if result["requests_per_second"] < floor:
+            regressions.append(
+                f"{target}: {result['requests_per_second']} req/s, baseline "
+                f"{reference['requests_per_second']}"
+            )
+        for endpoint, stats in result["endpoints"].items():
+            expected = reference["endpoints"].get(endpoint)
+            if not expected:
+                continue
+            ceiling = expected["p95_ms"] * (1 + tolerance) + slack_ms
+            if stats["p95_ms"] > ceiling:
+                regressions.append(
+                    f"{target} {endpoint}: p95 {stats['p95_ms']} ms, baseline "
+                    f"{expected['p95_ms']} ms"
+                )
+            if stats["errors"] and not expected["errors"]:
+                regressions.append(
+                    f"{target} {endpoint}: {stats['errors']} errors, baseline none"
+                )
+    return regressions
+
+
+def spawn(name: str, argv: list[str]) -> dict[str, Any]:
+    """Run one target in a fresh interpreter and collect its results"""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", name, *argv],
+        cwd=TARGETS[name],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    # Apps may print on import; the results are the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def report(name: str, result: dict[str, Any]) -> None:
+    print(
+        f"{name}: {result['requests']} requests at concurrency "
+        f"{result['concurrency']}, {result['requests_per_second']} req/s, "
+        f"{result['errors']} errors"
+    )
+    print(
+        f"  {'endpoint':<20} {'count':>6} {'errors':>6} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"  {endpoint:<20} {stats['requests']:>6} {stats['errors']:>6} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--ads-per-user", type=int, default=10)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument(
+        "--bcrypt-rounds",
+        type=int,
+        default=4,
+        help="cost of the seeded password hashes (production uses 12)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed fractional regression before the run fails",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", choices=sorted(TARGETS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_target(args.child, args))))
+        return
+
+    passthrough = [
+        f"--{option.replace('_', '-')}={getattr(args, option)}"
+        for option in (
+            "concurrency",
+            "requests",
+            "warmup",
+            "users",
+            "ads_per_user",
+            "db_latency_ms",
+            "bcrypt_rounds",
+            "seed",
+        )
+    ]
+    results = {}
+    for name in args.target or sorted(TARGETS):
+        results[name] = spawn(name, passthrough)
+        report(name, results[name])
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = (
+            json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        )
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline")
+        return
+
+    regressions = compare_to_baseline(
+        results, json.loads(baseline_path.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
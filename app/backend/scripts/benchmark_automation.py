@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Automation Throughput Benchmark
+Drives AutomationManager against the local fake marketplace
+(scripts/fake_marketplace.py) at N concurrent posts and reports posts per
+minute, p50/p99 post duration, peak RSS and the number of browsers running.
+
+Every worker owns an AutomationManager with its own platform instances, as a
+platform instance holds one browser at a time. Peak RSS covers this process
+and all of its children (Playwright driver and browsers); it is read from
+/proc, so it is only reported on Linux.
+
+Usage:
+  python scripts/benchmark_automation.py
+  python scripts/benchmark_automation.py --concurrency 8 --posts 64
+  python scripts/benchmark_automation.py --latency-ms 200 --captcha-rate 0.1 \\
+      --rate-limit-rate 0.05 --json results.json
+
+Requires Playwright's Chromium (``playwright install chromium``). Posts use
+the "fast" humanization profile unless --humanization says otherwise.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Ensure the backend root is importable when running this script directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from automation import (  # noqa: E402
+    AdData,
+    AutomationManager,
+    CraigslistAutomation,
+    FacebookMarketplaceAutomation,
+    OfferUpAutomation,
+    PlatformCredentials,
+)
+from scripts.fake_marketplace import (  # noqa: E402
+    FakeMarketplace,
+    FixtureRouter,
+    MarketplaceConfig,
+)
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+PLATFORMS = {
+    "craigslist": CraigslistAutomation,
+    "facebook": FacebookMarketplaceAutomation,
+    "offerup": OfferUpAutomation,
+}
+
+CREDENTIALS = PlatformCredentials(username="seller@example.com", password="secret")
+
+
+@dataclass
+class PostSample:
+    platform: str
+    status: str
+    seconds: float
+    message: str | None
+
+
+def _descendants(pid: int) -> list[int]:
+    """pid and all of its descendant processes"""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after ")"
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        found.append(current)
+        stack.extend(children.get(current, []))
+    return found
+
+
+def sample_processes() -> tuple[int, int]:
+    """(RSS bytes, browser count) of this process tree"""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    rss = browsers = 0
+    for pid in _descendants(os.getpid()):
+        try:
+            with open(f"/proc/{pid}/statm") as fh:
+                rss += int(fh.read().split()[1]) * page_size
+            with open(f"/proc/{pid}/cmdline", "rb") as fh:
+                cmdline = fh.read()
+        except OSError:
+            continue
+        # Renderer, GPU and utility processes carry a --type= switch
+        if b"chrom" in cmdline.lower() and b"--type=" not in cmdline:
+            browsers += 1
+    return rss, browsers
+
+
+async def monitor(stop: asyncio.Event, peaks: dict[str, int]) -> None:
+    if not os.path.isdir("/proc"):
+        return
+    while not stop.is_set():
+        rss, browsers = sample_processes()
+        peaks["rss"] = max(peaks["rss"], rss)
+        peaks["browsers"] = max(peaks["browsers"], browsers)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.25)
+        except asyncio.TimeoutError:
+            pass
+
+
+def make_ad(index: int, image_base: str, images: int) -> AdData:
+    return AdData(
+        title=f"Solid oak desk #{index}",
+        description="Solid oak writing desk with three drawers. " * 20,
+        price=150,
+        category="furniture",
+        location="Phoenix",
+        images=[f"{image_base}/images/{index}-{n}.jpg" for n in range(images)],
+    )
+
+
+async def worker(
+    queue: "asyncio.Queue[tuple[int, str]]",
+    samples: list[PostSample],
+    platforms: list[str],
+    marketplace_url: str,
+    images: int,
+) -> None:
+    manager = AutomationManager()
+    for name in platforms:
+        platform = PLATFORMS[name]()
+        platform.context_hooks.append(FixtureRouter(marketplace_url))
+        manager.register_platform(platform)
+    while True:
+        try:
+            index, platform = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        result = await manager.post_to_platform(
+            platform, make_ad(index, marketplace_url, images), CREDENTIALS
+        )
+        samples.append(
+            PostSample(
+                platform=platform,
+                status=result.status.value,
+                seconds=time.perf_counter() - started,
+                message=result.message,
+            )
+        )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    config = MarketplaceConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        captcha_rate=args.captcha_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    platforms = args.platform or sorted(PLATFORMS)
+    with FakeMarketplace(config) as marketplace:
+        os.environ["AUTOMATION_HUMANIZATION"] = args.humanization
+
+        queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+        for index in range(args.posts):
+            queue.put_nowait((index, platforms[index % len(platforms)]))
+
+        samples: list[PostSample] = []
+        peaks = {"rss": 0, "browsers": 0}
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(monitor(stop, peaks))
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(queue, samples, platforms, marketplace.url, args.images)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+        durations = [sample.seconds for sample in samples]
+        statuses = Counter(sample.status for sample in samples)
+        failures = Counter(
+            sample.message.splitlines()[0] if sample.message else None
+            for sample in samples
+            if sample.status != "success"
+        )
+        return {
+            "concurrency": args.concurrency,
+            "posts": len(samples),
+            "platforms": platforms,
+            "humanization": args.humanization,
+            "elapsed_seconds": round(elapsed, 2),
+            "posts_per_minute": round(statuses["success"] / elapsed * 60, 2),
+            "p50_seconds": round(percentile(durations, 50), 3),
+            "p99_seconds": round(percentile(durations, 99), 3),
+            "mean_seconds": round(statistics.mean(durations), 3),
+            "peak_rss_mb": round(peaks["rss"] / 1024 / 1024, 1) or None,
+            "peak_browsers": peaks["browsers"] or None,
+            "statuses": dict(statuses),
+            "failures": dict(failures.most_common(5)),
+            "marketplace": marketplace.stats.to_dict(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=24)
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), action="append")
+    parser.add_argument("--images", type=int, default=0, help="images per ad")
+    parser.add_argument("--humanization", default="fast")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--latency-jitter-ms", type=float, default=50)
+    parser.add_argument("--captcha-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(
+        f"{results['posts']} posts on {', '.join(results['platforms'])} "
+        f"at concurrency {results['concurrency']} "
+        f"({results['humanization']} humanization)"
+    )
+    print(f"  posts/min      {results['posts_per_minute']:>10}")
+    print(f"  p50 duration   {results['p50_seconds']:>10} s")
+    print(f"  p99 duration   {results['p99_seconds']:>10} s")
+    print(f"  peak RSS       {results['peak_rss_mb']} MB")
+    print(f"  peak browsers  {results['peak_browsers']}")
+    print(f"  statuses       {results['statuses']}")
+    if results["failures"]:
+        print(f"  failures       {results['failures']}")
+    print(f"  marketplace    {results['marketplace']}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
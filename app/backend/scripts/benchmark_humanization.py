@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Humanization Benchmark
+Compares post duration across humanization profiles (automation.humanize).
+
+Each platform's login and listing form is replayed through the real
+``PlatformAutomationBase`` helpers (random_delay, safe_click, safe_fill)
+against a simulated page on a virtual clock, so a run takes milliseconds yet
+reports the time a real post would spend sleeping, typing and acting.
+
+Usage:
+  python scripts/benchmark_humanization.py
+  python scripts/benchmark_humanization.py --posts 500 --description-chars 2000
+  python scripts/benchmark_humanization.py --platform facebook --profile legacy
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+# Ensure the backend root is importable when running this script directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from automation import base  # noqa: E402
+from automation.humanize import PROFILES  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Virtual cost of page actions (seconds), excluding any humanization
+CLICK_SECONDS = 0.05
+FILL_SECONDS = 0.02
+
+# Steps of each platform's login and listing flow, in the order the platform
+# modules run them: ("delay", min, max), ("click", selector) or
+# ("fill", selector, field) where field names the text to enter.
+FLOWS: dict[str, list[tuple[Any, ...]]] = {
+    "craigslist": [
+        ("delay", 2, 4),
+        ("fill", 'input[name="inputEmailHandle"]', "email"),
+        ("fill", 'input[name="inputPassword"]', "password"),
+        ("click", 'input[type="submit"][value="log in"]'),
+        ("delay", 2, 4),
+        ("delay", 2, 4),
+        ("click", 'input[value="sss"]'),
+        ("click", 'button[type="submit"]'),
+        ("delay", 1, 2),
+        ("click", 'input[value="fuo"]'),
+        ("click", 'button[type="submit"]'),
+        ("delay", 1, 2),
+        ("delay", 1, 2),
+        ("fill", 'input[name="PostingTitle"]', "title"),
+        ("fill", 'input[name="price"]', "price"),
+        ("fill", 'textarea[name="PostingBody"]', "description"),
+        ("fill", 'input[name="postal"]', "postal"),
+        ("click", 'input[value="continue"]'),
+        ("delay", 2, 4),
+        ("click", 'input[value="publish"]'),
+        ("delay", 3, 5),
+    ],
+    "facebook": [
+        ("delay", 2, 4),
+        ("fill", "#email", "email"),
+        ("fill", "#pass", "password"),
+        ("click", 'button[name="login"]'),
+        ("delay", 3, 5),
+        ("delay", 2, 4),
+        ("click", '[data-testid="marketplace-category-furniture"]'),
+        ("delay", 1, 2),
+        ("fill", '[data-testid="marketplace-composer-title-input"]', "title"),
+        ("fill", '[data-testid="marketplace-composer-price-input"]', "price"),
+        (
+            "fill",
+            '[data-testid="marketplace-composer-description-input"]',
+            "description",
+        ),
+        ("fill", '[data-testid="marketplace-composer-location-input"]', "location"),
+        ("click", '[data-testid="marketplace-composer-publish-button"]'),
+        ("delay", 3, 5),
+    ],
+    "offerup": [
+        ("delay", 2, 4),
+        ("fill", 'input[type="email"]', "email"),
+        ("fill", 'input[type="password"]', "password"),
+        ("click", 'button[type="submit"]'),
+        ("delay", 3, 5),
+        ("delay", 2, 4),
+        ("delay", 1, 2),
+        ("fill", 'input[name="title"]', "title"),
+        ("fill", 'input[name="price"]', "price"),
+        ("fill", 'textarea[name="description"]', "description"),
+        ("delay", 0.5, 1.0),
+        ("click", '[data-testid="category-selector"]'),
+        ("delay", 0.5, 1.0),
+        ("click", '[data-testid="category-option-furniture"]'),
+        ("fill", 'input[name="location"]', "location"),
+        ("delay", 1, 2),
+        ("click", '[data-testid="location-suggestion"]'),
+        ("click", 'button[type="submit"]'),
+        ("delay", 3, 6),
+    ],
+}
+
+
+@dataclass
+class Clock:
+    """Virtual time split by what it was spent on"""
+
+    sleeping: float = 0.0
+    typing: float = 0.0
+    acting: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.sleeping + self.typing + self.acting
+
+    async def sleep(self, seconds: float, *args: Any, **kwargs: Any) -> None:
+        self.sleeping += seconds
+
+
+class SimulatedPage:
+    """Page stand-in that charges actions to a virtual clock"""
+
+    def __init__(self, clock: Clock):
+        self.clock = clock
+
+    async def wait_for_selector(self, selector: str, **kwargs: Any) -> None:
+        return None
+
+    async def click(self, selector: str, **kwargs: Any) -> None:
+        self.clock.acting += CLICK_SECONDS
+
+    async def fill(self, selector: str, text: str, **kwargs: Any) -> None:
+        self.clock.acting += FILL_SECONDS
+
+    async def type(self, selector: str, text: str, delay: float = 0) -> None:
+        self.clock.typing += len(text) * delay / 1000
+
+
+class SimulatedPlatform(base.PlatformAutomationBase):
+    """Runs a platform flow through the base class helpers"""
+
+    def __init__(self, platform: str):
+        super().__init__(platform)
+
+    async def login(self, credentials):
+        return True
+
+    async def validate_credentials(self, credentials):
+        return True
+
+    async def post_ad(self, ad_data, credentials):
+        raise NotImplementedError
+
+    def get_supported_categories(self) -> list[str]:
+        return []
+
+    async def run_flow(self, steps: list[tuple[Any, ...]], texts: dict[str, str]):
+        for step in steps:
+            if step[0] == "delay":
+                await self.random_delay(step[1], step[2])
+            elif step[0] == "click":
+                await self.safe_click(step[1])
+            else:
+                await self.safe_fill(step[1], texts[step[2]])
+
+
+def make_texts(description_chars: int) -> dict[str, str]:
+    words = ["solid", "oak", "desk", "great", "condition", "pickup", "only"]
+    description = ""
+    while len(description) < description_chars:
+        description += random.choice(words) + " "
+    return {
+        "email": "seller.account@example.com",
+        "password": "correct-horse-battery",
+        "title": "Solid oak writing desk with drawers, barely used",
+        "price": "150",
+        "description": description[:description_chars],
+        "location": "Austin, TX",
+        "postal": "78701",
+    }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def benchmark(
+    platform: str, profile: str, posts: int, texts: dict[str, str]
+) -> dict[str, float]:
+    simulated = SimulatedPlatform(platform)
+    simulated.humanization = PROFILES[profile]
+    totals, sleeping, typing = [], [], []
+    for _ in range(posts):
+        clock = Clock()
+        simulated.page = SimulatedPage(clock)  # type: ignore[assignment]
+        with mock.patch.object(base.asyncio, "sleep", clock.sleep):
+            await simulated.run_flow(FLOWS[platform], texts)
+        totals.append(clock.total)
+        sleeping.append(clock.sleeping)
+        typing.append(clock.typing)
+    return {
+        "p50": percentile(totals, 50),
+        "p95": percentile(totals, 95),
+        "mean": statistics.mean(totals),
+        "sleeping": statistics.mean(sleeping),
+        "typing": statistics.mean(typing),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--description-chars", type=int, default=1200)
+    parser.add_argument("--platform", choices=sorted(FLOWS), action="append")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        help="legacy, fast, or a platform name; default: legacy, platform, fast",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    texts = make_texts(args.description_chars)
+    print(
+        f"{'platform':<11} {'profile':<11} {'p50 s':>8} {'p95 s':>8} "
+        f"{'sleep s':>8} {'type s':>8}"
+    )
+    for platform in args.platform or sorted(FLOWS):
+        for profile in args.profile or ["legacy", platform, "fast"]:
+            if profile not in PROFILES:
+                parser.error(f"unknown profile {profile}")
+            result = await benchmark(platform, profile, args.posts, texts)
+            print(
+                f"{platform:<11} {profile:<11} {result['p50']:>8.1f} "
+                f"{result['p95']:>8.1f} {result['sleeping']:>8.1f} "
+                f"{result['typing']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""User Search Benchmark
+Compares the legacy unanchored $regex user search with the trigram strategy
+in services.user_search on a synthetic users collection (1M users by default).
+
+Usage:
+  MONGO_URL=mongodb://localhost:27017 python scripts/benchmark_user_search.py
+  python scripts/benchmark_user_search.py --users 100000 --queries 200
+  python scripts/benchmark_user_search.py --sql > bench.sql   # Postgres/pg_trgm
+
+The Mongo benchmark writes to a dedicated database (default
+crosspostme_bench) and never touches application data.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import certifi
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne
+
+# Ensure the backend root is importable when running this script directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.user_search import search_users_mongo, user_search_fields  # noqa: E402
+from scripts.setup_db import setup_users_search_indexes  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "example.com", "shop.io"]
+
+# Seeds and times the same workload on Postgres; run with psql against a
+# scratch database that has supabase_schema.sql applied.
+SQL_BENCHMARK = """\\timing on
+INSERT INTO users (username, email, password_hash)
+SELECT 'user_' || md5(g::text), 'seller' || g || '_' || substr(md5(g::text), 1, 6) || '@example.com', 'x'
+FROM generate_series(1, {users}) AS g
+ON CONFLICT DO NOTHING;
+ANALYZE users;
+
+-- Legacy search (sequential scan)
+EXPLAIN ANALYZE SELECT * FROM users
+WHERE username ILIKE '%a1b2%' OR email ILIKE '%a1b2%' LIMIT 20;
+
+-- Trigram RPC (GIN index scan)
+EXPLAIN ANALYZE SELECT * FROM search_users('a1b2', 20);
+SELECT * FROM search_users('seller42', 20);
+"""
+
+
+def _random_user(i: int) -> dict[str, Any]:
+    handle = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    username = f"{handle}{i}"
+    email = f"{handle}.{i}@{random.choice(DOMAINS)}"
+    return {
+        "id": f"bench-{i}",
+        "username": username,
+        "email": email,
+        "is_active": True,
+        **user_search_fields(username, email),
+    }
+
+
+async def seed_users(db: Any, total: int, batch_size: int = 10000) -> None:
+    """Insert synthetic users unless the collection is already populated"""
+    existing = await db.users.estimated_document_count()
+    if existing >= total:
+        logger.info(f"Reusing {existing} seeded users")
+        return
+
+    logger.info(f"Seeding {total - existing} users...")
+    for start in range(existing, total, batch_size):
+        batch = [
+            InsertOne(_random_user(i)) for i in range(start, min(start + batch_size, total))
+        ]
+        await db.users.bulk_write(batch, ordered=False)
+    await setup_users_search_indexes(db)
+
+
+async def _legacy_search(db: Any, q: str, limit: int) -> list[dict[str, Any]]:
+    query_filter = {
+        "$or": [
+            {"username": {"$regex": q, "$options": "i"}},
+            {"email": {"$regex": q, "$options": "i"}},
+        ],
+    }
+    return await db.users.find(query_filter).limit(limit).to_list(length=limit)
+
+
+async def _time_queries(fn, db: Any, queries: list[str], limit: int) -> list[float]:
+    timings = []
+    for q in queries:
+        started = time.perf_counter()
+        await fn(db, q, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    print(
+        f"{name:<10} n={len(ordered):<5} "
+        f"p50={statistics.median(ordered):8.2f}ms  p95={p95:8.2f}ms  max={ordered[-1]:8.2f}ms",
+    )
+
+
+async def run_mongo(args: argparse.Namespace) -> None:
+    mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+    client_opts = {}
+    if "mongodb+srv" in mongo_url:
+        client_opts.update({"tls": True, "tlsCAFile": certifi.where()})
+    client: Any = AsyncIOMotorClient(mongo_url, **client_opts)  # type: ignore[arg-type]
+    db = client[args.db_name]
+
+    try:
+        await seed_users(db, args.users)
+
+        # Sample real substrings so every query has matches
+        sample = await db.users.aggregate([{"$sample": {"size": args.queries}}]).to_list(
+            args.queries,
+        )
+        queries = []
+        for user in sample:
+            source = random.choice([user["username"], user["email"]])
+            start = random.randint(0, max(len(source) - 4, 0))
+            queries.append(source[start : start + 4])
+
+        print(f"\nUser search benchmark: {args.users} users, {len(queries)} queries")
+        _report("regex", await _time_queries(_legacy_search, db, queries, args.limit))
+        _report("trigram", await _time_queries(search_users_mongo, db, queries, args.limit))
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--db-name",
+        default=os.environ.get("BENCH_DB_NAME", "crosspostme_bench"),
+    )
+    parser.add_argument(
+        "--sql",
+        action="store_true",
+        help="Print the equivalent Postgres benchmark script and exit",
+    )
+    args = parser.parse_args()
+
+    if args.sql:
+        print(SQL_BENCHMARK.format(users=args.users))
+        return
+
+    asyncio.run(run_mongo(args))
+
+
+if __name__ == "__main__":
+    main()
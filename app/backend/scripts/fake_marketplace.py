@@ -0,0 +1,461 @@
+"""Local fake marketplace for automation tests and benchmarks
+Serves static replicas of the Craigslist, Facebook Marketplace and OfferUp
+login and posting pages, built from the selectors the platform automations
+look for, so ``AutomationManager`` can post end to end without touching the
+live sites.
+
+This is a test and benchmark harness, not part of the application. The
+automations keep navigating to their real URLs; a ``FixtureRouter`` added to
+a platform's ``context_hooks`` is installed on each of its browser contexts
+and answers requests for marketplace hosts from the fake marketplace (the
+page still sees the real URL), aborting every other request to keep runs
+offline.
+
+``MarketplaceConfig`` injects page latency, CAPTCHA challenges on the posting
+page and rate-limit rejections on publish, each at a configurable rate.
+
+    with FakeMarketplace(MarketplaceConfig(latency_ms=150)) as marketplace:
+        craigslist = CraigslistAutomation()
+        craigslist.context_hooks.append(FixtureRouter(marketplace.url))
+        manager.register_platform(craigslist)
+        result = await manager.post_to_platform("craigslist", ad, credentials)
+"""
+
+import asyncio
+import html
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
+
+# Marketplace domains (and their subdomains) served by the fake marketplace
+MARKETPLACE_HOSTS = {
+    "craigslist.org": "craigslist",
+    "facebook.com": "facebook",
+    "offerup.com": "offerup",
+}
+
+# Category values each automation selects (see their category_mapping)
+CRAIGSLIST_CATEGORIES = ("ela", "fua", "cta", "rea", "app", "cla", "sga", "tla", "foa")
+FACEBOOK_CATEGORIES = (
+    "ELECTRONICS",
+    "HOME_GARDEN",
+    "VEHICLE",
+    "PROPERTY_RENTALS",
+    "APPAREL",
+    "SPORTING_GOODS",
+    "OTHER",
+)
+OFFERUP_CATEGORIES = (
+    "electronics",
+    "home-garden",
+    "auto-parts",
+    "housing",
+    "clothing-shoes",
+    "sporting-goods",
+    "everything-else",
+)
+
+RATE_LIMIT_MESSAGE = "You are posting too fast. Please wait before posting again."
+
+# Smallest JPEG header; enough for file inputs, which never decode it
+_IMAGE_BYTES = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+
+
+@dataclass
+class MarketplaceConfig:
+    """Latency and failure injection for the fake marketplace"""
+
+    latency_ms: float = 0.0  # added to every page request
+    latency_jitter_ms: float = 0.0  # uniform extra latency on top
+    captcha_rate: float = 0.0  # share of posting pages showing a CAPTCHA
+    rate_limit_rate: float = 0.0  # share of publishes rejected as too fast
+    seed: int | None = None
+
+
+@dataclass
+class MarketplaceStats:
+    """What the fake marketplace served"""
+
+    requests: int = 0
+    captchas: int = 0
+    rate_limited: int = 0
+    published: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "captchas": self.captchas,
+            "rate_limited": self.rate_limited,
+            "published": dict(self.published),
+        }
+
+
+def _page(title: str, body: str, status_code: int = 200) -> HTMLResponse:
+    return HTMLResponse(
+        f"<!doctype html><html><head><title>{title}</title></head>"
+        f"<body>{body}</body></html>",
+        status_code=status_code,
+    )
+
+
+async def _form(request: Request) -> dict[str, str]:
+    """URL-encoded form fields (file inputs are not submitted)"""
+    fields = parse_qs((await request.body()).decode(), keep_blank_values=True)
+    return {name: values[0] for name, values in fields.items()}
+
+
+def create_app(config: MarketplaceConfig | None = None) -> FastAPI:
+    """Fake marketplace app; counters are kept on ``app.state.stats``"""
+    config = config or MarketplaceConfig()
+    stats = MarketplaceStats()
+    rng = random.Random(config.seed)
+    listing_ids = itertools.count(1000)
+
+    app = FastAPI(title="Fake marketplace", docs_url=None, redoc_url=None)
+    app.state.config = config
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def inject_latency(request: Request, call_next):
+        stats.requests += 1
+        delay_ms = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        return await call_next(request)
+
+    def captcha() -> str:
+        if rng.random() >= config.captcha_rate:
+            return ""
+        stats.captchas += 1
+        return '<div class="g-recaptcha" data-sitekey="fake"></div>'
+
+    def rate_limited() -> bool:
+        if rng.random() >= config.rate_limit_rate:
+            return False
+        stats.rate_limited += 1
+        return True
+
+    def published(platform: str) -> int:
+        stats.published[platform] = stats.published.get(platform, 0) + 1
+        return next(listing_ids)
+
+    @app.get("/images/{name}")
+    async def image(name: str) -> Response:
+        return Response(_IMAGE_BYTES, media_type="image/jpeg")
+
+    # Craigslist: login, type and category steps, posting form, preview
+
+    @app.get("/craigslist/login")
+    async def craigslist_login_form():
+        return _page(
+            "craigslist: account log in",
+            '<form method="post" action="/login">'
+            '<input type="text" name="inputEmailHandle">'
+            '<input type="password" name="inputPassword">'
+            '<input type="submit" value="log in">'
+            "</form>",
+        )
+
+    @app.post("/craigslist/login")
+    async def craigslist_login(request: Request):
+        email = html.escape((await _form(request)).get("inputEmailHandle", ""))
+        return _page("craigslist: account", f'<a href="/login/home">{email}</a>')
+
+    @app.get("/craigslist/post")
+    async def craigslist_post_type():
+        return _page(
+            "craigslist: create posting",
+            captcha() + '<form method="get" action="/post/category">'
+            '<label><input type="radio" name="id" value="sss"> for sale by owner'
+            '</label><button type="submit">continue</button></form>',
+        )
+
+    @app.get("/craigslist/post/category")
+    async def craigslist_post_category():
+        options = "".join(
+            f'<label><input type="radio" name="id" value="{code}"> {code}</label>'
+            for code in CRAIGSLIST_CATEGORIES
+        )
+        return _page(
+            "craigslist: choose category",
+            f'<form method="get" action="/post/edit">{options}'
+            '<button type="submit">continue</button></form>',
+        )
+
+    @app.get("/craigslist/post/edit")
+    async def craigslist_post_edit():
+        return _page(
+            "craigslist: create posting",
+            '<form id="postingForm" method="post" action="/post/preview">'
+            '<input type="text" name="PostingTitle">'
+            '<input type="text" name="price">'
+            '<textarea name="PostingBody"></textarea>'
+            '<select name="area"><option>phoenix</option><option>tucson</option>'
+            "<option>flagstaff</option></select>"
+            '<input type="email" name="FromEMail">'
+            '<input type="tel" name="PhoneNumber">'
+            '<input type="file" name="images" multiple>'
+            '<input type="submit" value="continue">'
+            "</form>",
+        )
+
+    @app.post("/craigslist/post/preview")
+    async def craigslist_post_preview(request: Request):
+        title = html.escape((await _form(request)).get("PostingTitle", ""))
+        return _page(
+            "craigslist: preview",
+            f"<h2>{title}</h2>"
+            '<form method="post" action="/post/publish">'
+            f'<input type="hidden" name="PostingTitle" value="{title}">'
+            '<input type="submit" value="publish"></form>',
+        )
+
+    @app.post("/craigslist/post/publish")
+    async def craigslist_post_publish(request: Request):
+        if rate_limited():
+            return _page(
+                "craigslist: error",
+                f'<p class="error">{RATE_LIMIT_MESSAGE}</p>',
+                status_code=429,
+            )
+        host = request.headers.get("x-fixture-host", "phoenix.craigslist.org")
+        listing_id = published("craigslist")
+        return _page(
+            "craigslist: posted",
+            '<p class="posted_success">Your posting is live</p>'
+            f'<a href="https://{host}/fuo/d/listing/{listing_id}.html">'
+            "view your posting</a>",
+        )
+
+    # Facebook Marketplace: login, marketplace home, composer
+
+    @app.get("/facebook/")
+    async def facebook_login_form():
+        return _page(
+            "Facebook - log in",
+            '<button data-testid="cookie-policy-manage-dialog-accept-button" '
+            'onclick="this.remove()">Allow all cookies</button>'
+            '<form data-testid="royal_login_form" method="post" action="/login">'
+            '<input id="email" name="email" type="text">'
+            '<input id="pass" name="pass" type="password">'
+            '<button data-testid="royal_login_button" type="submit">Log in</button>'
+            "</form>",
+        )
+
+    @app.post("/facebook/login")
+    async def facebook_login():
+        return _page("Facebook", '<a href="/marketplace">Marketplace</a>')
+
+    @app.get("/facebook/marketplace")
+    async def facebook_marketplace():
+        return _page(
+            "Marketplace",
+            '<a href="/marketplace" data-testid="marketplace_tab">Marketplace</a>',
+        )
+
+    @app.get("/facebook/marketplace/create")
+    async def facebook_create_form():
+        categories = "".join(
+            f'<button type="button" data-testid="marketplace-category-{category}">'
+            f"{category}</button>"
+            for category in FACEBOOK_CATEGORIES
+        )
+        return _page(
+            "Marketplace - create listing",
+            captcha() + '<form data-testid="marketplace-composer-form" method="post" '
+            f'action="/marketplace/create">{categories}'
+            '<input name="title" data-testid="marketplace-composer-title-input">'
+            '<input name="price" data-testid="marketplace-composer-price-input">'
+            '<textarea name="description" '
+            'data-testid="marketplace-composer-description-input"></textarea>'
+            '<input name="location" '
+            'data-testid="marketplace-composer-location-input">'
+            '<div data-testid="marketplace-composer-photo-upload">Add photos</div>'
+            '<input type="file" accept="image/*" multiple onchange="'
+            "for (const f of this.files) { const d = document.createElement('div');"
+            " d.dataset.testid = 'marketplace-composer-photo-preview';"
+            ' this.after(d); }">'
+            '<button type="submit" '
+            'data-testid="marketplace-composer-publish-button">Publish</button>'
+            "</form>",
+        )
+
+    @app.post("/facebook/marketplace/create")
+    async def facebook_create():
+        if rate_limited():
+            return _page(
+                "Marketplace - error",
+                '<div data-testid="marketplace-error-message">'
+                f"{RATE_LIMIT_MESSAGE}</div>",
+                status_code=429,
+            )
+        listing_id = published("facebook")
+        return _page(
+            "Marketplace",
+            '<div data-testid="marketplace-success-modal">'
+            "Your listing has been posted "
+            f'<a href="/marketplace/item/{listing_id}/">View listing</a></div>',
+        )
+
+    # OfferUp: login, sell form
+
+    @app.get("/offerup/login")
+    async def offerup_login_form():
+        return _page(
+            "OfferUp - log in",
+            '<form method="post" action="/login">'
+            '<input data-testid="email-input" type="email" name="email">'
+            '<input data-testid="password-input" type="password" name="password">'
+            '<button data-testid="login-button" type="submit">Log in</button>'
+            "</form>",
+        )
+
+    @app.post("/offerup/login")
+    async def offerup_login():
+        return _page("OfferUp", '<div data-testid="user-menu">Account</div>')
+
+    @app.get("/offerup/sell")
+    async def offerup_sell_form():
+        categories = "".join(
+            f'<option value="{category}">{category}</option>'
+            for category in OFFERUP_CATEGORIES
+        )
+        return _page(
+            "OfferUp - sell",
+            captcha() + '<form data-testid="sell-form" method="post" action="/sell">'
+            '<input data-testid="title-input" name="title">'
+            '<select data-testid="category-select" name="category">'
+            f"{categories}</select>"
+            '<input data-testid="price-input" name="price">'
+            '<textarea data-testid="description-input" name="description">'
+            "</textarea>"
+            '<input data-testid="location-input" name="location">'
+            '<ul><li class="location-suggestion">Phoenix, AZ</li></ul>'
+            '<input data-testid="image-upload" type="file" multiple>'
+            '<button data-testid="submit-button" type="submit">Post</button>'
+            "</form>",
+        )
+
+    @app.post("/offerup/sell")
+    async def offerup_sell():
+        if rate_limited():
+            return _page(
+                "OfferUp - error",
+                f'<p class="error-message">{RATE_LIMIT_MESSAGE}</p>',
+                status_code=429,
+            )
+        listing_id = published("offerup")
+        return _page(
+            "OfferUp",
+            '<p data-testid="success-message">Your item is now live</p>'
+            f'<a href="/item/detail/{listing_id}">View your item</a>',
+        )
+
+    return app
+
+
+class FakeMarketplace:
+    """Runs the fake marketplace on a local port in a background thread
+
+    A thread of its own keeps the server's latency and CPU use out of the
+    event loop being measured.
+    """
+
+    def __init__(
+        self,
+        config: MarketplaceConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(
+            uvicorn.Config(
+                self.app, host=host, port=port, log_level="warning", lifespan="off"
+            )
+        )
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stats(self) -> MarketplaceStats:
+        return self.app.state.stats
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> None:
+        self._thread = threading.Thread(
+            target=self._server.run, name="fake-marketplace", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Fake marketplace failed to start")
+            time.sleep(0.01)
+        # Port 0 binds a free port; read back the one chosen
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def __enter__(self) -> "FakeMarketplace":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+class FixtureRouter:
+    """Answers marketplace requests in a browser context from a fake marketplace
+
+    Requests keep their real URL in the browser; everything that is neither a
+    marketplace host nor the fake marketplace itself is aborted.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def target(self, url: str) -> str | None:
+        """Fake marketplace URL for a request, or None if not a marketplace"""
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        for domain, platform in MARKETPLACE_HOSTS.items():
+            if host == domain or host.endswith(f".{domain}"):
+                base = urlsplit(self.base_url)
+                path = f"/{platform}{parts.path or '/'}"
+                return urlunsplit((base.scheme, base.netloc, path, parts.query, ""))
+        return None
+
+    async def install(self, context: Any) -> None:
+        await context.route("**/*", self.handle)
+
+    async def handle(self, route: Any) -> None:
+        request = route.request
+        target = self.target(request.url)
+        if target is None:
+            if request.url.startswith(self.base_url):
+                await route.fallback()
+            else:
+                await route.abort("blockedbyclient")
+            return
+        headers = {
+            **request.headers,
+            "x-fixture-host": urlsplit(request.url).hostname or "",
+        }
+        response = await route.fetch(url=target, headers=headers)
+        await route.fulfill(response=response)
@@ -0,0 +1,1187 @@
+"""In-Memory Database Stand-ins
+Motor (mongomock-style) and Supabase client doubles used by
+scripts/benchmark_api.py to run the API without MongoDB or Postgres.
+
+Both keep documents in process and support the subset of each API the routes
+use. ``latency_ms`` adds a simulated round trip to every call, so patterns
+that cost round trips in production (N+1 queries, sequential awaits) cost
+time here too: the Motor stand-in yields to the event loop like Motor does,
+while the Supabase stand-in blocks it like the synchronous supabase-py client.
+
+This module only depends on the standard library (plus bson for ObjectIds),
+so it can be loaded into either app's process.
+"""
+
+import asyncio
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from bson import ObjectId
+
+_MISSING = object()
+
+
+def _clone(value: Any) -> Any:
+    """Copy of a document; leaf values (str, datetime, ObjectId) are immutable"""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+# ==================== DOCUMENT MATCHING ====================
+
+
+def _get(doc: Any, path: str) -> Any:
+    """Value at a dotted path, _MISSING if absent; arrays fan out"""
+    current = doc
+    for part in path.split("."):
+        if isinstance(current, dict):
+            current = current.get(part, _MISSING)
+        elif isinstance(current, list):
+            if part.isdigit():
+                index = int(part)
+                current = current[index] if index < len(current) else _MISSING
+            else:
+                values = [_get(item, part) for item in current]
+                current = [value for value in values if value is not _MISSING]
+        else:
+            return _MISSING
+        if current is _MISSING:
+            return _MISSING
+    return current
+
+
+def _set(doc: dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc: dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _compare(op: str, value: Any, target: Any) -> bool:
+    if value is _MISSING or value is None or target is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > target
+        if op == "$gte":
+            return value >= target
+        if op == "$lt":
+            return value < target
+        return value <= target
+    except TypeError:
+        return False
+
+
+def _candidates(value: Any) -> list[Any]:
+    # An array field matches when the array itself or any element does
+    if isinstance(value, list):
+        return [value, *value]
+    return [value]
+
+
+def _match_operator(op: str, value: Any, target: Any) -> bool:
+    if op == "$eq":
+        return any(candidate == target for candidate in _candidates(value)) or (
+            target is None and value is _MISSING
+        )
+    if op == "$ne":
+        return not _match_operator("$eq", value, target)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return any(_compare(op, candidate, target) for candidate in _candidates(value))
+    if op == "$in":
+        return any(_match_operator("$eq", value, option) for option in target)
+    if op == "$nin":
+        return not _match_operator("$in", value, target)
+    if op == "$all":
+        return all(_match_operator("$eq", value, item) for item in target)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(target)
+    if op == "$regex":
+        pattern = target if hasattr(target, "search") else re.compile(target)
+        return any(
+            isinstance(candidate, str) and pattern.search(candidate) is not None
+            for candidate in _candidates(value)
+        )
+    if op == "$size":
+        return isinstance(value, list) and len(value) == target
+    if op == "$elemMatch":
+        return isinstance(value, list) and any(
+            matches(item, target) for item in value if isinstance(item, dict)
+        )
+    if op == "$not":
+        return not _match_condition(value, target)
+    raise NotImplementedError(f"Unsupported query operator {op}")
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        if "$regex" in condition and "$options" in condition:
+            flags = re.IGNORECASE if "i" in condition["$options"] else 0
+            condition = {
+                **condition,
+                "$regex": re.compile(condition["$regex"], flags),
+            }
+        return all(
+            _match_operator(op, value, target)
+            for op, target in condition.items()
+            if op != "$options"
+        )
+    if hasattr(condition, "search"):
+        return _match_operator("$regex", value, condition)
+    return _match_operator("$eq", value, condition)
+
+
+def matches(doc: dict[str, Any], query: dict[str, Any] | None) -> bool:
+    """Whether doc satisfies a MongoDB query document"""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _match_condition(_get(doc, key), condition):
+            return False
+    return True
+
+
+# ==================== UPDATES AND PROJECTIONS ====================
+
+
+def apply_update(
+    doc: dict[str, Any], update: dict[str, Any], inserting: bool = False
+) -> None:
+    """Apply a MongoDB update document (or replacement) to doc in place"""
+    if not any(key.startswith("$") for key in update):
+        preserved = doc.get("_id")
+        doc.clear()
+        doc.update(_clone(update))
+        if preserved is not None:
+            doc.setdefault("_id", preserved)
+        return
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = _get(doc, path)
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                _set(doc, path, _clone(value))
+            elif op == "$unset":
+                _unset(doc, path)
+            elif op == "$inc":
+                _set(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ("$min", "$max"):
+                if current is _MISSING or (
+                    value < current if op == "$min" else value > current
+                ):
+                    _set(doc, path, value)
+            elif op in ("$push", "$addToSet"):
+                items = (
+                    value["$each"]
+                    if isinstance(value, dict) and "$each" in value
+                    else [value]
+                )
+                array = [] if current is _MISSING else current
+                for item in items:
+                    if op == "$push" or item not in array:
+                        array.append(_clone(item))
+                _set(doc, path, array)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    _set(
+                        doc,
+                        path,
+                        [
+                            item
+                            for item in current
+                            if not (
+                                matches(item, value)
+                                if isinstance(value, dict) and isinstance(item, dict)
+                                else _match_condition(item, value)
+                            )
+                        ],
+                    )
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"Unsupported update operator {op}")
+
+
+def _project(doc: dict[str, Any], projection: Any) -> dict[str, Any]:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = dict.fromkeys(projection, 1)
+    include = [key for key, flag in projection.items() if flag and key != "_id"]
+    if include:
+        projected: dict[str, Any] = {}
+        for path in include:
+            value = _get(doc, path)
+            if value is not _MISSING:
+                _set(projected, path, value)
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    projected = dict(doc)
+    for path, flag in projection.items():
+        if not flag:
+            _unset(projected, path)
+    return projected
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    # MongoDB orders missing/null before everything else
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (2, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, datetime):
+        return (5, value)
+    return (4, str(value))
+
+
+def _sorted(
+    docs: list[dict[str, Any]], spec: list[tuple[str, int]]
+) -> list[dict[str, Any]]:
+    for key, direction in reversed(spec):
+        docs = sorted(
+            docs, key=lambda doc: _sort_key(_get(doc, key)), reverse=direction < 0
+        )
+    return docs
+
+
+def _sort_spec(key_or_list: Any, direction: int | None = None) -> list[tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [(key, value) for key, value in key_or_list]
+
+
+# ==================== AGGREGATION ====================
+
+
+def _expr(doc: dict[str, Any], expression: Any) -> Any:
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            op, args = next(iter(expression.items()))
+            if op.startswith("$"):
+                return _expr_operator(doc, op, args)
+        return {key: _expr(doc, value) for key, value in expression.items()}
+    if isinstance(expression, list):
+        return [_expr(doc, item) for item in expression]
+    return expression
+
+
+def _expr_operator(doc: dict[str, Any], op: str, args: Any) -> Any:
+    if op == "$cond":
+        if isinstance(args, dict):
+            args = [args["if"], args["then"], args["else"]]
+        return _expr(doc, args[1]) if _expr(doc, args[0]) else _expr(doc, args[2])
+    if op == "$literal":
+        return args
+    if op == "$ifNull":
+        value = _expr(doc, args[0])
+        return _expr(doc, args[1]) if value is None else value
+    values = [_expr(doc, arg) for arg in (args if isinstance(args, list) else [args])]
+    if op == "$and":
+        return all(values)
+    if op == "$or":
+        return any(values)
+    if op == "$not":
+        return not values[0]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$ne":
+        return values[0] != values[1]
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(op, values[0], values[1])
+    if op == "$in":
+        return values[0] in values[1]
+    if op == "$add":
+        return sum(value or 0 for value in values)
+    if op == "$multiply":
+        result = 1
+        for value in values:
+            result *= value or 0
+        return result
+    if op == "$divide":
+        return values[0] / values[1] if values[1] else None
+    if op == "$size":
+        return len(values[0] or [])
+    raise NotImplementedError(f"Unsupported expression operator {op}")
+
+
+def _accumulate(op: str, values: list[Any]) -> Any:
+    present = [value for value in values if value is not None]
+    if op == "$sum":
+        return sum(value for value in present if isinstance(value, (int, float)))
+    if op == "$avg":
+        numbers = [value for value in present if isinstance(value, (int, float))]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op == "$min":
+        return min(present, default=None)
+    if op == "$max":
+        return max(present, default=None)
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$last":
+        return values[-1] if values else None
+    if op == "$push":
+        return values
+    if op == "$addToSet":
+        unique: list[Any] = []
+        for value in values:
+            if value not in unique:
+                unique.append(value)
+        return unique
+    raise NotImplementedError(f"Unsupported accumulator {op}")
+
+
+def _group(docs: list[dict[str, Any]], spec: dict[str, Any]) -> list[dict[str, Any]]:
+    groups: dict[str, tuple[Any, list[dict[str, Any]]]] = {}
+    for doc in docs:
+        key = _expr(doc, spec["_id"])
+        groups.setdefault(repr(key), (key, []))[1].append(doc)
+    results = []
+    for key, members in groups.values():
+        result = {"_id": key}
+        for name, accumulator in spec.items():
+            if name == "_id":
+                continue
+            op, expression = next(iter(accumulator.items()))
+            result[name] = _accumulate(op, [_expr(doc, expression) for doc in members])
+        results.append(result)
+    return results
+
+
+def run_pipeline(
+    docs: list[dict[str, Any]],
+    pipeline: list[dict[str, Any]],
+    database: "MemoryDatabase | None" = None,
+) -> list[dict[str, Any]]:
+    """Evaluate an aggregation pipeline over docs
+
+    ``database`` resolves the collections named by ``$unionWith``.
+    """
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            docs = [doc for doc in docs if matches(doc, spec)]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$sort":
+            docs = _sorted(docs, _sort_spec(spec))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$project":
+            computed = {
+                key: value
+                for key, value in spec.items()
+                if not isinstance(value, (int, bool))
+            }
+            flags = {key: value for key, value in spec.items() if key not in computed}
+            projected = []
+            for doc in docs:
+                out = _project(doc, flags) if flags else {"_id": doc.get("_id")}
+                for key, expression in computed.items():
+                    out[key] = _expr(doc, expression)
+                projected.append(out)
+            docs = projected
+        elif name == "$unwind":
+            path = (spec["path"] if isinstance(spec, dict) else spec)[1:]
+            unwound = []
+            for doc in docs:
+                for item in _get(doc, path) or []:
+                    copied = dict(doc)
+                    _set(copied, path, item)
+                    unwound.append(copied)
+            docs = unwound
+        elif name == "$facet":
+            docs = [
+                {key: run_pipeline(docs, sub, database) for key, sub in spec.items()}
+            ]
+        elif name == "$unionWith" and database is not None:
+            spec = spec if isinstance(spec, dict) else {"coll": spec}
+            other = list(database[spec["coll"]].docs)
+            docs = docs + run_pipeline(other, spec.get("pipeline", []), database)
+        else:
+            raise NotImplementedError(f"Unsupported pipeline stage {name}")
+    return docs
+
+
+# ==================== MOTOR STAND-IN ====================
+
+
+@dataclass
+class InsertOneResult:
+    inserted_id: Any
+
+
+@dataclass
+class InsertManyResult:
+    inserted_ids: list[Any]
+
+
+@dataclass
+class UpdateResult:
+    matched_count: int
+    modified_count: int
+    upserted_id: Any = None
+
+
+@dataclass
+class DeleteResult:
+    deleted_count: int
+
+
+@dataclass
+class BulkWriteResult:
+    inserted_count: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    deleted_count: int = 0
+    upserted_count: int = 0
+
+
+class MemoryCursor:
+    """Motor cursor over a snapshot of matching documents"""
+
+    def __init__(
+        self,
+        collection: "MemoryCollection",
+        docs: list[dict[str, Any]],
+        projection: Any = None,
+    ):
+        self._collection = collection
+        self._docs = docs
+        self._projection = projection
+        self._sort: list[tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list: Any, direction: int | None = None) -> "MemoryCursor":
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        return self
+
+    def _results(self) -> list[dict[str, Any]]:
+        docs = _sorted(self._docs, self._sort) if self._sort else self._docs
+        docs = docs[self._skip :]
+        if self._limit:
+            docs = docs[: self._limit]
+        return [_clone(_project(doc, self._projection)) for doc in docs]
+
+    async def to_list(self, length: int | None = None) -> list[dict[str, Any]]:
+        await self._collection.database.round_trip()
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self) -> Any:
+        return self._iterate()
+
+    async def _iterate(self) -> Any:
+        for doc in await self.to_list(None):
+            yield doc
+
+
+class MemoryCollection:
+    """Motor collection stand-in"""
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.docs: list[dict[str, Any]] = []
+        self.indexes: dict[str, Any] = {}
+
+    def _matching(self, query: dict[str, Any] | None) -> list[dict[str, Any]]:
+        return [doc for doc in self.docs if matches(doc, query)]
+
+    def _insert(self, document: dict[str, Any]) -> Any:
+        doc = _clone(document)
+        doc.setdefault("_id", ObjectId())
+        # Motor sets _id on the caller's document too
+        document.setdefault("_id", doc["_id"])
+        self.docs.append(doc)
+        return doc["_id"]
+
+    def _update(
+        self, query: dict[str, Any], update: Any, upsert: bool, many: bool
+    ) -> UpdateResult:
+        targets = self._matching(query)
+        if not many:
+            targets = targets[:1]
+        modified = 0
+        for doc in targets:
+            before = _clone(doc)
+            apply_update(doc, update)
+            modified += doc != before
+        if targets or not upsert:
+            return UpdateResult(len(targets), modified)
+        doc = {
+            key: value
+            for key, value in query.items()
+            if not key.startswith("$") and not isinstance(value, dict)
+        }
+        apply_update(doc, update, inserting=True)
+        return UpdateResult(0, 0, upserted_id=self._insert(doc))
+
+    def _delete(self, query: dict[str, Any], many: bool) -> DeleteResult:
+        targets = self._matching(query)
+        if not many:
+            targets = targets[:1]
+        ids = {id(doc) for doc in targets}
+        self.docs = [doc for doc in self.docs if id(doc) not in ids]
+        return DeleteResult(len(targets))
+
+    def find(
+        self,
+        filter: dict[str, Any] | None = None,
+        projection: Any = None,
+        **kwargs: Any,
+    ) -> MemoryCursor:
+        cursor = MemoryCursor(self, self._matching(filter), projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("skip"):
+            cursor.skip(kwargs["skip"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(
+        self,
+        filter: dict[str, Any] | None = None,
+        projection: Any = None,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        results = await self.find(filter, projection, **kwargs).limit(1).to_list(1)
+        return results[0] if results else None
+
+    async def insert_one(
+        self, document: dict[str, Any], **kwargs: Any
+    ) -> InsertOneResult:
+        await self.database.round_trip()
+        return InsertOneResult(self._insert(document))
+
+    async def insert_many(
+        self, documents: list[dict[str, Any]], **kwargs: Any
+    ) -> InsertManyResult:
+        await self.database.round_trip()
+        return InsertManyResult([self._insert(doc) for doc in documents])
+
+    async def update_one(
+        self, filter: dict[str, Any], update: Any, upsert: bool = False, **kwargs: Any
+    ) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, update, upsert, many=False)
+
+    async def update_many(
+        self, filter: dict[str, Any], update: Any, upsert: bool = False, **kwargs: Any
+    ) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, update, upsert, many=True)
+
+    async def replace_one(
+        self,
+        filter: dict[str, Any],
+        replacement: dict[str, Any],
+        upsert: bool = False,
+        **kwargs: Any,
+    ) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, replacement, upsert, many=False)
+
+    async def delete_one(self, filter: dict[str, Any], **kwargs: Any) -> DeleteResult:
+        await self.database.round_trip()
+        return self._delete(filter, many=False)
+
+    async def delete_many(self, filter: dict[str, Any], **kwargs: Any) -> DeleteResult:
+        await self.database.round_trip()
+        return self._delete(filter, many=True)
+
+    async def find_one_and_update(
+        self,
+        filter: dict[str, Any],
+        update: dict[str, Any],
+        upsert: bool = False,
+        return_document: Any = False,
+        sort: Any = None,
+        projection: Any = None,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        await self.database.round_trip()
+        targets = self._matching(filter)
+        if sort:
+            targets = _sorted(targets, _sort_spec(sort))
+        if targets:
+            doc = targets[0]
+            before = _clone(doc)
+            apply_update(doc, update)
+        elif upsert:
+            result = self._update(filter, update, upsert=True, many=False)
+            before, doc = None, self._matching({"_id": result.upserted_id})[0]
+        else:
+            return None
+        # pymongo's ReturnDocument.AFTER is True
+        chosen = doc if return_document else before
+        return _clone(_project(chosen, projection)) if chosen else None
+
+    async def count_documents(self, filter: dict[str, Any], **kwargs: Any) -> int:
+        await self.database.round_trip()
+        docs = self._matching(filter)
+        if kwargs.get("skip"):
+            docs = docs[kwargs["skip"] :]
+        if kwargs.get("limit"):
+            docs = docs[: kwargs["limit"]]
+        return len(docs)
+
+    async def estimated_document_count(self, **kwargs: Any) -> int:
+        await self.database.round_trip()
+        return len(self.docs)
+
+    async def distinct(
+        self, key: str, filter: dict[str, Any] | None = None, **kwargs: Any
+    ) -> list[Any]:
+        await self.database.round_trip()
+        values: list[Any] = []
+        for doc in self._matching(filter):
+            value = _get(doc, key)
+            for item in value if isinstance(value, list) else [value]:
+                if item is not _MISSING and item not in values:
+                    values.append(item)
+        return values
+
+    def aggregate(self, pipeline: list[dict[str, Any]], **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(
+            self, run_pipeline(list(self.docs), pipeline, self.database)
+        )
+
+    async def bulk_write(
+        self, requests: list[Any], ordered: bool = True, **kwargs: Any
+    ) -> BulkWriteResult:
+        await self.database.round_trip()
+        result = BulkWriteResult()
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self._insert(request._doc)
+                result.inserted_count += 1
+            elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                outcome = self._update(
+                    request._filter,
+                    request._doc,
+                    bool(request._upsert),
+                    many=kind == "UpdateMany",
+                )
+                result.matched_count += outcome.matched_count
+                result.modified_count += outcome.modified_count
+                result.upserted_count += outcome.upserted_id is not None
+            elif kind in ("DeleteOne", "DeleteMany"):
+                outcome = self._delete(request._filter, many=kind == "DeleteMany")
+                result.deleted_count += outcome.deleted_count
+            else:
+                raise NotImplementedError(f"Unsupported bulk operation {kind}")
+        return result
+
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        spec = _sort_spec(keys, 1)
+        name = kwargs.get("name") or "_".join(
+            f"{key}_{direction}" for key, direction in spec
+        )
+        self.indexes[name] = {"key": spec, **kwargs}
+        return name
+
+    async def create_indexes(self, indexes: list[Any], **kwargs: Any) -> list[str]:
+        return [
+            await self.create_index(
+                index.document["key"].items(), name=index.document["name"]
+            )
+            for index in indexes
+        ]
+
+    async def drop_index(self, name: str, **kwargs: Any) -> None:
+        self.indexes.pop(name, None)
+
+    def list_indexes(self, **kwargs: Any) -> MemoryCursor:
+        return MemoryCursor(
+            self,
+            [{"name": name, **spec} for name, spec in self.indexes.items()],
+        )
+
+    async def index_information(self) -> dict[str, Any]:
+        return dict(self.indexes)
+
+
+class MemoryDatabase:
+    """Motor database stand-in; any attribute is a collection"""
+
+    def __init__(self, name: str = "memory", latency_ms: float = 0.0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self._collections: dict[str, MemoryCollection] = {}
+
+    async def round_trip(self) -> None:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    def get_collection(self, name: str, **kwargs: Any) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    async def list_collection_names(self, **kwargs: Any) -> list[str]:
+        return list(self._collections)
+
+    async def command(self, command: Any, **kwargs: Any) -> dict[str, Any]:
+        await self.round_trip()
+        return {"ok": 1.0}
+
+
+class MemoryMotorClient:
+    """AsyncIOMotorClient stand-in handing out MemoryDatabases"""
+
+    def __init__(self, *args: Any, latency_ms: float = 0.0, **kwargs: Any):
+        self.latency_ms = latency_ms
+        self._databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name, self.latency_ms)
+        return self._databases[name]
+
+    def get_database(self, name: str, **kwargs: Any) -> MemoryDatabase:
+        return self[name]
+
+    def close(self) -> None:
+        pass
+
+
+# ==================== SUPABASE STAND-IN ====================
+
+
+@dataclass
+class MemoryResponse:
+    """supabase-py APIResponse stand-in"""
+
+    data: Any
+    count: int | None = None
+
+
+@dataclass
+class _Filter:
+    column: str
+    op: str
+    value: Any
+
+
+def _split_logic(text: str) -> list[str]:
+    """Split a PostgREST logic tree on top-level commas"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"' and (i == 0 or text[i - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_logic(text: str) -> _Filter:
+    """Parse one PostgREST or_() condition (col.op.value, and(...), or(...))"""
+    for group in ("and", "or"):
+        if text.startswith(f"{group}(") and text.endswith(")"):
+            inner = text[len(group) + 1 : -1]
+            return _Filter("", group, [_parse_logic(p) for p in _split_logic(inner)])
+    column, op, value = text.split(".", 2)
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return _Filter(column, op, value)
+
+
+def _row_matches(row: dict[str, Any], condition: _Filter) -> bool:
+    if condition.op == "and":
+        return all(_row_matches(row, part) for part in condition.value)
+    if condition.op == "or":
+        return any(_row_matches(row, part) for part in condition.value)
+    value = row.get(condition.column)
+    if isinstance(condition.value, str) and isinstance(value, (int, float)):
+        # Values parsed from a logic tree are strings
+        condition = _Filter(condition.column, condition.op, float(condition.value))
+    if condition.op == "eq":
+        return value == condition.value
+    if condition.op == "neq":
+        return value != condition.value
+    if condition.op == "in":
+        return value in condition.value
+    if condition.op == "is":
+        return (
+            value is None
+            if condition.value in (None, "null")
+            else value == condition.value
+        )
+    if condition.op in ("like", "ilike"):
+        pattern = re.escape(condition.value).replace("%", ".*").replace("_", ".")
+        flags = re.IGNORECASE if condition.op == "ilike" else 0
+        return (
+            isinstance(value, str) and re.fullmatch(pattern, value, flags) is not None
+        )
+    if condition.op == "contains":
+        return isinstance(value, (list, dict)) and all(
+            item in value for item in condition.value
+        )
+    return _compare(f"${condition.op}", value, condition.value)
+
+
+def _jsonable(row: dict[str, Any]) -> dict[str, Any]:
+    # PostgREST returns JSON, so timestamps come back as ISO strings
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+class MemoryQuery:
+    """supabase-py query builder over a MemorySupabase table"""
+
+    def __init__(self, store: "MemorySupabase", table: str):
+        self._store = store
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count: str | None = None
+        self._payload: Any = None
+        self._on_conflict = "id"
+        self._filters: list[_Filter] = []
+        self._order: list[tuple[str, bool, bool]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single = False
+
+    def select(
+        self, columns: str = "*", count: str | None = None, **kwargs: Any
+    ) -> "MemoryQuery":
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, rows: Any, **kwargs: Any) -> "MemoryQuery":
+        self._action, self._payload = "insert", rows
+        return self
+
+    def upsert(
+        self, rows: Any, on_conflict: str = "id", **kwargs: Any
+    ) -> "MemoryQuery":
+        self._action, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: dict[str, Any], **kwargs: Any) -> "MemoryQuery":
+        self._action, self._payload = "update", values
+        return self
+
+    def delete(self, **kwargs: Any) -> "MemoryQuery":
+        self._action = "delete"
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> "MemoryQuery":
+        self._filters.append(_Filter(column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: Any) -> "MemoryQuery":
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "is", value)
+
+    def like(self, column: str, pattern: str) -> "MemoryQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "MemoryQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def contains(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(column, "contains", value)
+
+    def or_(self, filters: str, **kwargs: Any) -> "MemoryQuery":
+        self._filters.append(_parse_logic(f"or({filters})"))
+        return self
+
+    def match(self, query: dict[str, Any]) -> "MemoryQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def order(
+        self,
+        column: str,
+        desc: bool = False,
+        nullsfirst: bool | None = None,
+        **kwargs: Any,
+    ) -> "MemoryQuery":
+        # Postgres sorts NULLs as larger than any value unless told otherwise
+        self._order.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, size: int, **kwargs: Any) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs: Any) -> "MemoryQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "MemoryQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "MemoryQuery":
+        return self.single()
+
+    def _selected(self, row: dict[str, Any]) -> dict[str, Any]:
+        columns = [column.strip() for column in self._columns.split(",")]
+        if "*" in columns or self._columns == "count":
+            return _clone(row)
+        # Embedded resources ("users(*)") are not modelled
+        return {column: row.get(column) for column in columns if "(" not in column}
+
+    def execute(self) -> MemoryResponse:
+        self._store.round_trip()
+        rows = self._store.tables.setdefault(self._table, [])
+        if self._action in ("insert", "upsert"):
+            payload = (
+                self._payload if isinstance(self._payload, list) else [self._payload]
+            )
+            written = [
+                self._store.write(
+                    self._table, row, self._action == "upsert", self._on_conflict
+                )
+                for row in payload
+            ]
+            return MemoryResponse([_clone(row) for row in written])
+
+        targets = [
+            row for row in rows if all(_row_matches(row, f) for f in self._filters)
+        ]
+        if self._action == "update":
+            for row in targets:
+                row.update(_jsonable(self._payload))
+            return MemoryResponse([_clone(row) for row in targets])
+        if self._action == "delete":
+            ids = {id(row) for row in targets}
+            self._store.tables[self._table] = [
+                row for row in rows if id(row) not in ids
+            ]
+            return MemoryResponse([_clone(row) for row in targets])
+
+        count = len(targets) if self._count else None
+        for column, desc, nullsfirst in reversed(self._order):
+            targets = sorted(
+                targets, key=lambda row: _sort_key(row.get(column)), reverse=desc
+            )
+            targets = sorted(
+                targets, key=lambda row: (row.get(column) is None) != nullsfirst
+            )
+        targets = targets[self._offset :]
+        if self._limit is not None:
+            targets = targets[: self._limit]
+        data = [self._selected(row) for row in targets]
+        if self._single:
+            return MemoryResponse(data[0] if data else None, count)
+        return MemoryResponse(data, count)
+
+
+class _MemoryRpc:
+    def __init__(self, store: "MemorySupabase", fn: str, params: dict[str, Any]):
+        self._store = store
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> MemoryResponse:
+        self._store.round_trip()
+        handler = self._store.rpcs.get(self._fn)
+        if handler is None:
+            raise NotImplementedError(f"No in-memory handler for RPC {self._fn}")
+        return MemoryResponse(handler(self._store, self._params))
+
+
+def _write_with_outbox(store: "MemorySupabase", params: dict[str, Any]) -> Any:
+    # Mirrors write_with_outbox in supabase_schema.sql
+    table, row = params["p_table"], params["p_row"]
+    if params.get("p_match_id") is None:
+        written = store.write(table, row)
+    else:
+        matched = [
+            r
+            for r in store.tables.get(table, [])
+            if r.get("id") == params["p_match_id"]
+        ]
+        if not matched:
+            return None
+        matched[0].update(row)
+        written = matched[0]
+    for entry in params.get("p_outbox") or []:
+        store.write("replication_outbox", {**entry, "attempts": 0})
+    return _clone(written)
+
+
+def _increment_listing_views(store: "MemorySupabase", params: dict[str, Any]) -> None:
+    store.write(
+        "business_intelligence",
+        {
+            "event_type": "listing_view",
+            "event_data": {
+                "listing_id": params["listing_id"],
+                "platform": params["platform_name"],
+            },
+        },
+    )
+
+
+def _apply_listing_analytics_deltas(
+    store: "MemorySupabase", params: dict[str, Any]
+) -> int:
+    # Mirrors apply_listing_analytics_deltas in supabase_schema.sql
+    rows = store.tables.setdefault("analytics", [])
+    for delta in params["p_rows"]:
+        key = (delta["listing_id"], delta["platform"], delta["date"])
+        existing = next(
+            (r for r in rows if (r["listing_id"], r["platform"], r["date"]) == key),
+            None,
+        )
+        if existing is None:
+            store.write("analytics", delta)
+            continue
+        for metric in ("views", "clicks", "favorites", "messages"):
+            existing[metric] = existing.get(metric, 0) + delta.get(metric, 0)
+    return len(params["p_rows"])
+
+
+@dataclass
+class MemorySupabase:
+    """supabase-py Client stand-in with tables held in memory"""
+
+    latency_ms: float = 0.0
+    tables: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    rpcs: dict[str, Callable[["MemorySupabase", dict[str, Any]], Any]] = field(
+        default_factory=lambda: {
+            "write_with_outbox": _write_with_outbox,
+            "increment_listing_views": _increment_listing_views,
+            "apply_listing_analytics_deltas": _apply_listing_analytics_deltas,
+        }
+    )
+    calls: int = 0
+
+    def round_trip(self) -> None:
+        self.calls += 1
+        if self.latency_ms:
+            # supabase-py is synchronous: a request blocks the event loop
+            time.sleep(self.latency_ms / 1000)
+
+    def write(
+        self,
+        table: str,
+        row: dict[str, Any],
+        upsert: bool = False,
+        on_conflict: str = "id",
+    ) -> dict[str, Any]:
+        """Insert a row with column defaults, or merge it into a conflicting one"""
+        rows = self.tables.setdefault(table, [])
+        row = _jsonable(row)
+        if upsert:
+            keys = [key.strip() for key in on_conflict.split(",")]
+            for existing in rows:
+                if all(key in row and existing.get(key) == row[key] for key in keys):
+                    existing.update(row)
+                    return existing
+        stored = {
+            "id": str(uuid.uuid4()),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **row,
+        }
+        rows.append(stored)
+        return stored
+
+    def register_rpc(
+        self, name: str, handler: Callable[["MemorySupabase", dict[str, Any]], Any]
+    ) -> None:
+        self.rpcs[name] = handler
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def from_(self, name: str) -> MemoryQuery:
+        return self.table(name)
+
+    def rpc(
+        self, fn: str, params: dict[str, Any] | None = None, **kwargs: Any
+    ) -> _MemoryRpc:
+        return _MemoryRpc(self, fn, params or {})
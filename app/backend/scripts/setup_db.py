@@ -5,11 +5,18 @@ Sets up MongoDB collections and indexes for optimal performance
 import asyncio
 import logging
 import os
+import sys
+from pathlib import Path
 from typing import Any
 
 import certifi
 from motor.motor_asyncio import AsyncIOMotorClient
 
+# Ensure the backend root is importable when running this script directly
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +40,7 @@ async def setup_database(db) -> None:
         await setup_leads_indexes(db)
         await setup_platform_accounts_indexes(db)
         await setup_secure_credentials_indexes(db)
+        await setup_users_search_indexes(db)
 
         logger.info("Database setup completed successfully")
 
@@ -71,6 +79,13 @@ async def setup_messages_indexes(db) -> None:
         background=True,
     )
 
+    # Keyset pagination index: (sort key, id) tiebreaker for cursor paging
+    await db.messages.create_index(
+        [("user_id", 1), ("received_at", -1), ("id", -1)],
+        name="messages_user_received_id_idx",
+        background=True,
+    )
+
     # Index for platform and status filtering
     await db.messages.create_index(
         [("user_id", 1), ("platform", 1), ("is_read", 1), ("is_responded", 1)],
@@ -99,6 +114,14 @@ async def setup_ads_indexes(db) -> None:
         background=True,
     )
 
+    # Keyset/export index: (sort key, id) tiebreaker so per-user ads stream in
+    # created_at order without an in-memory sort
+    await db.ads.create_index(
+        [("user_id", 1), ("created_at", -1), ("id", -1)],
+        name="ads_user_created_id_idx",
+        background=True,
+    )
+
     # Platform and status index
     await db.ads.create_index(
         [("user_id", 1), ("platforms", 1), ("status", 1)],
@@ -128,6 +151,13 @@ async def setup_leads_indexes(db) -> None:
         background=True,
     )
 
+    # Keyset pagination index: (sort key, id) tiebreaker for cursor paging
+    await db.leads.create_index(
+        [("user_id", 1), ("created_at", -1), ("id", -1)],
+        name="leads_user_created_id_idx",
+        background=True,
+    )
+
     # Contact information index
     await db.leads.create_index(
         [("user_id", 1), ("platform", 1), ("contact_email", 1)],
@@ -190,6 +220,41 @@ async def setup_secure_credentials_indexes(db) -> None:
     logger.info("Secure credentials indexes created")
 
 
+async def setup_users_search_indexes(db) -> None:
+    """Set up indexes for admin user search and backfill derived fields"""
+    from services.user_search import backfill_user_search_fields
+
+    logger.info("Setting up users search indexes...")
+
+    # Multikey trigram indexes for substring search
+    await db.users.create_index(
+        [("username_grams", 1)],
+        name="users_username_grams_idx",
+        background=True,
+    )
+    await db.users.create_index(
+        [("email_grams", 1)],
+        name="users_email_grams_idx",
+        background=True,
+    )
+
+    # Normalized fields for short (prefix) queries
+    await db.users.create_index(
+        [("username_lower", 1)],
+        name="users_username_lower_idx",
+        background=True,
+    )
+    await db.users.create_index(
+        [("email_lower", 1)],
+        name="users_email_lower_idx",
+        background=True,
+    )
+
+    await backfill_user_search_fields(db)
+
+    logger.info("Users search indexes created")
+
+
 async def check_existing_indexes(db) -> None:
     """Check what indexes currently exist"""
     logger.info("Checking existing indexes...")
@@ -200,6 +265,7 @@ async def check_existing_indexes(db) -> None:
         "leads",
         "platform_accounts",
         "secure_credentials",
+        "users",
     ]
 
     for collection_name in collections:
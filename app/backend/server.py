@@ -1,19 +1,21 @@
 import asyncio
 import logging
 import os
+import sys
 import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List
 
-from db import get_typed_db
+from db import close_mongo_db, get_mongo_db, get_typed_db
 from dotenv import load_dotenv
 from fastapi import APIRouter, FastAPI, HTTPException, Response
 from pydantic import BaseModel, ConfigDict, Field
 
 # Import route modules
-from routes import ads, ai, auth, diagrams, platform_oauth, platforms
+from routes import ads, ai, auth, diagrams, enhanced_signup, messages, platform_oauth, platforms
+from services.metrics import PrometheusMiddleware, metrics_response
 from starlette.middleware.cors import CORSMiddleware
 
 ROOT_DIR = Path(__file__).parent
@@ -105,6 +107,30 @@ async def health_check() -> Dict[str, Any]:
         "db_connected": bool(db_ok),
     }
 
+    from services.replication import replication_metrics
+
+    replication = replication_metrics()
+    if replication is not None:
+        payload["replication"] = replication
+
+    from services.ad_renewal import renewal_metrics
+
+    renewals = renewal_metrics()
+    if renewals is not None:
+        payload["ad_renewal"] = renewals
+
+    from services.analytics_views import analytics_view_metrics
+
+    analytics_views = analytics_view_metrics()
+    if analytics_views is not None:
+        payload["analytics_views"] = analytics_views
+
+    from services.listing_analytics import listing_analytics_metrics
+
+    listing_analytics = listing_analytics_metrics()
+    if listing_analytics is not None:
+        payload["listing_analytics"] = listing_analytics
+
     # Optional debug info included only when explicitly enabled via env var
     # to avoid leaking internal cert paths in production logs.
     try:
@@ -154,6 +180,44 @@ async def lifespan(app: FastAPI):
     """Lifespan handler: runs startup validation and index initialization, and closes DB on shutdown."""
     from routes.auth import initialize_auth_indexes
 
+    token_refresh_scheduler = None
+    outbox_replicator = None
+    ad_renewal_engine = None
+    analytics_view_refresher = None
+    listing_analytics_buffer = None
+
+    # Export event loop lag on /metrics
+    from services.metrics import LoopLagMonitor
+
+    loop_lag_monitor = LoopLagMonitor()
+    loop_lag_monitor.start()
+
+    # Keep the analytics materialized views behind the dashboards fresh
+    if os.environ.get("ANALYTICS_VIEW_REFRESH_ENABLED", "true").lower() in ("true", "1", "yes"):
+        try:
+            from services.analytics_views import AnalyticsViewRefresher
+            from supabase_db import get_supabase
+
+            if get_supabase() is not None:
+                analytics_view_refresher = AnalyticsViewRefresher()
+                analytics_view_refresher.start()
+        except Exception as e:
+            analytics_view_refresher = None
+            logger.warning(f"Could not start analytics view refresher: {e}")
+
+    # Coalesce listing view/click counters into batched analytics writes
+    if os.environ.get("LISTING_ANALYTICS_BUFFER_ENABLED", "true").lower() in ("true", "1", "yes"):
+        try:
+            from services.listing_analytics import ListingAnalyticsBuffer
+            from supabase_db import get_supabase
+
+            if get_supabase() is not None:
+                listing_analytics_buffer = ListingAnalyticsBuffer()
+                listing_analytics_buffer.start()
+        except Exception as e:
+            listing_analytics_buffer = None
+            logger.warning(f"Could not start listing analytics buffer: {e}")
+
     # Only validate DB if MongoDB client exists
     if hasattr(db, "db") and db.db is not None:
         # Validate DB connectivity and retry a few times to survive transient
@@ -203,15 +267,87 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Database not configured. Running in limited mode.")
 
+    # Token refresh, outbox replication and ad renewal work on MongoDB
+    # collections, so they run whenever MONGO_URL points at a database
+    mongo_db = get_mongo_db()
+    if mongo_db is not None:
+        # Renew stored OAuth tokens ahead of expiry in the background
+        if os.environ.get("TOKEN_REFRESH_ENABLED", "true").lower() in ("true", "1", "yes"):
+            try:
+                from services.token_refresh import TokenRefreshScheduler
+
+                token_refresh_scheduler = TokenRefreshScheduler(mongo_db)
+                await token_refresh_scheduler.ensure_indexes()
+                token_refresh_scheduler.start()
+            except Exception as e:
+                token_refresh_scheduler = None
+                logger.warning(f"Could not start token refresh scheduler: {e}")
+
+        # Replicate Supabase writes recorded in the outbox into MongoDB
+        if os.environ.get("OUTBOX_REPLICATION_ENABLED", "true").lower() in ("true", "1", "yes"):
+            try:
+                from services.replication import OutboxReplicator
+                from supabase_db import get_supabase
+
+                if get_supabase() is not None:
+                    outbox_replicator = OutboxReplicator(mongo_db)
+                    outbox_replicator.start()
+            except Exception as e:
+                outbox_replicator = None
+                logger.warning(f"Could not start outbox replicator: {e}")
+
+        # Repost auto_renew ads on their platforms when their renewal is due
+        if os.environ.get("AD_RENEWAL_ENABLED", "false").lower() in ("true", "1", "yes"):
+            try:
+                from services.ad_renewal import AdRenewalEngine
+
+                ad_renewal_engine = AdRenewalEngine(mongo_db)
+                await ad_renewal_engine.ensure_indexes()
+                ad_renewal_engine.start()
+            except Exception as e:
+                ad_renewal_engine = None
+                logger.warning(f"Could not start ad renewal engine: {e}")
+    else:
+        logger.info("MONGO_URL not set; token refresh, outbox replication and ad renewal are off")
+
     try:
         yield
     finally:
+        await loop_lag_monitor.stop()
+
+        if token_refresh_scheduler is not None:
+            await token_refresh_scheduler.stop()
+
+        if outbox_replicator is not None:
+            await outbox_replicator.stop()
+
+        if ad_renewal_engine is not None:
+            await ad_renewal_engine.stop()
+
+        if analytics_view_refresher is not None:
+            await analytics_view_refresher.stop()
+
+        # Writes the counts still pending
+        if listing_analytics_buffer is not None:
+            await listing_analytics_buffer.stop()
+
+        from services.platform_oauth_service import close_provider_clients
+
+        await close_provider_clients()
+
+        # Close pooled platform API clients if the automations were loaded
+        automation = sys.modules.get("automation")
+        if automation is not None:
+            await automation.automation_manager.close()
+
         if hasattr(db, "close"):
             try:
                 db.close()
             except Exception as e:
                 logger.warning(f"Error closing database: {e}")
 
+        close_mongo_db()
+
 
 # Create the main app with lifespan handler
 app = FastAPI(lifespan=lifespan)
@@ -226,6 +362,16 @@ app.include_router(platforms.router)
 app.include_router(platform_oauth.router)
 app.include_router(ai.router)
 app.include_router(diagrams.router)
+app.include_router(messages.router)
+# Admin analytics and exports; its /enhanced-signup is served by auth.router
+app.include_router(enhanced_signup.router)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics_response()
+    return Response(content=body, media_type=content_type)
 
 
 app.add_middleware(
@@ -235,3 +381,5 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps every other middleware and times the whole request
+app.add_middleware(PrometheusMiddleware)
@@ -0,0 +1,523 @@
+"""Ad Renewal Engine
+Reposts ads that have ``auto_renew`` enabled on the platforms they are posted
+to, keeping them near the top of marketplace feeds without sellers renewing by
+hand.
+
+Each (ad, platform) pair has one document in ``ad_renewals`` holding its
+``next_renewal_at``. A (status, next_renewal_at) index lets every tick read
+only the due batch, so the cost of a tick depends on how many renewals are
+due rather than on how many ads exist. Claimed renewals are leased (safe
+across app instances), grouped per platform and spread out with jitter at that
+platform's renewal rate, then pushed through ``automation_manager``. Pacing a
+batch can take longer than one lease, so the lease on a platform's remaining
+renewals is extended before each one, and a renewal whose lease was taken over
+by another instance is skipped rather than posted twice.
+
+A successful repost ends the listing it replaces where the platform supports
+it (eBay). The browser automations have no flow for deleting a listing, so on
+those platforms the old listing stays up until it expires; its id is kept in
+``posted_ads.superseded_platform_ad_ids`` so it can be cleaned up.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pymongo
+
+from .periodic import PeriodicService
+
+logger = logging.getLogger(__name__)
+
+# Hours between renewals per platform ("Repost every 48 hours for visibility")
+RENEWAL_INTERVAL_HOURS: dict[str, float] = {
+    "craigslist": 48,
+    "facebook": 48,
+    "offerup": 48,
+    "ebay": 168,
+}
+DEFAULT_RENEWAL_INTERVAL_HOURS = 48.0
+
+# Renewals per minute per platform, kept under each platform's posting limits
+RENEWAL_RATE_PER_MINUTE: dict[str, float] = {
+    "craigslist": 2,
+    "facebook": 4,
+    "offerup": 4,
+    "ebay": 20,
+}
+DEFAULT_RENEWAL_RATE_PER_MINUTE = 2.0
+
+# Fraction of the interval used to spread next renewals so they do not bunch up
+INTERVAL_JITTER = 0.1
+
+MAX_FAILURE_BACKOFF = timedelta(hours=24)
+
+
+def renewal_interval(platform: str) -> timedelta:
+    hours = RENEWAL_INTERVAL_HOURS.get(platform, DEFAULT_RENEWAL_INTERVAL_HOURS)
+    return timedelta(hours=hours)
+
+
+def next_renewal_time(platform: str, after: datetime) -> datetime:
+    """Next renewal after ``after``, jittered by INTERVAL_JITTER of the interval"""
+    interval = renewal_interval(platform)
+    jitter = interval * random.uniform(0, INTERVAL_JITTER)
+    return after + interval + jitter
+
+
+def renewal_spacing(platform: str) -> float:
+    """Seconds between renewals on one platform, with +/-20% jitter"""
+    rate = RENEWAL_RATE_PER_MINUTE.get(platform, DEFAULT_RENEWAL_RATE_PER_MINUTE)
+    return 60.0 / rate * random.uniform(0.8, 1.2)
+
+
+def build_ad_data(ad: dict[str, Any]) -> Any:
+    """AdData for reposting a stored ad"""
+    from automation.base import AdData
+
+    return AdData(
+        title=ad["title"],
+        description=ad["description"],
+        price=ad["price"],
+        category=ad["category"],
+        location=ad["location"],
+        images=ad.get("images", []),
+    )
+
+
+def _as_utc(value: Any) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class AdRenewalEngine(PeriodicService):
+    """Background task that renews due (ad, platform) listings
+
+    ``reconcile`` keeps ``ad_renewals`` in step with ads that opted into
+    auto-renew; ``run_once`` claims and executes one due batch.
+    """
+
+    label = "Ad renewal engine"
+
+    def __init__(
+        self,
+        db: Any,
+        manager: Any = None,
+        credentials: Any = None,
+        interval_seconds: float | None = None,
+        batch_size: int | None = None,
+        lease_seconds: int = 1800,
+        reconcile_every: int = 30,
+    ) -> None:
+        super().__init__(
+            interval_seconds or float(os.getenv("AD_RENEWAL_INTERVAL_SECONDS", "60")),
+            metrics={
+                "renewed": 0,
+                "failed": 0,
+                "rate_limited": 0,
+                "paused": 0,
+                "resumed": 0,
+                "last_batch_size": 0,
+                "last_lag_seconds": 0.0,
+                "max_lag_seconds": 0.0,
+                "renewals_per_minute": 0.0,
+                "last_run_at": None,
+            },
+        )
+        self.db: Any = db
+        self._manager = manager
+        self._credentials = credentials
+        self.batch_size = batch_size or int(os.getenv("AD_RENEWAL_BATCH_SIZE", "200"))
+        self.lease = timedelta(seconds=lease_seconds)
+        # Identifies this instance's leases so an expired one is never reused
+        self.owner = uuid.uuid4().hex
+        self.reconcile_every = reconcile_every
+        self._ticks = 0
+        # Completion timestamps for the rolling one-minute throughput
+        self._completions: deque[float] = deque()
+
+    @property
+    def manager(self) -> Any:
+        if self._manager is None:
+            from automation import automation_manager
+
+            self._manager = automation_manager
+        return self._manager
+
+    @property
+    def credentials(self) -> Any:
+        if self._credentials is None:
+            from automation.credentials import credential_manager
+
+            self._credentials = credential_manager
+        return self._credentials
+
+    async def ensure_indexes(self) -> None:
+        """Create the unique pair index and the due-time index"""
+        specs = [
+            ([("ad_id", 1), ("platform", 1)], {"name": "ad_platform", "unique": True}),
+            (
+                [("status", 1), ("next_renewal_at", 1)],
+                {"name": "status_next_renewal_at"},
+            ),
+        ]
+        for keys, options in specs:
+            try:
+                await self.db.ad_renewals.create_index(keys, **options)
+            except pymongo.errors.OperationFailure as e:
+                if e.code in (85, 86) or "already exists" in str(e):
+                    logger.info("Ad renewal index already exists: %s", e)
+                else:
+                    raise
+
+    async def reconcile(self, batch_size: int = 500) -> int:
+        """Register posted platforms of auto-renew ads that have no renewal entry
+
+        Paused renewals of auto-renew ads that are still posted are resumed,
+        due one renewal interval from now: the seller may have turned
+        auto_renew back on or saved new credentials, and a renewal that still
+        cannot run pauses again at the cost of one attempt per interval.
+
+        Returns:
+            Number of renewal entries created
+
+        """
+        created = 0
+        resumed_before = self.metrics["resumed"]
+        cursor = self.db.ads.find(
+            {"auto_renew": True}, {"_id": 0, "id": 1, "user_id": 1}
+        )
+        batch: list[dict[str, Any]] = []
+
+        async def _flush(ads: list[dict[str, Any]]) -> int:
+            owners = {ad["id"]: ad.get("user_id") for ad in ads}
+            posted = await self.db.posted_ads.find(
+                {"ad_id": {"$in": list(owners)}, "status": "active"},
+                {"_id": 0, "ad_id": 1, "platform": 1, "posted_at": 1},
+            ).to_list(length=None)
+            if not posted:
+                return 0
+            now = datetime.now(timezone.utc)
+            requests = []
+            for pa in posted:
+                pair = {"ad_id": pa["ad_id"], "platform": pa["platform"]}
+                posted_at = _as_utc(pa.get("posted_at")) or now
+                requests.append(
+                    pymongo.UpdateOne(
+                        pair,
+                        {
+                            "$setOnInsert": {
+                                "user_id": owners.get(pa["ad_id"]),
+                                "status": "active",
+                                "failures": 0,
+                                "next_renewal_at": next_renewal_time(
+                                    pa["platform"], posted_at
+                                ),
+                            },
+                        },
+                        upsert=True,
+                    ),
+                )
+                requests.append(
+                    pymongo.UpdateOne(
+                        {**pair, "status": "paused"},
+                        {
+                            "$set": {
+                                "status": "active",
+                                "failures": 0,
+                                "next_renewal_at": next_renewal_time(
+                                    pa["platform"], now
+                                ),
+                            },
+                            "$unset": {"paused_reason": ""},
+                        },
+                    ),
+                )
+            result = await self.db.ad_renewals.bulk_write(requests, ordered=False)
+            # Only the resume updates can modify an existing entry
+            self.metrics["resumed"] += result.modified_count
+            return result.upserted_count
+
+        async for ad in cursor:
+            batch.append(ad)
+            if len(batch) >= batch_size:
+                created += await _flush(batch)
+                batch = []
+        if batch:
+            created += await _flush(batch)
+
+        if created:
+            logger.info(f"Registered {created} ad renewals")
+        if self.metrics["resumed"] > resumed_before:
+            logger.info(
+                f"Resumed {self.metrics['resumed'] - resumed_before} paused ad renewals"
+            )
+        return created
+
+    async def _claim_due(self, now: datetime) -> list[dict[str, Any]]:
+        """Select the next batch of due renewals and lease them to this instance"""
+        due = await (
+            self.db.ad_renewals.find(
+                {
+                    "status": "active",
+                    "next_renewal_at": {"$lte": now},
+                    "$or": [
+                        {"lease_until": {"$exists": False}},
+                        {"lease_until": {"$lte": now}},
+                    ],
+                },
+            )
+            .sort("next_renewal_at", 1)
+            .limit(self.batch_size)
+            .to_list(length=self.batch_size)
+        )
+
+        claimed: list[dict[str, Any]] = []
+        for renewal in due:
+            # Conditional update so only one instance wins each lease
+            result = await self.db.ad_renewals.update_one(
+                {
+                    "_id": renewal["_id"],
+                    "$or": [
+                        {"lease_until": {"$exists": False}},
+                        {"lease_until": {"$lte": now}},
+                    ],
+                },
+                {"$set": {"lease_until": now + self.lease, "lease_owner": self.owner}},
+            )
+            if result.modified_count:
+                claimed.append(renewal)
+        return claimed
+
+    async def _hold(self, queue: list[dict[str, Any]]) -> bool:
+        """Extend this instance's lease on a platform's remaining renewals
+
+        Returns:
+            False when the first renewal's lease expired and another instance
+            claimed it
+
+        """
+        until = datetime.now(timezone.utc) + self.lease
+        first, rest = queue[0], queue[1:]
+        result = await self.db.ad_renewals.update_one(
+            {"_id": first["_id"], "lease_owner": self.owner},
+            {"$set": {"lease_until": until}},
+        )
+        if rest:
+            await self.db.ad_renewals.update_many(
+                {"_id": {"$in": [r["_id"] for r in rest]}, "lease_owner": self.owner},
+                {"$set": {"lease_until": until}},
+            )
+        return bool(result.modified_count)
+
+    async def _pause(self, renewal: dict[str, Any], reason: str) -> None:
+        self.metrics["paused"] += 1
+        await self.db.ad_renewals.update_one(
+            {"_id": renewal["_id"]},
+            {
+                "$set": {"status": "paused", "paused_reason": reason},
+                "$unset": {"lease_until": "", "lease_owner": ""},
+            },
+        )
+
+    async def _renew(self, renewal: dict[str, Any]) -> str:
+        """Repost one (ad, platform) pair and schedule its next renewal"""
+        platform = renewal["platform"]
+        ad = await self.db.ads.find_one({"id": renewal["ad_id"]}, {"_id": 0})
+        if not ad or not ad.get("auto_renew"):
+            await self._pause(renewal, "auto_renew disabled")
+            return "paused"
+
+        credentials = await self.credentials.get_credentials(
+            ad.get("user_id"), platform
+        )
+        if credentials is None:
+            await self._pause(renewal, "missing credentials")
+            return "paused"
+
+        posted = {"ad_id": renewal["ad_id"], "platform": platform}
+        previous = await self.db.posted_ads.find_one(
+            posted, {"_id": 0, "platform_ad_id": 1}
+        )
+        result = await self.manager.post_to_platform(
+            platform, build_ad_data(ad), credentials
+        )
+        now = datetime.now(timezone.utc)
+        status = result.status.value
+
+        if status == "success":
+            posted_update: dict[str, Any] = {
+                "$set": {
+                    "platform_ad_id": result.platform_ad_id,
+                    "post_url": result.post_url,
+                    "posted_at": now.isoformat(),
+                    "renewed_at": now.isoformat(),
+                },
+                "$inc": {"renew_count": 1},
+            }
+            old_id = (previous or {}).get("platform_ad_id")
+            if old_id and old_id != result.platform_ad_id:
+                if not await self._end_listing(platform, old_id, credentials):
+                    posted_update["$push"] = {"superseded_platform_ad_ids": old_id}
+            await self.db.posted_ads.update_one(posted, posted_update)
+            update = {
+                "next_renewal_at": next_renewal_time(platform, now),
+                "last_renewed_at": now,
+                "failures": 0,
+                "last_result": result.to_dict(),
+            }
+            outcome = "renewed"
+        elif status in ("login_required", "account_blocked"):
+            # Needs the seller's attention; retrying would only repeat the failure
+            await self._pause(renewal, status)
+            return "paused"
+        elif status == "rate_limited":
+            update = {
+                "next_renewal_at": now + timedelta(seconds=result.retry_after or 300),
+                "last_result": result.to_dict(),
+            }
+            outcome = "rate_limited"
+        else:
+            failures = int(renewal.get("failures", 0)) + 1
+            backoff = min(
+                timedelta(minutes=15) * 2 ** (failures - 1), MAX_FAILURE_BACKOFF
+            )
+            update = {
+                "next_renewal_at": now + backoff,
+                "failures": failures,
+                "last_result": result.to_dict(),
+            }
+            outcome = "failed"
+
+        await self.db.ad_renewals.update_one(
+            {"_id": renewal["_id"]},
+            {"$set": update, "$unset": {"lease_until": "", "lease_owner": ""}},
+        )
+        return outcome
+
+    async def _end_listing(
+        self, platform: str, platform_ad_id: str, credentials: Any
+    ) -> bool:
+        """End the listing a repost replaced; False if it is still up"""
+        try:
+            result = await self.manager.end_listing(
+                platform, platform_ad_id, credentials
+            )
+        except Exception as e:
+            logger.warning(f"Ending {platform} listing {platform_ad_id} failed: {e}")
+            return False
+        if result is None:
+            return False  # the platform cannot end listings
+        if result.status.value != "success":
+            logger.warning(
+                f"Ending {platform} listing {platform_ad_id} failed: {result.message}"
+            )
+            return False
+        return True
+
+    async def _renew_platform(self, renewals: list[dict[str, Any]]) -> list[str]:
+        """Renew one platform's share of the batch, spaced at its renewal rate"""
+        outcomes = []
+        for i, renewal in enumerate(renewals):
+            if i:
+                await asyncio.sleep(renewal_spacing(renewal["platform"]))
+            if self._stopping.is_set():
+                break
+            try:
+                if not await self._hold(renewals[i:]):
+                    logger.info(
+                        f"Lease on renewal of ad {renewal.get('ad_id')} was taken over"
+                    )
+                    outcomes.append("skipped")
+                    continue
+                outcome = await self._renew(renewal)
+            except Exception as e:
+                logger.warning(
+                    f"Renewal of ad {renewal.get('ad_id')} "
+                    f"on {renewal.get('platform')} failed: {e}",
+                )
+                outcome = "failed"
+            outcomes.append(outcome)
+            if outcome == "renewed":
+                self._completions.append(time.monotonic())
+        return outcomes
+
+    def _record(
+        self, outcomes: list[str], claimed: list[dict[str, Any]], now: datetime
+    ) -> None:
+        for outcome in outcomes:
+            if outcome in ("renewed", "failed", "rate_limited"):
+                self.metrics[outcome] += 1
+
+        due_times = [_as_utc(r.get("next_renewal_at")) for r in claimed]
+        oldest = min((d for d in due_times if d is not None), default=now)
+        lag = max((now - oldest).total_seconds(), 0.0)
+        self.metrics["last_lag_seconds"] = lag
+        self.metrics["max_lag_seconds"] = max(self.metrics["max_lag_seconds"], lag)
+
+        cutoff = time.monotonic() - 60
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+        self.metrics["renewals_per_minute"] = float(len(self._completions))
+
+    async def run_once(self) -> dict[str, int]:
+        """Renew one batch of due listings
+
+        Returns:
+            Counts of claimed renewals by outcome
+
+        """
+        now = datetime.now(timezone.utc)
+        self.metrics["last_run_at"] = now.isoformat()
+        claimed = await self._claim_due(now)
+        self.metrics["last_batch_size"] = len(claimed)
+        if not claimed:
+            self._record([], [], now)
+            return {"claimed": 0, "renewed": 0, "failed": 0}
+
+        by_platform: dict[str, list[dict[str, Any]]] = {}
+        for renewal in claimed:
+            by_platform.setdefault(renewal["platform"], []).append(renewal)
+
+        # Platforms run concurrently; within a platform renewals are spaced out
+        results = await asyncio.gather(
+            *(self._renew_platform(items) for items in by_platform.values()),
+        )
+        outcomes = [o for platform_outcomes in results for o in platform_outcomes]
+        self._record(outcomes, claimed, now)
+
+        stats = {
+            "claimed": len(claimed),
+            "renewed": outcomes.count("renewed"),
+            "failed": len(outcomes) - outcomes.count("renewed"),
+        }
+        logger.info(
+            "Ad renewal batch: %(claimed)d claimed, %(renewed)d renewed, "
+            "%(failed)d not renewed",
+            stats,
+        )
+        return stats
+
+    async def tick(self) -> bool:
+        if self._ticks % self.reconcile_every == 0:
+            await self.reconcile()
+        self._ticks += 1
+        await self.run_once()
+        return False
+
+
+def renewal_metrics() -> dict[str, Any] | None:
+    """Metrics of the renewal engine running in this process, if any"""
+    return AdRenewalEngine.running_metrics()
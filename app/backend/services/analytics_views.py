@@ -0,0 +1,105 @@
+"""Analytics View Refresh
+Keeps the analytics materialized views (``user_stats``, ``industry_breakdown``,
+``revenue_breakdown``, ``marketplace_usage``, ``challenge_breakdown``) fresh so
+dashboards read precomputed rows instead of re-aggregating the whole user base
+on every request.
+
+``AnalyticsViewRefresher`` calls the ``refresh_analytics_views`` RPC on a timer.
+The function refreshes each view with ``REFRESH MATERIALIZED VIEW CONCURRENTLY``
+(readers are not blocked), skips views refreshed within the last interval, and
+returns the ``materialized_view_refreshes`` staleness rows, so several app
+instances can run refreshers without multiplying the work.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+from .periodic import PeriodicService
+
+REFRESH_TABLE = "materialized_view_refreshes"
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def staleness(rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Per-view refresh time and age from ``materialized_view_refreshes`` rows"""
+    now = datetime.now(timezone.utc)
+    views: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        refreshed_at = _parse_timestamp(row.get("refreshed_at"))
+        views[row["view_name"]] = {
+            "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+            "age_seconds": (
+                max((now - refreshed_at).total_seconds(), 0.0) if refreshed_at else None
+            ),
+            "duration_ms": row.get("duration_ms"),
+        }
+    return views
+
+
+class AnalyticsViewRefresher(PeriodicService):
+    """Background task that refreshes the analytics materialized views"""
+
+    label = "Analytics view refresher"
+
+    def __init__(
+        self,
+        supabase_client: Any = None,
+        interval_seconds: float | None = None,
+    ) -> None:
+        super().__init__(
+            interval_seconds
+            or float(os.getenv("ANALYTICS_VIEW_REFRESH_SECONDS", "300")),
+            metrics={
+                "refreshes": 0,
+                "views": {},
+                "last_run_at": None,
+                "last_error": None,
+            },
+        )
+        self.supabase_client = supabase_client
+
+    def _client(self) -> Any:
+        if self.supabase_client is None:
+            from supabase_db import get_supabase
+
+            self.supabase_client = get_supabase()
+        return self.supabase_client
+
+    async def run_once(self) -> dict[str, dict[str, Any]]:
+        """Refresh the views that are older than the interval
+
+        Returns:
+            Staleness of every analytics view after the refresh
+
+        """
+        client = self._client()
+        if client is None:
+            return {}
+        response = await asyncio.to_thread(
+            lambda: client.rpc(
+                "refresh_analytics_views",
+                {"p_max_age_seconds": int(self.interval_seconds)},
+            ).execute(),
+        )
+        views = staleness(response.data or [])
+
+        self.metrics["refreshes"] += 1
+        self.metrics["views"] = views
+        self.metrics["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        return views
+
+
+def analytics_view_metrics() -> dict[str, Any] | None:
+    """Metrics of the refresher running in this process, if any"""
+    return AnalyticsViewRefresher.running_metrics()
@@ -0,0 +1,195 @@
+"""Streaming Exports
+Streams large result sets as NDJSON or CSV without holding them in memory.
+
+Rows are read a page at a time: Supabase tables with keyset queries on
+(order column, id), MongoDB collections through a server-side cursor with a
+bounded batch size. Each page is encoded and handed to a ``StreamingResponse``
+before the next one is read, optionally through an incremental gzip
+compressor, so a worker's memory use depends on the page size and not on the
+size of the export.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_PAGE_SIZE = 1000
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+MEDIA_TYPES = {FORMAT_NDJSON: "application/x-ndjson", FORMAT_CSV: "text/csv"}
+
+
+def _quote(value: Any) -> str:
+    """Quote a PostgREST filter value so dots, commas and colons survive"""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+async def supabase_keyset_rows(
+    client: Any,
+    table: str,
+    columns: str = "*",
+    filters: Callable[[Any], Any] | None = None,
+    order_column: str = "created_at",
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield every matching row of a Supabase table in (order_column, id) order
+
+    Each page continues after the last row of the previous one, so every page
+    is an index range read no matter how deep into the export it is.
+    ``filters`` applies the caller's conditions to each page's query. Pass
+    ``order_column="id"`` to page on the primary key alone. Rows whose
+    ``order_column`` is NULL sort last and are paged on ``id`` alone.
+    """
+
+    def fetch(after: dict[str, Any] | None) -> list[dict[str, Any]]:
+        query = client.table(table).select(columns)
+        if filters is not None:
+            query = filters(query)
+        if after is not None and order_column == "id":
+            query = query.gt("id", after["id"])
+        elif after is not None and after[order_column] is None:
+            query = query.is_(order_column, "null").gt("id", after["id"])
+        elif after is not None:
+            position = _quote(after[order_column])
+            query = query.or_(
+                f"{order_column}.gt.{position},"
+                f"and({order_column}.eq.{position},id.gt.{_quote(after['id'])}),"
+                f"{order_column}.is.null"
+            )
+        query = query.order(order_column, nullsfirst=False)
+        if order_column != "id":
+            query = query.order("id")
+        response = query.limit(page_size).execute()
+        return response.data or []
+
+    last: dict[str, Any] | None = None
+    while True:
+        # supabase-py is synchronous; keep the round trip off the event loop
+        rows = await asyncio.to_thread(fetch, last)
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+
+
+async def mongo_cursor_rows(
+    collection: Any,
+    query: dict[str, Any],
+    sort: list[tuple[str, int]],
+    projection: dict[str, Any] | None = None,
+    batch_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield matching MongoDB documents through a server-side cursor"""
+    projection = {"_id": 0, **(projection or {})}
+    cursor = collection.find(query, projection).sort(sort).batch_size(batch_size)
+    async for document in cursor:
+        yield document
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_default)
+    return value
+
+
+async def encode_ndjson(
+    rows: AsyncIterator[dict[str, Any]], page_size: int = EXPORT_PAGE_SIZE
+) -> AsyncIterator[bytes]:
+    """One JSON document per line, emitted in chunks of page_size rows"""
+    chunk: list[str] = []
+    async for row in rows:
+        chunk.append(json.dumps(row, default=_default))
+        if len(chunk) >= page_size:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+async def encode_csv(
+    rows: AsyncIterator[dict[str, Any]],
+    fields: Iterable[str],
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[bytes]:
+    """CSV with a header row; nested values are written as JSON"""
+    fields = list(fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    async for row in rows:
+        writer.writerow({field: _cell(row.get(field)) for field in fields})
+        pending += 1
+        if pending >= page_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream incrementally into a single gzip member"""
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def streaming_export(
+    rows: AsyncIterator[dict[str, Any]],
+    filename: str,
+    fmt: str = FORMAT_NDJSON,
+    fields: Iterable[str] | None = None,
+    gzip: bool = False,
+) -> StreamingResponse:
+    """Stream rows as an NDJSON or CSV download, optionally gzipped
+
+    CSV needs the column list up front since rows are never buffered.
+    """
+    if fmt == FORMAT_CSV:
+        if fields is None:
+            raise ValueError("CSV exports need a field list")
+        body = encode_csv(rows, fields)
+    elif fmt == FORMAT_NDJSON:
+        body = encode_ndjson(rows)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    filename = f"{filename}.{fmt}"
+    media_type = MEDIA_TYPES[fmt]
+    if gzip:
+        body = gzip_chunks(body)
+        filename = f"{filename}.gz"
+        media_type = "application/gzip"
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{stamp}-{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
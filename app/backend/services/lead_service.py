@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime
 from typing import Any
 
+from services.message_stats import invalidate_message_stats
+
 logger = logging.getLogger(__name__)
 
 # Precompiled regex for strict domain validation
@@ -178,6 +180,7 @@ class LeadService:
                     "$addToSet": {"message_ids": message_data.get("id")},
                 },
             )
+            invalidate_message_stats(existing_lead.get("user_id"))
 
             return bool(result.modified_count > 0)
 
@@ -204,6 +207,7 @@ class LeadService:
                     "$addToSet": {"message_ids": message_data.get("id")},
                 },
             )
+            invalidate_message_stats(message_data.get("user_id"))
         except Exception as e:
             logger.error(f"Error updating lead last contact: {e}", exc_info=True)
 
@@ -238,6 +242,7 @@ class LeadService:
         }
 
         await self.db.leads.insert_one(lead_data)
+        invalidate_message_stats(lead_data["user_id"])
         return lead_id
 
     async def _fuzzy_match_lead(
@@ -0,0 +1,272 @@
+"""Listing Analytics Buffer
+Coalesces listing view/click/favorite/message counts in memory and writes them
+to the ``analytics`` table in batches, so a popular listing costs one row
+update per flush instead of one database write per page view.
+
+Deltas are summed per (listing_id, platform, date) and flushed every
+``LISTING_ANALYTICS_FLUSH_SECONDS`` (or as soon as
+``LISTING_ANALYTICS_MAX_PENDING`` keys are pending) through the
+``apply_listing_analytics_deltas`` RPC, one ``INSERT ... ON CONFLICT DO UPDATE``
+that adds each delta to the row for its ``UNIQUE(listing_id, platform, date)``.
+Pending deltas are flushed when the app shuts down. A crash loses at most one
+flush interval (and at most ``max_pending`` keys) of counts.
+
+One bad row (a listing that was deleted, a ``listing_id`` that is not a uuid)
+fails the whole RPC, so a batch rejected for its data is retried row by row and
+the rows that still fail are quarantined: logged, counted and dropped instead
+of being retried forever.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Any
+
+from .periodic import PeriodicService
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("views", "clicks", "favorites", "messages")
+
+# SQLSTATE classes of errors caused by the rows themselves: data exceptions
+# (invalid uuid) and integrity constraint violations (missing listing)
+ROW_ERROR_CLASSES = ("22", "23")
+
+
+def apply_listing_analytics_deltas(client: Any, rows: list[dict[str, Any]]) -> int:
+    """Add per (listing_id, platform, date) deltas to ``analytics`` in one call
+
+    Returns:
+        How many analytics rows were inserted or updated
+
+    """
+    if not rows:
+        return 0
+    response = client.rpc("apply_listing_analytics_deltas", {"p_rows": rows}).execute()
+    return int(response.data or 0)
+
+
+def _is_row_error(error: Exception) -> bool:
+    """Whether a write was rejected for its data, so retrying cannot succeed"""
+    return str(getattr(error, "code", "") or "")[:2] in ROW_ERROR_CLASSES
+
+
+def delta_row(
+    listing_id: str,
+    platform: str,
+    day: date | None = None,
+    user_id: str | None = None,
+    **counts: int,
+) -> dict[str, Any]:
+    """One ``apply_listing_analytics_deltas`` row"""
+    unknown = set(counts) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unsupported listing analytics metric: {sorted(unknown)}")
+    day = day or datetime.now(timezone.utc).date()
+    return {
+        "listing_id": listing_id,
+        "platform": platform,
+        "date": day.isoformat(),
+        "user_id": user_id,
+        **{metric: counts.get(metric, 0) for metric in METRICS},
+    }
+
+
+class ListingAnalyticsBuffer(PeriodicService):
+    """Sums listing analytics deltas in memory and flushes them in batches
+
+    ``record`` is synchronous and thread-safe (SupabaseDB methods run in worker
+    threads); flushing happens on the event loop the buffer was started on.
+    Rows of a flush that failed because the database was unavailable are put
+    back and retried on the next one. Once ``max_pending`` keys are pending,
+    deltas for new keys are written directly (like SupabaseDB does without a
+    buffer) and only counted in ``metrics["dropped"]`` if that write fails too.
+    """
+
+    label = "Listing analytics buffer"
+
+    def __init__(
+        self,
+        supabase_client: Any = None,
+        flush_interval_seconds: float | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        super().__init__(
+            flush_interval_seconds
+            or float(os.getenv("LISTING_ANALYTICS_FLUSH_SECONDS", "5")),
+            metrics={
+                "recorded": 0,
+                "flushes": 0,
+                "rows_written": 0,
+                "written_directly": 0,
+                "quarantined": 0,
+                "dropped": 0,
+                "pending": 0,
+                "last_flush_ms": 0.0,
+                "last_flush_at": None,
+                "last_error": None,
+            },
+        )
+        self.supabase_client = supabase_client
+        self.max_pending = max_pending or int(
+            os.getenv("LISTING_ANALYTICS_MAX_PENDING", "1000"),
+        )
+
+        self._pending: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+
+    def _client(self) -> Any:
+        if self.supabase_client is None:
+            from supabase_db import get_supabase
+
+            self.supabase_client = get_supabase()
+        return self.supabase_client
+
+    def _merge(self, row: dict[str, Any], force: bool = False) -> bool:
+        """Add a delta row to the pending totals; False when the buffer is full
+
+        ``force`` adds new keys past ``max_pending`` (rows put back after a
+        failed flush, which the next flush takes out again).
+        """
+        key = (row["listing_id"], row["platform"], row["date"])
+        pending = self._pending.get(key)
+        if pending is None:
+            if len(self._pending) >= self.max_pending and not force:
+                return False
+            self._pending[key] = dict(row)
+            return True
+        for metric in METRICS:
+            pending[metric] += row[metric]
+        if pending.get("user_id") is None:
+            pending["user_id"] = row.get("user_id")
+        return True
+
+    def record(
+        self,
+        listing_id: str,
+        platform: str,
+        user_id: str | None = None,
+        day: date | None = None,
+        **counts: int,
+    ) -> None:
+        """Add counts (views=1, clicks=1, ...) for a listing on a platform"""
+        row = delta_row(listing_id, platform, day=day, user_id=user_id, **counts)
+        with self._lock:
+            merged = self._merge(row)
+            self.metrics["recorded"] += 1
+            pending = len(self._pending)
+            self.metrics["pending"] = pending
+
+        # Flush early once the buffer is full instead of waiting for the timer
+        if pending >= self.max_pending:
+            self.wake()
+        if not merged:
+            self._write_directly(row)
+
+    def _write_directly(self, row: dict[str, Any]) -> None:
+        """Write a delta that did not fit into the full buffer right away"""
+        try:
+            apply_listing_analytics_deltas(self._client(), [row])
+        except Exception as e:
+            with self._lock:
+                self.metrics["dropped"] += 1
+            logger.warning(
+                f"Dropped listing analytics delta for {row['listing_id']}: {e}"
+            )
+            return
+        with self._lock:
+            self.metrics["written_directly"] += 1
+
+    def _put_back(self, rows: list[dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self._merge(row, force=True)
+            self.metrics["pending"] = len(self._pending)
+
+    def _write_each(
+        self, client: Any, rows: list[dict[str, Any]]
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Write rows one at a time, quarantining the ones rejected for their data
+
+        Returns:
+            How many analytics rows were written, and the rows to retry because
+            the database became unavailable part way through
+
+        """
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                written += apply_listing_analytics_deltas(client, [row])
+            except Exception as e:
+                if not _is_row_error(e):
+                    return written, rows[i:]
+                with self._lock:
+                    self.metrics["quarantined"] += 1
+                logger.warning(f"Quarantined listing analytics delta {row}: {e}")
+        return written, []
+
+    async def flush(self) -> int:
+        """Write all pending deltas
+
+        Returns:
+            How many analytics rows were written
+
+        """
+        async with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending.values())
+                self._pending = {}
+                self.metrics["pending"] = 0
+            if not rows:
+                return 0
+
+            client = self._client()
+            if client is None:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                written = await asyncio.to_thread(
+                    apply_listing_analytics_deltas, client, rows
+                )
+            except Exception as e:
+                self.metrics["last_error"] = str(e)
+                if not _is_row_error(e):
+                    # Put the deltas back so the next flush retries them
+                    self._put_back(rows)
+                    raise
+                written, retry = await asyncio.to_thread(self._write_each, client, rows)
+                self._put_back(retry)
+
+            self.metrics["flushes"] += 1
+            self.metrics["rows_written"] += written
+            self.metrics["last_flush_ms"] = (time.perf_counter() - started) * 1000
+            self.metrics["last_flush_at"] = datetime.now(timezone.utc).isoformat()
+            return written
+
+    async def run_once(self) -> int:
+        return await self.flush()
+
+    async def on_stop(self) -> None:
+        """Write whatever is still pending"""
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(
+                f"Could not flush listing analytics on shutdown "
+                f"({self.metrics['pending']} rows lost): {e}"
+            )
+
+
+def active_listing_analytics_buffer() -> ListingAnalyticsBuffer | None:
+    """The buffer running in this process, if any"""
+    return ListingAnalyticsBuffer.running()
+
+
+def listing_analytics_metrics() -> dict[str, Any] | None:
+    """Metrics of the buffer running in this process, if any"""
+    return ListingAnalyticsBuffer.running_metrics()
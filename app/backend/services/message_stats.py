@@ -0,0 +1,216 @@
+"""Message and Lead Statistics
+Computes every inbox counter in a single database round trip and keeps the
+result in a short-TTL per-user cache that message and lead writes invalidate.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_LEAD_STATUSES = ["new", "contacted", "qualified", "negotiating"]
+
+MESSAGE_STATS_CACHE_TTL = float(os.getenv("MESSAGE_STATS_CACHE_TTL", "30"))
+MESSAGE_STATS_CACHE_MAX_USERS = int(os.getenv("MESSAGE_STATS_CACHE_MAX_USERS", "10000"))
+# The Supabase fallback only counts messages from the last N days so the RPC
+# reads the recent business_intelligence partitions instead of all of them
+MESSAGE_STATS_SUPABASE_DAYS = int(os.getenv("MESSAGE_STATS_SUPABASE_DAYS", "90"))
+
+
+class MessageStatsCache:
+    """In-process TTL cache of per-user statistics
+
+    Entries expire after ``ttl`` seconds and are dropped explicitly whenever a
+    message or lead for the user changes, so the badge never shows stale
+    counts for longer than one write.
+    """
+
+    def __init__(self, ttl: float, max_users: int) -> None:
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: dict[str, tuple[float, dict[str, Any]]] = {}
+
+    def get(self, user_id: str) -> dict[str, Any] | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, stats = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        return stats
+
+    def set(self, user_id: str, stats: dict[str, Any]) -> None:
+        if len(self._entries) >= self.max_users and user_id not in self._entries:
+            # Evict the entry closest to expiry to bound memory
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            self._entries.pop(oldest, None)
+        self._entries[user_id] = (time.monotonic() + self.ttl, stats)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+
+message_stats_cache = MessageStatsCache(
+    MESSAGE_STATS_CACHE_TTL,
+    MESSAGE_STATS_CACHE_MAX_USERS,
+)
+
+
+def invalidate_message_stats(user_id: str) -> None:
+    """Drop cached statistics after a message or lead write for the user"""
+    message_stats_cache.invalidate(user_id)
+
+
+def build_stats_pipeline(user_id: str, since: str) -> list[dict[str, Any]]:
+    """Aggregation computing message and lead counters in one round trip
+
+    Leads are pulled into the messages pipeline with $unionWith and every
+    counter is computed by a $facet branch over the combined stream.
+    """
+    is_message = {"$match": {"_kind": "message"}}
+    return [
+        {"$match": {"user_id": user_id}},
+        {
+            "$project": {
+                "_kind": {"$literal": "message"},
+                "platform": 1,
+                "is_read": 1,
+                "received_at": 1,
+            },
+        },
+        {
+            "$unionWith": {
+                "coll": "leads",
+                "pipeline": [
+                    {"$match": {"user_id": user_id}},
+                    {"$project": {"_kind": {"$literal": "lead"}, "status": 1}},
+                ],
+            },
+        },
+        {
+            "$facet": {
+                "messages": [
+                    is_message,
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total": {"$sum": 1},
+                            "unread": {
+                                "$sum": {"$cond": [{"$eq": ["$is_read", False]}, 1, 0]},
+                            },
+                            "recent": {
+                                "$sum": {"$cond": [{"$gte": ["$received_at", since]}, 1, 0]},
+                            },
+                        },
+                    },
+                ],
+                "platforms": [
+                    is_message,
+                    {"$group": {"_id": "$platform", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": 10},
+                ],
+                "leads": [
+                    {"$match": {"_kind": "lead"}},
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total": {"$sum": 1},
+                            "active": {
+                                "$sum": {
+                                    "$cond": [
+                                        {"$in": ["$status", ACTIVE_LEAD_STATUSES]},
+                                        1,
+                                        0,
+                                    ],
+                                },
+                            },
+                        },
+                    },
+                ],
+            },
+        },
+    ]
+
+
+def _stats_from_facets(facets: dict[str, Any]) -> dict[str, Any]:
+    messages = (facets.get("messages") or [{}])[0]
+    leads = (facets.get("leads") or [{}])[0]
+    return {
+        "total_messages": messages.get("total", 0),
+        "unread_messages": messages.get("unread", 0),
+        "total_leads": leads.get("total", 0),
+        "active_leads": leads.get("active", 0),
+        "recent_messages_24h": messages.get("recent", 0),
+        "platform_breakdown": [
+            {"platform": stat["_id"], "count": stat["count"]}
+            for stat in facets.get("platforms", [])
+        ],
+    }
+
+
+async def compute_message_stats(db: Any, user_id: str) -> dict[str, Any]:
+    """Compute statistics from MongoDB with a single aggregation"""
+    since = (datetime.now() - timedelta(days=1)).isoformat()
+    result = await db.messages.aggregate(build_stats_pipeline(user_id, since)).to_list(1)
+    return _stats_from_facets(result[0] if result else {})
+
+
+def compute_message_stats_supabase(client: Any, user_id: str) -> dict[str, Any]:
+    """Compute message counters from Supabase via the get_message_stats RPC
+
+    Messages are only logged to business_intelligence on Supabase, so read
+    state and leads are not tracked there and are reported as None rather
+    than zero. total_messages covers the last MESSAGE_STATS_SUPABASE_DAYS.
+    """
+    now = datetime.now()
+    response = client.rpc(
+        "get_message_stats",
+        {
+            "p_user_id": user_id,
+            "p_since": (now - timedelta(days=1)).isoformat(),
+            "p_from": (now - timedelta(days=MESSAGE_STATS_SUPABASE_DAYS)).isoformat(),
+        },
+    ).execute()
+    data = response.data or {}
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return {
+        "total_messages": data.get("total_messages", 0),
+        "unread_messages": None,
+        "total_leads": None,
+        "active_leads": None,
+        "recent_messages_24h": data.get("recent_messages_24h", 0),
+        "platform_breakdown": data.get("platform_breakdown") or [],
+    }
+
+
+async def get_message_stats(
+    db: Any,
+    user_id: str,
+    supabase_client: Any = None,
+) -> dict[str, Any]:
+    """Return cached statistics, recomputing on a miss
+
+    MongoDB holds messages and leads and is the primary source. When the
+    aggregation fails and a Supabase client is available the message counters
+    come from the Supabase RPC instead.
+    """
+    cached = message_stats_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    try:
+        stats = await compute_message_stats(db, user_id)
+    except Exception as e:
+        if supabase_client is None:
+            raise
+        logger.warning(f"Message stats aggregation failed, using Supabase: {e}")
+        stats = compute_message_stats_supabase(supabase_client, user_id)
+
+    message_stats_cache.set(user_id, stats)
+    return stats
@@ -0,0 +1,427 @@
+"""Prometheus Metrics
+Process-wide metrics exported on ``/metrics`` in the Prometheus text format.
+
+- ``PrometheusMiddleware`` records per-route request latency, status codes and
+  requests in flight. Routes are labelled with their path template
+  (``/api/ads/{ad_id}``), never the raw path, to keep label cardinality bounded.
+- ``InstrumentedSupabaseClient`` wraps the Supabase client used by
+  ``SupabaseDB`` and times each ``execute()``, labelled with the table (or RPC)
+  and operation.
+- ``instrument_motor_database`` wraps a Motor database so every collection
+  call is timed, labelled with the collection and operation.
+- ``track_call`` times calls to external services (OpenAI, Stripe, eBay).
+- ``AUTOMATION_STEP_DURATION`` is fed by the step spans of marketplace
+  automations (``automation.tracing``); the ``AUTOMATION_*`` request and byte
+  counters by their request interception (``automation.network``).
+- ``LoopLagMonitor`` exports how late the event loop wakes up a sleeping task,
+  which is the time every other coroutine waits behind blocking work.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+logger = logging.getLogger(__name__)
+
+# Request latencies span fast cached reads to slow AI/marketplace calls
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+)
+DB_CALL_DURATION = Histogram(
+    "db_call_duration_seconds",
+    "Database call latency by backend, table/collection and operation",
+    ["backend", "target", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to external services",
+    ["service", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+AUTOMATION_STEP_DURATION = Histogram(
+    "automation_step_duration_seconds",
+    "Duration of marketplace automation steps by platform and step",
+    ["platform", "step", "outcome"],
+    # Steps range from a single click to a whole multi-minute post
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+AUTOMATION_INTERCEPTED_REQUESTS = Counter(
+    "automation_intercepted_requests_total",
+    "Automation browser requests blocked or stubbed by interception profiles",
+    ["platform", "resource_type", "action"],
+)
+AUTOMATION_BYTES_SAVED = Counter(
+    "automation_bytes_saved_estimate_total",
+    "Estimated bytes not downloaded because requests were intercepted",
+    ["platform"],
+)
+AUTOMATION_BYTES_LOADED = Counter(
+    "automation_bytes_loaded_total",
+    "Bytes downloaded by automation browsers (from Content-Length)",
+    ["platform"],
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop resumed the last lag probe",
+)
+EVENT_LOOP_LAG_MAX = Gauge(
+    "event_loop_lag_max_seconds",
+    "Largest event loop lag seen since the process started",
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Lag probes that resumed later than the stall threshold",
+)
+
+# Label used for requests that did not match any route (404s, probes)
+UNMATCHED_ROUTE = "unmatched"
+
+# Paths excluded from request metrics
+EXCLUDED_PATHS = {"/metrics"}
+
+
+def metrics_response() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# ==================== HTTP ====================
+
+
+def _route_label(scope: dict[str, Any]) -> str:
+    """Path template of the route that handled the request"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency, status and in-flight HTTP requests
+
+    The route is read from the scope after the app has handled the request,
+    since the router only resolves it then.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=_route_label(scope),
+                status=str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+# ==================== EXTERNAL SERVICES ====================
+
+
+@contextmanager
+def track_call(service: str, operation: str) -> Iterator[None]:
+    """Time a call to an external service
+
+    Works for both sync and awaited calls::
+
+        with track_call("openai", "chat.completions"):
+            response = await openai.ChatCompletion.acreate(...)
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_DURATION.labels(
+            service=service, operation=operation, outcome=outcome
+        ).observe(time.perf_counter() - started)
+
+
+def observe_db_call(
+    backend: str, target: str, operation: str, outcome: str, seconds: float
+) -> None:
+    DB_CALL_DURATION.labels(
+        backend=backend, target=target, operation=operation, outcome=outcome
+    ).observe(seconds)
+
+
+@contextmanager
+def track_db_call(backend: str, target: str, operation: str) -> Iterator[None]:
+    """Time one database round trip"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        observe_db_call(
+            backend, target, operation, outcome, time.perf_counter() - started
+        )
+
+
+# ==================== SUPABASE ====================
+
+# Query builder methods that decide the kind of statement executed
+SUPABASE_OPERATIONS = ("select", "insert", "update", "upsert", "delete")
+
+
+class _TimedQuery:
+    """Proxy for a postgrest query builder that times ``execute()``"""
+
+    def __init__(self, builder: Any, target: str, operation: str):
+        self._builder = builder
+        self._target = target
+        self._operation = operation
+
+    def execute(self) -> Any:
+        with track_db_call("supabase", self._target, self._operation):
+            return self._builder.execute()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+        operation = name if name in SUPABASE_OPERATIONS else self._operation
+
+        def chained(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _TimedQuery(result, self._target, operation)
+            return result
+
+        return chained
+
+
+class InstrumentedSupabaseClient:
+    """Supabase client wrapper timing every query and RPC it executes"""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> _TimedQuery:
+        return _TimedQuery(self._client.table(name), name, "query")
+
+    def from_(self, name: str) -> _TimedQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: dict[str, Any] | None = None, **kwargs: Any) -> Any:
+        return _TimedQuery(self._client.rpc(fn, params or {}, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+# ==================== MONGODB ====================
+
+# Collection methods that return a cursor; the round trip happens on iteration
+MOTOR_CURSOR_METHODS = {"find", "aggregate", "list_indexes"}
+
+
+class _TimedCursor:
+    """Motor cursor proxy timing ``to_list()``"""
+
+    def __init__(self, cursor: Any, collection: str, operation: str):
+        self._cursor = cursor
+        self._collection = collection
+        self._operation = operation
+
+    async def to_list(self, *args: Any, **kwargs: Any) -> list[Any]:
+        with track_db_call("mongo", self._collection, self._operation):
+            return await self._cursor.to_list(*args, **kwargs)
+
+    def __aiter__(self) -> Any:
+        # Iteration is left untimed: a histogram sample per document would
+        # mostly measure the driver's local buffer
+        return self._cursor.__aiter__()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            # sort()/limit()/skip() return the cursor itself
+            return self if result is self._cursor else result
+
+        return chained
+
+
+class _TimedCollection:
+    """Motor collection proxy timing each database operation"""
+
+    def __init__(self, collection: Any):
+        self._collection = collection
+        self._name = collection.name
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if _is_collection(attr):
+            return _TimedCollection(attr)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if name in MOTOR_CURSOR_METHODS:
+                return _TimedCursor(attr(*args, **kwargs), self._name, name)
+            started = time.perf_counter()
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self._timed(name, result, started)
+            return _TimedCollection(result) if _is_collection(result) else result
+
+        return call
+
+    async def _timed(self, operation: str, awaitable: Any, started: float) -> Any:
+        # Motor starts the operation when it is called, so time from there
+        outcome = "error"
+        try:
+            result = await awaitable
+            outcome = "ok"
+            return result
+        finally:
+            observe_db_call(
+                "mongo",
+                self._name,
+                operation,
+                outcome,
+                time.perf_counter() - started,
+            )
+
+    def __getitem__(self, name: str) -> "_TimedCollection":
+        return _TimedCollection(self._collection[name])
+
+
+class _TimedDatabase:
+    """Motor database proxy whose collections are timed"""
+
+    def __init__(self, database: Any):
+        self._database = database
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._database, name)
+        return _TimedCollection(attr) if _is_collection(attr) else attr
+
+    def __getitem__(self, name: str) -> _TimedCollection:
+        return _TimedCollection(self._database[name])
+
+    def get_collection(self, name: str, **kwargs: Any) -> _TimedCollection:
+        return _TimedCollection(self._database.get_collection(name, **kwargs))
+
+
+def _is_collection(value: Any) -> bool:
+    # Checked on the class: a Motor database answers any attribute with a
+    # collection of that name
+    return hasattr(type(value), "find_one") and hasattr(value, "name")
+
+
+def instrument_motor_database(database: Any) -> Any:
+    """Wrap a Motor database so every collection call is timed"""
+    if database is None or isinstance(database, _TimedDatabase):
+        return database
+    return _TimedDatabase(database)
+
+
+# ==================== EVENT LOOP LAG ====================
+
+
+class LoopLagMonitor:
+    """Measures event loop lag by timing how late a periodic sleep resumes"""
+
+    def __init__(
+        self,
+        interval_seconds: float | None = None,
+        stall_threshold_seconds: float | None = None,
+    ):
+        self.interval_seconds = interval_seconds or float(
+            os.environ.get("LOOP_LAG_INTERVAL_SECONDS", "0.5")
+        )
+        self.stall_threshold_seconds = stall_threshold_seconds or float(
+            os.environ.get("LOOP_LAG_STALL_SECONDS", "0.1")
+        )
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def record(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        EVENT_LOOP_LAG.set(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+            EVENT_LOOP_LAG_MAX.set(lag)
+        if lag >= self.stall_threshold_seconds:
+            EVENT_LOOP_STALLS.inc()
+            logger.warning(f"Event loop stalled for {lag * 1000:.0f} ms")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.record(loop.time() - expected)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,94 @@
+"""Keyset (cursor) pagination helpers
+Pages are addressed by an opaque cursor over (sort key, id) instead of skip/offset,
+so page 500 costs the same index range scan as page 1.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+# Response header carrying the cursor for endpoints that return a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, item_id: str) -> str:
+    """Encode the (sort key, id) of the last item on a page as an opaque cursor"""
+    if isinstance(sort_value, datetime):
+        payload = {"t": "dt", "v": sort_value.isoformat(), "id": item_id}
+    else:
+        payload = {"v": sort_value, "id": item_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, str]:
+    """Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if payload.get("t") == "dt":
+            value = datetime.fromisoformat(value)
+        return value, str(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from e
+
+
+def keyset_query(
+    query: dict[str, Any],
+    sort_field: str,
+    cursor: str | None,
+    descending: bool = True,
+) -> dict[str, Any]:
+    """Extend a filter so it only matches items after the cursor position
+
+    Results must be sorted with sort_spec() and backed by a compound index
+    ending in (sort_field, id). MongoDB sorts null/missing keys before every
+    value, so they are the tail of a descending scan and the head of an
+    ascending one; a range operator never matches them, so they get their own
+    branch.
+    """
+    if not cursor:
+        return query
+    value, item_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    if value is None:
+        branches = [{sort_field: None, "id": {op: item_id}}]
+        if not descending:
+            branches.append({sort_field: {"$ne": None}})
+    else:
+        branches = [
+            {sort_field: {op: value}},
+            {sort_field: value, "id": {op: item_id}},
+        ]
+        if descending:
+            branches.append({sort_field: None})
+    after = {"$or": branches}
+    return {"$and": [query, after]} if query else after
+
+
+def sort_spec(sort_field: str, descending: bool = True) -> list[tuple[str, int]]:
+    """Sort specification matching keyset_query (sort key, then id tiebreaker)"""
+    direction = -1 if descending else 1
+    return [(sort_field, direction), ("id", direction)]
+
+
+def next_cursor(items: list[dict[str, Any]], sort_field: str, limit: int) -> str | None:
+    """Return the cursor for the following page, or None if this was the last
+
+    Callers fetch limit + 1 rows; the extra row only signals that more exist
+    and is trimmed from ``items`` in place.
+    """
+    if len(items) <= limit:
+        return None
+    del items[limit:]
+    last = items[-1]
+    return encode_cursor(last.get(sort_field), str(last.get("id")))
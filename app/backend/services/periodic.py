@@ -0,0 +1,124 @@
+"""Periodic Background Services
+Shared lifecycle for the background loops that run next to the API (token
+refresh, outbox replication, ad renewal, analytics view refresh and listing
+analytics flushing).
+
+A ``PeriodicService`` runs ``tick`` on the event loop it was started on, waits
+``interval_seconds`` between ticks (less when ``wake`` is called or ``tick``
+reports more work), logs and records tick failures in ``metrics`` and keeps
+the instance running in this process reachable for health/metrics reporting.
+"""
+
+import asyncio
+import logging
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Seconds ``stop`` waits for the current tick before cancelling it
+STOP_TIMEOUT_SECONDS = 10
+
+S = TypeVar("S", bound="PeriodicService")
+
+# Service running in this process, per service class
+_running: dict[type, "PeriodicService"] = {}
+
+
+class PeriodicService:
+    """Base class for a background loop that calls ``tick`` on a timer
+
+    Subclasses set ``label`` and implement ``run_once``, or override ``tick``
+    when a run can report that more work is already waiting. ``on_stop`` runs
+    once the loop has exited, e.g. to write out buffered state.
+    """
+
+    label = "Periodic service"
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        metrics: dict[str, Any] | None = None,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.metrics: dict[str, Any] = metrics if metrics is not None else {}
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> Any:
+        raise NotImplementedError
+
+    async def tick(self) -> bool:
+        """Run once; True when more work is waiting and the loop should not sleep"""
+        await self.run_once()
+        return False
+
+    async def on_stop(self) -> None:
+        """Called by ``stop`` after the loop has exited"""
+
+    def wake(self) -> None:
+        """Run the next tick now instead of at the end of the interval
+
+        Safe to call from any thread.
+        """
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.tick():
+                    continue
+            except Exception as e:
+                self.metrics["last_error"] = str(e)
+                logger.warning(f"{self.label} tick failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the background loop on the running event loop"""
+        _running[type(self)] = self
+        self._loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._wake.clear()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"{self.label} started")
+
+    async def stop(self) -> None:
+        """Stop the background loop and run ``on_stop``"""
+        if _running.get(type(self)) is self:
+            del _running[type(self)]
+        self._stopping.set()
+        self._wake.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=STOP_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+            logger.info(f"{self.label} stopped")
+        await self.on_stop()
+        self._loop = None
+
+    @classmethod
+    def running(cls: type[S]) -> S | None:
+        """The instance of this service running in this process, if any"""
+        service = _running.get(cls)
+        return service if isinstance(service, cls) else None
+
+    @classmethod
+    def running_metrics(cls) -> dict[str, Any] | None:
+        """Metrics of the instance running in this process, if any"""
+        service = cls.running()
+        return dict(service.metrics) if service is not None else None
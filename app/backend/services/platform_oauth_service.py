@@ -17,6 +17,63 @@ from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 is used when the optional ``h2`` package is installed (httpx[http2])
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Seconds before expiry at which a stored token is considered due for refresh
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "600"))
+
+# App-lifetime pooled HTTP clients, one per OAuth provider
+_provider_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_provider_client(platform: str) -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client for an OAuth provider
+
+    Clients are created lazily and reused for the lifetime of the process so
+    token exchanges and refreshes reuse warm TCP/TLS connections.
+    """
+    client = _provider_clients.get(platform)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=10,
+                keepalive_expiry=60.0,
+            ),
+        )
+        _provider_clients[platform] = client
+    return client
+
+
+async def close_provider_clients() -> None:
+    """Close all pooled provider clients (call on application shutdown)"""
+    clients = list(_provider_clients.values())
+    _provider_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing OAuth HTTP client: {e}")
+
+
+def compute_token_expiry(expires_in: Any, now: datetime | None = None) -> datetime | None:
+    """Convert an OAuth ``expires_in`` value (seconds) to an absolute expiry time"""
+    try:
+        seconds = int(expires_in)
+    except (TypeError, ValueError):
+        return None
+    if seconds <= 0:
+        return None
+    return (now or datetime.utcnow()) + timedelta(seconds=seconds)
+
 
 class PlatformOAuthService:
     """Service for handling OAuth integrations with marketplace platforms"""
@@ -365,24 +422,24 @@ class PlatformOAuthService:
             "code": code,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(config["token_url"], data=params)
-            if response.status_code != 200:
-                error_text = response.text
-                raise Exception(f"Facebook token exchange failed: {error_text}")
+        client = get_provider_client("facebook")
+        response = await client.post(config["token_url"], data=params)
+        if response.status_code != 200:
+            error_text = response.text
+            raise Exception(f"Facebook token exchange failed: {error_text}")
 
-            token_data = response.json()
-            if not isinstance(token_data, dict):
-                token_data = {}
+        token_data = response.json()
+        if not isinstance(token_data, dict):
+            token_data = {}
 
-            # Get user info
-            user_info_url = f"{config['api_base']}/me?access_token={token_data.get('access_token', '')}&fields=id,name,email"
-            user_response = await client.get(user_info_url)
-            if user_response.status_code == 200:
-                user_info = user_response.json()
-                token_data["user_info"] = user_info
+        # Get user info
+        user_info_url = f"{config['api_base']}/me?access_token={token_data.get('access_token', '')}&fields=id,name,email"
+        user_response = await client.get(user_info_url)
+        if user_response.status_code == 200:
+            user_info = user_response.json()
+            token_data["user_info"] = user_info
 
-            return dict(token_data)
+        return dict(token_data)
 
     async def _exchange_ebay_token(
         self,
@@ -407,115 +464,115 @@ class PlatformOAuthService:
             "redirect_uri": redirect_uri,
         }
 
-        async with httpx.AsyncClient() as client:
+        client = get_provider_client("ebay")
+        try:
+            response = await client.post(
+                config["token_url"],
+                headers=headers,
+                data=data,
+                timeout=30.0,
+            )
+
+            if response.status_code == 200:
+                token_data = response.json()
+                return dict(token_data) if isinstance(token_data, dict) else {}
+
+            # Handle specific eBay error responses
             try:
-                response = await client.post(
-                    config["token_url"],
-                    headers=headers,
-                    data=data,
-                    timeout=30.0,
+                error_response = response.json()
+                error_code = error_response.get("error", "unknown_error")
+                error_description = error_response.get(
+                    "error_description",
+                    "Unknown error occurred",
                 )
 
-                if response.status_code == 200:
-                    token_data = response.json()
-                    return dict(token_data) if isinstance(token_data, dict) else {}
-
-                # Handle specific eBay error responses
-                try:
-                    error_response = response.json()
-                    error_code = error_response.get("error", "unknown_error")
-                    error_description = error_response.get(
-                        "error_description",
-                        "Unknown error occurred",
-                    )
-
-                    # Sanitize and map eBay-specific errors to user-friendly messages
-                    if error_code == "invalid_grant":
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Authorization code expired or invalid. Please try connecting again.",
-                        )
-                    if error_code == "invalid_client":
-                        logger.error(
-                            f"eBay OAuth client credentials invalid: {error_response}",
-                        )
-                        raise HTTPException(
-                            status_code=500,
-                            detail="eBay integration configuration error. Please contact support.",
-                        )
-                    if error_code == "unsupported_grant_type":
-                        logger.error(f"eBay OAuth grant type error: {error_response}")
-                        raise HTTPException(
-                            status_code=500,
-                            detail="eBay integration configuration error. Please contact support.",
-                        )
-                    if error_code == "invalid_scope":
-                        logger.error(f"eBay OAuth scope error: {error_response}")
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Requested eBay permissions are not available. Please contact support.",
-                        )
-                    # Log full error for debugging but return sanitized message
-                    logger.error(f"eBay token exchange error: {error_response}")
+                # Sanitize and map eBay-specific errors to user-friendly messages
+                if error_code == "invalid_grant":
                     raise HTTPException(
                         status_code=400,
-                        detail=f"eBay authorization failed: {error_description[:100]}",
+                        detail="Authorization code expired or invalid. Please try connecting again.",
                     )
-
-                except (ValueError, KeyError):
-                    # Response is not valid JSON or missing expected fields
+                if error_code == "invalid_client":
                     logger.error(
-                        f"eBay token exchange non-JSON error response: {response.status_code} - {response.text[:200]}",
+                        f"eBay OAuth client credentials invalid: {error_response}",
+                    )
+                    raise HTTPException(
+                        status_code=500,
+                        detail="eBay integration configuration error. Please contact support.",
                     )
-                    if response.status_code == 400:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Invalid authorization request. Please try connecting again.",
-                        )
-                    if response.status_code == 401:
-                        raise HTTPException(
-                            status_code=500,
-                            detail="eBay integration authentication error. Please contact support.",
-                        )
-                    if response.status_code == 403:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="eBay access denied. Please check your account permissions.",
-                        )
-                    if response.status_code >= 500:
-                        raise HTTPException(
-                            status_code=503,
-                            detail="eBay service temporarily unavailable. Please try again later.",
-                        )
+                if error_code == "unsupported_grant_type":
+                    logger.error(f"eBay OAuth grant type error: {error_response}")
+                    raise HTTPException(
+                        status_code=500,
+                        detail="eBay integration configuration error. Please contact support.",
+                    )
+                if error_code == "invalid_scope":
+                    logger.error(f"eBay OAuth scope error: {error_response}")
                     raise HTTPException(
                         status_code=400,
-                        detail="eBay authorization failed. Please try again.",
+                        detail="Requested eBay permissions are not available. Please contact support.",
                     )
-
-            except httpx.TimeoutException:
-                logger.error("eBay token exchange timeout")
+                # Log full error for debugging but return sanitized message
+                logger.error(f"eBay token exchange error: {error_response}")
                 raise HTTPException(
-                    status_code=503,
-                    detail="eBay service timeout. Please try again.",
-                )
-            except httpx.RequestError as e:
-                logger.error(f"eBay token exchange network error: {e!s}")
-                raise HTTPException(
-                    status_code=503,
-                    detail="Network error connecting to eBay. Please try again.",
+                    status_code=400,
+                    detail=f"eBay authorization failed: {error_description[:100]}",
                 )
-            except HTTPException:
-                # Re-raise our custom HTTP exceptions
-                raise
-            except Exception as e:
-                logger.exception(
-                    f"Unexpected error during eBay token exchange: {e!s}",
+
+            except (ValueError, KeyError):
+                # Response is not valid JSON or missing expected fields
+                logger.error(
+                    f"eBay token exchange non-JSON error response: {response.status_code} - {response.text[:200]}",
                 )
+                if response.status_code == 400:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Invalid authorization request. Please try connecting again.",
+                    )
+                if response.status_code == 401:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="eBay integration authentication error. Please contact support.",
+                    )
+                if response.status_code == 403:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="eBay access denied. Please check your account permissions.",
+                    )
+                if response.status_code >= 500:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="eBay service temporarily unavailable. Please try again later.",
+                    )
                 raise HTTPException(
-                    status_code=500,
-                    detail="Unexpected error during eBay authorization. Please try again.",
+                    status_code=400,
+                    detail="eBay authorization failed. Please try again.",
                 )
 
+        except httpx.TimeoutException:
+            logger.error("eBay token exchange timeout")
+            raise HTTPException(
+                status_code=503,
+                detail="eBay service timeout. Please try again.",
+            )
+        except httpx.RequestError as e:
+            logger.error(f"eBay token exchange network error: {e!s}")
+            raise HTTPException(
+                status_code=503,
+                detail="Network error connecting to eBay. Please try again.",
+            )
+        except HTTPException:
+            # Re-raise our custom HTTP exceptions
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Unexpected error during eBay token exchange: {e!s}",
+            )
+            raise HTTPException(
+                status_code=500,
+                detail="Unexpected error during eBay authorization. Please try again.",
+            )
+
     async def store_platform_credentials(
         self,
         user_id: str,
@@ -578,7 +635,12 @@ class PlatformOAuthService:
         platform: str,
         token_data: dict[str, Any],
     ) -> None:
-        """Store OAuth token securely"""
+        """Store OAuth token securely
+
+        ``expires_at`` is derived from ``expires_in`` so the refresh scheduler
+        can walk tokens in expiry order via the (status, expires_at) index.
+        """
+        now = datetime.utcnow()
         await self.db.platform_tokens.update_one(
             {"user_id": user_id, "platform": platform},
             {
@@ -589,16 +651,156 @@ class PlatformOAuthService:
                     "refresh_token": token_data.get("refresh_token"),
                     "token_type": token_data.get("token_type", "Bearer"),
                     "expires_in": token_data.get("expires_in"),
+                    "expires_at": compute_token_expiry(
+                        token_data.get("expires_in"),
+                        now,
+                    ),
                     "scope": token_data.get("scope"),
                     "user_info": token_data.get("user_info", {}),
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow(),
+                    "created_at": now,
+                    "updated_at": now,
                     "status": "active",
+                    "refresh_failures": 0,
                 },
+                "$unset": {"refresh_error": "", "refresh_lease_until": ""},
             },
             upsert=True,
         )
 
+    async def refresh_platform_token(self, token_doc: dict[str, Any]) -> bool:
+        """Refresh a stored OAuth token and persist the renewed values
+
+        Args:
+            token_doc: Document from the platform_tokens collection
+
+        Returns:
+            True if the token was renewed, False otherwise
+
+        """
+        platform = token_doc.get("platform")
+        config = self.oauth_configs.get(platform or "", {})
+
+        try:
+            if platform == "facebook":
+                token_data = await self._refresh_facebook_token(token_doc, config)
+            elif platform == "ebay":
+                token_data = await self._refresh_ebay_token(token_doc, config)
+            else:
+                logger.warning(f"Token refresh not supported for {platform}")
+                return False
+        except Exception as e:
+            logger.warning(
+                f"Token refresh failed for {platform} user {token_doc.get('user_id')}: {e!s}",
+            )
+            await self.db.platform_tokens.update_one(
+                {"user_id": token_doc.get("user_id"), "platform": platform},
+                {
+                    "$set": {"refresh_error": str(e)[:200]},
+                    "$inc": {"refresh_failures": 1},
+                },
+            )
+            return False
+
+        now = datetime.utcnow()
+        updates: dict[str, Any] = {
+            "access_token": token_data.get("access_token"),
+            "expires_in": token_data.get("expires_in"),
+            "expires_at": compute_token_expiry(token_data.get("expires_in"), now),
+            "updated_at": now,
+            "last_refreshed_at": now,
+            "refresh_failures": 0,
+        }
+        # eBay only rotates refresh tokens occasionally; keep the old one otherwise
+        if token_data.get("refresh_token"):
+            updates["refresh_token"] = token_data["refresh_token"]
+
+        await self.db.platform_tokens.update_one(
+            {"user_id": token_doc.get("user_id"), "platform": platform},
+            {
+                "$set": updates,
+                "$unset": {"refresh_error": "", "refresh_lease_until": ""},
+            },
+        )
+        return True
+
+    async def _refresh_facebook_token(
+        self,
+        token_doc: dict[str, Any],
+        config: dict,
+    ) -> dict[str, Any]:
+        """Renew a Facebook long-lived user token via fb_exchange_token"""
+        params = {
+            "grant_type": "fb_exchange_token",
+            "client_id": config.get("client_id"),
+            "client_secret": config.get("client_secret"),
+            "fb_exchange_token": token_doc.get("access_token"),
+        }
+
+        client = get_provider_client("facebook")
+        response = await client.get(config["token_url"], params=params)
+        if response.status_code != 200:
+            raise Exception(f"Facebook token refresh failed: {response.text[:200]}")
+
+        token_data = response.json()
+        return dict(token_data) if isinstance(token_data, dict) else {}
+
+    async def _refresh_ebay_token(
+        self,
+        token_doc: dict[str, Any],
+        config: dict,
+    ) -> dict[str, Any]:
+        """Mint a new eBay user access token from the stored refresh token"""
+        refresh_token = token_doc.get("refresh_token")
+        if not refresh_token:
+            raise Exception("No refresh token stored for eBay")
+
+        auth_string = f"{config.get('client_id')}:{config.get('client_secret')}"
+        auth_b64 = base64.b64encode(auth_string.encode("ascii")).decode("ascii")
+
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {auth_b64}",
+        }
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            "scope": token_doc.get("scope") or config.get("scope"),
+        }
+
+        client = get_provider_client("ebay")
+        response = await client.post(config["token_url"], headers=headers, data=data)
+        if response.status_code != 200:
+            raise Exception(f"eBay token refresh failed: {response.text[:200]}")
+
+        token_data = response.json()
+        return dict(token_data) if isinstance(token_data, dict) else {}
+
+    async def get_valid_token(self, user_id: str, platform: str) -> str | None:
+        """Get a usable access token for posting
+
+        The refresh scheduler renews tokens ahead of expiry, so this normally
+        returns the stored token without a network round trip. A token that is
+        already expired (e.g. the scheduler was down) is refreshed inline.
+        """
+        token_doc = await self.db.platform_tokens.find_one(
+            {"user_id": user_id, "platform": platform, "status": "active"},
+        )
+        if not token_doc:
+            return None
+
+        expires_at = token_doc.get("expires_at")
+        if expires_at is None or expires_at > datetime.utcnow():
+            return token_doc.get("access_token")
+
+        logger.info(f"Stored {platform} token for user {user_id} expired; refreshing inline")
+        if not await self.refresh_platform_token(token_doc):
+            return None
+
+        refreshed = await self.db.platform_tokens.find_one(
+            {"user_id": user_id, "platform": platform, "status": "active"},
+        )
+        return refreshed.get("access_token") if refreshed else None
+
     def _encrypt_credentials(self, credentials: dict[str, str]) -> str:
         """Encrypt credentials using Fernet symmetric encryption
 
@@ -0,0 +1,362 @@
+"""Outbox Replication
+Replicates Supabase (primary) writes to MongoDB during the migration without a
+second database round trip in the request path.
+
+Handlers call ``write_with_outbox``, which runs the primary insert/update and
+records the matching MongoDB operations in ``replication_outbox`` inside one
+Postgres transaction (the ``write_with_outbox`` RPC), so MongoDB can never miss
+a committed write. ``OutboxReplicator`` drains the outbox in the background,
+applying each batch as ordered ``bulk_write`` calls per collection, retrying
+failed rows with backoff and tracking replication lag. A row MongoDB rejects
+``max_attempts`` times is moved to ``replication_outbox_dead_letter`` so it
+stops holding back newer writes to its document.
+
+Outbox operations are idempotent (upsert by ``id`` / ``$set``), so a row that
+is replayed after a crash or lease expiry converges to the same document.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .periodic import PeriodicService
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_TABLE = "replication_outbox"
+
+DEFAULT_MAX_ATTEMPTS = 10
+
+# Outbox operation kinds
+OP_UPSERT = "upsert"  # replace the document matching filter (insert if missing)
+OP_SET = "set"  # $set document fields on the document matching filter
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip through JSON so datetimes and similar serialize like the API"""
+    return json.loads(json.dumps(value, default=str))
+
+
+def outbox_op(
+    collection: str,
+    op: str,
+    document: dict[str, Any],
+    filter: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Describe one MongoDB write to replicate
+
+    Upserts default to matching on the document's ``id``.
+    """
+    if op not in (OP_UPSERT, OP_SET):
+        raise ValueError(f"Unsupported outbox operation: {op}")
+    if filter is None:
+        filter = {"id": document["id"]}
+    document = {k: v for k, v in document.items() if k != "_id"}
+    return {
+        "collection": collection,
+        "op": op,
+        "filter": _jsonable(filter),
+        "document": _jsonable(document),
+    }
+
+
+def write_with_outbox(
+    client: Any,
+    table: str,
+    row: dict[str, Any],
+    outbox: list[dict[str, Any]] | None = None,
+    match_id: str | None = None,
+) -> dict[str, Any] | None:
+    """Insert (or update by id) a Supabase row and enqueue its MongoDB replicas
+
+    Both happen in one transaction on the database side.
+
+    Returns:
+        The written row, or None when an update matched nothing
+
+    """
+    response = client.rpc(
+        "write_with_outbox",
+        {
+            "p_table": table,
+            "p_row": _jsonable(row),
+            "p_match_id": match_id,
+            "p_outbox": outbox or [],
+        },
+    ).execute()
+    return response.data if response.data else None
+
+
+def to_mongo_write(entry: dict[str, Any]) -> Any:
+    """Convert an outbox row into a pymongo bulk write request"""
+    if entry["op"] == OP_UPSERT:
+        return ReplaceOne(entry["filter"], entry["document"], upsert=True)
+    if entry["op"] == OP_SET:
+        return UpdateOne(entry["filter"], {"$set": entry["document"]})
+    raise ValueError(f"Unsupported outbox operation: {entry['op']}")
+
+
+def _document_key(entry: dict[str, Any]) -> str:
+    return json.dumps(entry["filter"], sort_keys=True)
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class OutboxReplicator(PeriodicService):
+    """Background task that drains the Supabase outbox into MongoDB
+
+    Each tick claims a batch of due outbox rows (``FOR UPDATE SKIP LOCKED``
+    with a lease, so several app instances can run replicators), groups them
+    by collection in outbox order and applies them with ordered
+    ``bulk_write`` calls. Replicated rows are deleted. A row MongoDB rejects
+    is released with exponential backoff and its error recorded, and the
+    rest of the collection's batch is applied after it; only newer rows for
+    the rejected row's document are held back (``defer_replication_outbox``),
+    so one bad row does not delay unrelated documents. The claim never hands
+    out a row while an older row for the same document is still pending, so
+    a backed-off ``$set`` cannot be overtaken by a newer one.
+
+    A rejected row that has been claimed ``max_attempts`` times is moved to
+    the dead-letter table (counted in ``metrics["dead_lettered"]``). Rows
+    that failed because MongoDB could not be reached are only backed off.
+    """
+
+    label = "Outbox replicator"
+
+    def __init__(
+        self,
+        db: Any,
+        supabase_client: Any = None,
+        interval_seconds: float | None = None,
+        batch_size: int | None = None,
+        lease_seconds: int = 60,
+        max_attempts: int | None = None,
+    ) -> None:
+        super().__init__(
+            interval_seconds or float(os.getenv("OUTBOX_REPLICATION_INTERVAL_SECONDS", "1")),
+            metrics={
+                "replicated": 0,
+                "failed": 0,
+                "dead_lettered": 0,
+                "batches": 0,
+                "last_batch_size": 0,
+                "last_lag_seconds": 0.0,
+                "max_lag_seconds": 0.0,
+                "last_apply_ms": 0.0,
+                "last_run_at": None,
+                "last_error": None,
+            },
+        )
+        self.db: Any = db
+        self.supabase_client = supabase_client
+        self.batch_size = batch_size or int(os.getenv("OUTBOX_REPLICATION_BATCH_SIZE", "500"))
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts or int(
+            os.getenv("OUTBOX_REPLICATION_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS))
+        )
+
+    def _client(self) -> Any:
+        if self.supabase_client is None:
+            from supabase_db import get_supabase
+
+            self.supabase_client = get_supabase()
+        return self.supabase_client
+
+    async def _claim(self) -> list[dict[str, Any]]:
+        client = self._client()
+        if client is None:
+            return []
+        response = await asyncio.to_thread(
+            lambda: client.rpc(
+                "claim_replication_outbox",
+                {"p_limit": self.batch_size, "p_lease_seconds": self.lease_seconds},
+            ).execute(),
+        )
+        return response.data or []
+
+    async def _complete(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        client = self._client()
+        await asyncio.to_thread(
+            lambda: client.table(OUTBOX_TABLE).delete().in_("id", ids).execute(),
+        )
+
+    async def _release(
+        self, ids: list[int], error: str, max_attempts: int | None = None
+    ) -> list[int]:
+        """Back off failed rows; returns the ids moved to the dead-letter table"""
+        if not ids:
+            return []
+        client = self._client()
+        response = await asyncio.to_thread(
+            lambda: client.rpc(
+                "release_replication_outbox",
+                {"p_ids": ids, "p_error": error[:1000], "p_max_attempts": max_attempts},
+            ).execute(),
+        )
+        return response.data or []
+
+    async def _defer(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        client = self._client()
+        await asyncio.to_thread(
+            lambda: client.rpc("defer_replication_outbox", {"p_ids": ids}).execute(),
+        )
+
+    async def _apply(
+        self, collection: str, entries: list[dict[str, Any]]
+    ) -> tuple[int, str | None]:
+        """Apply entries in order
+
+        Returns:
+            How many leading entries succeeded, and MongoDB's error for the
+            entry after them (None when every entry applied)
+
+        """
+        requests = [to_mongo_write(entry) for entry in entries]
+        try:
+            await self.db[collection].bulk_write(requests, ordered=True)
+            return len(entries), None
+        except BulkWriteError as e:
+            # Ordered bulk writes stop at the first error; everything before it applied
+            error = (e.details.get("writeErrors") or [{}])[0]
+            return int(error.get("index", 0)), str(error.get("errmsg") or e)
+
+    async def _replicate(
+        self, collection: str, entries: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Apply one collection's rows, continuing past rows MongoDB rejects
+
+        Returns:
+            ``done`` rows, ``rejected`` (row, error) pairs, ``deferred`` rows
+            queued behind a rejected row for their document, and the
+            ``unapplied`` rows left when MongoDB failed outright (``error``)
+
+        """
+        outcome: dict[str, Any] = {
+            "done": [],
+            "rejected": [],
+            "deferred": [],
+            "unapplied": [],
+            "error": "",
+        }
+        blocked: set[str] = set()
+        pending = entries
+        while pending:
+            try:
+                applied, error = await self._apply(collection, pending)
+            except Exception as e:
+                outcome["unapplied"] = pending
+                outcome["error"] = f"{collection}: {e}"
+                break
+            outcome["done"].extend(pending[:applied])
+            if error is None:
+                break
+            outcome["rejected"].append((pending[applied], error))
+            blocked.add(_document_key(pending[applied]))
+            rest, pending = pending[applied + 1 :], []
+            for entry in rest:
+                if _document_key(entry) in blocked:
+                    outcome["deferred"].append(entry)
+                else:
+                    pending.append(entry)
+        return outcome
+
+    async def run_once(self) -> dict[str, int]:
+        """Replicate one batch of outbox rows
+
+        Returns:
+            Counts of claimed, replicated and failed rows
+
+        """
+        entries = await self._claim()
+        self.metrics["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        if not entries:
+            self.metrics["last_batch_size"] = 0
+            self.metrics["last_lag_seconds"] = 0.0
+            return {"claimed": 0, "replicated": 0, "failed": 0}
+
+        # Apply in outbox (commit) order; RETURNING order is unspecified
+        entries.sort(key=lambda entry: entry["id"])
+        by_collection: dict[str, list[dict[str, Any]]] = {}
+        for entry in entries:
+            by_collection.setdefault(entry["collection"], []).append(entry)
+
+        started = time.perf_counter()
+        done: list[int] = []
+        rejected: dict[str, list[int]] = {}
+        deferred: list[int] = []
+        dead: list[int] = []
+        error = ""
+        for collection, group in by_collection.items():
+            outcome = await self._replicate(collection, group)
+            done.extend(entry["id"] for entry in outcome["done"])
+            for entry, reason in outcome["rejected"]:
+                error = f"{collection}: {reason}"
+                rejected.setdefault(error, []).append(entry["id"])
+            deferred.extend(entry["id"] for entry in outcome["deferred"])
+            if outcome["unapplied"]:
+                error = outcome["error"]
+                await self._release([entry["id"] for entry in outcome["unapplied"]], error)
+
+        await self._complete(done)
+        for reason, ids in rejected.items():
+            dead.extend(await self._release(ids, reason, self.max_attempts))
+        await self._defer(deferred)
+        failed = len(entries) - len(done)
+
+        now = datetime.now(timezone.utc)
+        created = [_parse_timestamp(entry.get("created_at")) for entry in entries]
+        oldest = min((c for c in created if c is not None), default=now)
+        lag = max((now - oldest).total_seconds(), 0.0)
+
+        self.metrics["replicated"] += len(done)
+        self.metrics["failed"] += failed
+        self.metrics["dead_lettered"] += len(dead)
+        self.metrics["batches"] += 1
+        self.metrics["last_batch_size"] = len(entries)
+        self.metrics["last_lag_seconds"] = lag
+        self.metrics["max_lag_seconds"] = max(self.metrics["max_lag_seconds"], lag)
+        self.metrics["last_apply_ms"] = (time.perf_counter() - started) * 1000
+        if failed:
+            self.metrics["last_error"] = error
+            logger.warning(f"Outbox replication: {failed} rows not replicated ({error})")
+        if dead:
+            logger.error(
+                f"Outbox rows {dead} moved to the dead-letter table after "
+                f"{self.max_attempts} rejected attempts"
+            )
+
+        stats = {"claimed": len(entries), "replicated": len(done), "failed": failed}
+        logger.debug(
+            "Outbox batch: %(claimed)d claimed, %(replicated)d replicated, %(failed)d failed",
+            stats,
+        )
+        return stats
+
+    async def tick(self) -> bool:
+        stats = await self.run_once()
+        # A full batch means the outbox is backlogged; continue immediately
+        return stats["claimed"] >= self.batch_size
+
+
+def replication_metrics() -> dict[str, Any] | None:
+    """Metrics of the replicator running in this process, if any"""
+    return OutboxReplicator.running_metrics()
@@ -0,0 +1,172 @@
+"""Token Refresh Scheduler
+Proactively renews stored OAuth tokens shortly before they expire so posting
+paths always find a valid token without an inline refresh round trip.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+import pymongo
+
+from .periodic import PeriodicService
+from .platform_oauth_service import TOKEN_REFRESH_MARGIN_SECONDS, PlatformOAuthService
+
+logger = logging.getLogger(__name__)
+
+MAX_REFRESH_BACKOFF = timedelta(hours=6)
+
+
+class TokenRefreshScheduler(PeriodicService):
+    """Background task that renews OAuth tokens in expiry order
+
+    Each tick reads the next batch of active tokens whose ``expires_at`` falls
+    inside the refresh margin, using the (status, expires_at) index so the scan
+    cost depends on the batch size rather than the number of stored tokens.
+    A short lease on each claimed token keeps multiple app instances from
+    refreshing the same token. A failed refresh holds the token for an
+    exponentially growing backoff, and after ``max_failures`` consecutive
+    failures it is no longer claimed: ``get_valid_token`` still refreshes it
+    inline once it expires, and a successful refresh or reconnect resets the
+    count.
+    """
+
+    label = "Token refresh scheduler"
+
+    def __init__(
+        self,
+        db: Any,
+        oauth_service: PlatformOAuthService | None = None,
+        interval_seconds: float | None = None,
+        batch_size: int | None = None,
+        concurrency: int = 5,
+        margin_seconds: int = TOKEN_REFRESH_MARGIN_SECONDS,
+        lease_seconds: int = 300,
+        max_failures: int | None = None,
+    ) -> None:
+        super().__init__(
+            interval_seconds
+            or float(os.getenv("TOKEN_REFRESH_INTERVAL_SECONDS", "60")),
+        )
+        self.db: Any = db
+        self.oauth_service = oauth_service or PlatformOAuthService(db)
+        self.batch_size = batch_size or int(
+            os.getenv("TOKEN_REFRESH_BATCH_SIZE", "100"),
+        )
+        self.concurrency = concurrency
+        self.margin = timedelta(seconds=margin_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_failures = max_failures or int(
+            os.getenv("TOKEN_REFRESH_MAX_FAILURES", "8"),
+        )
+
+    async def ensure_indexes(self) -> None:
+        """Create the expiry-ordered index used to find due tokens"""
+        try:
+            await self.db.platform_tokens.create_index(
+                [("status", 1), ("expires_at", 1)],
+                name="status_expires_at",
+            )
+        except pymongo.errors.OperationFailure as e:
+            if e.code in (85, 86) or "already exists" in str(e):
+                logger.info("Token expiry index already exists: %s", e)
+            else:
+                raise
+
+    async def _claim_due_tokens(self, now: datetime) -> list[dict[str, Any]]:
+        """Select the next batch of due tokens and lease them to this instance"""
+        due = await (
+            self.db.platform_tokens.find(
+                {
+                    "status": "active",
+                    "expires_at": {"$ne": None, "$lte": now + self.margin},
+                    "refresh_failures": {"$not": {"$gte": self.max_failures}},
+                    "$or": [
+                        {"refresh_lease_until": {"$exists": False}},
+                        {"refresh_lease_until": {"$lte": now}},
+                    ],
+                },
+            )
+            .sort("expires_at", 1)
+            .limit(self.batch_size)
+            .to_list(length=self.batch_size)
+        )
+
+        claimed: list[dict[str, Any]] = []
+        for token_doc in due:
+            # Conditional update so only one instance wins each lease
+            result = await self.db.platform_tokens.update_one(
+                {
+                    "_id": token_doc["_id"],
+                    "$or": [
+                        {"refresh_lease_until": {"$exists": False}},
+                        {"refresh_lease_until": {"$lte": now}},
+                    ],
+                },
+                {"$set": {"refresh_lease_until": now + self.lease}},
+            )
+            if result.modified_count:
+                claimed.append(token_doc)
+        return claimed
+
+    async def _back_off(self, token_doc: dict[str, Any], now: datetime) -> None:
+        """Hold a token whose refresh failed until its backoff has passed"""
+        failures = int(token_doc.get("refresh_failures") or 0) + 1
+        delay = min(self.lease * 2 ** (failures - 1), MAX_REFRESH_BACKOFF)
+        if failures >= self.max_failures:
+            logger.warning(
+                f"Giving up on refreshing {token_doc.get('platform')} token for user "
+                f"{token_doc.get('user_id')} after {failures} failures",
+            )
+        await self.db.platform_tokens.update_one(
+            {
+                "user_id": token_doc.get("user_id"),
+                "platform": token_doc.get("platform"),
+            },
+            {"$set": {"refresh_lease_until": now + delay}},
+        )
+
+    async def run_once(self) -> dict[str, int]:
+        """Refresh one batch of due tokens
+
+        Returns:
+            Counts of claimed, refreshed and failed tokens
+
+        """
+        now = datetime.utcnow()
+        claimed = await self._claim_due_tokens(now)
+        if not claimed:
+            return {"claimed": 0, "refreshed": 0, "failed": 0}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _refresh(token_doc: dict[str, Any]) -> bool:
+            async with semaphore:
+                return await self.oauth_service.refresh_platform_token(token_doc)
+
+        results = await asyncio.gather(
+            *(_refresh(doc) for doc in claimed),
+            return_exceptions=True,
+        )
+        refreshed = sum(1 for r in results if r is True)
+        for token_doc, result in zip(claimed, results):
+            if result is not True:
+                await self._back_off(token_doc, now)
+        stats = {
+            "claimed": len(claimed),
+            "refreshed": refreshed,
+            "failed": len(claimed) - refreshed,
+        }
+        logger.info(
+            "Token refresh batch: %(claimed)d claimed, %(refreshed)d refreshed, "
+            "%(failed)d failed",
+            stats,
+        )
+        return stats
+
+    async def tick(self) -> bool:
+        stats = await self.run_once()
+        # A full batch means more tokens are due; continue immediately
+        return stats["claimed"] >= self.batch_size
@@ -0,0 +1,217 @@
+"""User Search Service
+Indexed substring search over username and email for the admin user search.
+
+Supabase uses a pg_trgm GIN index through the ``search_users`` RPC. MongoDB
+has no trigram index, so user documents carry normalized lowercase fields and
+trigram arrays (``username_grams`` / ``email_grams``) with multikey indexes:
+a substring query must contain all of the substring's trigrams, which turns
+the unanchored regex scan into an index intersection over a small candidate
+set that is then verified and ranked in Python.
+
+Queries shorter than three characters are a substring match on both
+backends, like the Supabase LIKE pattern. The MongoDB side verifies and ranks
+at most ``CANDIDATE_SCAN_FACTOR * limit`` candidates, so a request's cost is
+bounded even for a substring shared by most users (e.g. "gmail"). The
+trade-off is recall for such broad queries: candidates are read in index
+order, not by similarity, so past the cap a closer match can be missed where
+the Supabase RPC (which ranks every match) would return it. Queries selective
+enough to match fewer users than the cap return the same results on both.
+"""
+
+import heapq
+import itertools
+import logging
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Columns returned by search (matches routes.users.UserResponse)
+USER_SEARCH_FIELDS = [
+    "id",
+    "username",
+    "email",
+    "full_name",
+    "phone",
+    "is_active",
+    "is_admin",
+    "created_at",
+    "updated_at",
+    "trial_active",
+    "trial_type",
+]
+
+# Candidates streamed per round trip while verifying and ranking
+CANDIDATE_BATCH_SIZE = 500
+
+# Candidates verified per requested result before MongoDB search stops reading
+CANDIDATE_SCAN_FACTOR = 50
+
+
+def normalize(value: str | None) -> str:
+    """Normalize a searchable value (trimmed, lowercase)"""
+    return (value or "").strip().lower()
+
+
+def trigrams(value: str | None) -> list[str]:
+    """Distinct trigrams of a normalized value"""
+    text = normalize(value)
+    return sorted({text[i : i + 3] for i in range(len(text) - 2)})
+
+
+def username_search_fields(username: str | None) -> dict[str, Any]:
+    """Derived search fields to store alongside a user's username"""
+    return {"username_lower": normalize(username), "username_grams": trigrams(username)}
+
+
+def email_search_fields(email: str | None) -> dict[str, Any]:
+    """Derived search fields to store alongside a user's email"""
+    return {"email_lower": normalize(email), "email_grams": trigrams(email)}
+
+
+def user_search_fields(username: str | None, email: str | None) -> dict[str, Any]:
+    """All derived search fields for a MongoDB user document"""
+    return {**username_search_fields(username), **email_search_fields(email)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Trigram similarity in [0, 1], approximating pg_trgm's similarity()"""
+    grams_a = {f"  {a} "[i : i + 3] for i in range(len(a) + 1)}
+    grams_b = {f"  {b} "[i : i + 3] for i in range(len(b) + 1)}
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def _rank_key(user: dict[str, Any], needle: str) -> tuple[float, str] | None:
+    """Sort key for a verified match (best first), or None for a false positive"""
+    username = normalize(user.get("username"))
+    email = normalize(user.get("email"))
+    if needle and needle not in username and needle not in email:
+        return None
+    return (-max(similarity(needle, username), similarity(needle, email)), username)
+
+
+class _TopMatches:
+    """Best ``limit`` verified matches seen so far, in bounded memory"""
+
+    def __init__(self, q: str, limit: int) -> None:
+        self.needle = normalize(q)
+        self.limit = limit
+        self._matches: list[tuple[tuple[float, str], int, dict[str, Any]]] = []
+        self._order = itertools.count()
+
+    def add(self, user: dict[str, Any]) -> None:
+        key = _rank_key(user, self.needle)
+        if key is None:
+            return
+        self._matches.append((key, next(self._order), user))
+        if len(self._matches) >= 2 * self.limit + CANDIDATE_BATCH_SIZE:
+            self._matches = heapq.nsmallest(self.limit, self._matches)
+
+    def result(self) -> list[dict[str, Any]]:
+        return [user for _, _, user in heapq.nsmallest(self.limit, self._matches)]
+
+
+def rank_users(users: list[dict[str, Any]], q: str, limit: int) -> list[dict[str, Any]]:
+    """Keep true substring matches and order them by best field similarity"""
+    top = _TopMatches(q, limit)
+    for user in users:
+        top.add(user)
+    return top.result()
+
+
+def build_mongo_search_filter(q: str) -> dict[str, Any]:
+    """MongoDB filter served by the search indexes
+
+    Queries of three or more characters use the trigram arrays; shorter ones
+    have no trigram to look up and fall back to an unanchored substring match
+    on the normalized fields (a scan of the small lowercase index keys), the
+    same as the Supabase LIKE pattern.
+    """
+    grams = trigrams(q)
+    if grams:
+        return {
+            "$or": [
+                {"username_grams": {"$all": grams}},
+                {"email_grams": {"$all": grams}},
+            ],
+        }
+    pattern = re.escape(normalize(q))
+    return {
+        "$or": [
+            {"username_lower": {"$regex": pattern}},
+            {"email_lower": {"$regex": pattern}},
+        ],
+    }
+
+
+async def search_users_mongo(db: Any, q: str | None, limit: int) -> list[dict[str, Any]]:
+    """Search MongoDB users, returning projected and ranked documents"""
+    projection = {field: 1 for field in USER_SEARCH_FIELDS}
+    projection["_id"] = 0
+
+    if not q or not normalize(q):
+        return await db.users.find({}, projection).limit(limit).to_list(length=limit)
+
+    # Rank at most CANDIDATE_SCAN_FACTOR * limit candidates (see the module
+    # docstring for the recall trade-off); only the best ``limit`` are kept
+    top = _TopMatches(q, limit)
+    cursor = db.users.find(build_mongo_search_filter(q), projection).limit(
+        CANDIDATE_SCAN_FACTOR * limit
+    )
+    async for user in cursor.batch_size(CANDIDATE_BATCH_SIZE):
+        top.add(user)
+    return top.result()
+
+
+def search_users_supabase(client: Any, q: str | None, limit: int) -> list[dict[str, Any]]:
+    """Search Supabase users via the trigram-indexed search_users RPC"""
+    if not q or not normalize(q):
+        response = (
+            client.table("users")
+            .select(",".join(f for f in USER_SEARCH_FIELDS if f != "is_admin"))
+            .limit(limit)
+            .execute()
+        )
+        return response.data if response.data else []
+
+    response = client.rpc(
+        "search_users",
+        {"p_query": normalize(q), "p_limit": limit},
+    ).execute()
+    return response.data if response.data else []
+
+
+async def backfill_user_search_fields(db: Any, batch_size: int = 1000) -> int:
+    """Populate search fields on users created before they existed
+
+    Returns:
+        Number of user documents updated
+
+    """
+    from pymongo import UpdateOne
+
+    updated = 0
+    batch: list[Any] = []
+    cursor = db.users.find(
+        {"username_grams": {"$exists": False}},
+        {"_id": 1, "username": 1, "email": 1},
+    )
+    async for user in cursor:
+        batch.append(
+            UpdateOne(
+                {"_id": user["_id"]},
+                {"$set": user_search_fields(user.get("username"), user.get("email"))},
+            ),
+        )
+        if len(batch) >= batch_size:
+            await db.users.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.users.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    logger.info(f"Backfilled search fields for {updated} users")
+    return updated
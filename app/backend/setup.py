@@ -28,6 +28,8 @@ setup(
         # HTTP client and utilities
         "httpx>=0.27.0,<1.0.0",  # Async HTTP client
         "python-multipart>=0.0.9,<1.0.0",  # Multipart form data
+        # Observability
+        "prometheus-client>=0.20.0,<1.0.0",  # /metrics exposition
     ],
     extras_require={
         "dev": [
@@ -5,10 +5,18 @@ Replaces MongoDB with PostgreSQL via Supabase
 
 import logging
 import os
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
+from services.analytics_views import REFRESH_TABLE, staleness
+from services.listing_analytics import (
+    active_listing_analytics_buffer,
+    apply_listing_analytics_deltas,
+    delta_row,
+)
+from services.metrics import InstrumentedSupabaseClient
 from supabase import Client, create_client
 
 logger = logging.getLogger(__name__)
@@ -40,6 +48,11 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
 else:
     logger.info(f"✅ Supabase configured: {SUPABASE_URL}")
 
+# business_intelligence is partitioned by month on timestamp; event reads
+# without an explicit range are bounded to this window so they prune to the
+# latest partitions
+EVENTS_DEFAULT_WINDOW_DAYS = int(os.getenv("EVENTS_DEFAULT_WINDOW_DAYS", "30"))
+
 # Initialize Supabase client (singleton)
 _supabase_client: Optional[Client] = None
 
@@ -71,7 +84,9 @@ class SupabaseDB:
     """Wrapper class for Supabase operations with error handling"""
 
     def __init__(self):
-        self.client = get_supabase()
+        client = get_supabase()
+        # Every query and RPC is timed for /metrics, by table and operation
+        self.client = InstrumentedSupabaseClient(client) if client else None
         if not self.client:
             logger.warning(
                 "SupabaseDB initialized without client - operations will fail gracefully"
@@ -84,6 +99,11 @@ class SupabaseDB:
                 "Supabase client not initialized. Check SUPABASE_URL and SUPABASE_SERVICE_KEY"
             )
 
+    def require_client(self):
+        """Return the client for direct table/RPC calls, raising if unavailable"""
+        self._check_client()
+        return self.client
+
     async def validate_connection(self) -> bool:
         """Validate Supabase connection"""
         if not self.client:
@@ -370,11 +390,25 @@ class SupabaseDB:
         user_id: Optional[str] = None,
         event_type: Optional[str] = None,
         limit: int = 100,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
     ) -> List[Dict]:
-        """Get business intelligence events"""
+        """Get business intelligence events in [since, until)
+
+        since defaults to EVENTS_DEFAULT_WINDOW_DAYS ago; the range lets
+        Postgres skip every monthly partition outside it.
+        """
         self._check_client()
+        if since is None:
+            since = datetime.utcnow() - timedelta(days=EVENTS_DEFAULT_WINDOW_DAYS)
         try:
-            query = self.client.table("business_intelligence").select("*")
+            query = (
+                self.client.table("business_intelligence")
+                .select("*")
+                .gte("timestamp", since.isoformat())
+            )
+            if until is not None:
+                query = query.lt("timestamp", until.isoformat())
             if user_id:
                 query = query.eq("user_id", user_id)
             if event_type:
@@ -385,20 +419,42 @@ class SupabaseDB:
             logger.error(f"Error getting events: {e}")
             return []
 
+    def count_events(self, since: datetime, until: Optional[datetime] = None) -> int:
+        """Count business intelligence events in [since, until)"""
+        self._check_client()
+        try:
+            query = (
+                self.client.table("business_intelligence")
+                .select("id", count="exact")
+                .gte("timestamp", since.isoformat())
+            )
+            if until is not None:
+                query = query.lt("timestamp", until.isoformat())
+            response = query.limit(1).execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error counting events: {e}")
+            return 0
+
     # ==================== ANALYTICS ====================
 
     def get_industry_stats(self) -> List[Dict]:
-        """Get industry breakdown (uses view)"""
+        """Get industry breakdown (precomputed, see refresh_analytics_views)"""
         self._check_client()
         try:
-            response = self.client.table("industry_breakdown").select("*").execute()
+            response = (
+                self.client.table("industry_breakdown")
+                .select("*")
+                .order("user_count", desc=True)
+                .execute()
+            )
             return response.data if response.data else []
         except Exception as e:
             logger.error(f"Error getting industry stats: {e}")
             return []
 
     def get_user_stats(self, limit: int = 100) -> List[Dict]:
-        """Get user statistics (uses view)"""
+        """Get user statistics (precomputed, see refresh_analytics_views)"""
         self._check_client()
         try:
             response = (
@@ -410,38 +466,82 @@ class SupabaseDB:
             return []
 
     def get_revenue_breakdown(self) -> Dict[str, int]:
-        """Get revenue breakdown by range"""
+        """Get user counts by revenue range (grouped in the database)"""
+        return self._get_breakdown("revenue_breakdown", "monthly_revenue")
+
+    def get_marketplace_usage(self) -> Dict[str, int]:
+        """Get user counts by marketplace in use (grouped in the database)"""
+        return self._get_breakdown("marketplace_usage", "marketplace")
+
+    def get_challenge_breakdown(self) -> Dict[str, int]:
+        """Get user counts by biggest challenge (grouped in the database)"""
+        return self._get_breakdown("challenge_breakdown", "biggest_challenge")
+
+    def _get_breakdown(self, view: str, column: str) -> Dict[str, int]:
         self._check_client()
         try:
             response = (
-                self.client.table("user_business_profiles")
-                .select("monthly_revenue")
+                self.client.table(view)
+                .select(f"{column},user_count")
+                .order("user_count", desc=True)
                 .execute()
             )
+            return {row[column]: row["user_count"] for row in response.data or []}
+        except Exception as e:
+            logger.error(f"Error getting {view}: {e}")
+            return {}
 
-            breakdown = {}
-            for row in response.data:
-                revenue = row.get("monthly_revenue", "unknown")
-                breakdown[revenue] = breakdown.get(revenue, 0) + 1
+    def count_users(self) -> int:
+        """Count users (from the precomputed user_stats rows)"""
+        self._check_client()
+        try:
+            response = (
+                self.client.table("user_stats")
+                .select("id", count="exact")
+                .limit(1)
+                .execute()
+            )
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error counting users: {e}")
+            return 0
 
-            return breakdown
+    def get_analytics_staleness(self) -> Dict[str, Dict]:
+        """Get when each analytics view was last refreshed and its age"""
+        self._check_client()
+        try:
+            response = self.client.table(REFRESH_TABLE).select("*").execute()
+            return staleness(response.data or [])
         except Exception as e:
-            logger.error(f"Error getting revenue breakdown: {e}")
+            logger.error(f"Error getting analytics staleness: {e}")
             return {}
 
     # ==================== ANALYTICS TRACKING ====================
 
     def track_listing_view(self, listing_id: str, user_id: str, platform: str):
         """Track listing view"""
+        self.track_listing_activity(listing_id, user_id, platform, views=1)
+
+    def track_listing_activity(
+        self, listing_id: str, user_id: str, platform: str, **counts: int
+    ):
+        """Count listing views/clicks/favorites/messages
+
+        Counts are coalesced by the running ListingAnalyticsBuffer and written
+        in batches; without one (scripts, tests) they are written right away.
+        """
         self._check_client()
+        buffer = active_listing_analytics_buffer()
         try:
-            # Upsert analytics record
-            self.client.rpc(
-                "increment_listing_views",
-                {"listing_id": listing_id, "platform_name": platform},
-            ).execute()
+            if buffer is not None:
+                buffer.record(listing_id, platform, user_id=user_id, **counts)
+                return
+            apply_listing_analytics_deltas(
+                self.client,
+                [delta_row(listing_id, platform, user_id=user_id, **counts)],
+            )
         except Exception as e:
-            logger.error(f"Error tracking view: {e}")
+            logger.error(f"Error tracking listing activity: {e}")
 
     # ==================== UTILITY METHODS ====================
 
@@ -0,0 +1,269 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemoryDatabase  # noqa: E402
+from services import ad_renewal  # noqa: E402
+from services.ad_renewal import AdRenewalEngine, next_renewal_time  # noqa: E402
+
+
+class _Status(Enum):
+    SUCCESS = "success"
+    FAILED = "failed"
+    RATE_LIMITED = "rate_limited"
+    LOGIN_REQUIRED = "login_required"
+
+
+class _Result:
+    def __init__(self, status, retry_after=None):
+        self.status = status
+        self.platform_ad_id = "pa-1" if status is _Status.SUCCESS else None
+        self.post_url = (
+            "https://example.com/pa-1" if status is _Status.SUCCESS else None
+        )
+        self.retry_after = retry_after
+
+    def to_dict(self):
+        return {"status": self.status.value}
+
+
+class _Manager:
+    def __init__(self, results, on_post=None):
+        self.results = results
+        self.calls = []
+        self.ended = []
+        self.on_post = on_post
+
+    async def post_to_platform(self, platform, ad_data, credentials):
+        self.calls.append(platform)
+        if self.on_post is not None:
+            await self.on_post()
+        return self.results[platform]
+
+    async def end_listing(self, platform, platform_ad_id, credentials):
+        if platform != "ebay":
+            return None
+        self.ended.append(platform_ad_id)
+        return _Result(_Status.SUCCESS)
+
+
+class _Credentials:
+    async def get_credentials(self, user_id, platform):
+        return object()
+
+
+def _engine(ads, renewals, results, monkeypatch, posted=(), on_post=None):
+    monkeypatch.setattr(ad_renewal, "build_ad_data", lambda ad: ad)
+    monkeypatch.setattr(ad_renewal, "renewal_spacing", lambda platform: 0)
+    db = MemoryDatabase()
+    db.ads.docs.extend(ads)
+    db.ad_renewals.docs.extend(renewals)
+    db.posted_ads.docs.extend(posted)
+    engine = AdRenewalEngine(
+        db,
+        manager=_Manager(results, on_post),
+        credentials=_Credentials(),
+        interval_seconds=1,
+        batch_size=10,
+    )
+    return engine, db
+
+
+def _renewal(_id, platform, ad_id="ad-1", due=timedelta(minutes=-5), **fields):
+    return {
+        "_id": _id,
+        "ad_id": ad_id,
+        "platform": platform,
+        "status": "active",
+        "failures": 0,
+        "next_renewal_at": datetime.now(timezone.utc) + due,
+        **fields,
+    }
+
+
+def _by_id(collection):
+    return {doc["_id"]: doc for doc in collection.docs}
+
+
+AD = {"id": "ad-1", "user_id": "u1", "auto_renew": True}
+
+
+def test_next_renewal_time_stays_within_jitter():
+    now = datetime.now(timezone.utc)
+    for _ in range(50):
+        nxt = next_renewal_time("craigslist", now)
+        assert timedelta(hours=48) <= nxt - now <= timedelta(hours=48 * 1.1)
+
+
+async def test_claim_due_leases_only_due_unleased_active_renewals(monkeypatch):
+    now = datetime.now(timezone.utc)
+    renewals = [
+        _renewal(1, "craigslist", due=timedelta(minutes=-1)),
+        _renewal(2, "craigslist", due=timedelta(minutes=-9)),
+        # Not due yet
+        _renewal(3, "craigslist", due=timedelta(minutes=5)),
+        # Leased by another instance, and a lease that has expired
+        _renewal(4, "ebay", lease_until=now + timedelta(minutes=10)),
+        _renewal(5, "ebay", lease_until=now - timedelta(minutes=1)),
+        _renewal(6, "facebook", status="paused"),
+    ]
+    engine, db = _engine([AD], renewals, {}, monkeypatch)
+    engine.batch_size = 2
+
+    first = await engine._claim_due(now)
+    second = await engine._claim_due(now)
+
+    # Oldest due first, limited to the batch size; leased rows are not reclaimed
+    assert [r["_id"] for r in first] == [2, 5]
+    assert [r["_id"] for r in second] == [1]
+    docs = _by_id(db.ad_renewals)
+    assert {i for i, d in docs.items() if d.get("lease_owner") == engine.owner} == {
+        1,
+        2,
+        5,
+    }
+    assert docs[1]["lease_until"] == now + engine.lease
+    assert await engine._claim_due(now) == []
+
+
+async def test_run_once_handles_each_outcome(monkeypatch):
+    renewals = [
+        _renewal(1, "craigslist"),
+        _renewal(2, "facebook"),
+        _renewal(3, "offerup"),
+        _renewal(4, "ebay"),
+    ]
+    results = {
+        "craigslist": _Result(_Status.SUCCESS),
+        "facebook": _Result(_Status.RATE_LIMITED, retry_after=600),
+        "offerup": _Result(_Status.LOGIN_REQUIRED),
+        "ebay": _Result(_Status.FAILED),
+    }
+    posted = [{"ad_id": "ad-1", "platform": "craigslist"}]
+    engine, db = _engine([AD], renewals, results, monkeypatch, posted=posted)
+    now = datetime.now(timezone.utc)
+
+    stats = await engine.run_once()
+
+    assert stats == {"claimed": 4, "renewed": 1, "failed": 3}
+    assert sorted(engine.manager.calls) == ["craigslist", "ebay", "facebook", "offerup"]
+    assert engine.metrics["renewed"] == 1
+    assert engine.metrics["rate_limited"] == 1
+    assert engine.metrics["failed"] == 1
+    assert engine.metrics["paused"] == 1
+    assert engine.metrics["last_lag_seconds"] >= 300
+
+    docs = _by_id(db.ad_renewals)
+    assert docs[1]["next_renewal_at"] > now + timedelta(hours=47)
+    assert (
+        timedelta(minutes=9) < docs[2]["next_renewal_at"] - now <= timedelta(minutes=11)
+    )
+    assert docs[3]["status"] == "paused"
+    assert docs[3]["paused_reason"] == "login_required"
+    assert docs[4]["failures"] == 1
+    # Every outcome releases the lease
+    assert not any("lease_owner" in doc for doc in docs.values())
+
+    (cl,) = db.posted_ads.docs
+    assert cl["platform_ad_id"] == "pa-1"
+    assert cl["renew_count"] == 1
+
+
+async def test_disabled_auto_renew_pauses_without_posting(monkeypatch):
+    ad = dict(AD, auto_renew=False)
+    engine, db = _engine([ad], [_renewal(1, "craigslist")], {}, monkeypatch)
+
+    await engine.run_once()
+
+    assert engine.manager.calls == []
+    assert db.ad_renewals.docs[0]["status"] == "paused"
+    assert db.ad_renewals.docs[0]["paused_reason"] == "auto_renew disabled"
+
+
+async def test_empty_batch_reports_no_lag(monkeypatch):
+    engine, _ = _engine([AD], [], {}, monkeypatch)
+
+    stats = await engine.run_once()
+
+    assert stats["claimed"] == 0
+    assert engine.metrics["last_lag_seconds"] == 0.0
+
+
+async def test_renewal_taken_over_by_another_instance_is_skipped(monkeypatch):
+    renewals = [_renewal(1, "craigslist"), _renewal(2, "craigslist", "ad-2")]
+    ads = [AD, dict(AD, id="ad-2")]
+    results = {"craigslist": _Result(_Status.SUCCESS)}
+    holds = []
+
+    async def take_over_second():
+        # While the first renewal posts, another instance takes the second over
+        second = _by_id(db.ad_renewals)[2]
+        holds.append(second["lease_until"])
+        second["lease_owner"] = "other"
+
+    engine, db = _engine(ads, renewals, results, monkeypatch, on_post=take_over_second)
+
+    stats = await engine.run_once()
+
+    assert engine.manager.calls == ["craigslist"]
+    assert stats == {"claimed": 2, "renewed": 1, "failed": 1}
+    second = _by_id(db.ad_renewals)[2]
+    assert second["lease_owner"] == "other"
+    assert second["next_renewal_at"] < datetime.now(timezone.utc)
+    # Before the first renewal the lease on the rest of the queue was extended
+    assert holds[0] > datetime.now(timezone.utc) + engine.lease - timedelta(minutes=1)
+
+
+async def test_repost_ends_or_records_the_replaced_listing(monkeypatch):
+    renewals = [_renewal(1, "ebay"), _renewal(2, "craigslist")]
+    posted = [
+        {"ad_id": "ad-1", "platform": "ebay", "platform_ad_id": "old-ebay"},
+        {"ad_id": "ad-1", "platform": "craigslist", "platform_ad_id": "old-cl"},
+    ]
+    results = {
+        "ebay": _Result(_Status.SUCCESS),
+        "craigslist": _Result(_Status.SUCCESS),
+    }
+    engine, db = _engine([AD], renewals, results, monkeypatch, posted=posted)
+
+    await engine.run_once()
+
+    assert engine.manager.ended == ["old-ebay"]
+    docs = {doc["platform"]: doc for doc in db.posted_ads.docs}
+    assert "superseded_platform_ad_ids" not in docs["ebay"]
+    assert docs["craigslist"]["superseded_platform_ad_ids"] == ["old-cl"]
+
+
+async def test_reconcile_registers_new_pairs_and_resumes_paused_ones(monkeypatch):
+    ads = [AD, dict(AD, id="ad-2"), dict(AD, id="ad-3", auto_renew=False)]
+    posted = [
+        {"ad_id": "ad-1", "platform": "ebay", "status": "active"},
+        {"ad_id": "ad-2", "platform": "craigslist", "status": "active"},
+        {"ad_id": "ad-3", "platform": "craigslist", "status": "active"},
+        {"ad_id": "ad-2", "platform": "facebook", "status": "removed"},
+    ]
+    renewals = [
+        _renewal(1, "craigslist", "ad-2", status="paused", paused_reason="x"),
+        _renewal(2, "craigslist", "ad-3", status="paused", paused_reason="x"),
+        _renewal(3, "facebook", "ad-2", status="paused", paused_reason="x"),
+    ]
+    engine, db = _engine(ads, renewals, {}, monkeypatch, posted=posted)
+    now = datetime.now(timezone.utc)
+
+    assert await engine.reconcile() == 1
+    assert await engine.reconcile() == 0
+
+    docs = {(d["ad_id"], d["platform"]): d for d in db.ad_renewals.docs}
+    assert docs[("ad-1", "ebay")]["status"] == "active"
+    resumed = docs[("ad-2", "craigslist")]
+    assert resumed["status"] == "active" and "paused_reason" not in resumed
+    assert resumed["next_renewal_at"] >= now + timedelta(hours=48)
+    # auto_renew off, or no longer posted there: stays paused
+    assert docs[("ad-3", "craigslist")]["status"] == "paused"
+    assert docs[("ad-2", "facebook")]["status"] == "paused"
+    assert engine.metrics["resumed"] == 1
@@ -0,0 +1,97 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from auth import User, get_current_user_with_fallback  # noqa: E402
+from routes import enhanced_signup  # noqa: E402
+from scripts.memory_db import MemorySupabase  # noqa: E402
+from services.analytics_views import AnalyticsViewRefresher  # noqa: E402
+from supabase_db import SupabaseDB  # noqa: E402
+
+
+def _refresh(store, params):
+    # Stands in for refresh_analytics_views: one view is past p_max_age_seconds
+    now = datetime.now(timezone.utc)
+    for row in store.tables["materialized_view_refreshes"]:
+        age = now - datetime.fromisoformat(row["refreshed_at"])
+        if age >= timedelta(seconds=params["p_max_age_seconds"]):
+            row["refreshed_at"] = now.isoformat()
+    return store.tables["materialized_view_refreshes"]
+
+
+def _client():
+    client = MemorySupabase()
+    old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    recent = (datetime.now(timezone.utc) - timedelta(seconds=30)).isoformat()
+    for name, refreshed_at in (("user_stats", recent), ("revenue_breakdown", old)):
+        client.write(
+            "materialized_view_refreshes",
+            {"view_name": name, "refreshed_at": refreshed_at, "duration_ms": 12.5},
+        )
+    for revenue, count in (("1k-5k", 4), ("unknown", 1), ("50k+", 9)):
+        client.write(
+            "revenue_breakdown", {"monthly_revenue": revenue, "user_count": count}
+        )
+    client.write("industry_breakdown", {"industry": "retail", "user_count": 14})
+    client.write("user_stats", {"username": "a"})
+    client.write("user_stats", {"username": "b"})
+    client.register_rpc("refresh_analytics_views", _refresh)
+    return client
+
+
+async def test_refresher_records_staleness():
+    refresher = AnalyticsViewRefresher(supabase_client=_client(), interval_seconds=300)
+
+    views = await refresher.run_once()
+
+    assert set(views) == {"user_stats", "revenue_breakdown"}
+    assert views["revenue_breakdown"]["age_seconds"] < 5
+    assert 25 <= views["user_stats"]["age_seconds"] < 60
+    assert refresher.metrics["refreshes"] == 1
+
+
+async def test_business_insights_read_precomputed_rows(monkeypatch):
+    db = SupabaseDB()
+    db.client = _client()
+    monkeypatch.setattr(enhanced_signup, "supabase_db", db)
+
+    assert db.get_revenue_breakdown() == {"50k+": 9, "1k-5k": 4, "unknown": 1}
+
+    insights = await enhanced_signup.get_business_insights(_admin="a1")
+
+    assert insights["total_users"] == 2
+    assert insights["industries"] == [{"_id": "retail", "count": 14}]
+    assert insights["revenue_ranges"][0] == {"_id": "50k+", "count": 9}
+    assert insights["marketplace_usage"] == []
+    assert insights["views"]["revenue_breakdown"]["duration_ms"] == 12.5
+
+
+async def test_business_insights_route_serves_the_views(monkeypatch):
+    from server import app
+
+    db = SupabaseDB()
+    db.client = _client()
+    monkeypatch.setattr(enhanced_signup, "supabase_db", db)
+    monkeypatch.setattr(enhanced_signup, "USE_SUPABASE", True)
+    admin = User(id="a1", username="admin", email="admin@example.com", is_admin=True)
+    monkeypatch.setitem(
+        app.dependency_overrides,
+        get_current_user_with_fallback,
+        lambda: (admin, admin.id),
+    )
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as http:
+        response = await http.get("/api/auth/business-insights")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["industries"] == [{"_id": "retail", "count": 14}]
+    assert set(body["views"]) == {"user_stats", "revenue_breakdown"}
@@ -0,0 +1,118 @@
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from automation.network import (  # noqa: E402
+    ALLOW,
+    BLOCK,
+    STUB,
+    TYPICAL_BYTES,
+    RequestInterceptor,
+    profile_for,
+)
+
+
+def test_facebook_profile_decisions():
+    profile = profile_for("facebook")
+
+    assert profile.decide("https://www.facebook.com/marketplace/create", "document")
+    assert profile.decide("https://static.xx.fbcdn.net/app.js", "script") == ALLOW
+    assert profile.decide("https://scontent.xx.fbcdn.net/p.jpg", "image") == BLOCK
+    assert profile.decide("https://static.xx.fbcdn.net/font.woff2", "font") == BLOCK
+    assert profile.decide("https://www.facebook.com/tr?id=1", "image") == BLOCK
+    assert profile.decide("https://www.facebook.com/tr/", "xhr") == BLOCK
+    assert profile.decide("https://www.facebook.com/track", "xhr") == ALLOW
+    assert (
+        profile.decide("https://www.googletagmanager.com/gtm.js?id=1", "script") == STUB
+    )
+    assert profile.decide("https://stats.g.doubleclick.net/collect", "ping") == BLOCK
+    # Lookalike hosts are not matched by suffix alone
+    assert profile.decide("https://notdoubleclick.net/x.js", "script") == ALLOW
+    # CAPTCHA challenges keep their images
+    assert (
+        profile.decide("https://www.google.com/recaptcha/api2/payload", "image")
+        == ALLOW
+    )
+    assert profile.decide("data:image/png;base64,AAAA", "image") == ALLOW
+
+
+def test_blocking_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("AUTOMATION_BLOCK_RESOURCES", "false")
+    assert profile_for("craigslist") is None
+
+    monkeypatch.setenv("AUTOMATION_BLOCK_RESOURCES", "true")
+    assert profile_for("someplatform").platform == "someplatform"
+
+
+class _Route:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.action = None
+
+    async def continue_(self):
+        self.action = "continue"
+
+    async def abort(self, error_code=None):
+        self.action = "abort"
+
+    async def fulfill(self, **kwargs):
+        self.action = "fulfill"
+        self.fulfilled = kwargs
+
+
+class _Context:
+    def __init__(self):
+        self.routes = []
+        self.listeners = {}
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+
+async def test_interceptor_routes_requests_and_counts_savings():
+    context = _Context()
+    interceptor = RequestInterceptor("offerup", profile_for("offerup"))
+    await interceptor.install(context)
+    pattern, handler = context.routes[0]
+    assert pattern == "**/*"
+
+    routes = [
+        _Route("https://offerup.com/sell", "document"),
+        _Route("https://images.offerup.com/item.jpg", "image"),
+        _Route("https://www.google-analytics.com/g/collect", "ping"),
+        _Route("https://www.googletagmanager.com/gtag/js", "script"),
+    ]
+    for route in routes:
+        await handler(route)
+    context.listeners["response"](SimpleNamespace(headers={"content-length": "1500"}))
+    context.listeners["response"](SimpleNamespace(headers={}))
+
+    assert [r.action for r in routes] == ["continue", "abort", "abort", "fulfill"]
+    assert routes[3].fulfilled["content_type"] == "application/javascript"
+    stats = interceptor.stats.to_dict()
+    assert stats["requests"] == 4
+    assert stats["blocked"] == 2
+    assert stats["stubbed"] == 1
+    assert stats["blocked_by_type"] == {"image": 1, "ping": 1}
+    assert stats["bytes_loaded"] == 1500
+    assert stats["bytes_saved_estimate"] == (
+        TYPICAL_BYTES["image"] + TYPICAL_BYTES["ping"] + TYPICAL_BYTES["script"]
+    )
+
+
+async def test_without_profile_only_loaded_bytes_are_counted():
+    context = _Context()
+    interceptor = RequestInterceptor("craigslist", None)
+    await interceptor.install(context)
+
+    context.listeners["response"](SimpleNamespace(headers={"content-length": "10"}))
+
+    assert context.routes == []
+    assert interceptor.stats.bytes_loaded == 10
@@ -0,0 +1,205 @@
+import os
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from automation.base import (  # noqa: E402
+    AdData,
+    AutomationManager,
+    PlatformAutomationBase,
+    PlatformCredentials,
+    PostResult,
+    PostStatus,
+)
+from automation.tracing import MAX_SPANS, span, trace_post, traced  # noqa: E402
+
+
+class _Tracing:
+    def __init__(self):
+        self.started = False
+        self.saved = []
+
+    async def start(self, **kwargs):
+        self.started = True
+
+    async def stop(self, path=None):
+        self.saved.append(path)
+        if path:
+            with open(path, "wb") as fh:
+                fh.write(b"trace")
+
+
+class _Context:
+    def __init__(self):
+        self.tracing = _Tracing()
+
+
+class _FakePlatform(PlatformAutomationBase):
+    def __init__(self, fail_on=None):
+        super().__init__("fakeplatform")
+        self.fail_on = fail_on
+
+    async def initialize_browser(self):
+        self.context = _Context()
+        await self._start_tracing()
+
+    async def cleanup(self):
+        pass
+
+    async def login(self, credentials):
+        return True
+
+    async def validate_credentials(self, credentials):
+        return await self.login(credentials)
+
+    async def post_ad(self, ad_data, credentials):
+        await self.random_delay(0, 0)
+        return await self._fill_listing_form(ad_data)
+
+    @traced()
+    async def _fill_listing_form(self, ad_data):
+        await self._upload_images(ad_data.images)
+        if self.fail_on == "form":
+            raise RuntimeError("form not found")
+        return PostResult(status=PostStatus.SUCCESS, platform_ad_id="1")
+
+    @traced()
+    async def _upload_images(self, image_urls):
+        return False
+
+    def get_supported_categories(self):
+        return ["other"]
+
+
+AD = AdData(
+    title="Desk",
+    description="Oak desk",
+    price=50,
+    category="other",
+    location="Austin",
+    images=["https://example.com/1.jpg"],
+)
+CREDENTIALS = PlatformCredentials(username="u", password="p")
+
+
+def _names(node):
+    return [child["name"] for child in node.get("children", [])]
+
+
+async def test_post_result_carries_nested_step_spans():
+    manager = AutomationManager()
+    manager.register_platform(_FakePlatform())
+
+    result = await manager.post_to_platform("fakeplatform", AD, CREDENTIALS)
+
+    spans = result.to_dict()["spans"]
+    assert result.status is PostStatus.SUCCESS
+    assert spans["name"] == "post"
+    assert spans["outcome"] == "ok"
+    assert _names(spans) == [
+        "initialize_browser",
+        "validate_credentials",
+        "post_ad",
+        "cleanup",
+    ]
+    post_ad = spans["children"][2]
+    assert _names(post_ad) == ["random_delay", "fill_listing_form"]
+    form = post_ad["children"][1]
+    assert form["children"][0]["name"] == "upload_images"
+    assert form["children"][0]["outcome"] == "failed"
+    # Only string arguments (URLs, selectors) are recorded as span detail
+    assert "detail" not in form["children"][0]
+    assert spans["duration_ms"] >= post_ad["duration_ms"]
+    assert result.trace_path is None
+
+    count = REGISTRY.get_sample_value(
+        "automation_step_duration_seconds_count",
+        {"platform": "fakeplatform", "step": "fill_listing_form", "outcome": "ok"},
+    )
+    assert count >= 1
+
+
+async def test_exceptions_mark_spans_as_errors():
+    manager = AutomationManager()
+    manager.register_platform(_FakePlatform(fail_on="form"))
+
+    result = await manager.post_to_platform("fakeplatform", AD, CREDENTIALS)
+
+    assert result.status is PostStatus.FAILED
+    assert result.spans["outcome"] == "error"
+    post_ad = result.spans["children"][2]
+    form = post_ad["children"][1]
+    assert form["outcome"] == "error"
+    assert form["error"] == "form not found"
+
+
+async def test_slow_posts_keep_a_playwright_trace(tmp_path):
+    platform = _FakePlatform()
+    platform.trace_slow_seconds = 1e-9
+    platform.trace_dir = str(tmp_path)
+    manager = AutomationManager()
+    manager.register_platform(platform)
+
+    result = await manager.post_to_platform("fakeplatform", AD, CREDENTIALS)
+
+    assert result.trace_path is not None
+    assert os.path.dirname(result.trace_path) == str(tmp_path)
+    assert os.path.exists(result.trace_path)
+
+
+async def test_fast_posts_discard_the_trace(tmp_path):
+    platform = _FakePlatform()
+    platform.trace_slow_seconds = 3600
+    platform.trace_dir = str(tmp_path)
+
+    await platform.initialize_browser()
+    assert platform.context.tracing.started
+    assert await platform.save_trace_if_slow(0.5) is None
+    assert platform.context.tracing.saved == [None]
+    assert os.listdir(tmp_path) == []
+
+
+class _BrowserPlatform(_FakePlatform):
+    async def initialize_browser(self):
+        await super().initialize_browser()
+        self.page = object()
+
+    async def cleanup(self):
+        self.page = None
+
+    async def post_ad(self, ad_data, credentials):
+        self._ensure_page()
+        return await super().post_ad(ad_data, credentials)
+
+
+async def test_default_post_ads_posts_each_ad_in_a_browser_session():
+    platform = _BrowserPlatform()
+
+    results = await platform.post_ads([AD, AD], CREDENTIALS)
+
+    assert [result.status for result in results] == [PostStatus.SUCCESS] * 2
+    assert all(_names(result.spans)[0] == "initialize_browser" for result in results)
+    assert platform.page is None
+
+
+def test_span_tree_is_capped():
+    with trace_post("fakeplatform") as root:
+        for _ in range(MAX_SPANS + 50):
+            with span("fakeplatform", "random_delay"):
+                pass
+
+    assert len(root.children) == MAX_SPANS - 1
+
+
+def test_spans_outside_a_post_only_feed_the_histogram():
+    with pytest.raises(ValueError):
+        with span("fakeplatform", "goto", "https://example.com") as current:
+            raise ValueError("navigation failed")
+
+    assert current.outcome == "error"
+    assert current.children == []
@@ -0,0 +1,142 @@
+import os
+import sys
+
+from pymongo import ReturnDocument, UpdateOne
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.benchmark_api import compare_to_baseline  # noqa: E402
+from scripts.memory_db import MemoryDatabase, MemorySupabase  # noqa: E402
+
+
+async def test_memory_collection_queries_like_motor():
+    db = MemoryDatabase()
+    await db.ads.insert_many(
+        [
+            {"id": "a", "status": "posted", "platforms": ["facebook"], "price": 10},
+            {"id": "b", "status": "draft", "platforms": ["offerup"], "price": 30},
+            {"id": "c", "status": "posted", "platforms": ["offerup"], "price": 20},
+        ]
+    )
+
+    posted = (
+        await db.ads.find({"status": "posted"}, {"_id": 0, "id": 1})
+        .sort([("price", -1)])
+        .to_list(10)
+    )
+    assert posted == [{"id": "c"}, {"id": "a"}]
+    assert await db.ads.count_documents({"platforms": "offerup"}) == 2
+    assert (
+        await db.ads.count_documents(
+            {"$or": [{"price": {"$lt": 15}}, {"id": {"$in": ["b"]}}]}
+        )
+        == 2
+    )
+    assert sorted(await db.ads.distinct("platforms")) == ["facebook", "offerup"]
+
+    await db.ads.update_one({"id": "b"}, {"$set": {"status": "posted"}})
+    await db.ads.bulk_write(
+        [UpdateOne({"id": "z"}, {"$inc": {"price": 5}}, upsert=True)]
+    )
+    claimed = await db.ads.find_one_and_update(
+        {"status": "posted"},
+        {"$set": {"status": "claimed"}},
+        sort=[("price", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    assert claimed["id"] == "a" and claimed["status"] == "claimed"
+    assert (await db.ads.find_one({"id": "z"}))["price"] == 5
+
+
+async def test_memory_aggregate_supports_facets():
+    db = MemoryDatabase()
+    await db.messages.insert_many(
+        [
+            {"user_id": "u1", "platform": "email", "is_read": False},
+            {"user_id": "u1", "platform": "email", "is_read": True},
+            {"user_id": "u1", "platform": "sms", "is_read": False},
+            {"user_id": "u2", "platform": "sms", "is_read": False},
+        ]
+    )
+    pipeline = [
+        {"$match": {"user_id": "u1"}},
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total": {"$sum": 1},
+                            "unread": {"$sum": {"$cond": ["$is_read", 0, 1]}},
+                        }
+                    }
+                ],
+                "platforms": [
+                    {"$group": {"_id": "$platform", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ],
+            }
+        },
+    ]
+
+    [facets] = await db.messages.aggregate(pipeline).to_list(1)
+
+    assert facets["totals"] == [{"_id": None, "total": 3, "unread": 2}]
+    assert facets["platforms"][0] == {"_id": "email", "count": 2}
+
+
+def test_memory_supabase_queries_and_rpcs():
+    client = MemorySupabase()
+    client.table("posted_ads").insert(
+        [{"ad_id": "a", "views": 3}, {"ad_id": "a", "views": 9}, {"ad_id": "b"}]
+    ).execute()
+
+    result = (
+        client.table("posted_ads")
+        .select("ad_id,views", count="exact")
+        .eq("ad_id", "a")
+        .order("views", desc=True)
+        .limit(1)
+        .execute()
+    )
+    assert result.data == [{"ad_id": "a", "views": 9}]
+    assert result.count == 2
+
+    written = client.rpc(
+        "write_with_outbox",
+        {
+            "p_table": "platform_connections",
+            "p_row": {"user_id": "u1", "platform": "ebay"},
+            "p_match_id": None,
+            "p_outbox": [{"collection": "platform_accounts", "op": "upsert"}],
+        },
+    ).execute()
+    assert written.data["id"] and written.data["platform"] == "ebay"
+    assert len(client.tables["replication_outbox"]) == 1
+
+
+def _result(rps, p95, errors=0):
+    return {
+        "concurrency": 16,
+        "db_latency_ms": 1.0,
+        "requests_per_second": rps,
+        "endpoints": {"list_ads": {"p95_ms": p95, "errors": errors}},
+    }
+
+
+def test_baseline_comparison_flags_regressions():
+    baseline = {"crosspostme": _result(200.0, 40.0)}
+
+    assert (
+        compare_to_baseline({"crosspostme": _result(180.0, 45.0)}, baseline, 0.25) == []
+    )
+    regressions = compare_to_baseline(
+        {"crosspostme": _result(120.0, 80.0, errors=3)}, baseline, 0.25
+    )
+    assert len(regressions) == 3
+    assert regressions[0].startswith("crosspostme: 120.0 req/s")
+
+    other_settings = {**_result(200.0, 40.0), "concurrency": 64}
+    assert compare_to_baseline({"crosspostme": other_settings}, baseline, 0.25)
@@ -0,0 +1,46 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemorySupabase  # noqa: E402
+from supabase_db import SupabaseDB  # noqa: E402
+
+
+def _db_with_events(*ages_days):
+    now = datetime.utcnow()
+    client = MemorySupabase()
+    for age in ages_days:
+        client.write(
+            "business_intelligence",
+            {
+                "user_id": "u1",
+                "event_type": "ai_call",
+                "timestamp": (now - timedelta(days=age)).isoformat(),
+            },
+        )
+    db = SupabaseDB()
+    db.client = client
+    return db, now
+
+
+def test_get_events_defaults_to_a_recent_window():
+    db, _ = _db_with_events(1, 10, 45, 400)
+
+    events = db.get_events(user_id="u1")
+
+    assert len(events) == 2
+    assert events[0]["timestamp"] > events[1]["timestamp"]
+
+
+def test_get_events_honours_an_explicit_range():
+    db, now = _db_with_events(1, 10, 45, 400)
+
+    events = db.get_events(
+        since=now - timedelta(days=500), until=now - timedelta(days=5)
+    )
+
+    assert len(events) == 3
@@ -0,0 +1,265 @@
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import httpx
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from automation.base import AdData, PlatformCredentials, PostStatus  # noqa: E402
+from automation.ebay import EBayAutomation  # noqa: E402
+from automation.ebay_api import (  # noqa: E402
+    AdaptiveTokenBucket,
+    EBayTradingClient,
+    ResponseParser,
+    parse_response,
+)
+
+NS = "urn:ebay:apis:eBLBaseComponents"
+
+
+def _ad(n):
+    return AdData(
+        title=f"Item <{n}> & more",
+        description="desc",
+        price=10 + n,
+        category="electronics",
+        location="Phoenix",
+        images=[],
+    )
+
+
+def _credentials():
+    return PlatformCredentials(
+        username="seller",
+        password="",
+        additional_data={
+            "app_id": "a",
+            "dev_id": "d",
+            "cert_id": "c",
+            "user_token": "t",
+        },
+    )
+
+
+def _envelope(call, body):
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>'
+        f'<{call}Response xmlns="{NS}">{body}</{call}Response>'
+    ).encode()
+
+
+def _fake_ebay(calls):
+    """MockTransport answering the Trading API calls used by EBayAutomation"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        call = request.headers["X-EBAY-API-CALL-NAME"]
+        root = ET.fromstring(request.content)
+        calls.append((call, root))
+        if call == "GeteBayOfficialTime":
+            body = "<Ack>Success</Ack><Timestamp>2026-01-01T00:00:00.000Z</Timestamp>"
+        elif call == "AddItems":
+            body = "<Ack>Warning</Ack>"
+            for container in root.findall(".//{*}AddItemRequestContainer"):
+                message_id = container.find("{*}MessageID").text
+                title = container.find("{*}Item/{*}Title").text
+                if title.startswith("Item <3>"):
+                    result = (
+                        "<Errors><ShortMessage>Bad title</ShortMessage>"
+                        "<SeverityCode>Error</SeverityCode></Errors>"
+                    )
+                else:
+                    result = f"<ItemID>9{message_id}</ItemID>"
+                body += (
+                    "<AddItemResponseContainer>"
+                    f"<CorrelationID>{message_id}</CorrelationID>{result}"
+                    "</AddItemResponseContainer>"
+                )
+        elif call == "EndItems":
+            body = "<Ack>Success</Ack>"
+            for container in root.findall(".//{*}EndItemRequestContainer"):
+                message_id = container.find("{*}MessageID").text
+                body += (
+                    "<EndItemResponseContainer>"
+                    f"<CorrelationID>{message_id}</CorrelationID>"
+                    "<EndTime>2026-01-01T00:00:00.000Z</EndTime>"
+                    "</EndItemResponseContainer>"
+                )
+        else:
+            body = "<Ack>Success</Ack>"
+        return httpx.Response(200, content=_envelope(call, body))
+
+    return httpx.MockTransport(handler)
+
+
+def _automation(calls):
+    ebay = EBayAutomation()
+    ebay.api_client = EBayTradingClient(
+        ebay.api_url,
+        rate_limiter=AdaptiveTokenBucket(rate=1000, burst=1000),
+        transport=_fake_ebay(calls),
+    )
+    return ebay
+
+
+def test_parser_handles_byte_sized_chunks():
+    xml = (
+        f'<AddItemsResponse xmlns="{NS}"><Ack>Failure</Ack>'
+        "<Errors><ErrorCode>518</ErrorCode><ShortMessage>Limit</ShortMessage></Errors>"
+        "<AddItemResponseContainer><CorrelationID>0</CorrelationID><ItemID>1</ItemID>"
+        "</AddItemResponseContainer></AddItemsResponse>"
+    ).encode()
+    parser = ResponseParser()
+    for i in range(len(xml)):
+        parser.feed(xml[i : i + 1])
+    response = parser.close()
+
+    assert response == parse_response(xml)
+    assert response.ack == "Failure"
+    assert response.throttled
+    assert response.containers == [{"Errors": [], "CorrelationID": "0", "ItemID": "1"}]
+
+
+def test_token_bucket_adapts_to_throttling():
+    bucket = AdaptiveTokenBucket(rate=2.0, min_rate=0.5, max_rate=2.2, increase=0.1)
+    for _ in range(5):
+        bucket.on_success()
+    assert bucket.rate == 2.2
+    bucket.on_throttle()
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 0.5
+
+
+async def test_post_ads_batches_add_items_and_keeps_order():
+    calls = []
+    ebay = _automation(calls)
+
+    results = await ebay.post_ads([_ad(n) for n in range(7)], _credentials())
+
+    names = [name for name, _ in calls]
+    assert names == ["GeteBayOfficialTime", "AddItems", "AddItems"]
+    assert [r.platform_ad_id for r in results[:3]] == ["90", "91", "92"]
+    assert results[3].status == PostStatus.FAILED
+    assert "Bad title" in results[3].message
+    assert results[6].post_url == "https://www.ebay.com/itm/96"
+    # Titles are escaped by the XML builder, not by hand
+    titles = [t.text for _, root in calls[1:] for t in root.findall(".//{*}Title")]
+    assert "Item <0> & more" in titles
+    await ebay.close()
+
+
+async def test_end_items_and_revise_items_cover_every_item():
+    calls = []
+    ebay = _automation(calls)
+    await ebay.login(_credentials())
+    item_ids = [str(n) for n in range(12)]
+
+    ended = await ebay.end_items(item_ids)
+    revised = await ebay.revise_items([(i, _ad(0)) for i in item_ids[:3]])
+
+    assert [name for name, _ in calls].count("EndItems") == 2
+    assert set(ended) == set(item_ids)
+    assert all(r.status == PostStatus.SUCCESS for r in ended.values())
+    assert [r.status for r in revised.values()] == [PostStatus.SUCCESS] * 3
+    # Credentials were validated once and reused
+    assert [name for name, _ in calls].count("GeteBayOfficialTime") == 1
+    await ebay.close()
+
+
+async def test_throttled_call_is_retried_with_lower_rate():
+    responses = [
+        "<Ack>Failure</Ack><Errors><ErrorCode>518</ErrorCode></Errors>",
+        "<Ack>Success</Ack>",
+    ]
+
+    def handler(request):
+        return httpx.Response(200, content=_envelope("X", responses.pop(0)))
+
+    bucket = AdaptiveTokenBucket(rate=100, burst=10, min_rate=1)
+    client = EBayTradingClient(
+        "https://ebay.test", rate_limiter=bucket, transport=httpx.MockTransport(handler)
+    )
+    response = await client.call("X", _automation([]).api_credentials)
+
+    assert response.ok
+    assert bucket.rate < 100
+    await client.aclose()
+
+
+async def test_oauth_token_is_sent_in_the_iaf_header():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=_envelope("X", "<Ack>Success</Ack>"))
+
+    ebay = _automation([])
+    ebay.api_client = EBayTradingClient(
+        "https://ebay.test", transport=httpx.MockTransport(handler)
+    )
+    credentials = _credentials()
+    credentials.additional_data["oauth_access_token"] = "oauth-tok"
+    await ebay.login(credentials)
+
+    assert requests[0].headers["X-EBAY-API-IAF-TOKEN"] == "oauth-tok"
+    assert b"eBayAuthToken" not in requests[0].content
+    await ebay.close()
+
+
+def _answering(body_for):
+    """EBayAutomation whose API answers every call with body_for(call)"""
+
+    def handler(request):
+        call = request.headers["X-EBAY-API-CALL-NAME"]
+        return httpx.Response(200, content=_envelope(call, body_for(call)))
+
+    ebay = _automation([])
+    ebay.api_client = EBayTradingClient(
+        "https://ebay.test", transport=httpx.MockTransport(handler)
+    )
+    return ebay
+
+
+async def test_end_item_without_a_matching_container_fails_instead_of_raising():
+    ebay = _answering(
+        lambda call: "<Ack>Warning</Ack><EndItemResponseContainer>"
+        "<CorrelationID>other</CorrelationID></EndItemResponseContainer>"
+    )
+
+    result = await ebay.end_item("123")
+
+    assert result.status == PostStatus.FAILED
+    assert result.platform_ad_id == "123"
+    await ebay.close()
+
+
+async def test_call_failure_gives_each_item_its_own_result():
+    ebay = _answering(
+        lambda call: "<Ack>Failure</Ack><Errors><ShortMessage>Down</ShortMessage>"
+        "<SeverityCode>Error</SeverityCode></Errors>"
+    )
+
+    results = await ebay._add_items([(0, _ad(0)), (1, _ad(1))])
+
+    assert results[0].status == PostStatus.FAILED
+    assert results[0] is not results[1]
+    await ebay.close()
+
+
+async def test_ebay_batches_end_items_and_manager_closes_its_client():
+    from automation.base import AutomationManager
+
+    calls = []
+    ebay = _automation(calls)
+    manager = AutomationManager()
+    manager.register_platform(ebay)
+
+    ended = await ebay.end_listings(["1", "2"], _credentials())
+    await manager.close()
+
+    assert [name for name, _ in calls] == ["GeteBayOfficialTime", "EndItems"]
+    assert set(ended) == {"1", "2"}
+    assert ebay.api_client._client is None
@@ -0,0 +1,167 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import httpx
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from auth import User, get_current_user_with_fallback  # noqa: E402
+from routes import auth as auth_routes  # noqa: E402
+from routes import enhanced_signup  # noqa: E402
+from scripts.memory_db import MemoryDatabase, MemorySupabase  # noqa: E402
+from services.export import supabase_keyset_rows  # noqa: E402
+from supabase_db import SupabaseDB  # noqa: E402
+
+
+async def _body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def _supabase(monkeypatch, module, client):
+    db = SupabaseDB()
+    db.client = client
+    monkeypatch.setattr(module, "supabase_db", db)
+    monkeypatch.setattr(module, "USE_SUPABASE", True)
+
+
+async def test_keyset_pages_cover_ties_exactly_once():
+    client = MemorySupabase()
+    for i in range(7):
+        # Three rows share each timestamp; pages must not skip or repeat them
+        client.write(
+            "listings",
+            {
+                "id": f"l{i}",
+                "user_id": "u1" if i != 3 else "u2",
+                "created_at": f"2025-03-0{1 + i // 3}T10:00:00.5+00:00",
+            },
+        )
+
+    rows = [
+        row["id"]
+        async for row in supabase_keyset_rows(
+            client,
+            "listings",
+            filters=lambda query: query.eq("user_id", "u1"),
+            page_size=2,
+        )
+    ]
+
+    assert rows == ["l0", "l1", "l2", "l4", "l5", "l6"]
+    assert client.calls == 4  # three full pages, then an empty one
+
+
+async def test_keyset_pages_continue_through_null_sort_keys():
+    client = MemorySupabase()
+    for i, created_at in enumerate([None, "2025-03-01", None, "2025-03-02", None]):
+        client.write("listings", {"id": f"l{i}", "created_at": created_at})
+
+    rows = [
+        row["id"] async for row in supabase_keyset_rows(client, "listings", page_size=2)
+    ]
+
+    # NULLs sort last, like Postgres, and are paged on id
+    assert rows == ["l1", "l3", "l0", "l2", "l4"]
+
+
+async def test_ads_export_streams_gzipped_csv(monkeypatch):
+    client = MemorySupabase()
+    client.write("listings", {"user_id": "u1", "title": 'Desk, "oak"', "price": 40})
+    client.write("listings", {"user_id": "u2", "title": "Lamp", "price": 5})
+    _supabase(monkeypatch, auth_routes, client)
+
+    response = await auth_routes.export_my_data(
+        dataset="ads", format="csv", gzip=True, current_user=(None, "u1")
+    )
+    rows = list(
+        csv.DictReader(io.StringIO(gzip.decompress(await _body(response)).decode()))
+    )
+
+    assert response.media_type == "application/gzip"
+    assert response.headers["content-disposition"].endswith('-ads.csv.gz"')
+    assert [(row["title"], row["price"]) for row in rows] == [('Desk, "oak"', "40")]
+
+
+async def test_messages_export_reads_a_mongo_cursor(monkeypatch):
+    db = MemoryDatabase()
+    start = datetime(2025, 3, 1)
+    await db.messages.insert_many(
+        [
+            {"id": f"m{i}", "user_id": "u1", "received_at": start - timedelta(hours=i)}
+            for i in range(3)
+        ]
+        + [{"id": "other", "user_id": "u2", "received_at": start}]
+    )
+    monkeypatch.setattr(auth_routes, "get_mongo_db", lambda: db)
+
+    response = await auth_routes.export_my_data(
+        dataset="messages", format="ndjson", gzip=False, current_user=(None, "u1")
+    )
+    lines = [json.loads(line) for line in (await _body(response)).splitlines()]
+
+    assert response.media_type == "application/x-ndjson"
+    assert [line["id"] for line in lines] == ["m2", "m1", "m0"]
+    assert lines[0]["received_at"] == "2025-02-28T22:00:00"
+
+
+async def test_business_data_stream_is_anonymized(monkeypatch):
+    client = MemorySupabase()
+    now = datetime.utcnow()
+    for days_ago in (1, 2, 60):
+        client.write(
+            "business_intelligence",
+            {
+                "user_id": "u1",
+                "event_type": "signup",
+                "event_data": {"industry": "retail"},
+                "timestamp": (now - timedelta(days=days_ago)).isoformat(),
+            },
+        )
+    _supabase(monkeypatch, enhanced_signup, client)
+
+    response = await enhanced_signup.stream_business_data(
+        days=30, format="ndjson", gzip=False, _admin="a1"
+    )
+    lines = [json.loads(line) for line in (await _body(response)).splitlines()]
+
+    assert len(lines) == 2
+    assert all("user_id" not in line and "id" not in line for line in lines)
+    assert lines[0]["event_data"] == {"industry": "retail"}
+    assert (await enhanced_signup.export_business_data(days=30, _admin="a1"))[
+        "data_points"
+    ] == 2
+
+
+async def test_business_data_routes_are_mounted_for_admins_only(monkeypatch):
+    from server import app
+
+    client = MemorySupabase()
+    _supabase(monkeypatch, enhanced_signup, client)
+    admin = User(id="a1", username="admin", email="admin@example.com", is_admin=True)
+    member = User(id="u1", username="member", email="member@example.com")
+    transport = httpx.ASGITransport(app=app)
+
+    statuses = []
+    for user in (member, admin):
+        monkeypatch.setitem(
+            app.dependency_overrides,
+            get_current_user_with_fallback,
+            lambda user=user: (user, user.id),
+        )
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as http:
+            response = await http.get(
+                "/api/auth/data-export/stream",
+                params={"format": "ndjson", "gzip": "false"},
+            )
+        statuses.append(response.status_code)
+
+    assert statuses == [403, 200]
@@ -0,0 +1,167 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.fake_marketplace import (  # noqa: E402
+    RATE_LIMIT_MESSAGE,
+    FakeMarketplace,
+    FixtureRouter,
+    MarketplaceConfig,
+    create_app,
+)
+
+
+def _client(app):
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+async def test_craigslist_flow_serves_the_selectors_the_automation_uses():
+    app = create_app()
+    async with _client(app) as client:
+        login = (await client.get("/craigslist/login")).text
+        post = (await client.get("/craigslist/post")).text
+        category = (await client.get("/craigslist/post/category")).text
+        form = (await client.get("/craigslist/post/edit")).text
+        preview = await client.post(
+            "/craigslist/post/preview", data={"PostingTitle": "Desk <b>"}
+        )
+        published = await client.post(
+            "/craigslist/post/publish",
+            headers={"x-fixture-host": "phoenix.craigslist.org"},
+        )
+
+    assert 'name="inputEmailHandle"' in login
+    assert 'value="log in"' in login
+    assert 'value="sss"' in post and "g-recaptcha" not in post
+    assert 'value="fua"' in category
+    assert 'id="postingForm"' in form and 'name="PostingBody"' in form
+    assert "Desk &lt;b&gt;" in preview.text
+    assert "posted_success" in published.text
+    assert "https://phoenix.craigslist.org/fuo/d/" in published.text
+    assert app.state.stats.published == {"craigslist": 1}
+
+
+async def test_captchas_and_rate_limits_are_injected():
+    app = create_app(MarketplaceConfig(captcha_rate=1.0, rate_limit_rate=1.0))
+    async with _client(app) as client:
+        create = (await client.get("/facebook/marketplace/create")).text
+        sell = (await client.get("/offerup/sell")).text
+        rejected = await client.post("/offerup/sell", data={"title": "Desk"})
+
+    assert "g-recaptcha" in create and "g-recaptcha" in sell
+    assert rejected.status_code == 429
+    assert RATE_LIMIT_MESSAGE in rejected.text
+    assert app.state.stats.to_dict() == {
+        "requests": 3,
+        "captchas": 2,
+        "rate_limited": 1,
+        "published": {},
+    }
+
+
+class _Route:
+    def __init__(self, url):
+        self.request = SimpleNamespace(url=url, headers={"accept": "text/html"})
+        self.calls = []
+
+    async def fetch(self, url=None, headers=None):
+        self.calls.append(("fetch", url, headers["x-fixture-host"]))
+        return "response"
+
+    async def fulfill(self, response=None):
+        self.calls.append(("fulfill", response))
+
+    async def fallback(self):
+        self.calls.append(("fallback",))
+
+    async def abort(self, error_code=None):
+        self.calls.append(("abort",))
+
+
+async def test_router_answers_marketplace_hosts_and_blocks_the_rest():
+    router = FixtureRouter("http://127.0.0.1:8123/")
+    assert router.target("https://www.facebook.com") == (
+        "http://127.0.0.1:8123/facebook/"
+    )
+    assert router.target("https://phoenix.craigslist.org/post?id=sss") == (
+        "http://127.0.0.1:8123/craigslist/post?id=sss"
+    )
+    assert router.target("https://static.xx.fbcdn.net/app.js") is None
+
+    page = _Route("https://offerup.com/sell")
+    image = _Route("http://127.0.0.1:8123/images/1.jpg")
+    tracker = _Route("https://www.google-analytics.com/collect")
+    for route in (page, image, tracker):
+        await router.handle(route)
+
+    assert page.calls == [
+        ("fetch", "http://127.0.0.1:8123/offerup/sell", "offerup.com"),
+        ("fulfill", "response"),
+    ]
+    assert image.calls == [("fallback",)]
+    assert tracker.calls == [("abort",)]
+
+
+async def test_fake_marketplace_serves_on_a_local_port():
+    with FakeMarketplace(MarketplaceConfig(latency_ms=5)) as marketplace:
+        async with httpx.AsyncClient(base_url=marketplace.url) as client:
+            response = await client.get("/offerup/login")
+
+    assert marketplace.port != 0
+    assert 'data-testid="login-button"' in response.text
+    assert marketplace.stats.requests == 1
+
+
+@pytest.mark.skipif(
+    not os.environ.get("AUTOMATION_E2E"),
+    reason="needs Playwright's Chromium; set AUTOMATION_E2E=1",
+)
+async def test_automations_post_end_to_end(monkeypatch):
+    from automation import (
+        AdData,
+        AutomationManager,
+        CraigslistAutomation,
+        FacebookMarketplaceAutomation,
+        OfferUpAutomation,
+        PlatformCredentials,
+        PostStatus,
+    )
+
+    ad = AdData(
+        title="Desk",
+        description="Oak desk",
+        price=50,
+        category="furniture",
+        location="Phoenix",
+        images=[],
+    )
+    credentials = PlatformCredentials(username="u@example.com", password="p")
+    with FakeMarketplace() as marketplace:
+        monkeypatch.setenv("AUTOMATION_HUMANIZATION", "fast")
+        manager = AutomationManager()
+        for platform in (
+            CraigslistAutomation(),
+            FacebookMarketplaceAutomation(),
+            OfferUpAutomation(),
+        ):
+            platform.context_hooks.append(FixtureRouter(marketplace.url))
+            manager.register_platform(platform)
+
+        results = {
+            name: await manager.post_to_platform(name, ad, credentials)
+            for name in ("craigslist", "facebook", "offerup")
+        }
+
+    assert {name: result.status for name, result in results.items()} == dict.fromkeys(
+        results, PostStatus.SUCCESS
+    )
+    assert marketplace.stats.published == dict.fromkeys(results, 1)
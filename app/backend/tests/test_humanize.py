@@ -0,0 +1,104 @@
+import os
+import random
+import sys
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from automation.base import PlatformAutomationBase  # noqa: E402
+from automation.humanize import (  # noqa: E402
+    PROFILES,
+    HumanizationProfile,
+    Pacer,
+    Pause,
+    humanization_for,
+)
+
+
+class _Page:
+    def __init__(self):
+        self.calls = []
+
+    async def wait_for_selector(self, selector, **kwargs):
+        pass
+
+    async def fill(self, selector, text):
+        self.calls.append(("fill", selector, text))
+
+    async def type(self, selector, text, delay=0):
+        self.calls.append(("type", selector, text))
+
+
+class _Platform(PlatformAutomationBase):
+    def __init__(self, platform):
+        super().__init__(platform)
+        self.page = _Page()
+
+    async def login(self, credentials):
+        return True
+
+    async def validate_credentials(self, credentials):
+        return True
+
+    async def post_ad(self, ad_data, credentials):
+        return None
+
+    def get_supported_categories(self):
+        return []
+
+
+def test_long_text_is_filled_and_typeahead_fields_are_typed():
+    profile = PROFILES["facebook"]
+
+    assert profile.should_type("#pass", "hunter2")
+    assert profile.should_type('[data-testid="composer-location-input"]', "Austin")
+    assert not profile.should_type('[data-testid="composer-title-input"]', "Desk")
+    assert not profile.should_type("#email", "x" * 500)
+    assert PROFILES["legacy"].should_type("textarea", "x" * 2000)
+    assert not PROFILES["fast"].should_type("#pass", "hunter2")
+
+
+def test_pauses_stay_within_their_range():
+    rng = random.Random(7)
+    pause = Pause(0.2, 1.0, median=0.4, sigma=2.0)
+
+    samples = [pause.sample(rng) for _ in range(1000)]
+
+    assert min(samples) == 0.2
+    assert max(samples) == 1.0
+    assert 0.3 < sorted(samples)[500] < 0.5
+
+
+async def test_safe_fill_pastes_long_text():
+    platform = _Platform("offerup")
+    platform.humanization = HumanizationProfile(
+        name="offerup-test", keystroke_fields=("location",)
+    )
+
+    assert await platform.safe_fill('textarea[name="description"]', "y" * 2000)
+    assert await platform.safe_fill('input[name="location"]', "Austin")
+
+    assert platform.page.calls == [
+        ("fill", 'textarea[name="description"]', "y" * 2000),
+        ("fill", 'input[name="location"]', ""),
+        ("type", 'input[name="location"]', "Austin"),
+    ]
+
+
+def test_profile_override_and_pacing(monkeypatch):
+    monkeypatch.setenv("AUTOMATION_HUMANIZATION", "legacy")
+    assert humanization_for("craigslist").name == "legacy"
+    monkeypatch.delenv("AUTOMATION_HUMANIZATION")
+    assert humanization_for("craigslist").name == "craigslist"
+    assert humanization_for("mercari").keystroke_fields
+
+    pacer = Pacer(backoff=2.0, recovery=0.5, max_pace=4.0)
+    for _ in range(3):
+        pacer.blocked()
+    assert pacer.pace == 4.0
+    pacer.succeeded()
+    assert pacer.pace == 2.0
+    pacer.succeeded()
+    pacer.succeeded()
+    assert pacer.pace == 1.0
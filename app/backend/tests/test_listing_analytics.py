@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from postgrest.exceptions import APIError
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemorySupabase  # noqa: E402
+from services.listing_analytics import ListingAnalyticsBuffer  # noqa: E402
+from supabase_db import SupabaseDB  # noqa: E402
+
+
+def _db(client):
+    db = SupabaseDB()
+    db.client = client
+    return db
+
+
+async def test_views_are_coalesced_into_one_write_per_flush():
+    client = MemorySupabase()
+    db = _db(client)
+    buffer = ListingAnalyticsBuffer(supabase_client=client, flush_interval_seconds=60)
+    buffer.start()
+    try:
+        for _ in range(500):
+            db.track_listing_view("l1", "owner", "ebay")
+        db.track_listing_activity("l1", "owner", "ebay", clicks=2)
+        db.track_listing_view("l2", "owner", "facebook")
+        assert client.calls == 0
+
+        assert await buffer.flush() == 2
+        db.track_listing_view("l1", "owner", "ebay")
+    finally:
+        # Shutdown writes what is still pending
+        await buffer.stop()
+
+    assert client.calls == 2
+    rows = {row["listing_id"]: row for row in client.tables["analytics"]}
+    assert rows["l1"]["views"] == 501 and rows["l1"]["clicks"] == 2
+    assert rows["l2"]["views"] == 1
+
+
+async def test_full_buffer_flushes_early_and_bounds_pending():
+    client = MemorySupabase()
+    buffer = ListingAnalyticsBuffer(
+        supabase_client=client, flush_interval_seconds=60, max_pending=3
+    )
+    buffer.start()
+    try:
+        for listing in ("a", "b", "c"):
+            buffer.record(listing, "ebay", views=1)
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if client.tables.get("analytics"):
+                break
+        assert len(client.tables["analytics"]) == 3
+    finally:
+        await buffer.stop()
+
+    failing = ListingAnalyticsBuffer(
+        supabase_client=MemorySupabase(rpcs={}), max_pending=2
+    )
+    for listing in ("a", "b", "c"):
+        failing.record(listing, "ebay", views=1)
+    assert failing.metrics["dropped"] == 1
+    with pytest.raises(NotImplementedError):
+        await failing.flush()
+    # A failed flush keeps its deltas for the next attempt
+    assert failing.metrics["pending"] == 2
+
+
+async def test_bad_rows_are_quarantined_and_a_full_buffer_writes_directly():
+    client = MemorySupabase()
+    apply = client.rpcs["apply_listing_analytics_deltas"]
+
+    def _apply(store, params):
+        # Like the ::uuid cast in apply_listing_analytics_deltas
+        if any(row["listing_id"] == "not-a-uuid" for row in params["p_rows"]):
+            raise APIError({"code": "22P02", "message": "invalid input syntax"})
+        return apply(store, params)
+
+    client.register_rpc("apply_listing_analytics_deltas", _apply)
+    buffer = ListingAnalyticsBuffer(supabase_client=client, max_pending=2)
+    for listing in ("a", "not-a-uuid", "b"):
+        buffer.record(listing, "ebay", views=1)
+    assert buffer.metrics["written_directly"] == 1
+    assert buffer.metrics["dropped"] == 0
+
+    assert await buffer.flush() == 1
+    assert buffer.metrics["quarantined"] == 1
+    assert buffer.metrics["pending"] == 0
+    assert {row["listing_id"] for row in client.tables["analytics"]} == {"a", "b"}
+
+
+def test_without_a_buffer_activity_is_written_directly():
+    client = MemorySupabase()
+
+    _db(client).track_listing_activity("l1", "owner", "ebay", favorites=1)
+
+    assert client.tables["analytics"][0]["favorites"] == 1
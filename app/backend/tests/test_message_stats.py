@@ -0,0 +1,143 @@
+import os
+import sys
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from auth import get_current_user  # noqa: E402
+from routes import messages  # noqa: E402
+from scripts.memory_db import MemoryDatabase  # noqa: E402
+from server import app  # noqa: E402
+from services import message_stats  # noqa: E402
+from services.message_stats import MessageStatsCache, get_message_stats  # noqa: E402
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class _FakeMessages:
+    def __init__(self, facets):
+        self.facets = facets
+        self.calls = 0
+
+    def aggregate(self, pipeline):
+        self.calls += 1
+        return _FakeCursor([self.facets])
+
+
+class _FakeDB:
+    def __init__(self, facets):
+        self.messages = _FakeMessages(facets)
+
+
+FACETS = {
+    "messages": [{"_id": None, "total": 5, "unread": 2, "recent": 1}],
+    "platforms": [{"_id": "email", "count": 4}, {"_id": "sms", "count": 1}],
+    "leads": [{"_id": None, "total": 3, "active": 2}],
+}
+
+
+async def test_stats_single_aggregation_and_cache() -> None:
+    message_stats.invalidate_message_stats("u1")
+    db = _FakeDB(FACETS)
+
+    stats = await get_message_stats(db, "u1")
+    assert stats["total_messages"] == 5
+    assert stats["unread_messages"] == 2
+    assert stats["active_leads"] == 2
+    assert stats["platform_breakdown"][0] == {"platform": "email", "count": 4}
+
+    await get_message_stats(db, "u1")
+    assert db.messages.calls == 1
+
+    message_stats.invalidate_message_stats("u1")
+    await get_message_stats(db, "u1")
+    assert db.messages.calls == 2
+
+
+async def test_stats_empty_user() -> None:
+    message_stats.invalidate_message_stats("empty")
+    stats = await get_message_stats(_FakeDB({}), "empty")
+    assert stats["total_messages"] == 0
+    assert stats["platform_breakdown"] == []
+
+
+def test_cache_bounds_entries() -> None:
+    cache = MessageStatsCache(ttl=60, max_users=2)
+    cache.set("a", {})
+    cache.set("b", {})
+    cache.set("c", {})
+    assert cache.get("a") is None
+    assert cache.get("c") == {}
+
+
+class _FakeRpc:
+    def __init__(self, data):
+        self.data = data
+        self.params = None
+
+    def rpc(self, name, params):
+        self.params = params
+        return self
+
+    def execute(self):
+        return self
+
+
+class _FailingMessages:
+    def aggregate(self, pipeline):
+        raise RuntimeError("mongo down")
+
+
+async def test_supabase_fallback_is_windowed_and_omits_untracked() -> None:
+    message_stats.invalidate_message_stats("u2")
+    db = _FakeDB({})
+    db.messages = _FailingMessages()
+    client = _FakeRpc({"total_messages": 4, "recent_messages_24h": 1})
+
+    stats = await get_message_stats(db, "u2", supabase_client=client)
+
+    assert stats["total_messages"] == 4
+    assert stats["unread_messages"] is None
+    assert stats["active_leads"] is None
+    assert client.params["p_from"] < client.params["p_since"]
+
+
+async def test_stats_route_serves_the_aggregation(monkeypatch) -> None:
+    message_stats.invalidate_message_stats("route-user")
+    db = MemoryDatabase()
+    now = datetime.now().isoformat()
+    await db.messages.insert_many(
+        [
+            {"user_id": "route-user", "platform": "email", "is_read": False},
+            {"user_id": "route-user", "platform": "sms", "is_read": True},
+            {"user_id": "route-user", "platform": "email", "received_at": now},
+            {"user_id": "someone-else", "platform": "email", "is_read": False},
+        ]
+    )
+    await db.leads.insert_one({"user_id": "route-user", "status": "new"})
+    monkeypatch.setattr(messages, "get_mongo_db", lambda: db)
+    monkeypatch.setitem(
+        app.dependency_overrides, get_current_user, lambda: "route-user"
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        response = await c.get("/api/messages/stats/")
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_messages"] == 3
+    assert stats["unread_messages"] == 1
+    assert stats["recent_messages_24h"] == 1
+    assert stats["total_leads"] == 1
+    assert stats["platform_breakdown"][0] == {"platform": "email", "count": 2}
@@ -0,0 +1,238 @@
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from prometheus_client import REGISTRY
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.metrics import (  # noqa: E402
+    InstrumentedSupabaseClient,
+    LoopLagMonitor,
+    PrometheusMiddleware,
+    instrument_motor_database,
+    metrics_response,
+    track_call,
+)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+async def test_requests_are_labelled_by_route_template():
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    ok_before = _sample("http_request_duration_seconds_count", status="200", **labels)
+    missing_before = _sample(
+        "http_request_duration_seconds_count", status="404", **labels
+    )
+    unmatched_before = _sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        await c.get("/items/a")
+        await c.get("/items/b")
+        await c.get("/items/missing")
+        await c.get("/nowhere")
+
+    assert (
+        _sample("http_request_duration_seconds_count", status="200", **labels)
+        == ok_before + 2
+    )
+    assert (
+        _sample("http_request_duration_seconds_count", status="404", **labels)
+        == missing_before + 1
+    )
+    assert (
+        _sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        == unmatched_before + 1
+    )
+    assert _sample("http_requests_in_flight") == 0
+
+    body, content_type = metrics_response()
+    assert content_type.startswith("text/plain")
+    assert b'route="/items/{item_id}"' in body
+
+
+class _Builder:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def select(self, *args):
+        self.calls.append("select")
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        self.calls.append("execute")
+        return "response"
+
+
+class _Supabase:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        return _Builder(self.calls)
+
+    def rpc(self, fn, params):
+        return _Builder(self.calls)
+
+
+def test_supabase_queries_are_timed_by_table_and_operation():
+    labels = {"backend": "supabase", "outcome": "ok"}
+    select_before = _sample(
+        "db_call_duration_seconds_count", target="users", operation="select", **labels
+    )
+    rpc_before = _sample(
+        "db_call_duration_seconds_count",
+        target="increment_listing_views",
+        operation="rpc",
+        **labels,
+    )
+    raw = _Supabase()
+    client = InstrumentedSupabaseClient(raw)
+
+    result = client.table("users").select("*").eq("id", "u1").execute()
+    client.rpc("increment_listing_views", {"listing_id": "l1"}).execute()
+
+    assert result == "response"
+    assert raw.calls == ["select", "execute", "execute"]
+    assert (
+        _sample(
+            "db_call_duration_seconds_count",
+            target="users",
+            operation="select",
+            **labels,
+        )
+        == select_before + 1
+    )
+    assert (
+        _sample(
+            "db_call_duration_seconds_count",
+            target="increment_listing_views",
+            operation="rpc",
+            **labels,
+        )
+        == rpc_before + 1
+    )
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class _Collection:
+    def __init__(self, name):
+        self.name = name
+
+    async def find_one(self, query):
+        if query.get("fail"):
+            raise RuntimeError("boom")
+        return {"id": "1"}
+
+    def find(self, query):
+        return _Cursor([{"id": "1"}, {"id": "2"}])
+
+
+class _Database:
+    def __init__(self):
+        self.ads = _Collection("ads")
+
+    def __getitem__(self, name):
+        return _Collection(name)
+
+
+async def test_motor_calls_are_timed_by_collection_and_operation():
+    def count(operation, outcome="ok"):
+        return _sample(
+            "db_call_duration_seconds_count",
+            backend="mongo",
+            target="ads",
+            operation=operation,
+            outcome=outcome,
+        )
+
+    before = count("find_one"), count("find_one", "error"), count("find")
+    db = instrument_motor_database(_Database())
+
+    assert await db.ads.find_one({"id": "1"}) == {"id": "1"}
+    with pytest.raises(RuntimeError):
+        await db["ads"].find_one({"fail": True})
+    docs = await db.ads.find({}).sort("created_at", -1).to_list(10)
+
+    assert len(docs) == 2
+    assert count("find_one") == before[0] + 1
+    assert count("find_one", "error") == before[1] + 1
+    assert count("find") == before[2] + 1
+    assert instrument_motor_database(db) is db
+
+
+async def test_track_call_records_outcome():
+    def count(outcome):
+        return _sample(
+            "external_call_duration_seconds_count",
+            service="openai",
+            operation="chat.completions",
+            outcome=outcome,
+        )
+
+    ok_before, error_before = count("ok"), count("error")
+
+    with track_call("openai", "chat.completions"):
+        pass
+    with pytest.raises(ValueError):
+        with track_call("openai", "chat.completions"):
+            raise ValueError("bad response")
+
+    assert count("ok") == ok_before + 1
+    assert count("error") == error_before + 1
+
+
+def test_loop_lag_records_gauge_and_stalls():
+    monitor = LoopLagMonitor(interval_seconds=0.5, stall_threshold_seconds=0.1)
+    stalls_before = _sample("event_loop_stalls_total")
+
+    monitor.record(0.02)
+    assert _sample("event_loop_lag_seconds") == pytest.approx(0.02)
+    monitor.record(0.3)
+
+    assert _sample("event_loop_lag_seconds") == pytest.approx(0.3)
+    assert _sample("event_loop_lag_max_seconds") >= 0.3
+    assert _sample("event_loop_stalls_total") == stalls_before + 1
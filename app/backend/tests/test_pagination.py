@@ -0,0 +1,71 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemoryDatabase  # noqa: E402
+from services.pagination import (  # noqa: E402
+    encode_cursor,
+    keyset_query,
+    next_cursor,
+    sort_spec,
+)
+
+
+async def _pages(collection, descending, limit=2):
+    pages, cursor = [], None
+    while True:
+        items = (
+            await collection.find(
+                keyset_query({"user_id": "u1"}, "received_at", cursor, descending),
+                {"_id": 0},
+            )
+            .sort(sort_spec("received_at", descending))
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        cursor = next_cursor(items, "received_at", limit)
+        pages.append([item["id"] for item in items])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("descending", [True, False])
+async def test_pages_cover_rows_with_null_and_missing_sort_keys(descending):
+    db = MemoryDatabase()
+    received = [datetime(2025, 3, day) for day in (1, 2, 2, 3)] + [None, None]
+    await db.messages.insert_many(
+        [
+            {"id": f"m{i}", "user_id": "u1", "received_at": at}
+            for i, at in enumerate(received)
+        ]
+        + [{"id": "m6", "user_id": "u1"}, {"id": "x", "user_id": "u2"}]
+    )
+
+    pages = await _pages(db.messages, descending)
+
+    # MongoDB orders null and missing keys together, below every date
+    expected = ["m3", "m2", "m1", "m0", "m6", "m5", "m4"]
+    assert [i for page in pages for i in page] == (
+        expected if descending else expected[::-1]
+    )
+    assert all(len(page) == 2 for page in pages[:-1])
+
+
+def test_null_cursor_only_continues_through_null_keys_when_descending():
+    cursor = encode_cursor(None, "m5")
+
+    assert keyset_query({}, "received_at", cursor) == {
+        "$or": [{"received_at": None, "id": {"$lt": "m5"}}]
+    }
+    assert keyset_query({}, "received_at", cursor, descending=False) == {
+        "$or": [
+            {"received_at": None, "id": {"$gt": "m5"}},
+            {"received_at": {"$ne": None}},
+        ]
+    }
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.periodic import PeriodicService  # noqa: E402
+
+
+class _Counter(PeriodicService):
+    label = "Test counter"
+
+    def __init__(self, backlog: int = 0) -> None:
+        super().__init__(60, metrics={"ticks": 0})
+        self.backlog = backlog
+        self.ticked = asyncio.Event()
+        self.stopped = False
+
+    async def tick(self) -> bool:
+        self.metrics["ticks"] += 1
+        if self.metrics["ticks"] == 2:
+            raise RuntimeError("boom")
+        self.ticked.set()
+        if self.backlog:
+            self.backlog -= 1
+            return True
+        return False
+
+    async def on_stop(self) -> None:
+        self.stopped = True
+
+
+async def test_backlog_skips_the_wait_and_failures_are_recorded():
+    service = _Counter(backlog=3)
+    service.start()
+    try:
+        # Tick 2 fails, so the loop sleeps the (60s) interval after it
+        await asyncio.sleep(0.05)
+        assert service.metrics["ticks"] == 2
+        assert service.metrics["last_error"] == "boom"
+
+        service.ticked.clear()
+        service.wake()
+        await asyncio.wait_for(service.ticked.wait(), 1)
+        await asyncio.sleep(0.05)
+        # Woken early, then the remaining backlog runs back to back
+        assert service.metrics["ticks"] == 5
+    finally:
+        await service.stop()
+
+
+async def test_running_instance_is_registered_until_stopped():
+    service = _Counter()
+    assert _Counter.running_metrics() is None
+
+    service.start()
+    await asyncio.wait_for(service.ticked.wait(), 1)
+    assert _Counter.running() is service
+    assert _Counter.running_metrics() == {"ticks": 1}
+
+    await service.stop()
+    assert _Counter.running() is None
+    assert service.stopped
@@ -0,0 +1,179 @@
+import os
+import sys
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.replication import (  # noqa: E402
+    OP_SET,
+    OP_UPSERT,
+    OutboxReplicator,
+    outbox_op,
+    to_mongo_write,
+)
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return _Result(self.fn())
+
+
+class _Table:
+    def __init__(self, client):
+        self.client = client
+
+    def delete(self):
+        return self
+
+    def in_(self, column, ids):
+        return _Call(lambda: self.client.deleted.extend(ids))
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.attempts = {row["id"]: row.get("attempts", 1) for row in rows}
+        self.deleted = []
+        self.released = []
+        self.releases = []
+        self.deferred = []
+        self.dead_letter = []
+
+    def _release(self, params):
+        ids, max_attempts = params["p_ids"], params["p_max_attempts"]
+        self.releases.append((ids, params["p_error"], max_attempts))
+        dead = [
+            i for i in ids if max_attempts is not None and self.attempts[i] >= max_attempts
+        ]
+        self.released.extend(i for i in ids if i not in dead)
+        self.dead_letter.extend(dead)
+        return dead
+
+    def rpc(self, name, params):
+        if name == "claim_replication_outbox":
+            rows, self.rows = self.rows, []
+            return _Call(lambda: rows)
+        if name == "release_replication_outbox":
+            return _Call(lambda: self._release(params))
+        if name == "defer_replication_outbox":
+            return _Call(lambda: self.deferred.extend(params["p_ids"]))
+        raise AssertionError(name)
+
+    def table(self, name):
+        return _Table(self)
+
+
+class _FakeCollection:
+    """Rejects writes to documents whose id is in ``reject``"""
+
+    def __init__(self, reject=(), down=False):
+        self.requests = []
+        self.reject = set(reject)
+        self.down = down
+
+    async def bulk_write(self, requests, ordered):
+        assert ordered
+        if self.down:
+            raise ConnectionError("mongo unreachable")
+        for index, request in enumerate(requests):
+            if request._filter["id"] in self.reject:
+                raise BulkWriteError(
+                    {"writeErrors": [{"index": index, "errmsg": "Document failed validation"}]}
+                )
+            self.requests.append(request)
+
+
+def _row(row_id, op, attempts=1):
+    return {
+        "id": row_id,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "attempts": attempts,
+        **op,
+    }
+
+
+def test_outbox_op_is_json_safe_and_converts_to_idempotent_writes() -> None:
+    from datetime import datetime
+
+    op = outbox_op("messages", OP_UPSERT, {"_id": "x", "id": "m1", "at": datetime(2025, 1, 1)})
+    assert op["filter"] == {"id": "m1"}
+    assert op["document"] == {"id": "m1", "at": "2025-01-01 00:00:00"}
+    assert isinstance(to_mongo_write(op), ReplaceOne)
+    assert isinstance(to_mongo_write(outbox_op("users", OP_SET, {"a": 1}, {"id": "u"})), UpdateOne)
+
+
+async def test_replicator_batches_by_collection_and_releases_failures() -> None:
+    rows = [
+        _row(3, outbox_op("users", OP_SET, {"is_active": False}, {"id": "u1"})),
+        _row(1, outbox_op("messages", OP_UPSERT, {"id": "m1"})),
+        _row(2, outbox_op("messages", OP_UPSERT, {"id": "m2"})),
+        _row(4, outbox_op("users", OP_SET, {"full_name": "A"}, {"id": "u2"})),
+    ]
+    supabase = _FakeSupabase(rows)
+    db = {"messages": _FakeCollection(), "users": _FakeCollection(reject={"u2"})}
+    replicator = OutboxReplicator(db, supabase_client=supabase, batch_size=10)
+
+    stats = await replicator.run_once()
+
+    assert stats == {"claimed": 4, "replicated": 3, "failed": 1}
+    assert db["messages"].requests == [
+        ReplaceOne({"id": "m1"}, {"id": "m1"}, upsert=True),
+        ReplaceOne({"id": "m2"}, {"id": "m2"}, upsert=True),
+    ]
+    assert sorted(supabase.deleted) == [1, 2, 3]
+    assert supabase.released == [4]
+    assert replicator.metrics["last_lag_seconds"] > 0
+    assert (await replicator.run_once())["claimed"] == 0
+
+
+async def test_rejected_row_only_holds_back_its_own_document() -> None:
+    rows = [
+        _row(1, outbox_op("users", OP_SET, {"a": 1}, {"id": "u1"})),
+        _row(2, outbox_op("users", OP_SET, {"a": 1}, {"id": "bad"}), attempts=3),
+        _row(3, outbox_op("users", OP_SET, {"a": 2}, {"id": "u2"})),
+        _row(4, outbox_op("users", OP_SET, {"a": 2}, {"id": "bad"})),
+        _row(5, outbox_op("users", OP_SET, {"a": 3}, {"id": "u3"})),
+        _row(6, outbox_op("messages", OP_UPSERT, {"id": "m1"})),
+    ]
+    supabase = _FakeSupabase(rows)
+    db = {"users": _FakeCollection(reject={"bad"}), "messages": _FakeCollection(down=True)}
+    replicator = OutboxReplicator(db, supabase_client=supabase, batch_size=10, max_attempts=5)
+
+    stats = await replicator.run_once()
+
+    # Writes after the rejected row still apply; its document's newer row waits
+    assert [r._filter["id"] for r in db["users"].requests] == ["u1", "u2", "u3"]
+    assert sorted(supabase.deleted) == [1, 3, 5]
+    assert supabase.deferred == [4]
+    assert stats == {"claimed": 6, "replicated": 3, "failed": 3}
+    # Rejections count toward dead-lettering; an unreachable MongoDB does not
+    assert sorted(supabase.releases) == [
+        ([2], "users: Document failed validation", 5),
+        ([6], "messages: mongo unreachable", None),
+    ]
+    assert supabase.dead_letter == []
+
+
+async def test_row_rejected_max_attempts_times_is_dead_lettered() -> None:
+    rows = [_row(1, outbox_op("users", OP_SET, {"a": 1}, {"id": "bad"}), attempts=5)]
+    supabase = _FakeSupabase(rows)
+    db = {"users": _FakeCollection(reject={"bad"})}
+    replicator = OutboxReplicator(db, supabase_client=supabase, batch_size=10, max_attempts=5)
+
+    await replicator.run_once()
+
+    assert supabase.dead_letter == [1]
+    assert supabase.released == []
+    assert replicator.metrics["dead_lettered"] == 1
@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+SCRIPTS = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "scripts")
+)
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+from site_crawler import run  # noqa: E402
+
+PAGES = {
+    "/": """
+        <a href="/pricing">Pricing</a>
+        <a href="/dashboard">Dashboard</a>
+        <a href="/gone#section">Gone</a>
+        <a href="javascript:void(0)">Menu</a>
+        <a href="#top">Top</a>
+        <button onclick="window.location='/admin'">Admin</button>
+        <form action="/signup" method="post"></form>
+    """,
+    "/pricing": '<a href="/company">Company</a><a href="/">Home</a>',
+    "/company": '<a href="/deep">Deep</a>',
+    "/deep": "<p>too deep to be crawled</p>",
+    "/signup": "<p>sign up</p>",
+    "/login": "<p>log in</p>",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == "/dashboard":
+            self._send(302, b"", {"Location": "/login?next=/dashboard"})
+        elif self.path == "/admin":
+            self._send(401, b"auth required")
+        elif self.path.split("?")[0] in PAGES:
+            page = PAGES[self.path.split("?")[0]].encode()
+            self._send(200, page, {"Content-Type": "text/html; charset=utf-8"})
+        else:
+            self._send(404, b"not found")
+
+    def _send(self, code, body, headers=None):
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    _Handler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+async def test_crawl_classifies_links_and_respects_depth(site):
+    report = await run(site, max_depth=2, concurrency=4)
+    pages = {p["url"].replace(site, ""): p for p in report["pages"]}
+
+    assert pages["/"]["classification"] == "public"
+    assert pages["/pricing"]["classification"] == "public"
+    assert pages["/dashboard"]["classification"] == "redirect-to-login"
+    assert pages["/admin"]["classification"] == "protected"
+    assert pages["/gone"]["classification"] == "missing"
+    assert pages["/signup"]["classification"] == "public"
+    # /company is at the depth limit: checked, but its links are not followed
+    assert pages["/company"]["depth"] == 2
+    assert pages["/company"]["found_on"] == f"{site}/pricing"
+    assert "/deep" not in pages
+
+    assert report["non_navigating"][f"{site}/"] == ["javascript:void(0)", "#top"]
+    assert report["summary"]["missing"] == 1
+
+
+async def test_each_url_is_fetched_once(site):
+    await run(site, max_depth=5, concurrency=8)
+
+    fetched = [path for path in _Handler.requests if not path.startswith("/login")]
+    assert len(fetched) == len(set(fetched))
+
+
+async def test_depth_zero_only_checks_start_pages(site):
+    report = await run(site, max_depth=0, paths=["/pricing"])
+
+    assert sorted(p["url"] for p in report["pages"]) == [f"{site}/", f"{site}/pricing"]
@@ -0,0 +1,107 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.fernet import Fernet
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemoryDatabase  # noqa: E402
+from services.platform_oauth_service import (  # noqa: E402
+    PlatformOAuthService,
+    compute_token_expiry,
+    get_provider_client,
+)
+from services.token_refresh import TokenRefreshScheduler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _encryption_key(monkeypatch):
+    monkeypatch.setenv("CREDENTIAL_ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+
+def test_compute_token_expiry() -> None:
+    now = datetime(2025, 1, 1)
+    assert compute_token_expiry(7200, now) == now + timedelta(hours=2)
+    assert compute_token_expiry("60", now) == now + timedelta(seconds=60)
+    assert compute_token_expiry(None, now) is None
+    assert compute_token_expiry(0, now) is None
+
+
+def test_provider_client_is_shared() -> None:
+    assert get_provider_client("ebay") is get_provider_client("ebay")
+    assert get_provider_client("ebay") is not get_provider_client("facebook")
+
+
+async def test_get_valid_token_skips_refresh_when_fresh() -> None:
+    db = MemoryDatabase()
+    await db.platform_tokens.insert_one(
+        {
+            "user_id": "u1",
+            "platform": "ebay",
+            "status": "active",
+            "access_token": "tok",
+            "expires_at": datetime.utcnow() + timedelta(hours=1),
+        }
+    )
+    service = PlatformOAuthService(db)
+
+    async def _fail(_doc):
+        raise AssertionError("fresh token must not be refreshed inline")
+
+    service.refresh_platform_token = _fail
+    assert await service.get_valid_token("u1", "ebay") == "tok"
+
+
+async def test_run_once_counts_results() -> None:
+    db = MemoryDatabase()
+    service = PlatformOAuthService(db)
+    scheduler = TokenRefreshScheduler(db, oauth_service=service)
+    docs = [{"platform": "ebay", "user_id": str(i)} for i in range(3)]
+
+    async def _claim(now):
+        return docs
+
+    async def _refresh(doc):
+        return doc["user_id"] != "1"
+
+    scheduler._claim_due_tokens = _claim
+    service.refresh_platform_token = _refresh
+
+    stats = await scheduler.run_once()
+    assert stats == {"claimed": 3, "refreshed": 2, "failed": 1}
+
+
+async def test_failed_refreshes_back_off_exponentially() -> None:
+    db = MemoryDatabase()
+    service = PlatformOAuthService(db)
+    scheduler = TokenRefreshScheduler(db, oauth_service=service, max_failures=4)
+    docs = [
+        {"platform": "ebay", "user_id": "u0", "refresh_failures": 0},
+        {"platform": "ebay", "user_id": "u3", "refresh_failures": 3},
+        {"platform": "ebay", "user_id": "u9", "refresh_failures": 9},
+    ]
+    await db.platform_tokens.insert_many([dict(doc) for doc in docs])
+
+    async def _claim(now):
+        return docs
+
+    async def _refresh(doc):
+        return False
+
+    scheduler._claim_due_tokens = _claim
+    service.refresh_platform_token = _refresh
+    before = datetime.utcnow()
+
+    await scheduler.run_once()
+
+    held = {
+        doc["user_id"]: doc["refresh_lease_until"] - before
+        for doc in db.platform_tokens.docs
+    }
+    assert timedelta(minutes=5) <= held["u0"] < timedelta(minutes=6)
+    assert timedelta(minutes=40) <= held["u3"] < timedelta(minutes=41)
+    assert timedelta(hours=6) <= held["u9"] < timedelta(hours=6, minutes=1)
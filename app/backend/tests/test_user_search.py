@@ -0,0 +1,78 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scripts.memory_db import MemoryDatabase  # noqa: E402
+from services.user_search import (  # noqa: E402
+    CANDIDATE_SCAN_FACTOR,
+    _TopMatches,
+    build_mongo_search_filter,
+    rank_users,
+    search_users_mongo,
+    trigrams,
+    user_search_fields,
+)
+
+
+def test_search_fields_are_normalized() -> None:
+    fields = user_search_fields("Alice", "Alice@Example.com")
+    assert fields["username_lower"] == "alice"
+    assert fields["username_grams"] == ["ali", "ice", "lic"]
+    assert "exa" in fields["email_grams"]
+
+
+def test_filter_uses_grams_or_substring() -> None:
+    long_filter = build_mongo_search_filter("Lice")
+    assert long_filter["$or"][0] == {"username_grams": {"$all": trigrams("lice")}}
+
+    # Short queries match anywhere, like the Supabase LIKE '%q%' pattern
+    short_filter = build_mongo_search_filter("a.")
+    assert short_filter["$or"][0] == {"username_lower": {"$regex": "a\\."}}
+
+
+def test_rank_users_drops_false_positives_and_orders_by_similarity() -> None:
+    users = [
+        {"username": "bobsmith", "email": "b@x.com"},
+        {"username": "smith", "email": "s@x.com"},
+        # Contains every trigram of "mith" but not the substring itself
+        {"username": "mitxith", "email": "m@x.com"},
+    ]
+    ranked = rank_users(users, "smith", 10)
+    assert [u["username"] for u in ranked] == ["smith", "bobsmith"]
+
+
+def _user(username: str, email: str) -> dict:
+    return {"username": username, "email": email, **user_search_fields(username, email)}
+
+
+async def test_mongo_search_ranks_candidates_up_to_the_scan_cap(monkeypatch) -> None:
+    # The best match arrives after many weaker ones and must still win
+    limit = 5
+    cap = CANDIDATE_SCAN_FACTOR * limit
+    db = MemoryDatabase()
+    await db.users.insert_many(
+        [_user(f"user{i:05d}smithy", f"u{i}@x.com") for i in range(cap - 2)]
+        + [_user("jones", "smit@x.com"), _user("smith", "s@x.com")]
+        + [_user(f"late{i:05d}smith", f"l{i}@x.com") for i in range(cap)]
+    )
+    ranked_count = 0
+    add = _TopMatches.add
+
+    def counting_add(self, user):
+        nonlocal ranked_count
+        ranked_count += 1
+        add(self, user)
+
+    monkeypatch.setattr(_TopMatches, "add", counting_add)
+
+    ranked = await search_users_mongo(db, "smith", limit)
+
+    assert ranked[0]["username"] == "smith"
+    assert len(ranked) == limit
+    assert "jones" not in [user["username"] for user in ranked]
+    assert "username_grams" not in ranked[0]
+    # Matches past the cap are never read
+    assert ranked_count == cap
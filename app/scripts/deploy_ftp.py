@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Delta-sync the frontend build to one or more FTP docroots.
+
+Each target keeps a manifest of content hashes (.deploy-manifest.json). A
+deploy compares it with the local build and uploads only files whose hash
+changed, over a small pool of parallel FTP connections per target, with all
+targets deployed concurrently. index.html is uploaded last, to a temporary
+name and renamed into place, and only once every target has its assets, so
+visitors never get an index.html that points at bundles not yet uploaded.
+
+Usage:
+  python deploy_ftp.py --host HOST --user USER --password PASS \\
+      --local app/frontend/build --target public_html [--target ...]
+
+Files from earlier releases stay on the server so open pages can still load
+them, except compressed variants (.gz/.br) whose original is still deployed:
+when the build drops a variant, the server would keep serving the stale one
+in place of the updated file, so it is deleted.
+
+Credentials may also come from FTP_HOST / FTP_USER / FTP_PASSWORD.
+"""
+
+import argparse
+import ftplib
+import hashlib
+import io
+import json
+import os
+import posixpath
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MANIFEST_NAME = ".deploy-manifest.json"
+INDEX_NAME = "index.html"
+# Swapped in last, compressed variants (precompress_build.py) before index.html
+INDEX_FILES = (INDEX_NAME + ".br", INDEX_NAME + ".gz", INDEX_NAME)
+VARIANT_SUFFIXES = (".br", ".gz")
+
+# SPA fallback written when the build does not ship its own .htaccess
+# (precompress_build.py generates a full one with caching rules)
+SPA_HTACCESS = (
+    "RewriteEngine On\n"
+    "RewriteBase /\n"
+    "\n"
+    "# Serve index.html for all requests (single-page app)\n"
+    "RewriteCond %{REQUEST_FILENAME} !-f\n"
+    "RewriteCond %{REQUEST_FILENAME} !-d\n"
+    "RewriteRule ^ index.html [L,QSA]\n"
+)
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_manifest(local_dir):
+    """Map of build-relative POSIX path -> sha256 for every file in the build."""
+    manifest = {}
+    for root, _dirs, files in os.walk(local_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            manifest[rel] = sha256_file(path)
+    return manifest
+
+
+def local_files(local_dir):
+    """Manifest and readers for the build, plus generated files it lacks."""
+    manifest = build_manifest(local_dir)
+    readers = {rel: _file_reader(os.path.join(local_dir, rel)) for rel in manifest}
+    if ".htaccess" not in manifest:
+        data = SPA_HTACCESS.encode("utf-8")
+        manifest[".htaccess"] = hashlib.sha256(data).hexdigest()
+        readers[".htaccess"] = lambda: io.BytesIO(data)
+    return manifest, readers
+
+
+def _file_reader(path):
+    return lambda: open(path, "rb")
+
+
+def plan_upload(local_manifest, remote_manifest):
+    """Changed asset files, and the changed index files to swap in last."""
+    changed = sorted(
+        rel
+        for rel, digest in local_manifest.items()
+        if remote_manifest.get(rel) != digest
+    )
+    index_files = [rel for rel in INDEX_FILES if rel in changed]
+    return [rel for rel in changed if rel not in INDEX_FILES], index_files
+
+
+def plan_deletions(local_manifest, remote_manifest):
+    """Remote compressed variants the build dropped while keeping their original."""
+    return sorted(
+        rel
+        for rel in remote_manifest
+        if rel not in local_manifest
+        and rel.endswith(VARIANT_SUFFIXES)
+        and rel[:-3] in local_manifest
+    )
+
+
+class FtpPool:
+    """A fixed set of logged-in FTP connections shared by worker threads."""
+
+    def __init__(self, host, user, password, size, port=21, timeout=60):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.port = port
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        ftp = ftplib.FTP()
+        ftp.connect(self.host, self.port, timeout=self.timeout)
+        ftp.login(self.user, self.password)
+        ftp.set_pasv(True)
+        # Directories known to exist on the server, per connection
+        ftp.known_dirs = set()
+        return ftp
+
+    def run(self, fn, *args, retries=1):
+        """Call fn(ftp, *args) on an idle connection, reconnecting on failure.
+
+        A connection that failed is closed and its slot goes back to the pool
+        empty (None), so the next caller reconnects instead of reusing it.
+        """
+        ftp = self._idle.get()
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    if ftp is None:
+                        ftp = self._connect()
+                    return fn(ftp, *args)
+                except (ftplib.error_temp, OSError, EOFError):
+                    if ftp is not None:
+                        try:
+                            ftp.close()
+                        except Exception:
+                            pass
+                        ftp = None
+                    if attempt == retries:
+                        raise
+        finally:
+            self._idle.put(ftp)
+
+    def close(self):
+        while not self._idle.empty():
+            ftp = self._idle.get_nowait()
+            if ftp is None:
+                continue
+            try:
+                ftp.quit()
+            except Exception:
+                ftp.close()
+
+
+def ensure_remote_dir(ftp, path):
+    parts = [p for p in path.split("/") if p]
+    # Absolute paths stay absolute; relative ones start at the login directory
+    cur = "/" if path.startswith("/") else ""
+    for p in parts:
+        cur = posixpath.join(cur, p) if cur else p
+        if cur in ftp.known_dirs:
+            continue
+        try:
+            ftp.mkd(cur)
+        except ftplib.error_perm:
+            pass  # already exists
+        ftp.known_dirs.add(cur)
+
+
+def store(ftp, remote_path, reader):
+    ensure_remote_dir(ftp, posixpath.dirname(remote_path))
+    with reader() as fh:
+        ftp.storbinary(f"STOR {remote_path}", fh)
+
+
+def swap_in(ftp, remote_path, reader):
+    """Upload to a temporary name and rename over remote_path."""
+    tmp = f"{remote_path}.deploying"
+    store(ftp, tmp, reader)
+    try:
+        ftp.rename(tmp, remote_path)
+    except ftplib.error_perm:
+        # Some servers refuse to rename over an existing file
+        try:
+            ftp.delete(remote_path)
+        except ftplib.error_perm:
+            pass
+        ftp.rename(tmp, remote_path)
+
+
+def delete(ftp, remote_path):
+    try:
+        ftp.delete(remote_path)
+    except ftplib.error_perm:
+        pass  # already gone
+
+
+def fetch_remote_manifest(ftp, remote_path):
+    buf = io.BytesIO()
+    try:
+        ftp.retrbinary(f"RETR {remote_path}", buf.write)
+    except ftplib.error_perm:
+        return {}
+    try:
+        return json.loads(buf.getvalue().decode("utf-8")).get("files", {})
+    except ValueError:
+        return {}
+
+
+class TargetDeploy:
+    """Deployment of the build to one remote docroot."""
+
+    def __init__(self, target, pool, manifest, readers, workers, dry_run=False):
+        # "/" (the server root) must not collapse to "" (the login directory)
+        self.target = posixpath.normpath(target) if target else ""
+        self.pool = pool
+        self.manifest = manifest
+        self.readers = readers
+        self.workers = workers
+        self.dry_run = dry_run
+        self.remote_manifest = {}
+        self.uploads = []
+        self.index_files = []
+        self.deletions = []
+        self.bytes_sent = 0
+
+    def remote(self, rel):
+        return posixpath.join(self.target, rel) if self.target else rel
+
+    def prepare(self):
+        self.remote_manifest = self.pool.run(
+            fetch_remote_manifest, self.remote(MANIFEST_NAME)
+        )
+        self.uploads, self.index_files = plan_upload(
+            self.manifest, self.remote_manifest
+        )
+        self.deletions = plan_deletions(self.manifest, self.remote_manifest)
+        skipped = len(self.manifest) - len(self.uploads) - len(self.index_files)
+        print(
+            f"[{self.target}] {len(self.uploads)} to upload, {skipped} unchanged"
+            + (f", {len(self.deletions)} to delete" if self.deletions else "")
+            + (", index.html changed" if self.index_files else "")
+        )
+
+    def upload_assets(self):
+        if self.dry_run:
+            for rel in self.uploads:
+                print(f"[{self.target}] would upload {rel}")
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    self.pool.run, store, self.remote(rel), self.readers[rel]
+                ): rel
+                for rel in self.uploads
+            }
+            for future in as_completed(futures):
+                rel = futures[future]
+                future.result()
+                self.bytes_sent += _size(self.readers[rel])
+                print(f"[{self.target}] uploaded {rel}")
+
+    def publish(self):
+        """Delete stale variants, swap index.html in, then record the manifest."""
+        if self.dry_run:
+            for rel in self.deletions:
+                print(f"[{self.target}] would delete {rel}")
+            for rel in self.index_files:
+                print(f"[{self.target}] would swap in {rel}")
+            return
+        # Before the index swap, so a dropped index.html.gz is not served
+        # in place of the new index.html
+        for rel in self.deletions:
+            self.pool.run(delete, self.remote(rel))
+            print(f"[{self.target}] deleted {rel}")
+        for rel in self.index_files:
+            self.pool.run(swap_in, self.remote(rel), self.readers[rel])
+            self.bytes_sent += _size(self.readers[rel])
+            print(f"[{self.target}] swapped in {rel}")
+        # Files from earlier releases are kept so open pages can still load them
+        files = {
+            rel: digest
+            for rel, digest in self.remote_manifest.items()
+            if rel not in self.deletions
+        }
+        files.update(self.manifest)
+        data = json.dumps(
+            {
+                "deployed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "files": files,
+            },
+            indent=1,
+            sort_keys=True,
+        ).encode("utf-8")
+        self.pool.run(swap_in, self.remote(MANIFEST_NAME), lambda: io.BytesIO(data))
+
+
+def _size(reader):
+    with reader() as fh:
+        fh.seek(0, io.SEEK_END)
+        return fh.tell()
+
+
+def deploy(
+    host, user, password, local_dir, targets, connections=4, dry_run=False, port=21
+):
+    """Deploy local_dir to every target; returns True when all targets succeeded."""
+    manifest, readers = local_files(local_dir)
+    if INDEX_NAME not in manifest:
+        print("index.html missing from", local_dir)
+        return False
+
+    started = time.monotonic()
+    pools = {}
+    deploys = []
+    try:
+        for target in targets:
+            pools[target] = FtpPool(host, user, password, connections, port=port)
+            deploys.append(
+                TargetDeploy(
+                    target, pools[target], manifest, readers, connections, dry_run
+                )
+            )
+
+        failed = []
+        lock = threading.Lock()
+
+        def _phase(fn):
+            with ThreadPoolExecutor(max_workers=len(deploys)) as executor:
+                futures = {executor.submit(fn, d): d for d in deploys}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        with lock:
+                            failed.append(futures[future].target)
+                        print(f"[{futures[future].target}] FAILED: {e}")
+
+        _phase(TargetDeploy.prepare)
+        if not failed:
+            _phase(TargetDeploy.upload_assets)
+        if failed:
+            # No target is switched to the new release unless all have its assets
+            print("Aborting before index.html swap; failed targets:", ", ".join(failed))
+            return False
+        _phase(TargetDeploy.publish)
+    finally:
+        for pool in pools.values():
+            pool.close()
+
+    sent = sum(d.bytes_sent for d in deploys)
+    print(
+        f"Deployed to {len(deploys)} target(s) in {time.monotonic() - started:.1f}s, "
+        f"{sent / 1024:.0f} KiB sent"
+    )
+    return not failed
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--host", default=os.environ.get("FTP_HOST"))
+    p.add_argument("--port", type=int, default=21)
+    p.add_argument("--user", default=os.environ.get("FTP_USER"))
+    p.add_argument("--password", default=os.environ.get("FTP_PASSWORD"))
+    p.add_argument(
+        "--local", default="app/frontend/build", help="local build directory"
+    )
+    p.add_argument(
+        "--target",
+        action="append",
+        help="remote docroot (repeatable, default public_html)",
+    )
+    p.add_argument(
+        "--connections", type=int, default=4, help="FTP connections per target"
+    )
+    p.add_argument("--dry-run", action="store_true", help="show what would be uploaded")
+    p.add_argument(
+        "--precompress",
+        action="store_true",
+        help="run precompress_build.py on the build first",
+    )
+    args = p.parse_args()
+
+    if not (args.host and args.user and args.password):
+        p.error("--host, --user and --password (or FTP_* env vars) are required")
+    if not os.path.isdir(args.local):
+        print("Local build path not found:", args.local)
+        sys.exit(2)
+
+    if args.precompress:
+        from precompress_build import prepare
+
+        prepare(os.path.abspath(args.local))
+
+    ok = deploy(
+        args.host,
+        args.user,
+        args.password,
+        os.path.abspath(args.local),
+        args.target or ["public_html"],
+        connections=args.connections,
+        dry_run=args.dry_run,
+        port=args.port,
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""Precompress the frontend build and write its .htaccess caching rules.
+
+For every text asset the build gets .gz (and, when the ``brotli`` package is
+installed, .br) siblings. The generated .htaccess serves those variants to
+clients that accept them, marks content-hashed files (main.1a2b3c4d.js) as
+immutable for a year, keeps index.html on no-cache and retains the SPA
+fallback. Run it after ``yarn build``; deploy_ftp.py --precompress runs it too.
+
+Usage:
+  python precompress_build.py --local app/frontend/build
+  python precompress_build.py --local app/frontend/build --verify
+  python precompress_build.py --local app/frontend/build --verify \\
+      --url https://www.crosspostme.com
+
+--verify serves the build from a local HTTP server that applies the build's
+generated .htaccess (or checks --url, e.g. the deployed site) and confirms
+that each asset comes back with the Content-Encoding, body and the
+Cache-Control that cache_control_for() expects.
+"""
+
+import argparse
+import gzip
+import os
+import posixpath
+import re
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants are still produced
+    brotli = None
+
+TEXT_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt", ".xml", ".map")
+# Smaller files are not worth a compressed variant
+MIN_SIZE = 512
+# Keep a variant only if it saves at least this fraction
+MIN_SAVING = 0.05
+
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+NO_CACHE = "no-cache"
+SHORT_CACHE = "public, max-age=3600"
+
+# Encodings in server preference order: (Accept-Encoding token, file suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_EXT_PATTERN = "|".join(ext.lstrip(".") for ext in TEXT_EXTENSIONS)
+
+HTACCESS = f"""Options -MultiViews
+DirectoryIndex index.html
+
+# Generated by app/scripts/precompress_build.py - edit the script, not this file
+
+<IfModule mod_rewrite.c>
+RewriteEngine On
+RewriteBase /
+
+# Serve precompressed variants when the client accepts them
+RewriteCond %{{HTTP:Accept-Encoding}} br
+RewriteCond %{{REQUEST_FILENAME}}.br -f
+RewriteRule ^(.+\\.(?:{_EXT_PATTERN}))$ $1.br [E=no-gzip:1,L]
+
+RewriteCond %{{HTTP:Accept-Encoding}} gzip
+RewriteCond %{{REQUEST_FILENAME}}.gz -f
+RewriteRule ^(.+\\.(?:{_EXT_PATTERN}))$ $1.gz [E=no-gzip:1,L]
+
+# Serve index.html for all requests (single-page app)
+RewriteCond %{{REQUEST_FILENAME}} !-f
+RewriteCond %{{REQUEST_FILENAME}} !-d
+RewriteRule ^ index.html [L,QSA]
+</IfModule>
+
+# Precompressed variants keep the type of the original file
+<FilesMatch "\\.js\\.(br|gz)$">
+  ForceType application/javascript
+</FilesMatch>
+<FilesMatch "\\.css\\.(br|gz)$">
+  ForceType text/css
+</FilesMatch>
+<FilesMatch "\\.html\\.(br|gz)$">
+  ForceType text/html
+</FilesMatch>
+<FilesMatch "\\.svg\\.(br|gz)$">
+  ForceType image/svg+xml
+</FilesMatch>
+<FilesMatch "\\.(json|map)\\.(br|gz)$">
+  ForceType application/json
+</FilesMatch>
+<FilesMatch "\\.txt\\.(br|gz)$">
+  ForceType text/plain
+</FilesMatch>
+<FilesMatch "\\.xml\\.(br|gz)$">
+  ForceType application/xml
+</FilesMatch>
+
+<IfModule mod_headers.c>
+<FilesMatch "\\.br$">
+  Header set Content-Encoding br
+  Header append Vary Accept-Encoding
+</FilesMatch>
+<FilesMatch "\\.gz$">
+  Header set Content-Encoding gzip
+  Header append Vary Accept-Encoding
+</FilesMatch>
+
+Header set Cache-Control "{SHORT_CACHE}"
+# Content-hashed bundles never change under the same name
+<FilesMatch "\\.[0-9a-f]{{8,}}\\.">
+  Header set Cache-Control "{IMMUTABLE}"
+</FilesMatch>
+# HTML must be revalidated so a deploy takes effect immediately
+<FilesMatch "\\.html(\\.(br|gz))?$">
+  Header set Cache-Control "{NO_CACHE}"
+</FilesMatch>
+</IfModule>
+"""
+
+
+def cache_control_for(rel_path):
+    """Cache-Control the .htaccess assigns to a build-relative path."""
+    name = os.path.basename(rel_path)
+    if re.search(r"\.html$", name):
+        return NO_CACHE
+    if HASHED_NAME.search(name):
+        return IMMUTABLE
+    return SHORT_CACHE
+
+
+def is_text_asset(name):
+    return name.endswith(TEXT_EXTENSIONS)
+
+
+def _compressors():
+    comps = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        comps.insert(0, (".br", lambda data: brotli.compress(data, quality=11)))
+    return comps
+
+
+def precompress(local_dir, min_size=MIN_SIZE):
+    """Write compressed siblings of text assets.
+
+    Returns the total size of the text assets and their smallest variants.
+    """
+    original_total = 0
+    compressed_total = 0
+    comps = _compressors()
+    for root, _dirs, files in os.walk(local_dir):
+        for name in files:
+            if not is_text_asset(name):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as fh:
+                data = fh.read()
+            best = len(data)
+            for suffix, compress in comps:
+                variant = path + suffix
+                if len(data) < min_size:
+                    _remove(variant)
+                    continue
+                packed = compress(data)
+                if len(packed) > len(data) * (1 - MIN_SAVING):
+                    _remove(variant)
+                    continue
+                _write_if_changed(variant, packed)
+                best = min(best, len(packed))
+            original_total += len(data)
+            compressed_total += best
+    return original_total, compressed_total
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _write_if_changed(path, data):
+    # Leave identical variants untouched so deploy manifests stay stable
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            if fh.read() == data:
+                return
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+
+def write_htaccess(local_dir):
+    path = os.path.join(local_dir, ".htaccess")
+    _write_if_changed(path, HTACCESS.encode("utf-8"))
+    return path
+
+
+def prepare(local_dir):
+    """Precompress the build and write .htaccess; prints a summary."""
+    original, compressed = precompress(local_dir)
+    write_htaccess(local_dir)
+    saved = 100 * (1 - compressed / original) if original else 0
+    print(
+        f"Precompressed text assets: {original / 1024:.0f} KiB -> "
+        f"{compressed / 1024:.0f} KiB ({saved:.0f}% smaller)"
+        + ("" if brotli else "; brotli not installed, gzip only")
+    )
+
+
+class HtaccessRules:
+    """The subset of .htaccess directives the generated file uses, evaluated
+    the way Apache would, so a local --verify checks the generated rules
+    rather than a second copy of the policy.
+
+    Covers RewriteCond/RewriteRule (Accept-Encoding variants and the SPA
+    fallback), ForceType and ``Header set/append`` inside or outside
+    FilesMatch blocks. Later matching directives override earlier ones.
+    """
+
+    def __init__(self, text):
+        self.rewrites = []  # (conditions, pattern, substitution)
+        self.types = []  # (FilesMatch pattern, content type)
+        self.headers = []  # (FilesMatch pattern or None, action, name, value)
+        conditions = []
+        files_match = None
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            directive = parts[0]
+            if directive == "RewriteCond":
+                conditions.append((parts[1], parts[2]))
+            elif directive == "RewriteRule":
+                self.rewrites.append((conditions, parts[1], parts[2]))
+                conditions = []
+            elif directive == "<FilesMatch":
+                files_match = line[len("<FilesMatch") :].rstrip(">").strip().strip('"')
+            elif directive == "</FilesMatch>":
+                files_match = None
+            elif directive == "ForceType" and files_match:
+                self.types.append((files_match, parts[1]))
+            elif directive == "Header" and parts[1] in ("set", "append"):
+                name, value = parts[2], " ".join(parts[3:]).strip('"')
+                self.headers.append((files_match, parts[1], name, value))
+
+    def rewrite(self, rel, local_dir, accept_encoding):
+        """Build-relative path the server answers a request for rel with"""
+        path = os.path.join(local_dir, rel)
+        for conditions, pattern, target in self.rewrites:
+            match = re.match(pattern, rel)
+            if not match:
+                continue
+            if all(
+                self._condition(test, expected, path, accept_encoding)
+                for test, expected in conditions
+            ):
+                if target.startswith("$1"):
+                    return match.group(1) + target[2:]
+                return target
+        return rel
+
+    @staticmethod
+    def _condition(test, expected, path, accept_encoding):
+        if test == "%{HTTP:Accept-Encoding}":
+            return expected in accept_encoding
+        if test.startswith("%{REQUEST_FILENAME}"):
+            filename = path + test[len("%{REQUEST_FILENAME}") :]
+            checks = {"-f": os.path.isfile, "-d": os.path.isdir}
+            if expected.startswith("!"):
+                return not checks[expected[1:]](filename)
+            return checks[expected](filename)
+        raise ValueError(f"Unsupported RewriteCond {test}")
+
+    def content_type(self, served_name, default):
+        content_type = default
+        for pattern, forced in self.types:
+            if re.search(pattern, served_name):
+                content_type = forced
+        return content_type
+
+    def response_headers(self, served_name):
+        headers = {}
+        for pattern, action, name, value in self.headers:
+            if pattern is not None and not re.search(pattern, served_name):
+                continue
+            if action == "append" and name in headers:
+                headers[name] = f"{headers[name]}, {value}"
+            else:
+                headers[name] = value
+        return headers
+
+
+class PrecompressedHandler(SimpleHTTPRequestHandler):
+    """Static handler applying the rules of the build's generated .htaccess."""
+
+    def __init__(self, *args, rules, **kwargs):
+        self.rules = rules
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        rel = urllib.parse.unquote(self.path.split("?", 1)[0]).lstrip("/")
+        if not rel or os.path.isdir(os.path.join(self.directory, rel)):
+            rel = posixpath.join(rel, "index.html").lstrip("/")
+        accepted = self.headers.get("Accept-Encoding", "")
+        served = self.rules.rewrite(rel, self.directory, accepted)
+
+        try:
+            fh = open(os.path.join(self.directory, served), "rb")
+        except OSError:
+            self.send_error(404)
+            return None
+        size = os.fstat(fh.fileno()).st_size
+        name = posixpath.basename(served)
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", self.rules.content_type(name, self.guess_type(served))
+        )
+        self.send_header("Content-Length", str(size))
+        for header, value in self.rules.response_headers(name).items():
+            self.send_header(header, value)
+        self.end_headers()
+        return fh
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(local_dir, port=0):
+    """Start a local server for the build; returns (server, base_url).
+
+    The server applies the build's own .htaccess (as written by prepare()).
+    """
+    with open(os.path.join(local_dir, ".htaccess"), encoding="utf-8") as fh:
+        rules = HtaccessRules(fh.read())
+
+    def handler(*args, **kwargs):
+        return PrecompressedHandler(*args, rules=rules, directory=local_dir, **kwargs)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _decode(body, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("brotli response but brotli is not installed")
+        return brotli.decompress(body)
+    return body
+
+
+def verify(local_dir, base_url):
+    """Check served headers and bodies for every build file; returns problems."""
+    problems = []
+    accept = "br, gzip" if brotli else "gzip"
+    for root, _dirs, files in os.walk(local_dir):
+        for name in files:
+            if name.endswith((".br", ".gz")) or name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            req = urllib.request.Request(
+                f"{base_url.rstrip('/')}/{rel}", headers={"Accept-Encoding": accept}
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=15) as resp:
+                    body = resp.read()
+                    headers = resp.headers
+            except urllib.error.URLError as e:
+                problems.append(f"{rel}: request failed ({e})")
+                continue
+
+            expected_cache = cache_control_for(rel)
+            if headers.get("Cache-Control") != expected_cache:
+                problems.append(
+                    f"{rel}: Cache-Control {headers.get('Cache-Control')!r}, "
+                    f"expected {expected_cache!r}"
+                )
+            has_variant = any(
+                os.path.isfile(path + suffix)
+                for token, suffix in ENCODINGS
+                if token in accept
+            )
+            encoding = headers.get("Content-Encoding")
+            if has_variant and not encoding:
+                problems.append(f"{rel}: precompressed variant not served")
+            if encoding and "Accept-Encoding" not in headers.get("Vary", ""):
+                problems.append(f"{rel}: compressed response without Vary")
+            try:
+                decoded = _decode(body, encoding)
+            except (OSError, ValueError) as e:
+                problems.append(f"{rel}: could not decode body ({e})")
+                continue
+            with open(path, "rb") as fh:
+                if decoded != fh.read():
+                    problems.append(f"{rel}: body differs from the build")
+    return problems
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument(
+        "--local", default="app/frontend/build", help="local build directory"
+    )
+    p.add_argument("--verify", action="store_true", help="check served headers")
+    p.add_argument(
+        "--url", help="with --verify, check this site instead of a local server"
+    )
+    args = p.parse_args()
+
+    local_dir = os.path.abspath(args.local)
+    if not os.path.isdir(local_dir):
+        print("Local build path not found:", local_dir)
+        sys.exit(2)
+
+    if not args.verify:
+        prepare(local_dir)
+        return
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = serve(local_dir)
+    try:
+        problems = verify(local_dir, base_url)
+    finally:
+        if server is not None:
+            server.shutdown()
+    for problem in problems:
+        print("FAIL", problem)
+    print(
+        "Verified", base_url, "-", "OK" if not problems else f"{len(problems)} problems"
+    )
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
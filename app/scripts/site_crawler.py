@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Crawl the site concurrently and report where every link navigates.
+
+Starting from the homepage, pages on the same host are fetched and parsed for
+anchors, onclick/formaction targets and form actions, recursively up to
+--depth. Every discovered URL is checked once, over a shared keep-alive
+connection pool with at most --concurrency requests in flight. Results are
+classified as public (200), redirect-to-login (redirect ending at /login),
+redirect, protected (401/403), missing (404/410), error or unreachable, and
+written to a JSON report. Links that do not navigate (javascript:, #) are
+listed separately. Extra --path entries are checked (and crawled) as well.
+
+Usage:
+  python site_crawler.py --base https://www.crosspostme.com --depth 2 \\
+      --report crawl-report.json [--path /pricing ...] [--fail-on missing]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+import urllib.parse
+from html.parser import HTMLParser
+
+import httpx
+
+BASE = "https://www.crosspostme.com"
+USER_AGENT = "crosspostme-site-crawler/1.0"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# Response headers kept in the report
+REPORTED_HEADERS = ("content-type", "cache-control", "content-encoding", "server")
+MAX_REDIRECTS = 5
+NON_NAVIGATING_SCHEMES = ("javascript:", "mailto:", "tel:")
+
+ONCLICK_URL = re.compile(
+    r"(?:location|window.location|location.href)\s*[:=]\s*['\"]([^'\"]+)['\"]"
+)
+
+
+class LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self.buttons = []
+        self.forms = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a":
+            href = attrs.get("href")
+            if href:
+                self.links.append(href)
+        if tag == "button":
+            onclick = attrs.get("onclick")
+            if onclick:
+                self.buttons.append(onclick)
+            # sometimes button inside form with formaction
+            fa = attrs.get("formaction")
+            if fa:
+                self.buttons.append(fa)
+        if tag == "form":
+            method = (attrs.get("method") or "GET").upper()
+            self.forms.append((attrs.get("action"), method))
+
+
+def normalize(href, page_url):
+    """Absolute URL without fragment, or None for non-navigating hrefs."""
+    if not href:
+        return None
+    href = href.strip()
+    if href.startswith("#") or href.lower().startswith(NON_NAVIGATING_SCHEMES):
+        return None
+    url = urllib.parse.urljoin(page_url, href)
+    if not url.startswith(("http://", "https://")):
+        return None
+    return urllib.parse.urldefrag(url)[0]
+
+
+def extract_links(html, page_url):
+    """Targets found on a page, plus its non-navigating hrefs and forms."""
+    parser = LinkParser()
+    parser.feed(html)
+
+    targets = set()
+    for href in parser.links:
+        url = normalize(href, page_url)
+        if url:
+            targets.add(url)
+    for button in parser.buttons:
+        m = ONCLICK_URL.search(button)
+        candidate = m.group(1) if m else button
+        if m or candidate.startswith(("/", "http")):
+            url = normalize(candidate, page_url)
+            if url:
+                targets.add(url)
+    for action, _method in parser.forms:
+        url = normalize(action, page_url)
+        if url:
+            targets.add(url)
+
+    non_navigating = [h for h in parser.links if not normalize(h, page_url)]
+    return sorted(targets), non_navigating, parser.forms
+
+
+def classify(code, final_url, redirected):
+    if code is None:
+        return "unreachable"
+    final_path = urllib.parse.urlparse(final_url).path.rstrip("/")
+    if redirected and final_path.endswith("/login"):
+        return "redirect-to-login"
+    if code == 200:
+        return "redirect" if redirected else "public"
+    if code in (401, 403):
+        return "protected"
+    if code in (404, 410):
+        return "missing"
+    if code in REDIRECT_CODES:
+        return "redirect"
+    return "error"
+
+
+class SiteCrawler:
+    """Breadth-first crawler with bounded concurrency and connection reuse."""
+
+    def __init__(
+        self,
+        base,
+        max_depth=2,
+        concurrency=10,
+        timeout=15.0,
+        transport=None,
+        paths=(),
+    ):
+        self.base = base.rstrip("/")
+        self.paths = list(paths)
+        self.host = urllib.parse.urlparse(self.base).netloc
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.transport = transport
+        self.results = {}
+        self.non_navigating = {}
+        self.forms = {}
+
+    async def _fetch(self, client, url):
+        """Follow redirects by hand so the chain can be classified."""
+        started = time.monotonic()
+        current = url
+        redirected = False
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                resp = await client.get(current)
+                if resp.status_code in REDIRECT_CODES and "location" in resp.headers:
+                    redirected = True
+                    current = urllib.parse.urljoin(current, resp.headers["location"])
+                    continue
+                break
+            code, body = resp.status_code, resp
+        except httpx.HTTPError as e:
+            code, body, current = None, None, str(e)
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        return code, current, redirected, body, elapsed_ms
+
+    def _crawlable(self, url, response):
+        if response is None or response.status_code != 200:
+            return False
+        if urllib.parse.urlparse(url).netloc != self.host:
+            return False
+        return "html" in response.headers.get("content-type", "")
+
+    async def crawl(self):
+        queue = asyncio.Queue()
+        seen = set()
+        for path in ["/"] + self.paths:
+            url = urllib.parse.urljoin(self.base + "/", path)
+            if url not in seen:
+                seen.add(url)
+                queue.put_nowait((url, 0, None))
+
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        async with httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=False,
+            transport=self.transport,
+        ) as client:
+
+            async def worker():
+                while True:
+                    url, depth, found_on = await queue.get()
+                    try:
+                        code, final, redirected, response, ms = await self._fetch(
+                            client, url
+                        )
+                        self.results[url] = {
+                            "url": url,
+                            "status": code,
+                            "final_url": final,
+                            "classification": classify(code, final, redirected),
+                            "depth": depth,
+                            "found_on": found_on,
+                            "elapsed_ms": ms,
+                            "headers": {
+                                k: response.headers[k]
+                                for k in REPORTED_HEADERS
+                                if response is not None and k in response.headers
+                            },
+                        }
+                        if depth < self.max_depth and self._crawlable(final, response):
+                            links, non_nav, forms = extract_links(response.text, final)
+                            if non_nav:
+                                self.non_navigating[url] = non_nav
+                            if forms:
+                                self.forms[url] = forms
+                            for link in links:
+                                if link not in seen:
+                                    seen.add(link)
+                                    queue.put_nowait((link, depth + 1, url))
+                    finally:
+                        queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            await queue.join()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return self.results
+
+    def report(self, duration):
+        pages = sorted(self.results.values(), key=lambda r: (r["depth"], r["url"]))
+        summary = {}
+        for page in pages:
+            summary[page["classification"]] = summary.get(page["classification"], 0) + 1
+        return {
+            "base": self.base,
+            "max_depth": self.max_depth,
+            "duration_seconds": round(duration, 2),
+            "checked": len(pages),
+            "summary": summary,
+            "pages": pages,
+            "non_navigating": self.non_navigating,
+            "forms": {
+                url: [list(f) for f in forms] for url, forms in self.forms.items()
+            },
+        }
+
+
+async def run(
+    base, max_depth=2, concurrency=10, timeout=15.0, transport=None, paths=()
+):
+    """Crawl base and return the report dict."""
+    crawler = SiteCrawler(base, max_depth, concurrency, timeout, transport, paths)
+    started = time.monotonic()
+    await crawler.crawl()
+    return crawler.report(time.monotonic() - started)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--base", default=BASE)
+    p.add_argument("--depth", type=int, default=2, help="link depth to crawl")
+    p.add_argument("--concurrency", type=int, default=10)
+    p.add_argument("--timeout", type=float, default=15.0)
+    p.add_argument("--report", help="write the JSON report to this file")
+    p.add_argument(
+        "--path",
+        action="append",
+        default=[],
+        help="additional path to check, e.g. /pricing (repeatable)",
+    )
+    p.add_argument(
+        "--fail-on",
+        action="append",
+        default=[],
+        help="exit non-zero if any result has this classification (repeatable)",
+    )
+    args = p.parse_args()
+
+    report = asyncio.run(
+        run(args.base, args.depth, args.concurrency, args.timeout, paths=args.path)
+    )
+
+    for page in report["pages"]:
+        print(
+            page["url"], page["status"], "->", page["final_url"], page["classification"]
+        )
+    print(
+        f"\nChecked {report['checked']} URLs in {report['duration_seconds']}s:",
+        ", ".join(f"{k} {v}" for k, v in sorted(report["summary"].items())),
+    )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print("Report written to", args.report)
+
+    failing = [c for c in args.fail_on if report["summary"].get(c)]
+    sys.exit(1 if failing else 0)
+
+
+if __name__ == "__main__":
+    main()
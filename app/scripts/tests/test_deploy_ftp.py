@@ -0,0 +1,207 @@
+import ftplib
+import io
+import json
+import os
+import sys
+
+SCRIPTS = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+import deploy_ftp  # noqa: E402
+from deploy_ftp import (  # noqa: E402
+    MANIFEST_NAME,
+    FtpPool,
+    TargetDeploy,
+    deploy,
+    plan_deletions,
+    plan_upload,
+)
+
+
+class FakeServer:
+    """In-memory FTP server state shared by every FakeFTP connection"""
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = set()
+        self.connections = 0
+        self.fail_connects = 0
+        self.stored = []
+
+    def path(self, name):
+        return name if name.startswith("/") else "/home/" + name
+
+
+class FakeFTP:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    def connect(self, host, port, timeout=None):
+        if self.server.fail_connects:
+            self.server.fail_connects -= 1
+            raise OSError("connection refused")
+        self.server.connections += 1
+
+    def login(self, user, password):
+        pass
+
+    def set_pasv(self, value):
+        pass
+
+    def mkd(self, path):
+        path = self.server.path(path)
+        if path in self.server.dirs:
+            raise ftplib.error_perm("550 exists")
+        self.server.dirs.add(path)
+
+    def storbinary(self, cmd, fh):
+        path = self.server.path(cmd.split(" ", 1)[1])
+        self.server.files[path] = fh.read()
+        self.server.stored.append(path)
+
+    def retrbinary(self, cmd, callback):
+        path = self.server.path(cmd.split(" ", 1)[1])
+        if path not in self.server.files:
+            raise ftplib.error_perm("550 not found")
+        callback(self.server.files[path])
+
+    def rename(self, src, dst):
+        files = self.server.files
+        files[self.server.path(dst)] = files.pop(self.server.path(src))
+
+    def delete(self, path):
+        self.server.files.pop(self.server.path(path), None)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def _fake_ftp(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(deploy_ftp.ftplib, "FTP", lambda: FakeFTP(server))
+    return server
+
+
+def _build(tmp_path, files):
+    for rel, data in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return str(tmp_path)
+
+
+def test_plan_upload_defers_changed_index_files():
+    local = {"index.html": "b", "index.html.gz": "c", "a.js": "1", "b.css": "2"}
+    remote = {"index.html": "a", "index.html.gz": "c", "a.js": "1"}
+
+    assets, index_files = plan_upload(local, remote)
+
+    assert assets == ["b.css"]
+    assert index_files == ["index.html"]
+
+
+def test_plan_deletions_only_drops_variants_of_deployed_files():
+    local = {"index.html": "b", "robots.txt": "r"}
+    remote = {
+        "index.html": "a",
+        "index.html.gz": "z",  # dropped variant of a deployed file
+        "robots.txt.br": "y",
+        "static/old.1.js": "o",  # previous release, kept for open pages
+        "static/old.1.js.gz": "og",
+    }
+
+    assert plan_deletions(local, remote) == ["index.html.gz", "robots.txt.br"]
+
+
+def test_deploy_deletes_dropped_variants(tmp_path, monkeypatch):
+    server = _fake_ftp(monkeypatch)
+    build = _build(tmp_path / "v1", {"index.html": b"v1", "index.html.gz": b"gz1"})
+    assert deploy("h", "u", "p", build, ["public_html"])
+
+    build = _build(tmp_path / "v2", {"index.html": b"v2"})
+    assert deploy("h", "u", "p", build, ["public_html"])
+
+    assert "/home/public_html/index.html.gz" not in server.files
+    manifest = json.loads(server.files["/home/public_html/" + MANIFEST_NAME])
+    assert "index.html.gz" not in manifest["files"]
+
+
+def test_deploy_uploads_only_changes_and_merges_the_manifest(tmp_path, monkeypatch):
+    server = _fake_ftp(monkeypatch)
+    build = _build(
+        tmp_path / "v1",
+        {"index.html": b"v1", "static/app.1.js": b"one", "logo.png": b"png"},
+    )
+    assert deploy("h", "u", "p", build, ["public_html"], connections=2)
+    assert server.files["/home/public_html/static/app.1.js"] == b"one"
+
+    server.stored.clear()
+    build = _build(
+        tmp_path / "v2",
+        {"index.html": b"v2", "static/app.2.js": b"two", "logo.png": b"png"},
+    )
+    assert deploy("h", "u", "p", build, ["public_html"], connections=2)
+
+    assert "/home/public_html/logo.png" not in server.stored
+    assert "/home/public_html/static/app.2.js" in server.stored
+    # index.html is swapped in after the assets it references
+    assert server.stored.index("/home/public_html/index.html.deploying") > (
+        server.stored.index("/home/public_html/static/app.2.js")
+    )
+    manifest = json.loads(server.files["/home/public_html/" + MANIFEST_NAME])
+    # Bundles of the previous release stay listed for pages still open
+    assert {"static/app.1.js", "static/app.2.js"} <= set(manifest["files"])
+
+
+def test_root_target_stays_absolute(monkeypatch):
+    server = _fake_ftp(monkeypatch)
+    pool = FtpPool("h", "u", "p", 1)
+    target = TargetDeploy("/", pool, {}, {}, 1)
+
+    pool.run(deploy_ftp.store, target.remote("a/b.txt"), lambda: io.BytesIO(b"x"))
+
+    assert target.remote("a/b.txt") == "/a/b.txt"
+    assert server.files == {"/a/b.txt": b"x"}
+    assert "/a" in server.dirs
+
+
+def test_pool_retries_on_a_fresh_connection(monkeypatch):
+    server = _fake_ftp(monkeypatch)
+    pool = FtpPool("h", "u", "p", 1)
+    used = []
+
+    def flaky(ftp):
+        used.append(ftp)
+        if len(used) == 1:
+            raise EOFError("connection dropped")
+        return "ok"
+
+    assert pool.run(flaky) == "ok"
+    assert used[0].closed and not used[1].closed
+    assert server.connections == 2
+
+
+def test_pool_does_not_reuse_a_connection_after_a_failed_reconnect(monkeypatch):
+    server = _fake_ftp(monkeypatch)
+    pool = FtpPool("h", "u", "p", 1)
+    used = []
+
+    def broken(ftp):
+        used.append(ftp)
+        raise OSError("broken pipe")
+
+    server.fail_connects = 1
+    try:
+        pool.run(broken)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("expected the reconnect failure")
+
+    assert pool.run(lambda ftp: ftp) is not used[0]
+    assert not pool.run(lambda ftp: ftp).closed
@@ -0,0 +1,64 @@
+import os
+import sys
+
+SCRIPTS = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+import precompress_build  # noqa: E402
+from precompress_build import HtaccessRules, prepare, serve, verify  # noqa: E402
+
+
+def _build(tmp_path):
+    js = b"console.log('bundle');\n" * 100
+    files = {
+        "index.html": b"<html>" + b"<div></div>" * 100 + b"</html>",
+        "static/js/main.1a2b3c4d.js": js,
+        "robots.txt": b"User-agent: *\n",
+        "logo.png": b"\x89PNG" + b"\x00" * 600,
+    }
+    for rel, data in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    prepare(str(tmp_path))
+    return str(tmp_path)
+
+
+def _verify(local_dir):
+    server, base_url = serve(local_dir)
+    try:
+        return verify(local_dir, base_url)
+    finally:
+        server.shutdown()
+
+
+def test_generated_htaccess_matches_the_cache_policy(tmp_path):
+    assert _verify(_build(tmp_path)) == []
+
+
+def test_verify_catches_a_broken_htaccess_rule(tmp_path, monkeypatch):
+    # Drop the immutable rule for hashed bundles from the generated file
+    broken = precompress_build.HTACCESS.replace(
+        precompress_build.IMMUTABLE, precompress_build.SHORT_CACHE
+    )
+    monkeypatch.setattr(precompress_build, "HTACCESS", broken)
+    local_dir = _build(tmp_path)
+
+    problems = _verify(local_dir)
+
+    assert any("main.1a2b3c4d.js: Cache-Control" in p for p in problems)
+
+
+def test_rules_serve_variants_and_the_spa_fallback(tmp_path):
+    local_dir = _build(tmp_path)
+    rules = HtaccessRules(precompress_build.HTACCESS)
+    bundle = "static/js/main.1a2b3c4d.js"
+
+    assert rules.rewrite(bundle, local_dir, "gzip") == bundle + ".gz"
+    assert rules.rewrite(bundle, local_dir, "identity") == bundle
+    assert rules.rewrite("dashboard/settings", local_dir, "") == "index.html"
+    headers = rules.response_headers("main.1a2b3c4d.js.gz")
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Cache-Control"] == precompress_build.IMMUTABLE
+    assert rules.content_type("main.1a2b3c4d.js.gz", None) == "application/javascript"
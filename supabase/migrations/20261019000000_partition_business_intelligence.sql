@@ -0,0 +1,188 @@
+--
+-- Partition business_intelligence by month on "timestamp".
+--
+-- The table is rebuilt as a range-partitioned table with the same columns,
+-- existing rows are copied into monthly partitions, time ranges are served by
+-- a BRIN index, and two maintenance functions keep partitions created ahead
+-- of time and archive months past retention (scheduled with pg_cron when it is
+-- installed). Fresh installs get the same layout from supabase_schema.sql.
+--
+-- The copy holds an exclusive lock on the table; run it in a quiet window.
+--
+
+begin;
+
+lock table "public"."business_intelligence" in access exclusive mode;
+
+alter table "public"."business_intelligence" rename to "business_intelligence_unpartitioned";
+alter table "public"."business_intelligence_unpartitioned"
+    rename constraint "business_intelligence_pkey" to "business_intelligence_unpartitioned_pkey";
+drop index if exists "public"."idx_bi_user_id";
+drop index if exists "public"."idx_bi_event_type";
+drop index if exists "public"."idx_bi_timestamp";
+drop index if exists "public"."idx_bi_user_event_timestamp";
+
+-- The partition key cannot be null; older schemas allowed it
+do $$
+begin
+    if exists (
+        select 1 from information_schema.columns
+        where table_schema = 'public'
+          and table_name = 'business_intelligence_unpartitioned'
+          and column_name = 'created_at'
+    ) then
+        update "public"."business_intelligence_unpartitioned"
+        set "timestamp" = coalesce("created_at", now())
+        where "timestamp" is null;
+    else
+        update "public"."business_intelligence_unpartitioned"
+        set "timestamp" = now()
+        where "timestamp" is null;
+    end if;
+end;
+$$;
+
+create table "public"."business_intelligence"
+    (like "public"."business_intelligence_unpartitioned" including defaults)
+    partition by range ("timestamp");
+
+alter table "public"."business_intelligence"
+    alter column "timestamp" set not null,
+    add constraint "business_intelligence_pkey" primary key ("id", "timestamp");
+
+-- No user_id foreign key, unlike supabase_schema.sql: the table being
+-- migrated never had one and may hold events of users that no longer exist,
+-- which would make the copy below fail.
+
+-- Catches rows outside every monthly partition until maintenance moves them
+create table "public"."business_intelligence_default"
+    partition of "public"."business_intelligence" default;
+alter table "public"."business_intelligence_default" enable row level security;
+
+create index "idx_bi_user_event_timestamp"
+    on "public"."business_intelligence" ("user_id", "event_type", "timestamp");
+create index "idx_bi_event_type_timestamp"
+    on "public"."business_intelligence" ("event_type", "timestamp");
+create index "idx_bi_timestamp_brin"
+    on "public"."business_intelligence" using brin ("timestamp") with (pages_per_range = 32);
+
+create schema if not exists "bi_archive";
+revoke all on schema "bi_archive" from public;
+
+-- Create the monthly partitions from p_from's month (default: this month)
+-- through p_months_ahead months from now. Rows that landed in the default
+-- partition for a new month are moved into it. Returns the number created.
+create or replace function "public"."create_business_intelligence_partitions"(
+    p_months_ahead integer default 3,
+    p_from timestamp default null
+)
+returns integer
+security invoker
+set search_path = public
+language plpgsql
+as $$
+declare
+    v_month date := date_trunc('month', coalesce(p_from, now()))::date;
+    v_last date := (date_trunc('month', now()) + make_interval(months => p_months_ahead))::date;
+    v_next date;
+    v_name text;
+    v_created integer := 0;
+begin
+    while v_month <= v_last loop
+        v_next := (v_month + interval '1 month')::date;
+        v_name := 'business_intelligence_' || to_char(v_month, 'YYYY_MM');
+        if to_regclass(format('public.%I', v_name)) is null then
+            execute format('create table %I (like business_intelligence including defaults)', v_name);
+            -- Partitions are reachable through the API too; only the parent's policies apply
+            execute format('alter table %I enable row level security', v_name);
+            execute format(
+                'with moved as (delete from business_intelligence_default '
+                'where timestamp >= %L and timestamp < %L returning *) '
+                'insert into %I select * from moved',
+                v_month, v_next, v_name
+            );
+            -- ATTACH locks the parent in SHARE UPDATE EXCLUSIVE mode, but because a
+            -- DEFAULT partition exists it also holds ACCESS EXCLUSIVE on it while it
+            -- scans it for rows in the new range; inserts routed to the default
+            -- partition wait for that scan. The month's rows were just moved out
+            -- and months are created ahead while the default partition is
+            -- near-empty, so the scan is short.
+            execute format(
+                'alter table business_intelligence attach partition %I for values from (%L) to (%L)',
+                v_name, v_month, v_next
+            );
+            v_created := v_created + 1;
+        end if;
+        v_month := v_next;
+    end loop;
+    return v_created;
+end;
+$$;
+
+-- Detach the monthly partitions that ended more than p_retain_months ago and
+-- move them to bi_archive. Returns the archived table names.
+create or replace function "public"."archive_business_intelligence_partitions"(
+    p_retain_months integer default 13
+)
+returns setof text
+security invoker
+set search_path = public
+language plpgsql
+as $$
+declare
+    v_cutoff date := (date_trunc('month', now()) - make_interval(months => p_retain_months))::date;
+    v_name text;
+begin
+    for v_name in
+        select c.relname
+        from pg_inherits i
+        join pg_class c on c.oid = i.inhrelid
+        where i.inhparent = 'public.business_intelligence'::regclass
+          and c.relname ~ '^business_intelligence_[0-9]{4}_[0-9]{2}$'
+          and to_date(right(c.relname, 7), 'YYYY_MM') < v_cutoff
+        order by c.relname
+    loop
+        execute format('alter table business_intelligence detach partition %I', v_name);
+        execute format('alter table %I set schema bi_archive', v_name);
+        return next v_name;
+    end loop;
+end;
+$$;
+
+revoke execute on function "public"."create_business_intelligence_partitions"(integer, timestamp)
+    from public, anon, authenticated;
+revoke execute on function "public"."archive_business_intelligence_partitions"(integer)
+    from public, anon, authenticated;
+
+-- Partitions for every month that has data, then copy it over
+select "public"."create_business_intelligence_partitions"(
+    p_from => (select min("timestamp") from "public"."business_intelligence_unpartitioned")
+);
+insert into "public"."business_intelligence"
+select * from "public"."business_intelligence_unpartitioned";
+
+alter table "public"."business_intelligence" enable row level security;
+
+create policy "Users can view own events" on "public"."business_intelligence"
+    for select using (auth.uid()::text = user_id::text);
+
+create policy "System can insert events" on "public"."business_intelligence"
+    for insert with check (true);
+
+drop table "public"."business_intelligence_unpartitioned";
+
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule(
+            'business-intelligence-partitions',
+            '15 3 * * *',
+            'SELECT create_business_intelligence_partitions(); SELECT archive_business_intelligence_partitions();'
+        );
+    end if;
+end;
+$$;
+
+commit;
+
+analyze "public"."business_intelligence";
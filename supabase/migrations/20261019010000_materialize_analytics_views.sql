@@ -0,0 +1,170 @@
+--
+-- Materialize the analytics views.
+--
+-- user_stats and industry_breakdown become materialized views (user_stats
+-- keeps its current definition); revenue_breakdown, marketplace_usage and
+-- challenge_breakdown are added for the insights dashboard (grouped in the
+-- database instead of counted by the API); and
+-- refresh_analytics_views() refreshes them CONCURRENTLY while recording when
+-- each was last refreshed in materialized_view_refreshes. The backend calls it
+-- on a timer (ANALYTICS_VIEW_REFRESH_SECONDS). Fresh installs get the same
+-- objects from supabase_schema.sql.
+--
+-- Materialized views bypass RLS, so access is limited to the service role.
+--
+
+begin;
+
+-- user_stats keeps the columns of whichever schema created it
+do $$
+declare
+    v_definition text;
+begin
+    if exists (
+        select 1 from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = 'public' and c.relname = 'user_stats' and c.relkind = 'v'
+    ) then
+        v_definition := pg_get_viewdef('public.user_stats'::regclass, true);
+        drop view "public"."user_stats";
+        execute format('create materialized view "public"."user_stats" as %s', rtrim(v_definition, ';'));
+    end if;
+end;
+$$;
+
+create unique index if not exists "idx_user_stats_id"
+    on "public"."user_stats" ("id");
+
+drop view if exists "public"."industry_breakdown";
+
+create materialized view if not exists "public"."industry_breakdown" as
+select
+    industry,
+    count(*) as user_count,
+    avg(case
+        when monthly_revenue = 'under-1k' then 500
+        when monthly_revenue = '1k-5k' then 3000
+        when monthly_revenue = '5k-10k' then 7500
+        when monthly_revenue = '10k-25k' then 17500
+        when monthly_revenue = '25k-50k' then 37500
+        when monthly_revenue = '50k+' then 75000
+        else 0
+    end) as avg_revenue_estimate
+from "public"."user_business_profiles"
+where industry is not null
+group by industry;
+
+create unique index if not exists "idx_industry_breakdown_industry"
+    on "public"."industry_breakdown" ("industry");
+
+-- Profiles without a revenue range are grouped under 'unknown'; a NULL key
+-- can't be matched by a concurrent refresh
+create materialized view if not exists "public"."revenue_breakdown" as
+select
+    coalesce(monthly_revenue, 'unknown') as monthly_revenue,
+    count(*) as user_count
+from "public"."user_business_profiles"
+group by coalesce(monthly_revenue, 'unknown');
+
+create unique index if not exists "idx_revenue_breakdown_monthly_revenue"
+    on "public"."revenue_breakdown" ("monthly_revenue");
+
+-- Older schemas have no marketplace or challenge columns; those views are
+-- only created where the columns exist
+do $$
+begin
+    if exists (
+        select 1 from information_schema.columns
+        where table_schema = 'public'
+          and table_name = 'user_business_profiles'
+          and column_name = 'current_marketplaces'
+    ) then
+        create materialized view if not exists "public"."marketplace_usage" as
+        select
+            marketplace,
+            count(*) as user_count
+        from "public"."user_business_profiles", unnest(current_marketplaces) as marketplace
+        group by marketplace;
+
+        create unique index if not exists "idx_marketplace_usage_marketplace"
+            on "public"."marketplace_usage" ("marketplace");
+        revoke all on "public"."marketplace_usage" from public, anon, authenticated;
+    end if;
+
+    if exists (
+        select 1 from information_schema.columns
+        where table_schema = 'public'
+          and table_name = 'user_business_profiles'
+          and column_name = 'biggest_challenge'
+    ) then
+        create materialized view if not exists "public"."challenge_breakdown" as
+        select
+            biggest_challenge,
+            count(*) as user_count
+        from "public"."user_business_profiles"
+        where biggest_challenge is not null
+        group by biggest_challenge;
+
+        create unique index if not exists "idx_challenge_breakdown_biggest_challenge"
+            on "public"."challenge_breakdown" ("biggest_challenge");
+        revoke all on "public"."challenge_breakdown" from public, anon, authenticated;
+    end if;
+end;
+$$;
+
+revoke all on "public"."user_stats", "public"."industry_breakdown", "public"."revenue_breakdown"
+    from public, anon, authenticated;
+
+-- Staleness metadata, one row per materialized view
+create table if not exists "public"."materialized_view_refreshes" (
+    "view_name" text primary key,
+    "refreshed_at" timestamptz not null default now(),
+    "duration_ms" double precision not null default 0
+);
+
+alter table "public"."materialized_view_refreshes" enable row level security;
+
+insert into "public"."materialized_view_refreshes" ("view_name")
+select view_name
+from unnest(array[
+    'user_stats', 'industry_breakdown', 'revenue_breakdown', 'marketplace_usage', 'challenge_breakdown'
+]) as view_name
+where to_regclass(format('public.%I', view_name)) is not null
+on conflict ("view_name") do nothing;
+
+-- Refresh every analytics view last refreshed more than p_max_age_seconds ago
+-- and return the staleness rows. An advisory lock lets one caller refresh
+-- while concurrent callers return the current metadata.
+create or replace function "public"."refresh_analytics_views"(p_max_age_seconds integer default 0)
+returns setof "public"."materialized_view_refreshes"
+security definer
+set search_path = public
+language plpgsql
+as $$
+declare
+    v_view text;
+    v_started timestamptz;
+begin
+    if pg_try_advisory_xact_lock(hashtext('refresh_analytics_views')) then
+        for v_view in
+            select view_name
+            from materialized_view_refreshes
+            where refreshed_at <= now() - make_interval(secs => p_max_age_seconds)
+            order by view_name
+        loop
+            v_started := clock_timestamp();
+            execute format('refresh materialized view concurrently %I', v_view);
+            update materialized_view_refreshes
+            set refreshed_at = clock_timestamp(),
+                duration_ms = extract(epoch from clock_timestamp() - v_started) * 1000
+            where view_name = v_view;
+        end loop;
+    end if;
+    return query select * from materialized_view_refreshes order by view_name;
+end;
+$$;
+
+revoke execute on function "public"."refresh_analytics_views"(integer) from public, anon, authenticated;
+grant execute on function "public"."refresh_analytics_views"(integer) to service_role;
+
+commit;
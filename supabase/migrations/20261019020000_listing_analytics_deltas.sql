@@ -0,0 +1,80 @@
+--
+-- Batched listing analytics counters.
+--
+-- The backend sums view/click/favorite/message counts per (listing_id,
+-- platform, date) in memory and flushes them through
+-- apply_listing_analytics_deltas() instead of writing once per view. The
+-- function adds each delta to the matching analytics row in a single
+-- insert ... on conflict do update. Schemas created from the migrations have
+-- no analytics table yet; it is created with the supabase_schema.sql layout.
+--
+
+begin;
+
+create table if not exists "public"."analytics" (
+    "id" uuid primary key default "extensions"."uuid_generate_v4"(),
+    "listing_id" uuid references "public"."listings" ("id") on delete cascade,
+    "user_id" uuid references "public"."users" ("id") on delete cascade,
+    "platform" varchar(50),
+    "views" integer default 0,
+    "favorites" integer default 0,
+    "messages" integer default 0,
+    "clicks" integer default 0,
+    "date" date default current_date,
+    "created_at" timestamp default now(),
+    unique ("listing_id", "platform", "date")
+);
+
+create index if not exists "idx_analytics_listing_id" on "public"."analytics" ("listing_id");
+create index if not exists "idx_analytics_user_id" on "public"."analytics" ("user_id");
+create index if not exists "idx_analytics_date" on "public"."analytics" ("date");
+
+alter table "public"."analytics" enable row level security;
+
+do $$
+begin
+    if not exists (
+        select 1 from pg_policies
+        where schemaname = 'public' and tablename = 'analytics'
+          and policyname = 'Users can view own analytics'
+    ) then
+        create policy "Users can view own analytics" on "public"."analytics"
+            for select using (auth.uid()::text = user_id::text);
+    end if;
+end;
+$$;
+
+create or replace function "public"."apply_listing_analytics_deltas"(p_rows jsonb)
+returns integer
+security invoker
+set search_path = public
+language sql
+as $$
+    with upserted as (
+        insert into analytics (listing_id, user_id, platform, date, views, clicks, favorites, messages)
+        select
+            (r->>'listing_id')::uuid,
+            (r->>'user_id')::uuid,
+            r->>'platform',
+            coalesce((r->>'date')::date, current_date),
+            coalesce((r->>'views')::integer, 0),
+            coalesce((r->>'clicks')::integer, 0),
+            coalesce((r->>'favorites')::integer, 0),
+            coalesce((r->>'messages')::integer, 0)
+        from jsonb_array_elements(p_rows) as r
+        -- Same lock order in every batch, so concurrent flushes can't deadlock
+        order by 1, 3, 4
+        on conflict (listing_id, platform, date) do update set
+            views = analytics.views + excluded.views,
+            clicks = analytics.clicks + excluded.clicks,
+            favorites = analytics.favorites + excluded.favorites,
+            messages = analytics.messages + excluded.messages,
+            user_id = coalesce(analytics.user_id, excluded.user_id)
+        returning 1
+    )
+    select count(*)::integer from upserted;
+$$;
+
+revoke execute on function "public"."apply_listing_analytics_deltas"(jsonb) from public, anon, authenticated;
+
+commit;
@@ -0,0 +1,17 @@
+--
+-- Index listings on (user_id, created_at, id).
+--
+-- Per-user listing exports page through a user's listings in (created_at, id)
+-- order, continuing after the last row of the previous page. This index makes
+-- every page a range read however deep into the export it is, and its
+-- user_id prefix replaces the single-column user_id index.
+--
+
+begin;
+
+create index if not exists "idx_listings_user_created"
+    on "public"."listings" using btree ("user_id", "created_at", "id");
+
+drop index if exists "public"."idx_listings_user_id";
+
+commit;
@@ -6,6 +6,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram matching (admin user search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================================
 -- USERS TABLE
 -- ============================================
@@ -116,17 +119,26 @@ CREATE TABLE listings (
 
 -- ============================================
 -- BUSINESS INTELLIGENCE TABLE
+-- Partitioned by month on timestamp; partitions are created ahead and
+-- archived by the maintenance functions under BUSINESS INTELLIGENCE
+-- PARTITIONS below
 -- ============================================
 CREATE TABLE business_intelligence (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID REFERENCES users(id) ON DELETE CASCADE,
 
     event_type VARCHAR(100) NOT NULL,
     event_data JSONB DEFAULT '{}'::jsonb,
 
-    timestamp TIMESTAMP DEFAULT NOW(),
-    created_at TIMESTAMP DEFAULT NOW()
-);
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT NOW(),
+
+    -- The partition key must be part of the primary key
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every monthly partition until maintenance moves them
+CREATE TABLE business_intelligence_default PARTITION OF business_intelligence DEFAULT;
 
 -- ============================================
 -- PLATFORM CONNECTIONS TABLE
@@ -184,6 +196,8 @@ CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_users_trial_active ON users(trial_active);
 CREATE INDEX idx_users_created_at ON users(created_at);
+CREATE INDEX idx_users_username_trgm ON users USING GIN (lower(username) gin_trgm_ops);
+CREATE INDEX idx_users_email_trgm ON users USING GIN (lower(email) gin_trgm_ops);
 
 -- Business Profiles
 CREATE INDEX idx_business_profiles_user_id ON user_business_profiles(user_id);
@@ -191,15 +205,18 @@ CREATE INDEX idx_business_profiles_industry ON user_business_profiles(industry);
 CREATE INDEX idx_business_profiles_monthly_revenue ON user_business_profiles(monthly_revenue);
 
 -- Listings
-CREATE INDEX idx_listings_user_id ON listings(user_id);
+-- Serves per-user lookups and the keyset pages of per-user exports
+CREATE INDEX idx_listings_user_created ON listings(user_id, created_at, id);
 CREATE INDEX idx_listings_status ON listings(status);
 CREATE INDEX idx_listings_created_at ON listings(created_at);
 CREATE INDEX idx_listings_category ON listings(category);
 
--- Business Intelligence
-CREATE INDEX idx_bi_user_id ON business_intelligence(user_id);
-CREATE INDEX idx_bi_event_type ON business_intelligence(event_type);
-CREATE INDEX idx_bi_timestamp ON business_intelligence(timestamp);
+-- Business Intelligence (per-user lookups use idx_bi_user_event_timestamp).
+-- Rows arrive in time order, so a BRIN index serves time ranges at a
+-- fraction of a B-tree's size and insert cost.
+CREATE INDEX idx_bi_event_type_timestamp ON business_intelligence(event_type, timestamp);
+CREATE INDEX idx_bi_timestamp_brin ON business_intelligence
+    USING brin (timestamp) WITH (pages_per_range = 32);
 
 -- Platform Connections
 CREATE INDEX idx_platform_connections_user_id ON platform_connections(user_id);
@@ -294,14 +311,17 @@ CREATE TRIGGER update_platform_connections_updated_at BEFORE UPDATE ON platform_
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 -- ============================================
--- VIEWS FOR ANALYTICS
--- FIXED: Remove SECURITY DEFINER (use SECURITY INVOKER)
+-- MATERIALIZED VIEWS FOR ANALYTICS
+-- Dashboards read precomputed rows; refresh_analytics_views() recomputes them
+-- with REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked) and
+-- records when each one was last refreshed in materialized_view_refreshes.
+-- The backend calls it on a timer (ANALYTICS_VIEW_REFRESH_SECONDS).
+-- Materialized views bypass RLS, so only the service role can read them.
 -- ============================================
 
--- User stats view (SECURITY INVOKER means it uses querying user's permissions)
-CREATE VIEW user_stats
-WITH (security_invoker=true)
-AS
+-- One row per user (user_business_profiles is unique per user_id); listing and
+-- connection counts are aggregated before the join so it doesn't fan out
+CREATE MATERIALIZED VIEW user_stats AS
 SELECT
     u.id,
     u.username,
@@ -311,20 +331,21 @@ SELECT
     bp.industry,
     bp.monthly_revenue,
     bp.team_size,
-    COUNT(DISTINCT l.id) as total_listings,
-    COUNT(DISTINCT pc.id) as connected_platforms,
+    COALESCE(l.total_listings, 0) as total_listings,
+    COALESCE(pc.connected_platforms, 0) as connected_platforms,
     u.created_at as signup_date
 FROM users u
 LEFT JOIN user_business_profiles bp ON u.id = bp.user_id
-LEFT JOIN listings l ON u.id = l.user_id
-LEFT JOIN platform_connections pc ON u.id = pc.user_id
-GROUP BY u.id, u.username, u.email, u.trial_type, u.subscription_tier,
-         bp.industry, bp.monthly_revenue, bp.team_size, u.created_at;
-
--- Industry breakdown view (SECURITY INVOKER)
-CREATE VIEW industry_breakdown
-WITH (security_invoker=true)
-AS
+LEFT JOIN (
+    SELECT user_id, COUNT(*) as total_listings FROM listings GROUP BY user_id
+) l ON u.id = l.user_id
+LEFT JOIN (
+    SELECT user_id, COUNT(*) as connected_platforms FROM platform_connections GROUP BY user_id
+) pc ON u.id = pc.user_id;
+
+CREATE UNIQUE INDEX idx_user_stats_id ON user_stats(id);
+
+CREATE MATERIALIZED VIEW industry_breakdown AS
 SELECT
     industry,
     COUNT(*) as user_count,
@@ -339,8 +360,506 @@ SELECT
     END) as avg_revenue_estimate
 FROM user_business_profiles
 WHERE industry IS NOT NULL
-GROUP BY industry
-ORDER BY user_count DESC;
+GROUP BY industry;
+
+CREATE UNIQUE INDEX idx_industry_breakdown_industry ON industry_breakdown(industry);
+
+-- Profiles without a revenue range are grouped under 'unknown'; a NULL key
+-- can't be matched by a concurrent refresh
+CREATE MATERIALIZED VIEW revenue_breakdown AS
+SELECT
+    COALESCE(monthly_revenue, 'unknown') as monthly_revenue,
+    COUNT(*) as user_count
+FROM user_business_profiles
+GROUP BY COALESCE(monthly_revenue, 'unknown');
+
+CREATE UNIQUE INDEX idx_revenue_breakdown_monthly_revenue ON revenue_breakdown(monthly_revenue);
+
+CREATE MATERIALIZED VIEW marketplace_usage AS
+SELECT
+    marketplace,
+    COUNT(*) as user_count
+FROM user_business_profiles, unnest(current_marketplaces) as marketplace
+GROUP BY marketplace;
+
+CREATE UNIQUE INDEX idx_marketplace_usage_marketplace ON marketplace_usage(marketplace);
+
+CREATE MATERIALIZED VIEW challenge_breakdown AS
+SELECT
+    biggest_challenge,
+    COUNT(*) as user_count
+FROM user_business_profiles
+WHERE biggest_challenge IS NOT NULL
+GROUP BY biggest_challenge;
+
+CREATE UNIQUE INDEX idx_challenge_breakdown_biggest_challenge ON challenge_breakdown(biggest_challenge);
+
+REVOKE ALL ON user_stats, industry_breakdown, revenue_breakdown, marketplace_usage, challenge_breakdown
+    FROM PUBLIC, anon, authenticated;
+
+-- Staleness metadata, one row per materialized view
+CREATE TABLE materialized_view_refreshes (
+    view_name TEXT PRIMARY KEY,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    duration_ms DOUBLE PRECISION NOT NULL DEFAULT 0
+);
+
+ALTER TABLE materialized_view_refreshes ENABLE ROW LEVEL SECURITY;
+
+INSERT INTO materialized_view_refreshes (view_name)
+VALUES ('user_stats'), ('industry_breakdown'), ('revenue_breakdown'),
+       ('marketplace_usage'), ('challenge_breakdown')
+ON CONFLICT (view_name) DO NOTHING;
+
+-- Refresh every analytics view last refreshed more than p_max_age_seconds ago
+-- and return the staleness rows. Several app instances can call it on a
+-- timer: an advisory lock lets one of them refresh while the others return
+-- the current metadata. SECURITY DEFINER because only the views' owner may
+-- refresh them; execution is limited to the service role below.
+CREATE OR REPLACE FUNCTION refresh_analytics_views(p_max_age_seconds INTEGER DEFAULT 0)
+RETURNS SETOF materialized_view_refreshes
+SECURITY DEFINER
+SET search_path = public
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_view TEXT;
+    v_started TIMESTAMPTZ;
+BEGIN
+    IF pg_try_advisory_xact_lock(hashtext('refresh_analytics_views')) THEN
+        FOR v_view IN
+            SELECT view_name
+            FROM materialized_view_refreshes
+            WHERE refreshed_at <= NOW() - make_interval(secs => p_max_age_seconds)
+            ORDER BY view_name
+        LOOP
+            v_started := clock_timestamp();
+            EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', v_view);
+            UPDATE materialized_view_refreshes
+            SET refreshed_at = clock_timestamp(),
+                duration_ms = EXTRACT(EPOCH FROM clock_timestamp() - v_started) * 1000
+            WHERE view_name = v_view;
+        END LOOP;
+    END IF;
+    RETURN QUERY SELECT * FROM materialized_view_refreshes ORDER BY view_name;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION refresh_analytics_views(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_analytics_views(INTEGER) TO service_role;
+
+-- ============================================
+-- MESSAGE STATS RPC
+-- Single-query inbox counters for the /api/messages/stats Supabase path.
+-- Only received messages are logged here; read state and leads live in
+-- MongoDB, so the RPC does not report them. p_from bounds the scan so only
+-- the monthly partitions inside the window are read.
+-- ============================================
+
+DROP FUNCTION IF EXISTS get_message_stats(UUID, TIMESTAMP);
+
+CREATE OR REPLACE FUNCTION get_message_stats(
+    p_user_id UUID,
+    p_since TIMESTAMP,
+    p_from TIMESTAMP
+)
+RETURNS JSON
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE sql
+STABLE
+AS $$
+    WITH msgs AS (
+        SELECT event_data->>'platform' AS platform, timestamp
+        FROM business_intelligence
+        WHERE user_id = p_user_id
+          AND event_type = 'message_received'
+          AND timestamp >= p_from
+    )
+    SELECT json_build_object(
+        'total_messages', (SELECT COUNT(*) FROM msgs),
+        'recent_messages_24h', (SELECT COUNT(*) FROM msgs WHERE timestamp >= p_since),
+        'platform_breakdown', COALESCE((
+            SELECT json_agg(json_build_object('platform', platform, 'count', cnt))
+            FROM (
+                SELECT platform, COUNT(*) AS cnt
+                FROM msgs
+                GROUP BY platform
+                ORDER BY cnt DESC
+                LIMIT 10
+            ) p
+        ), '[]'::json)
+    );
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_bi_user_event_timestamp
+    ON business_intelligence(user_id, event_type, timestamp);
+
+-- ============================================
+-- USER SEARCH RPC
+-- Substring search over username/email served by the trigram GIN indexes,
+-- ranked by similarity and returning only the columns the API exposes
+-- ============================================
+
+CREATE OR REPLACE FUNCTION search_users(p_query TEXT, p_limit INTEGER DEFAULT 20)
+RETURNS TABLE (
+    id UUID,
+    username VARCHAR,
+    email VARCHAR,
+    full_name VARCHAR,
+    phone VARCHAR,
+    is_active BOOLEAN,
+    trial_active BOOLEAN,
+    trial_type VARCHAR,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    score REAL
+)
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_term TEXT := lower(p_query);
+    -- Escape LIKE wildcards so user input is matched literally
+    v_pattern TEXT := '%' || replace(replace(replace(lower(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    RETURN QUERY
+    SELECT
+        u.id, u.username, u.email, u.full_name, u.phone, u.is_active,
+        u.trial_active, u.trial_type, u.created_at, u.updated_at,
+        GREATEST(similarity(lower(u.username), v_term), similarity(lower(u.email), v_term)) AS score
+    FROM users u
+    WHERE lower(u.username) LIKE v_pattern
+       OR lower(u.email) LIKE v_pattern
+    ORDER BY 11 DESC, lower(u.username)  -- score (positional: OUT params shadow names)
+    LIMIT LEAST(GREATEST(p_limit, 1), 100);
+END;
+$$;
+
+-- ============================================
+-- REPLICATION OUTBOX
+-- MongoDB writes recorded in the same transaction as the primary write and
+-- drained by services.replication.OutboxReplicator (Supabase -> Mongo migration)
+-- ============================================
+
+CREATE TABLE replication_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    collection VARCHAR(100) NOT NULL,
+    op VARCHAR(20) NOT NULL CHECK (op IN ('upsert', 'set')),
+    filter JSONB NOT NULL,
+    document JSONB NOT NULL,
+
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX idx_replication_outbox_due ON replication_outbox(next_attempt_at, id);
+-- Older pending rows for the same document (claim ordering check)
+CREATE INDEX idx_replication_outbox_document ON replication_outbox(collection, filter, id);
+
+-- Only the service role (which bypasses RLS) reads or writes the outbox
+ALTER TABLE replication_outbox ENABLE ROW LEVEL SECURITY;
+
+-- Outbox rows MongoDB rejected on every attempt (e.g. a document that fails
+-- validation), parked so they stop blocking newer rows for their document.
+-- Inspect, fix and re-insert into replication_outbox to replay one.
+CREATE TABLE replication_outbox_dead_letter (
+    id BIGINT PRIMARY KEY,
+    collection VARCHAR(100) NOT NULL,
+    op VARCHAR(20) NOT NULL,
+    filter JSONB NOT NULL,
+    document JSONB NOT NULL,
+
+    attempts INTEGER,
+    last_error TEXT,
+    created_at TIMESTAMPTZ,
+    dead_lettered_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE replication_outbox_dead_letter ENABLE ROW LEVEL SECURITY;
+
+-- Insert a row (p_match_id NULL) or update it by id, and enqueue p_outbox
+-- entries ({collection, op, filter, document}) atomically with it
+CREATE OR REPLACE FUNCTION write_with_outbox(
+    p_table TEXT,
+    p_row JSONB,
+    p_match_id UUID DEFAULT NULL,
+    p_outbox JSONB DEFAULT '[]'::jsonb
+)
+RETURNS JSONB
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_cols TEXT;
+    v_sets TEXT;
+    v_result JSONB;
+BEGIN
+    IF p_table NOT IN ('users', 'platform_connections', 'business_intelligence') THEN
+        RAISE EXCEPTION 'write_with_outbox: table % is not replicated', p_table;
+    END IF;
+
+    IF p_match_id IS NULL THEN
+        -- Only the supplied columns, so omitted ones keep their defaults
+        SELECT string_agg(quote_ident(k), ', ') INTO v_cols FROM jsonb_object_keys(p_row) AS k;
+        EXECUTE format(
+            'INSERT INTO %1$I (%2$s) SELECT %2$s FROM jsonb_populate_record(NULL::%1$I, $1) '
+            'RETURNING to_jsonb(%1$I.*)',
+            p_table, v_cols
+        ) INTO v_result USING p_row;
+    ELSE
+        SELECT string_agg(format('%1$I = r.%1$I', k), ', ') INTO v_sets FROM jsonb_object_keys(p_row) AS k;
+        EXECUTE format(
+            'UPDATE %1$I AS t SET %2$s FROM jsonb_populate_record(NULL::%1$I, $1) AS r '
+            'WHERE t.id = $2 RETURNING to_jsonb(t.*)',
+            p_table, v_sets
+        ) INTO v_result USING p_row, p_match_id;
+    END IF;
+
+    IF v_result IS NOT NULL THEN
+        INSERT INTO replication_outbox (collection, op, filter, document)
+        SELECT e->>'collection', e->>'op', e->'filter', e->'document'
+        FROM jsonb_array_elements(p_outbox) AS e;
+    END IF;
+
+    RETURN v_result;
+END;
+$$;
+
+-- Lease the next due outbox rows to one replicator (SKIP LOCKED lets several
+-- app instances drain concurrently without double-applying rows).
+-- Rows for one document (collection + filter) must apply in id order, so a
+-- row is only claimed when every older row for its document is claimed in
+-- the same batch; a row behind one that is backing off, leased by another
+-- replicator or past the batch limit waits for it.
+CREATE OR REPLACE FUNCTION claim_replication_outbox(p_limit INTEGER DEFAULT 500, p_lease_seconds INTEGER DEFAULT 60)
+RETURNS SETOF replication_outbox
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE sql
+AS $$
+    WITH due AS (
+        SELECT id, collection, filter FROM replication_outbox
+        WHERE next_attempt_at <= NOW()
+        ORDER BY next_attempt_at, id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), ready AS (
+        SELECT d.id FROM due d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM replication_outbox p
+            WHERE p.collection = d.collection
+              AND p.filter = d.filter
+              AND p.id < d.id
+              AND p.id NOT IN (SELECT id FROM due)
+        )
+    )
+    UPDATE replication_outbox o
+    SET next_attempt_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = o.attempts + 1
+    WHERE o.id IN (SELECT id FROM ready)
+    RETURNING o.*;
+$$;
+
+-- Return failed rows to the queue with exponential backoff (capped at 5 min).
+-- Newer rows for the same documents stay queued behind them (see the claim).
+-- Rows that have been claimed p_max_attempts times are moved to
+-- replication_outbox_dead_letter instead (NULL: never, e.g. when MongoDB was
+-- unreachable rather than rejecting the rows); their ids are returned.
+DROP FUNCTION IF EXISTS release_replication_outbox(BIGINT[], TEXT);
+CREATE OR REPLACE FUNCTION release_replication_outbox(
+    p_ids BIGINT[],
+    p_error TEXT,
+    p_max_attempts INTEGER DEFAULT NULL
+)
+RETURNS SETOF BIGINT
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE sql
+AS $$
+    WITH dead AS (
+        DELETE FROM replication_outbox
+        WHERE id = ANY(p_ids) AND attempts >= p_max_attempts
+        RETURNING *
+    ), parked AS (
+        INSERT INTO replication_outbox_dead_letter
+            (id, collection, op, filter, document, attempts, last_error, created_at)
+        SELECT id, collection, op, filter, document, attempts, p_error, created_at FROM dead
+        RETURNING id
+    ), retried AS (
+        UPDATE replication_outbox
+        SET last_error = p_error,
+            next_attempt_at = NOW() + make_interval(secs => LEAST(power(2, attempts), 300))
+        WHERE id = ANY(p_ids) AND id NOT IN (SELECT id FROM dead)
+    )
+    SELECT id FROM parked;
+$$;
+
+-- Hand back claimed rows that were not attempted because an older row for
+-- their document failed in the same batch: the claim's attempt is undone and
+-- they are claimed again with (never ahead of) that row once its lease ends.
+CREATE OR REPLACE FUNCTION defer_replication_outbox(p_ids BIGINT[])
+RETURNS VOID
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE sql
+AS $$
+    UPDATE replication_outbox
+    SET attempts = GREATEST(attempts - 1, 0)
+    WHERE id = ANY(p_ids);
+$$;
+
+-- ============================================
+-- BUSINESS INTELLIGENCE PARTITIONS
+-- Monthly partitions are created a few months ahead, and months past the
+-- retention window are detached into the bi_archive schema, where they can
+-- be dumped (pg_dump -n bi_archive) and dropped without touching the live
+-- table. Scheduled daily with pg_cron when the extension is installed.
+-- ============================================
+
+CREATE SCHEMA IF NOT EXISTS bi_archive;
+REVOKE ALL ON SCHEMA bi_archive FROM PUBLIC;
+
+-- Create the monthly partitions from p_from's month (default: this month)
+-- through p_months_ahead months from now. Rows that landed in the default
+-- partition for a new month are moved into it. Returns the number created.
+CREATE OR REPLACE FUNCTION create_business_intelligence_partitions(
+    p_months_ahead INTEGER DEFAULT 3,
+    p_from TIMESTAMP DEFAULT NULL
+)
+RETURNS INTEGER
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_month DATE := date_trunc('month', COALESCE(p_from, NOW()))::date;
+    v_last DATE := (date_trunc('month', NOW()) + make_interval(months => p_months_ahead))::date;
+    v_next DATE;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_next := (v_month + INTERVAL '1 month')::date;
+        v_name := 'business_intelligence_' || to_char(v_month, 'YYYY_MM');
+        IF to_regclass(format('public.%I', v_name)) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE business_intelligence INCLUDING DEFAULTS)', v_name);
+            -- Partitions are reachable through the API too; only the parent's policies apply
+            EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM business_intelligence_default '
+                'WHERE timestamp >= %L AND timestamp < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                v_month, v_next, v_name
+            );
+            -- ATTACH locks the parent in SHARE UPDATE EXCLUSIVE mode, but because a
+            -- DEFAULT partition exists it also holds ACCESS EXCLUSIVE on it while it
+            -- scans it for rows in the new range; inserts routed to the default
+            -- partition wait for that scan. The month's rows were just moved out
+            -- and months are created ahead while the default partition is
+            -- near-empty, so the scan is short.
+            EXECUTE format(
+                'ALTER TABLE business_intelligence ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, v_next
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_month := v_next;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+-- Detach the monthly partitions that ended more than p_retain_months ago and
+-- move them to bi_archive. Returns the archived table names.
+CREATE OR REPLACE FUNCTION archive_business_intelligence_partitions(p_retain_months INTEGER DEFAULT 13)
+RETURNS SETOF TEXT
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => p_retain_months))::date;
+    v_name TEXT;
+BEGIN
+    FOR v_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.business_intelligence'::regclass
+          AND c.relname ~ '^business_intelligence_[0-9]{4}_[0-9]{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') < v_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE business_intelligence DETACH PARTITION %I', v_name);
+        EXECUTE format('ALTER TABLE %I SET SCHEMA bi_archive', v_name);
+        RETURN NEXT v_name;
+    END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION create_business_intelligence_partitions(INTEGER, TIMESTAMP) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION archive_business_intelligence_partitions(INTEGER) FROM PUBLIC, anon, authenticated;
+
+ALTER TABLE business_intelligence_default ENABLE ROW LEVEL SECURITY;
+SELECT create_business_intelligence_partitions();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'business-intelligence-partitions',
+            '15 3 * * *',
+            'SELECT create_business_intelligence_partitions(); SELECT archive_business_intelligence_partitions();'
+        );
+    END IF;
+END;
+$$;
+
+-- ============================================
+-- LISTING ANALYTICS DELTAS
+-- The backend sums view/click/favorite/message counts in memory and flushes
+-- them here in batches; each row's counts are added to the analytics row for
+-- its (listing_id, platform, date).
+-- ============================================
+
+CREATE OR REPLACE FUNCTION apply_listing_analytics_deltas(p_rows JSONB)
+RETURNS INTEGER
+SECURITY INVOKER
+SET search_path = public
+LANGUAGE sql
+AS $$
+    WITH upserted AS (
+        INSERT INTO analytics (listing_id, user_id, platform, date, views, clicks, favorites, messages)
+        SELECT
+            (r->>'listing_id')::uuid,
+            (r->>'user_id')::uuid,
+            r->>'platform',
+            COALESCE((r->>'date')::date, CURRENT_DATE),
+            COALESCE((r->>'views')::integer, 0),
+            COALESCE((r->>'clicks')::integer, 0),
+            COALESCE((r->>'favorites')::integer, 0),
+            COALESCE((r->>'messages')::integer, 0)
+        FROM jsonb_array_elements(p_rows) AS r
+        -- Same lock order in every batch, so concurrent flushes can't deadlock
+        ORDER BY 1, 3, 4
+        ON CONFLICT (listing_id, platform, date) DO UPDATE SET
+            views = analytics.views + EXCLUDED.views,
+            clicks = analytics.clicks + EXCLUDED.clicks,
+            favorites = analytics.favorites + EXCLUDED.favorites,
+            messages = analytics.messages + EXCLUDED.messages,
+            user_id = COALESCE(analytics.user_id, EXCLUDED.user_id)
+        RETURNING 1
+    )
+    SELECT COUNT(*)::integer FROM upserted;
+$$;
+
+REVOKE EXECUTE ON FUNCTION apply_listing_analytics_deltas(JSONB) FROM PUBLIC, anon, authenticated;
 
 -- ============================================
 -- SAMPLE DATA (Optional - for testing)